@@ -1,28 +1,178 @@
 """API routes for Model Autopsy AI"""
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
+import json
 import traceback
 
-from app.services.data_loader import load_and_validate
+from app.config import (
+    SEGMENT_MIN_ROWS, SEGMENT_TOP_K, REPORT_STORE_AUTOSAVE, SAMPLING_MAX_ROWS, ALLOW_MODEL_UPLOADS
+)
+from app.models.schemas import AutopsyReport
+from app.services.data_loader import load_and_validate, parse_csv_bytes, parse_csv_many, validate_frames
 from app.services.drift_detection import detect_drift
-from app.services.impact_analysis import analyze_impact
-from app.services.timeline import build_timeline
-from app.services.llm_diagnosis import generate_diagnosis
-from app.reports.report_builder import build_report
+from app.services.dataset_store import get_dataset_store
+from app.services.pipeline import run_pipeline
+from app.services.batch import run_batch_autopsy
+from app.services.sampling import sample_csv_stream, sample_frame
+from app.services.model_impact import load_model, IMPACT_METHODS
+from app.services.segment_analysis import analyze_segments
+from app.services.warmup import get_preloaded_baseline
+from app.services.report_store import get_report_store
+from app.services.report_rendering import get_pdf_render_queue
+from app.reports.renderer import render_html_chunks
+from app.services.admission import (
+    AdmissionRejected, estimate_cost, get_admission_controller, peek_csv_shape
+)
 
 router = APIRouter()
 
+
+async def _load_frames(slots, keep=()):
+    """
+    Load (name, upload, dataset_id) slots into unvalidated DataFrames
+    
+    Each slot must provide exactly one of an upload or a registered dataset id.
+    `keep` lists key columns to parse even if the drift policy skips them.
+    """
+    for name, upload, dataset_id in slots:
+        if (upload is None) == (not dataset_id):
+            raise ValueError(f"Provide either a '{name}' file or '{name}_id', not both or neither")
+    
+    frames = {}
+    uploads = []
+    for i, (name, upload, dataset_id) in enumerate(slots):
+        if dataset_id:
+            try:
+                frames[i] = get_dataset_store().load(dataset_id)
+            except KeyError:
+                raise ValueError(f"Unknown dataset id for '{name}': {dataset_id}")
+        else:
+            uploads.append((i, name, await upload.read()))
+    
+    # Uploads are parsed concurrently, each with its own sniffed encoding
+    if uploads:
+        parsed = await run_in_threadpool(
+            parse_csv_many, [content for _, _, content in uploads], [name for _, name, _ in uploads], keep
+        )
+        frames.update(zip([i for i, _, _ in uploads], parsed))
+    return [frames[i] for i in range(len(slots))]
+
+
+async def _load_inputs(slots, keep=()):
+    """Load train/prod_old/prod_new slots into validated DataFrames"""
+    if all(upload is not None and not dataset_id for _, upload, dataset_id in slots):
+        return await load_and_validate(*[upload for _, upload, _ in slots], keep=keep)
+    return validate_frames(*await _load_frames(slots, keep), keep=keep)
+
+
+async def _load_sampled_inputs(slots, sample_size, stratify_by, seed, keep=()):
+    """
+    Sample train/prod_old/prod_new slots while streaming, then validate
+    
+    Uploads are never read fully into memory; registered datasets are sampled
+    from their memory-mapped columns.
+    """
+    for name, upload, dataset_id in slots:
+        if (upload is None) == (not dataset_id):
+            raise ValueError(f"Provide either a '{name}' file or '{name}_id', not both or neither")
+    
+    frames = []
+    inputs = {}
+    for i, (name, upload, dataset_id) in enumerate(slots):
+        if dataset_id:
+            try:
+                source = get_dataset_store().load(dataset_id)
+            except KeyError:
+                raise ValueError(f"Unknown dataset id for '{name}': {dataset_id}")
+            df, info = await run_in_threadpool(sample_frame, source, sample_size, stratify_by, seed + i)
+        else:
+            df, info = await run_in_threadpool(
+                sample_csv_stream, upload.file, sample_size, stratify_by, seed + i, keep=keep
+            )
+        frames.append(df)
+        inputs[name] = info
+    
+    train_df, old_df, new_df = validate_frames(*frames, fingerprint=False, keep=[stratify_by, *keep])
+    sampling_info = {"sample_size": sample_size, "seed": seed, "inputs": inputs}
+    return train_df, old_df, new_df, sampling_info
+
+
+def _upload_size(upload: UploadFile) -> int:
+    if upload.size is not None:
+        return upload.size
+    position = upload.file.tell()
+    size = upload.file.seek(0, 2)
+    upload.file.seek(position)
+    return size
+
+
+def _input_shapes(slots):
+    """(rows, columns, raw_bytes) per input slot, without parsing anything"""
+    shapes = []
+    for _, upload, dataset_id in slots:
+        if dataset_id:
+            try:
+                meta = get_dataset_store().get(dataset_id)
+            except KeyError:
+                continue  # reported by the loader
+            shapes.append((meta["rows"], meta["num_columns"], 0))
+        elif upload is not None:
+            size = _upload_size(upload)
+            shapes.append((*peek_csv_shape(upload.file, size), size))
+    return shapes
+
+
+async def _admit(slots, sample_size=None):
+    """
+    Estimate a request's memory cost and wait for admission
+    
+    Returns a ticket for get_admission_controller().release(); raises
+    AdmissionRejected (see _admission_error) when the server is saturated.
+    """
+    cost = estimate_cost(_input_shapes(slots), sample_size)
+    return await get_admission_controller().acquire(cost)
+
+
+def _admission_error(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=e.status_code, detail=str(e), headers=e.headers)
+
+
+@router.get("/admission/status")
+def admission_status():
+    """Admission control state: running and queued analyses, memory budget in use"""
+    return get_admission_controller().status()
+
+
 @router.get("/test")
 def test_endpoint():
     """Simple test endpoint"""
     return {"status": "Backend is working!", "test": "success"}
 
-@router.post("/run-autopsy")
+@router.post("/run-autopsy", response_model=AutopsyReport, response_model_exclude_unset=True)
 async def run_autopsy(
-    train: UploadFile = File(..., description="Training data (baseline)"),
-    prod_old: UploadFile = File(..., description="Production data (before failure)"),
-    prod_new: UploadFile = File(..., description="Production data (after failure)"),
-    predictions: Optional[UploadFile] = File(None, description="Optional: predictions for SHAP analysis")
+    train: Optional[UploadFile] = File(None, description="Training data (baseline)"),
+    prod_old: Optional[UploadFile] = File(None, description="Production data (before failure)"),
+    prod_new: Optional[UploadFile] = File(None, description="Production data (after failure)"),
+    predictions: Optional[UploadFile] = File(None, description="Optional: prediction/actual CSV for prod_new (error attribution)"),
+    model: Optional[UploadFile] = File(None, description="Optional: pickled sklearn-compatible model"),
+    train_id: Optional[str] = Form(None, description="Registered dataset id to use instead of 'train'"),
+    prod_old_id: Optional[str] = Form(None, description="Registered dataset id to use instead of 'prod_old'"),
+    prod_new_id: Optional[str] = Form(None, description="Registered dataset id to use instead of 'prod_new'"),
+    incremental: bool = Form(True, description="Reuse per-feature results for unchanged columns"),
+    sample_size: Optional[int] = Form(None, description="Sampling mode: rows to sample from each input"),
+    stratify_by: Optional[str] = Form(None, description="Column to stratify samples on (sampling mode, SHAP rows)"),
+    sampling_seed: int = Form(42, description="Sampling mode: random seed"),
+    impact_method: str = Form("permutation", description="Model impact method: 'permutation' or 'shap'"),
+    join_key: Optional[str] = Form(None, description="Column joining predictions to prod_new (default: row order)"),
+    multivariate: bool = Form(True, description="Run multivariate (domain classifier / PCA) drift checks"),
+    correlation: bool = Form(True, description="Compare train vs production correlation matrices"),
+    correlation_top_k: Optional[int] = Form(None, description="Only correlate the k most drifted features"),
+    drift_metrics: Optional[str] = Form(None, description="Extra drift metrics, e.g. 'wasserstein,js,hellinger'"),
+    pvalue_correction: Optional[str] = Form(None, description="KS p-value correction: 'bh', 'holm' or 'none'"),
+    save_report: Optional[bool] = Form(None, description="Persist the report for history and diffs (default: REPORT_STORE_AUTOSAVE)"),
+    report_name: Optional[str] = Form(None, description="Name to store the report under, e.g. the model name")
 ):
     """
     Run complete autopsy analysis on ML model failure
@@ -34,85 +184,124 @@ async def run_autopsy(
     4. Timeline reconstruction
     5. LLM-powered diagnosis
     
+    With `incremental` enabled (default), drift and impact are recomputed only
+    for features whose column fingerprints changed since a previous run.
+    
+    Any of the three inputs can be a dataset id from `/datasets` instead of
+    an upload, which skips the transfer and parse cost.
+    
+    Setting `sample_size` switches to sampling mode for very large inputs:
+    each input is reservoir-sampled (stratified by `stratify_by` if given)
+    while streaming, scores carry confidence intervals, and features whose
+    interval straddles a cutoff are listed in `metadata.sampling.escalate_features`.
+    
+    Uploading a pickled `model` adds permutation (or, with `impact_method=shap`,
+    sampled SHAP) importance on old vs new production data to every impact
+    result (`model_impact`). Unpickling runs arbitrary code, so model uploads
+    are refused (403) unless the server sets `ALLOW_MODEL_UPLOADS=true`; the
+    CLI's `--model` loads from a local path instead.
+    
+    Uploading `predictions` (prediction, actual columns for prod_new rows,
+    joined by row order or `join_key`) adds an `error_attribution` section
+    ranking features by how much their shift explains the errors.
+    
+    With `multivariate` enabled (default), a `multivariate_drift` section
+    reports a train-vs-production domain classifier AUC and the shift in
+    PCA reconstruction error, which catch correlated shifts that univariate
+    tests miss.
+    
+    With `correlation` enabled (default), a `correlation_drift` section lists
+    the feature pairs whose correlation changed most (restricted to the
+    `correlation_top_k` most drifted features if given).
+    
+    `drift_metrics` (default: DRIFT_METRICS) adds any of ks, psi, wasserstein,
+    js, hellinger, energy to every drift result under `drift_metrics`.
+    
+    KS p-values are corrected across features (`pvalue_correction`, default
+    Benjamini-Hochberg) and `drift` follows `p_value_adjusted`.
+    
+    Reports are stored under `report_name` (unless `save_report=false` or
+    autosave is off) with their id in `metadata.report_id`; compare runs with
+    `/reports/{base_id}/diff/{target_id}` and track features over time with
+    `/reports/history/{feature}` and `/reports/top-drifting`.
+    
+    `visualizations.distributions` holds histograms and quantile summaries
+    (train / prod_old / prod_new) for the charted drifted features; any other
+    feature of a stored report loads from
+    `/reports/{report_id}/distributions/{feature}`.
+    
+    Requests pass admission control first: when the estimated memory or the
+    number of concurrent analyses is over budget they queue briefly, then
+    get 429 with Retry-After (see `/admission/status`).
+    
     Returns a comprehensive autopsy report with actionable insights.
     """
-    # Log immediately
-    with open("c:\\Users\\Abhishek  Reddy . C\\OneDrive\\Desktop\\k\\model-autopsy-ai\\function_called.txt", "w") as f:
-        f.write("Function was called!\n")
+    if model is not None and not ALLOW_MODEL_UPLOADS:
+        raise HTTPException(
+            status_code=403,
+            detail="Model uploads are disabled (set ALLOW_MODEL_UPLOADS=true on a trusted deployment)"
+        )
     
+    ticket = None
     try:
-        with open("c:\\Users\\Abhishek  Reddy . C\\OneDrive\\Desktop\\k\\model-autopsy-ai\\function_called.txt", "a") as f:
-            f.write("Inside try block\n")
-        
         print("\n=== AUTOPSY REQUEST RECEIVED ===")
-        with open("c:\\Users\\Abhishek  Reddy . C\\OneDrive\\Desktop\\k\\model-autopsy-ai\\function_called.txt", "a") as f:
-            f.write("After first print\n")
-        
         print("Step 1: Loading and validating data...")
-        with open("c:\\Users\\Abhishek  Reddy . C\\OneDrive\\Desktop\\k\\model-autopsy-ai\\function_called.txt", "a") as f:
-            f.write("About to call load_and_validate\n")
         
-        # Step 1: Load and validate data (async now)
-        train_df, old_df, new_df = await load_and_validate(train, prod_old, prod_new)
-        with open("c:\\Users\\Abhishek  Reddy . C\\OneDrive\\Desktop\\k\\model-autopsy-ai\\function_called.txt", "a") as f:
-            f.write(f"Data loaded: {len(train_df)} rows\n")
-        print(f"✅ Data loaded: train={len(train_df)}, old={len(old_df)}, new={len(new_df)}")
-        
-        print("Step 2: Detecting drift...")
-        # Step 2: Detect drift across features
-        with open("c:\\Users\\Abhishek  Reddy . C\\OneDrive\\Desktop\\k\\model-autopsy-ai\\function_called.txt", "a") as f:
-            f.write("About to detect drift\n")
-        drift_results = detect_drift(train_df, new_df)
-        with open("c:\\Users\\Abhishek  Reddy . C\\OneDrive\\Desktop\\k\\model-autopsy-ai\\function_called.txt", "a") as f:
-            f.write(f"Drift detected: {len(drift_results)} features\n")
-        print(f"Drift detection complete: {len(drift_results)} features analyzed")
+        slots = [
+            ("train", train, train_id),
+            ("prod_old", prod_old, prod_old_id),
+            ("prod_new", prod_new, prod_new_id)
+        ]
+        if sample_size is not None and not 0 < sample_size <= SAMPLING_MAX_ROWS:
+            raise ValueError(f"sample_size must be between 1 and {SAMPLING_MAX_ROWS}")
         
-        print("Step 3: Analyzing impact...")
-        # Step 3: Analyze feature impact
-        with open("c:\\Users\\Abhishek  Reddy . C\\OneDrive\\Desktop\\k\\model-autopsy-ai\\function_called.txt", "a") as f:
-            f.write("About to analyze impact\n")
-        impact_results = analyze_impact(train_df, old_df, new_df)
-        with open("c:\\Users\\Abhishek  Reddy . C\\OneDrive\\Desktop\\k\\model-autopsy-ai\\function_called.txt", "a") as f:
-            f.write(f"Impact analyzed: {len(impact_results)} features\n")
-        print(f"Impact analysis complete: {len(impact_results)} features")
+        ticket = await _admit(slots + [("predictions", predictions, None)], sample_size)
         
-        print("Step 4: Building timeline...")
-        # Step 4: Build failure timeline
-        with open("c:\\Users\\Abhishek  Reddy . C\\OneDrive\\Desktop\\k\\model-autopsy-ai\\function_called.txt", "a") as f:
-            f.write("About to build timeline\n")
-        timeline = build_timeline(drift_results, impact_results)
-        with open("c:\\Users\\Abhishek  Reddy . C\\OneDrive\\Desktop\\k\\model-autopsy-ai\\function_called.txt", "a") as f:
-            f.write("Timeline built\n")
-        print("Timeline built successfully")
+        # Step 1: Load and validate data (async now). Key columns stay loaded
+        # even when the drift policy skips them
+        keys = [join_key, stratify_by]
+        sampling_info = None
+        if sample_size is not None:
+            train_df, old_df, new_df, sampling_info = await _load_sampled_inputs(
+                slots, sample_size, stratify_by, sampling_seed, keys
+            )
+        else:
+            train_df, old_df, new_df = await _load_inputs(slots, keys)
+        print(f"✅ Data loaded: train={len(train_df)}, old={len(old_df)}, new={len(new_df)}")
         
-        print("Step 5: Generating diagnosis...")
-        # Step 5: Generate LLM diagnosis
-        with open("c:\\Users\\Abhishek  Reddy . C\\OneDrive\\Desktop\\k\\model-autopsy-ai\\function_called.txt", "a") as f:
-            f.write("About to generate diagnosis\n")
-        diagnosis = generate_diagnosis(drift_results, impact_results, timeline)
-        with open("c:\\Users\\Abhishek  Reddy . C\\OneDrive\\Desktop\\k\\model-autopsy-ai\\function_called.txt", "a") as f:
-            f.write("Diagnosis generated\n")
-        print("Diagnosis generated")
+        if impact_method not in IMPACT_METHODS:
+            raise ValueError(f"impact_method must be one of {IMPACT_METHODS}")
+        fitted_model = await run_in_threadpool(load_model, await model.read()) if model is not None else None
         
-        print("Step 6: Building report...")
-        # Step 6: Build comprehensive report
-        with open("c:\\Users\\Abhishek  Reddy . C\\OneDrive\\Desktop\k\\model-autopsy-ai\\function_called.txt", "a") as f:
-            f.write("About to build report\n")
-        report = build_report(drift_results, impact_results, timeline, diagnosis)
-        with open("c:\\Users\\Abhishek  Reddy . C\\OneDrive\\Desktop\k\\model-autopsy-ai\\function_called.txt", "a") as f:
-            f.write("Report built - SUCCESS!\n")
+        # Steps 2-6: Drift, impact, timeline, diagnosis and report (saved
+        # together with every feature's distribution data)
+        save = save_report if save_report is not None else REPORT_STORE_AUTOSAVE
+        report = await run_in_threadpool(
+            run_pipeline, train_df, old_df, new_df,
+            incremental=incremental,
+            baseline=get_preloaded_baseline(train_id) if sampling_info is None else None,
+            sampling_info=sampling_info,
+            model=fitted_model,
+            impact_method=impact_method,
+            stratify_by=stratify_by,
+            predictions_file=predictions.file if predictions is not None else None,
+            join_key=join_key,
+            multivariate=multivariate,
+            correlation=correlation,
+            correlation_top_k=correlation_top_k,
+            drift_metrics=drift_metrics,
+            pvalue_correction=pvalue_correction,
+            save_as=(report_name or "autopsy") if save else None
+        )
         print("Report built successfully")
         
-        with open("c:\\Users\\Abhishek  Reddy . C\\OneDrive\\Desktop\\k\\model-autopsy-ai\\function_called.txt", "a") as f:
-            f.write("About to return report\\n")
-            f.write(f"Report keys: {list(report.keys())}\\n")
-        
         # Convert to JSON-serializable format (handles NumPy/Pandas types)
-        import json
         json_report = json.loads(json.dumps(report, default=str))
         
         return json_report
         
+    except AdmissionRejected as e:
+        raise _admission_error(e)
     except ValueError as e:
         error_msg = f"ValueError: {str(e)}"
         print(error_msg)
@@ -125,21 +314,350 @@ async def run_autopsy(
         with open("backend.log", "a") as f:
             f.write(f"Exception: {error_detail}\n")
         raise HTTPException(status_code=500, detail=error_detail)
+    finally:
+        if ticket is not None:
+            get_admission_controller().release(ticket)
+
+async def _load_batch_models(prod_old, prod_new, model_names, manifest):
+    """
+    Resolve batch inputs into (name, old_df, new_df) triples
+    
+    Either pairs uploads by position (prod_old[i] with prod_new[i]) or follows
+    a JSON manifest: {"models": [{"name", "prod_old_id", "prod_new_id"}]},
+    where entries may instead reference uploaded files by filename via
+    "prod_old" / "prod_new".
+    """
+    uploads = {f.filename: f for f in (prod_old or []) + (prod_new or [])}
+    parsed = {}
+    
+    async def upload_frame(filename):
+        if filename not in uploads:
+            raise ValueError(f"Manifest references '{filename}', which was not uploaded")
+        if filename not in parsed:
+            parsed[filename] = parse_csv_bytes(await uploads[filename].read())
+        return parsed[filename]
+    
+    if manifest is not None:
+        try:
+            entries = json.loads(await manifest.read())["models"]
+        except (ValueError, KeyError, TypeError):
+            raise ValueError("Manifest must be JSON of the form {\"models\": [...]}")
+        
+        models = []
+        for i, entry in enumerate(entries):
+            frames = []
+            for slot in ("prod_old", "prod_new"):
+                if entry.get(f"{slot}_id"):
+                    try:
+                        frames.append(get_dataset_store().load(entry[f"{slot}_id"]))
+                    except KeyError:
+                        raise ValueError(f"Unknown dataset id for '{slot}': {entry[f'{slot}_id']}")
+                elif entry.get(slot):
+                    frames.append(await upload_frame(entry[slot]))
+                else:
+                    raise ValueError(f"Manifest entry {i} needs '{slot}' or '{slot}_id'")
+            models.append((entry.get("name") or f"model_{i}", frames[0], frames[1]))
+        return models
+    
+    if not prod_old or not prod_new or len(prod_old) != len(prod_new):
+        raise ValueError("Upload the same number of prod_old and prod_new files, or a manifest")
+    
+    names = [n.strip() for n in model_names.split(",")] if model_names else [
+        f.filename or f"model_{i}" for i, f in enumerate(prod_new)
+    ]
+    if len(names) != len(prod_new):
+        raise ValueError("model_names must list one name per prod_old/prod_new pair")
+    
+    contents, labels = [], []
+    for name, old, new in zip(names, prod_old, prod_new):
+        contents += [await old.read(), await new.read()]
+        labels += [f"{name} prod_old", f"{name} prod_new"]
+    frames = await run_in_threadpool(parse_csv_many, contents, labels)
+    return [(name, frames[2 * i], frames[2 * i + 1]) for i, name in enumerate(names)]
+
+
+@router.post("/run-autopsy/batch")
+async def run_autopsy_batch(
+    train: Optional[UploadFile] = File(None, description="Shared training data (baseline)"),
+    train_id: Optional[str] = Form(None, description="Registered dataset id to use instead of 'train'"),
+    prod_old: Optional[List[UploadFile]] = File(None, description="Production data before failure, one per model"),
+    prod_new: Optional[List[UploadFile]] = File(None, description="Production data after failure, one per model"),
+    model_names: Optional[str] = Form(None, description="Comma-separated model names, in upload order"),
+    manifest: Optional[UploadFile] = File(None, description="Optional JSON manifest of models"),
+    max_workers: Optional[int] = Form(None, description="Worker processes (default: BATCH_MAX_WORKERS)")
+):
+    """
+    Run autopsies for many models that share one training baseline
+    
+    Baseline statistics are computed once and the (prod_old, prod_new) pairs
+    are fanned out across a worker pool. Returns per-model reports plus a
+    fleet-level summary ranked by severity. Admission cost covers the
+    training input and every uploaded production file.
+    """
+    ticket = None
+    try:
+        ticket = await _admit(
+            [("train", train, train_id)] + [("prod", f, None) for f in (prod_old or []) + (prod_new or [])]
+        )
+        train_df, = await _load_frames([("train", train, train_id)])
+        models = await _load_batch_models(prod_old, prod_new, model_names, manifest)
+        
+        result = await run_in_threadpool(
+            run_batch_autopsy, train_df, models, max_workers, baseline=get_preloaded_baseline(train_id)
+        )
+        
+        # Convert to JSON-serializable format (handles NumPy/Pandas types)
+        return json.loads(json.dumps(result, default=str))
+    except AdmissionRejected as e:
+        raise _admission_error(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch autopsy failed: {str(e)}\n{traceback.format_exc()}")
+    finally:
+        if ticket is not None:
+            get_admission_controller().release(ticket)
+
 
 @router.post("/analyze-drift")
 async def analyze_drift_only(
-    train: UploadFile = File(...),
-    production: UploadFile = File(...)
+    train: Optional[UploadFile] = File(None),
+    production: Optional[UploadFile] = File(None),
+    train_id: Optional[str] = Form(None),
+    production_id: Optional[str] = Form(None),
+    drift_metrics: Optional[str] = Form(None, description="Extra drift metrics, e.g. 'wasserstein,js,hellinger'"),
+    pvalue_correction: Optional[str] = Form(None, description="KS p-value correction: 'bh', 'holm' or 'none'")
 ):
     """Quick drift analysis without full autopsy"""
+    ticket = None
     try:
-        train_df, _, prod_df = await load_and_validate(train, production, production)
-        drift_results = detect_drift(train_df, prod_df)
+        slots = [("train", train, train_id), ("production", production, production_id)]
+        ticket = await _admit(slots)
+        train_df, prod_df = await _load_frames(slots)
+        train_df, _, prod_df = validate_frames(train_df, prod_df, prod_df)
+        drift_results = detect_drift(
+            train_df, prod_df, baseline=get_preloaded_baseline(train_id),
+            metrics=drift_metrics, correction=pvalue_correction
+        )
         
-        return {
+        # Convert to JSON-serializable format (handles NumPy/Pandas types)
+        return json.loads(json.dumps({
             "status": "success",
-            "drift_detected": any(d["drift"] for d in drift_results),
-            "results": drift_results
-        }
+            "drift_detected": bool(drift_results.drift.any()),
+            "results": drift_results.records()
+        }, default=str))
+    except AdmissionRejected as e:
+        raise _admission_error(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if ticket is not None:
+            get_admission_controller().release(ticket)
+
+
+@router.post("/analyze-segments")
+async def analyze_segments_endpoint(
+    segment_by: str = Form(..., description="Comma-separated slicing columns, e.g. 'location,plan'"),
+    train: Optional[UploadFile] = File(None),
+    production: Optional[UploadFile] = File(None),
+    train_id: Optional[str] = Form(None),
+    production_id: Optional[str] = Form(None),
+    min_rows: int = Form(SEGMENT_MIN_ROWS, description="Prune segments with fewer production rows"),
+    top_k: int = Form(SEGMENT_TOP_K, description="Number of top drifting segments to return")
+):
+    """
+    Segment-level drift drill-down
+    
+    Computes drift (PSI, binned KS) and impact for every combination of the
+    slicing columns in one grouped pass, and returns the top drifting
+    segments, e.g. drift in `income` only for `location=remote`.
+    """
+    ticket = None
+    try:
+        slots = [("train", train, train_id), ("production", production, production_id)]
+        ticket = await _admit(slots)
+        columns = [col.strip().lower() for col in segment_by.split(",") if col.strip()]
+        train_df, prod_df = await _load_frames(slots, columns)
+        train_df, _, prod_df = validate_frames(train_df, prod_df, prod_df, fingerprint=False, keep=columns)
+        result = await run_in_threadpool(
+            analyze_segments, train_df, prod_df, columns, min_rows=min_rows, top_k=top_k
+        )
+        
+        # Convert to JSON-serializable format (handles NumPy/Pandas types)
+        return json.loads(json.dumps({"status": "success", **result}, default=str))
+    except AdmissionRejected as e:
+        raise _admission_error(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if ticket is not None:
+            get_admission_controller().release(ticket)
+
+
+@router.post("/datasets")
+async def register_dataset(
+    file: UploadFile = File(..., description="CSV snapshot to register"),
+    name: Optional[str] = Form(None, description="Optional display name")
+):
+    """
+    Register a dataset once and get a dataset id
+    
+    The file is parsed and stored as memory-mapped columns; pass the returned
+    id (e.g. `train_id`, `prod_new_id`) to analysis endpoints instead of
+    re-uploading the file.
+    """
+    try:
+        content = await file.read()
+        return get_dataset_store().ingest(content, name=name or file.filename or "dataset")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/datasets")
+def list_datasets():
+    """List registered datasets (most recently used first)"""
+    store = get_dataset_store()
+    return {
+        "datasets": store.list(),
+        "total_bytes": store.total_bytes(),
+        "quota_bytes": store.quota_bytes
+    }
+
+
+@router.get("/datasets/{dataset_id}")
+def get_dataset(dataset_id: str):
+    """Get metadata for a registered dataset"""
+    try:
+        return get_dataset_store().get(dataset_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.delete("/datasets/{dataset_id}")
+def delete_dataset(dataset_id: str):
+    """Remove a registered dataset"""
+    try:
+        get_dataset_store().delete(dataset_id)
+        return {"status": "deleted", "dataset_id": dataset_id}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/reports")
+def list_reports(name: Optional[str] = None, limit: int = 50):
+    """List stored reports, newest first (optionally only those saved under `name`)"""
+    return {"reports": get_report_store().list(name=name, limit=limit)}
+
+
+@router.get("/reports/history/{feature}")
+def feature_history(feature: str, name: Optional[str] = None, limit: int = 50):
+    """Drift and impact scores of one feature over its last `limit` stored runs, oldest first"""
+    return {
+        "feature": feature,
+        "name": name,
+        "history": get_report_store().feature_history(feature.strip().lower(), name=name, limit=limit)
+    }
+
+
+@router.get("/reports/top-drifting")
+def top_drifting_features(runs: int = 10, name: Optional[str] = None, top_k: int = 20):
+    """Features that drifted most often (then most strongly) over the last `runs` stored reports"""
+    return {
+        "runs": runs,
+        "name": name,
+        "features": get_report_store().top_drifting(runs=runs, name=name, top_k=top_k)
+    }
+
+
+@router.get("/reports/{report_id}")
+def get_report(report_id: str):
+    """Fetch a stored report"""
+    try:
+        return get_report_store().get(report_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/reports/{report_id}/distributions/{feature}")
+def get_feature_distribution(report_id: str, feature: str):
+    """
+    Histograms and quantile summaries of one feature in a stored report
+    
+    Reports only inline the charted features; this loads any other feature
+    on demand without reading the stored report.
+    """
+    try:
+        return get_report_store().get_distribution(report_id, feature.strip().lower())
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/reports/{report_id}/html")
+def download_report_html(report_id: str):
+    """
+    Full HTML report (every feature), streamed in chunks
+    
+    Rendered from precompiled templates as the response is sent, so large
+    reports never sit in memory as one string.
+    """
+    try:
+        report = get_report_store().get(report_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return StreamingResponse(render_html_chunks(report), media_type="text/html; charset=utf-8")
+
+
+@router.get("/reports/{report_id}/pdf")
+def download_report_pdf(report_id: str):
+    """
+    PDF of a stored report, rendered in the background and cached by id
+    
+    Returns the file once it is rendered; until then 202 with the job
+    status and a Retry-After hint (the first request starts the job).
+    """
+    queue = get_pdf_render_queue()
+    if not get_report_store().exists(report_id):
+        # Reports pruned by REPORT_STORE_MAX_REPORTS may still have a cached PDF
+        queue.evict(report_id)
+        raise HTTPException(status_code=404, detail=f"Unknown report id: {report_id}")
+    path = queue.cached_path(report_id)
+    if path is None:
+        status = queue.submit(report_id)
+        if status["status"] == "failed":
+            raise HTTPException(status_code=500, detail=f"PDF rendering failed: {status['error']}")
+        if status["status"] != "ready":
+            return JSONResponse(status_code=202, content=status, headers={"Retry-After": "1"})
+        path = queue.path(report_id)
+    return FileResponse(path, media_type="application/pdf", filename=f"autopsy-{report_id}.pdf")
+
+
+@router.get("/reports/{base_id}/diff/{target_id}")
+def diff_reports(base_id: str, target_id: str, top_k: Optional[int] = None, min_score_change: Optional[float] = None):
+    """
+    Compare two stored reports by feature
+    
+    Returns newly drifted and resolved features, severity and impact-level
+    changes, the largest drift/impact score changes and added/removed
+    features, computed from indexed per-feature rows (the stored reports are
+    not re-read).
+    """
+    options = {k: v for k, v in (("top_k", top_k), ("min_score_change", min_score_change)) if v is not None}
+    try:
+        return get_report_store().diff(base_id, target_id, **options)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.delete("/reports/{report_id}")
+def delete_report(report_id: str):
+    """Remove a stored report"""
+    try:
+        get_report_store().delete(report_id)
+        get_pdf_render_queue().evict(report_id)
+        return {"status": "deleted", "report_id": report_id}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
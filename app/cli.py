@@ -0,0 +1,213 @@
+"""
+Command-line autopsy runner for offline and cron use (no HTTP stack)
+
+Single autopsy from local files:
+
+    python -m app.cli run --train train.csv --prod-old old.csv --prod-new new.csv --out reports/
+
+Fleet-wide batch over a directory of snapshots, one subdirectory per model
+holding prod_old.csv and prod_new.csv:
+
+    python -m app.cli batch --train train.csv --models-dir snapshots/ --out reports/ --workers 8
+
+Files are parsed straight from disk (memory-mapped), so nothing goes
+through upload buffers. Reports are written as <name>.json, <name>.html
+and/or <name>.pdf (plus the report store with --save, for /reports diffs); the
+exit code is non-zero if any autopsy failed.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from app.config import BATCH_MAX_WORKERS
+from app.services.data_loader import read_csv_path, validate_frames
+from app.services.model_impact import IMPACT_METHODS, load_model
+from app.services.pipeline import run_pipeline
+from app.services.batch import run_batch_autopsy
+from app.services.report_store import get_report_store
+from app.reports.renderer import render_html_chunks, render_pdf
+
+REPORT_FORMATS = ("json", "html", "pdf")
+SNAPSHOT_FILES = ("prod_old.csv", "prod_new.csv")
+
+
+def _parse_formats(value: str) -> List[str]:
+    formats = [f.strip().lower() for f in value.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in REPORT_FORMATS]
+    if not formats or unknown:
+        raise argparse.ArgumentTypeError(f"Formats must be a comma-separated subset of {REPORT_FORMATS}")
+    return formats
+
+
+def write_report(report: dict, out_dir: str, name: str, formats: List[str]) -> List[str]:
+    """Write one report in every requested format; returns the written paths"""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    if "json" in formats:
+        path = os.path.join(out_dir, f"{name}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+        paths.append(path)
+    if "html" in formats:
+        path = os.path.join(out_dir, f"{name}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(render_html_chunks(report))
+        paths.append(path)
+    if "pdf" in formats:
+        path = os.path.join(out_dir, f"{name}.pdf")
+        with open(path, "wb") as f:
+            f.write(render_pdf(report))
+        paths.append(path)
+    return paths
+
+
+def discover_models(models_dir: str) -> List[Tuple[str, str, str]]:
+    """
+    (model name, prod_old path, prod_new path) for every snapshot subdirectory
+
+    Raises:
+        ValueError: If the directory is missing or holds no complete snapshot
+    """
+    if not os.path.isdir(models_dir):
+        raise ValueError(f"Models directory not found: {models_dir}")
+
+    models = []
+    for name in sorted(os.listdir(models_dir)):
+        paths = [os.path.join(models_dir, name, file) for file in SNAPSHOT_FILES]
+        if all(os.path.isfile(path) for path in paths):
+            models.append((name, *paths))
+        elif os.path.isdir(os.path.join(models_dir, name)):
+            print(f"⚠️ Skipping {name}: needs {' and '.join(SNAPSHOT_FILES)}")
+
+    if not models:
+        raise ValueError(f"No model snapshots ({', '.join(SNAPSHOT_FILES)}) found in {models_dir}")
+    return models
+
+
+def run_single(args) -> int:
+    start = time.time()
+    keys = [args.join_key]  # loaded even if the drift policy skips it
+    train_df, old_df, new_df = validate_frames(
+        *(read_csv_path(path, keep=keys) for path in (args.train, args.prod_old, args.prod_new)), keep=keys
+    )
+    print(f"✅ Data loaded: train={len(train_df)}, old={len(old_df)}, new={len(new_df)}")
+
+    model = None
+    if args.model:
+        with open(args.model, "rb") as f:
+            model = load_model(f.read())
+
+    predictions_file = open(args.predictions, "rb") if args.predictions else None
+    try:
+        report = run_pipeline(
+            train_df, old_df, new_df,
+            incremental=False,
+            model=model,
+            impact_method=args.impact_method,
+            predictions_file=predictions_file,
+            join_key=args.join_key,
+            multivariate=not args.no_multivariate,
+            correlation=not args.no_correlation,
+            drift_metrics=args.drift_metrics,
+            pvalue_correction=args.pvalue_correction,
+            save_as=args.name if args.save else None
+        )
+    finally:
+        if predictions_file is not None:
+            predictions_file.close()
+
+    for path in write_report(report, args.out, args.name, args.format):
+        print(f"📄 Wrote {path}")
+    print(f"✅ Autopsy finished in {time.time() - start:.1f}s: {report['executive_summary']['severity']}")
+    return 0
+
+
+def run_batch(args) -> int:
+    start = time.time()
+    snapshots = discover_models(args.models_dir)
+    train_df = read_csv_path(args.train)
+
+    # Parse snapshots concurrently; the C parser releases the GIL for most of the work
+    def load(snapshot):
+        name, old_path, new_path = snapshot
+        return name, read_csv_path(old_path), read_csv_path(new_path)
+
+    with ThreadPoolExecutor(max_workers=min(len(snapshots), args.workers or BATCH_MAX_WORKERS)) as pool:
+        models = list(pool.map(load, snapshots))
+    print(f"✅ Loaded {len(models)} model snapshots in {time.time() - start:.1f}s")
+
+    result = run_batch_autopsy(train_df, models, max_workers=args.workers)
+
+    failed = 0
+    for model in result["models"]:
+        if model["status"] != "completed":
+            failed += 1
+            print(f"❌ {model['model']}: {model['error']}")
+            continue
+        if args.save:
+            get_report_store().save(model["report"], model["model"])
+        write_report(model["report"], args.out, model["model"], args.format)
+
+    summary_path = os.path.join(args.out, "fleet_summary.json")
+    os.makedirs(args.out, exist_ok=True)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(dict(result["fleet_summary"], elapsed_seconds=result["elapsed_seconds"]), f, indent=2, default=str)
+
+    print(f"📄 Wrote {len(result['models']) - failed} reports and {summary_path}")
+    print(f"✅ Batch finished in {time.time() - start:.1f}s ({failed} failed)")
+    return 1 if failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Model Autopsy AI command-line runner")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_output_args(command):
+        command.add_argument("--out", default="reports", help="Output directory (default: reports)")
+        command.add_argument("--format", type=_parse_formats, default=["json"],
+                             help="Comma-separated report formats: json, html, pdf (default: json)")
+        command.add_argument("--save", action="store_true",
+                             help="Also persist reports in the report store (REPORT_STORE_PATH) for diffs")
+
+    run = commands.add_parser("run", help="Autopsy for one model from local CSV files")
+    run.add_argument("--train", required=True, help="Training data CSV")
+    run.add_argument("--prod-old", required=True, help="Production data before failure (CSV)")
+    run.add_argument("--prod-new", required=True, help="Production data after failure (CSV)")
+    run.add_argument("--name", default="autopsy_report", help="Report file name without extension (and stored name)")
+    run.add_argument("--model", help="Pickled/joblib model for model-aware impact")
+    run.add_argument("--impact-method", choices=IMPACT_METHODS, default="permutation")
+    run.add_argument("--predictions", help="CSV with prediction/actual columns for prod_new")
+    run.add_argument("--join-key", help="Column joining predictions to prod_new (default: row order)")
+    run.add_argument("--drift-metrics", help="Extra drift metrics, e.g. wasserstein,js")
+    run.add_argument("--pvalue-correction", choices=("bh", "holm", "none"))
+    run.add_argument("--no-multivariate", action="store_true", help="Skip multivariate drift checks")
+    run.add_argument("--no-correlation", action="store_true", help="Skip correlation drift")
+    add_output_args(run)
+    run.set_defaults(handler=run_single)
+
+    batch = commands.add_parser("batch", help="Autopsies for a directory of model snapshots")
+    batch.add_argument("--train", required=True, help="Shared training data CSV")
+    batch.add_argument("--models-dir", required=True,
+                       help="Directory with one subdirectory per model holding prod_old.csv and prod_new.csv")
+    batch.add_argument("--workers", type=int, help="Worker processes (default: BATCH_MAX_WORKERS)")
+    add_output_args(batch)
+    batch.set_defaults(handler=run_batch)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
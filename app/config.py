@@ -12,10 +12,150 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 KS_TEST_THRESHOLD = 0.05  # p-value threshold for KS test
 PSI_MODERATE_THRESHOLD = 0.1
 PSI_SEVERE_THRESHOLD = 0.25
+KS_SEVERITY_THRESHOLDS = (0.1, 0.2, 0.3)  # KS statistic cutoffs for Low / Moderate / High
 
 # Impact Analysis
 IMPACT_HIGH_THRESHOLD = 0.3
 IMPACT_MODERATE_THRESHOLD = 0.1
+CATEGORICAL_IMPACT_HIGH_THRESHOLD = 0.4
+CATEGORICAL_IMPACT_MODERATE_THRESHOLD = 0.2
+PROXY_IMPACT_WEIGHTS = {"mean_shift": 0.4, "variance_change": 0.3, "overlap_loss": 0.3}
+
+# Drift policy file (YAML or JSON): per-feature/pattern thresholds, weights,
+# metrics and skip rules, compiled once at startup (empty = config defaults)
+DRIFT_POLICY_PATH = os.getenv("DRIFT_POLICY_PATH", "")
+
+# Incremental re-autopsy: max cached per-feature results (drift + impact entries)
+INCREMENTAL_STORE_MAX_ENTRIES = int(os.getenv("INCREMENTAL_STORE_MAX_ENTRIES", "10000"))
+
+# Dataset registry (memory-mapped columnar snapshots)
+DATASET_STORE_DIR = os.getenv("DATASET_STORE_DIR", os.path.join("data", "datasets"))
+DATASET_STORE_QUOTA_MB = float(os.getenv("DATASET_STORE_QUOTA_MB", "2048"))
+
+# Batch autopsy worker processes (one baseline shared across many models)
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", str(os.cpu_count() or 1)))
+
+# Sampling mode (exploratory autopsies on very large inputs)
+SAMPLING_CHUNK_ROWS = int(os.getenv("SAMPLING_CHUNK_ROWS", "100000"))
+SAMPLING_BOOTSTRAP_ROUNDS = int(os.getenv("SAMPLING_BOOTSTRAP_ROUNDS", "200"))
+SAMPLING_CONFIDENCE = float(os.getenv("SAMPLING_CONFIDENCE", "0.95"))
+SAMPLING_MAX_ROWS = int(os.getenv("SAMPLING_MAX_ROWS", "1000000"))
+# Stratified sampling: distinct strata tracked (later ones pool into "<other>")
+# and the reservoir size as a multiple of sample_size
+SAMPLING_MAX_STRATA = int(os.getenv("SAMPLING_MAX_STRATA", "1000"))
+SAMPLING_STRATIFIED_OVERSAMPLE = float(os.getenv("SAMPLING_STRATIFIED_OVERSAMPLE", "1.25"))
+# Bootstrap rounds are resampled in blocks of at most this many values per side
+SAMPLING_BOOTSTRAP_BLOCK_CELLS = int(os.getenv("SAMPLING_BOOTSTRAP_BLOCK_CELLS", "4000000"))
+
+# Model-aware impact (permutation importance with batched predictions)
+MODEL_IMPACT_SAMPLE_ROWS = int(os.getenv("MODEL_IMPACT_SAMPLE_ROWS", "2000"))
+MODEL_IMPACT_BATCH_ROWS = int(os.getenv("MODEL_IMPACT_BATCH_ROWS", "200000"))
+MODEL_IMPACT_REPEATS = int(os.getenv("MODEL_IMPACT_REPEATS", "3"))
+MODEL_IMPACT_WORKERS = int(os.getenv("MODEL_IMPACT_WORKERS", str(os.cpu_count() or 1)))
+# Unpickling an uploaded model runs arbitrary code, so the API only accepts
+# model uploads when explicitly enabled for a trusted deployment
+ALLOW_MODEL_UPLOADS = os.getenv("ALLOW_MODEL_UPLOADS", "false").lower() in ("1", "true", "yes")
+
+# Scalable SHAP impact (summarized background, sampled rows, chunked workers)
+SHAP_BACKGROUND_SIZE = int(os.getenv("SHAP_BACKGROUND_SIZE", "50"))
+SHAP_EXPLAIN_ROWS = int(os.getenv("SHAP_EXPLAIN_ROWS", "1000"))
+SHAP_CHUNK_ROWS = int(os.getenv("SHAP_CHUNK_ROWS", "250"))
+SHAP_WORKERS = int(os.getenv("SHAP_WORKERS", str(os.cpu_count() or 1)))
+SHAP_PROCESS_MIN_ROWS = int(os.getenv("SHAP_PROCESS_MIN_ROWS", "5000"))
+SHAP_EXPLAINER_CACHE_SIZE = int(os.getenv("SHAP_EXPLAINER_CACHE_SIZE", "8"))
+
+# Prediction-error attribution (predictions upload)
+ERROR_ATTRIBUTION_BINS = int(os.getenv("ERROR_ATTRIBUTION_BINS", "10"))
+ERROR_ATTRIBUTION_CHUNK_ROWS = int(os.getenv("ERROR_ATTRIBUTION_CHUNK_ROWS", "100000"))
+
+# Segment drill-down
+SEGMENT_MIN_ROWS = int(os.getenv("SEGMENT_MIN_ROWS", "30"))
+SEGMENT_TOP_K = int(os.getenv("SEGMENT_TOP_K", "20"))
+
+# Multivariate drift (domain classifier + PCA reconstruction error)
+MULTIVARIATE_SAMPLE_ROWS = int(os.getenv("MULTIVARIATE_SAMPLE_ROWS", "50000"))
+MULTIVARIATE_BATCH_ROWS = int(os.getenv("MULTIVARIATE_BATCH_ROWS", "5000"))
+MULTIVARIATE_MAX_CATEGORIES = int(os.getenv("MULTIVARIATE_MAX_CATEGORIES", "20"))
+# Rows per side the (gradient-boosted) domain classifier is fitted on, and its boosting rounds
+MULTIVARIATE_CLASSIFIER_ROWS = int(os.getenv("MULTIVARIATE_CLASSIFIER_ROWS", "20000"))
+MULTIVARIATE_CLASSIFIER_ITERATIONS = int(os.getenv("MULTIVARIATE_CLASSIFIER_ITERATIONS", "100"))
+MULTIVARIATE_AUC_SEVERITY_THRESHOLDS = (0.55, 0.65, 0.75)  # hold-out AUC cutoffs for Low / Moderate / High
+
+# Correlation-structure drift
+CORRELATION_CHUNK_ROWS = int(os.getenv("CORRELATION_CHUNK_ROWS", "50000"))
+CORRELATION_MAX_FEATURES = int(os.getenv("CORRELATION_MAX_FEATURES", "500"))
+CORRELATION_CHANGE_THRESHOLD = float(os.getenv("CORRELATION_CHANGE_THRESHOLD", "0.2"))
+
+# High-cardinality categoricals: switch to sketches above this many distinct values
+HIGH_CARDINALITY_THRESHOLD = int(os.getenv("HIGH_CARDINALITY_THRESHOLD", "10000"))
+SKETCH_WIDTH = int(os.getenv("SKETCH_WIDTH", "65536"))
+SKETCH_DEPTH = int(os.getenv("SKETCH_DEPTH", "4"))
+SKETCH_HLL_PRECISION = int(os.getenv("SKETCH_HLL_PRECISION", "14"))
+SKETCH_TOP_K = int(os.getenv("SKETCH_TOP_K", "50"))
+# False-positive rate of the "seen in training" Bloom filter (sized from the HyperLogLog distinct estimate)
+SKETCH_BLOOM_FP_RATE = float(os.getenv("SKETCH_BLOOM_FP_RATE", "0.01"))
+
+# Extra drift metrics reported per feature (comma-separated subset of
+# ks, psi, wasserstein, js, hellinger, energy; empty disables the mode)
+DRIFT_METRICS = os.getenv("DRIFT_METRICS", "")
+
+# Multiple-testing correction across per-feature KS tests: "bh"
+# (Benjamini-Hochberg), "holm" or "none"
+DRIFT_PVALUE_CORRECTION = os.getenv("DRIFT_PVALUE_CORRECTION", "bh")
+# Training-quantile bins for PSI/JS/Hellinger on numerical features; the
+# visualization histograms reuse the same edges (from the baseline profile)
+DRIFT_METRIC_BINS = int(os.getenv("DRIFT_METRIC_BINS", "10"))
+# Coarse quantile bins for the cheap KS screening bound (0 disables screening)
+DRIFT_SCREENING_BINS = int(os.getenv("DRIFT_SCREENING_BINS", "32"))
+
+# Startup warm-up: import heavy modules, exercise the analysis paths and
+# profile registered baselines before serving. Runs when app.main is
+# imported, i.e. once in the master under `gunicorn --preload`, so workers
+# share the results copy-on-write. WARMUP_DATASETS is a comma-separated
+# list of dataset ids, or "*" for every registered dataset.
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+WARMUP_DATASETS = os.getenv("WARMUP_DATASETS", "")
+
+# CSV parse engine for uploads: "auto" (pyarrow if installed, else the C
+# parser), "pyarrow" or "c"
+CSV_PARSE_ENGINE = os.getenv("CSV_PARSE_ENGINE", "auto").lower()
+
+# Admission control for analysis endpoints: requests whose estimated memory
+# (rows x columns x bytes per cell, from file headers before parsing) does
+# not fit the budget, or that exceed the concurrency cap, queue briefly and
+# are then rejected with 429 + Retry-After
+ADMISSION_MEMORY_BUDGET_MB = float(os.getenv("ADMISSION_MEMORY_BUDGET_MB", "4096"))
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", str(os.cpu_count() or 1)))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "16"))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "30"))
+ADMISSION_BYTES_PER_CELL = int(os.getenv("ADMISSION_BYTES_PER_CELL", "48"))
+# Request bodies above this are refused (413) before they are read
+MAX_UPLOAD_MB = float(os.getenv("MAX_UPLOAD_MB", "2048"))
+
+# Persisted reports and per-feature score history. REPORT_STORE_BACKEND picks
+# a registered backend ("sqlite" by default, "memory"); /run-autopsy saves
+# every report unless REPORT_STORE_AUTOSAVE is off or save_report=false, and
+# only the newest REPORT_STORE_MAX_REPORTS are kept (0 = keep all)
+REPORT_STORE_BACKEND = os.getenv("REPORT_STORE_BACKEND", "sqlite")
+REPORT_STORE_PATH = os.getenv("REPORT_STORE_PATH", os.path.join("data", "reports.sqlite"))
+REPORT_STORE_AUTOSAVE = os.getenv("REPORT_STORE_AUTOSAVE", "true").lower() in ("1", "true", "yes")
+REPORT_STORE_MAX_REPORTS = int(os.getenv("REPORT_STORE_MAX_REPORTS", "1000"))
+REPORT_DIFF_TOP_K = int(os.getenv("REPORT_DIFF_TOP_K", "20"))
+REPORT_DIFF_MIN_SCORE_CHANGE = float(os.getenv("REPORT_DIFF_MIN_SCORE_CHANGE", "0.01"))
+
+# Visualization data: per-feature histograms over the training-quantile bins
+# the drift metrics use (DRIFT_METRIC_BINS), plus quantile summaries. Reports
+# inline the charted (top drifted) features; every feature is stored with a
+# saved report and fetched on demand from /reports/{report_id}/distributions/{feature}
+VISUALIZATION_MAX_CATEGORIES = int(os.getenv("VISUALIZATION_MAX_CATEGORIES", "20"))
+
+# Report rendering: HTML tables stream REPORT_RENDER_CHUNK_ROWS rows per
+# chunk; PDFs of stored reports are rendered by background workers and
+# cached on disk by report id (stored reports never change)
+REPORT_RENDER_CHUNK_ROWS = int(os.getenv("REPORT_RENDER_CHUNK_ROWS", "500"))
+REPORT_RENDER_WORKERS = int(os.getenv("REPORT_RENDER_WORKERS", "1"))
+REPORT_RENDER_CACHE_DIR = os.getenv("REPORT_RENDER_CACHE_DIR", os.path.join("data", "rendered"))
+REPORT_RENDER_CACHE_MAX_FILES = int(os.getenv("REPORT_RENDER_CACHE_MAX_FILES", "200"))
 
 # Supported column types
 NUMERICAL_TYPES = ['int64', 'float64', 'int32', 'float32']
@@ -3,6 +3,9 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.api.routes import router
+from app.config import WARMUP_ON_STARTUP, MAX_UPLOAD_MB
+from app.services.drift_policy import get_policy
+from app.services.warmup import prefork_warmup, warmup_status
 import traceback
 
 app = FastAPI(
@@ -23,6 +26,17 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Refuse oversized request bodies before they are read (413)"""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_MB * 1024 * 1024:
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"Request body exceeds the {MAX_UPLOAD_MB:.0f} MB upload limit"}
+        )
+    return await call_next(request)
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Catch all exceptions and return proper error response"""
@@ -40,6 +54,15 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 app.include_router(router)
 
+# Compile the drift policy once at startup (an invalid policy file fails fast here)
+get_policy()
+
+# Warm up at import time: under `gunicorn --preload` this runs once in the
+# master before workers fork; a plain uvicorn worker finishes it before it
+# starts accepting connections
+if WARMUP_ON_STARTUP:
+    prefork_warmup()
+
 @app.get("/")
 def health_check():
     """Health check endpoint"""
@@ -55,6 +78,7 @@ def detailed_health():
     return {
         "status": "healthy",
         "service": "Model Autopsy AI",
+        "warmup": warmup_status(),
         "endpoints": {
             "docs": "/docs",
             "autopsy": "/run-autopsy"
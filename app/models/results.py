@@ -0,0 +1,236 @@
+"""
+Columnar per-feature drift and impact results
+
+detect_drift and analyze_impact return these containers instead of a list
+of per-feature dicts: the scores every consumer sorts, filters and counts
+by live in typed NumPy arrays, and only the method-specific fields (test
+statistics, p-values, confidence intervals, model importance, ...) stay in
+one small `details` dict per feature. Full per-feature dicts are built only
+at the report/API boundary (records()); the report is then validated
+against the Pydantic response schemas (app.models.schemas).
+
+Records are fresh dicts, so writing to one does not change the container:
+services that annotate results write to `details[i]` or the score arrays.
+"""
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+import numpy as np
+
+SEVERITY_LEVELS = ("None", "Low", "Moderate", "High")
+IMPACT_LEVELS = ("None", "Low", "Moderate", "High")
+
+DRIFT_FIELDS = ("feature", "drift", "drift_score", "severity")
+IMPACT_FIELDS = ("feature", "impact_score", "impact_level", "weighted_impact_score")
+
+
+def _codes(values: Sequence, levels: Sequence[str]) -> np.ndarray:
+    """int8 level codes (-1 for missing or unknown levels)"""
+    lookup = {level: code for code, level in enumerate(levels)}
+    return np.fromiter((lookup.get(v, -1) for v in values), dtype=np.int8, count=len(values))
+
+
+def _level(code: int, levels: Sequence[str]) -> Optional[str]:
+    return levels[code] if code >= 0 else None
+
+
+def rank_descending(scores: np.ndarray, indices: Optional[np.ndarray] = None, k: Optional[int] = None) -> np.ndarray:
+    """
+    Indices ordered by score, highest first
+
+    Stable like sorted(..., reverse=True): ties keep their input order.
+
+    Args:
+        scores: Score per result
+        indices: Restrict the ranking to these result indices (default: all)
+        k: Keep only the first k
+    """
+    if indices is None:
+        indices = np.arange(len(scores))
+    ranked = indices[np.argsort(-scores[indices], kind="stable")]
+    return ranked if k is None else ranked[:k]
+
+
+class _ResultColumns:
+    """Sequence-of-records behaviour shared by the drift and impact containers"""
+
+    __slots__ = ()
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return (self.record(i) for i in range(len(self)))
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self.record(i) for i in range(len(self))[index]]
+        return self.record(range(len(self))[index])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (_ResultColumns, list)):
+            return self.records() == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def records(self, indices: Optional[Iterable[int]] = None) -> List[Dict]:
+        """Full per-feature dicts (all features, or `indices` in that order)"""
+        return [self.record(i) for i in (range(len(self)) if indices is None else indices)]
+
+    def index(self) -> Dict[str, int]:
+        """Position of each feature"""
+        return {feature: i for i, feature in enumerate(self.features.tolist())}
+
+
+@dataclass(slots=True, frozen=True, eq=False)
+class DriftColumns(_ResultColumns):
+    """Per-feature drift results as parallel arrays plus method-specific details"""
+
+    features: np.ndarray     # object (feature names)
+    drift: np.ndarray        # bool
+    drift_score: np.ndarray  # float64
+    severity: np.ndarray     # int8 codes into SEVERITY_LEVELS
+    details: List[Dict]      # method, p-values, statistics, ... (no DRIFT_FIELDS)
+
+    @classmethod
+    def from_results(cls, drift_results: Iterable[Dict]) -> "DriftColumns":
+        """
+        Split per-feature result dicts into columns as they arrive
+
+        Accepts a generator, so services never hold the full list of dicts.
+        """
+        features, drift, scores, severity, details = [], [], [], [], []
+        for result in drift_results:
+            features.append(result["feature"])
+            drift.append(bool(result.get("drift", False)))
+            scores.append(result.get("drift_score", 0))
+            severity.append(result.get("severity"))
+            details.append({k: v for k, v in result.items() if k not in DRIFT_FIELDS})
+        return cls(
+            features=np.array(features, dtype=object),
+            drift=np.array(drift, dtype=bool),
+            drift_score=np.array(scores, dtype=np.float64),
+            severity=_codes(severity, SEVERITY_LEVELS),
+            details=details
+        )
+
+    @classmethod
+    def coerce(cls, drift_results: Union["DriftColumns", Iterable[Dict]]) -> "DriftColumns":
+        """The container itself, or one built from a list of result dicts"""
+        return drift_results if isinstance(drift_results, cls) else cls.from_results(drift_results)
+
+    def record(self, i: int) -> Dict:
+        return {
+            "feature": self.features[i],
+            "drift": bool(self.drift[i]),
+            "drift_score": float(self.drift_score[i]),
+            "severity": _level(self.severity[i], SEVERITY_LEVELS),
+            **self.details[i]
+        }
+
+    def take(self, indices: np.ndarray) -> "DriftColumns":
+        return DriftColumns(
+            features=self.features[indices],
+            drift=self.drift[indices],
+            drift_score=self.drift_score[indices],
+            severity=self.severity[indices],
+            details=[self.details[i] for i in indices]
+        )
+
+    def sorted(self) -> "DriftColumns":
+        """Highest drift score first (stable)"""
+        return self.take(rank_descending(self.drift_score))
+
+    def drifted(self) -> np.ndarray:
+        """Indices of drifted features, in input order"""
+        return np.flatnonzero(self.drift)
+
+    def count_severity(self, level: str) -> int:
+        return int(np.count_nonzero(self.severity == SEVERITY_LEVELS.index(level)))
+
+    def top_drifted(self, k: Optional[int] = None) -> np.ndarray:
+        """Indices of drifted features by drift score, highest first"""
+        return rank_descending(self.drift_score, self.drifted(), k)
+
+
+@dataclass(slots=True, frozen=True, eq=False)
+class ImpactColumns(_ResultColumns):
+    """Per-feature impact results as parallel arrays plus method-specific details"""
+
+    features: np.ndarray       # object (feature names)
+    impact_score: np.ndarray   # float64
+    level: np.ndarray          # int8 codes into IMPACT_LEVELS
+    details: List[Dict]        # metrics, statistics, model_impact, ... (no IMPACT_FIELDS)
+    weighted_score: Optional[np.ndarray] = None  # float64, only when a model was supplied
+
+    @classmethod
+    def from_results(cls, impact_results: Iterable[Dict]) -> "ImpactColumns":
+        """Split per-feature result dicts into columns as they arrive (generators welcome)"""
+        features, scores, levels, weighted, details = [], [], [], [], []
+        for result in impact_results:
+            features.append(result["feature"])
+            scores.append(result.get("impact_score", 0))
+            levels.append(result.get("impact_level"))
+            weighted.append(result.get("weighted_impact_score"))
+            details.append({k: v for k, v in result.items() if k not in IMPACT_FIELDS})
+        has_weighted = bool(weighted) and all(w is not None for w in weighted)
+        return cls(
+            features=np.array(features, dtype=object),
+            impact_score=np.array(scores, dtype=np.float64),
+            level=_codes(levels, IMPACT_LEVELS),
+            details=details,
+            weighted_score=np.array(weighted, dtype=np.float64) if has_weighted else None
+        )
+
+    @classmethod
+    def coerce(cls, impact_results: Union["ImpactColumns", Iterable[Dict]]) -> "ImpactColumns":
+        """The container itself, or one built from a list of result dicts"""
+        return impact_results if isinstance(impact_results, cls) else cls.from_results(impact_results)
+
+    @property
+    def ranking_score(self) -> np.ndarray:
+        """weighted_impact_score when a model was supplied, impact_score otherwise"""
+        return self.weighted_score if self.weighted_score is not None else self.impact_score
+
+    def record(self, i: int) -> Dict:
+        record = {
+            "feature": self.features[i],
+            "impact_score": float(self.impact_score[i]),
+            "impact_level": _level(self.level[i], IMPACT_LEVELS),
+            **self.details[i]
+        }
+        if self.weighted_score is not None:
+            record["weighted_impact_score"] = float(self.weighted_score[i])
+        return record
+
+    def take(self, indices: np.ndarray) -> "ImpactColumns":
+        return ImpactColumns(
+            features=self.features[indices],
+            impact_score=self.impact_score[indices],
+            level=self.level[indices],
+            details=[self.details[i] for i in indices],
+            weighted_score=self.weighted_score[indices] if self.weighted_score is not None else None
+        )
+
+    def sorted(self) -> "ImpactColumns":
+        """Highest (model-weighted) impact score first (stable)"""
+        return self.take(rank_descending(self.ranking_score))
+
+    def with_weighted_score(self, weighted_score: np.ndarray) -> "ImpactColumns":
+        return replace(self, weighted_score=np.asarray(weighted_score, dtype=np.float64))
+
+    def with_level(self, level: str) -> np.ndarray:
+        """Indices of features at an impact level, in input order"""
+        return np.flatnonzero(self.level == IMPACT_LEVELS.index(level))
+
+    def count_level(self, level: str) -> int:
+        return int(np.count_nonzero(self.level == IMPACT_LEVELS.index(level)))
+
+    def top(self, k: Optional[int] = None, weighted: bool = True) -> np.ndarray:
+        """Indices by (model-weighted) impact score, highest first"""
+        return rank_descending(self.ranking_score if weighted else self.impact_score, k=k)
+
+    def score_of(self, features: np.ndarray) -> np.ndarray:
+        """impact_score aligned to `features` (0 where a feature has no impact result)"""
+        lookup = dict(zip(self.features.tolist(), self.impact_score.tolist()))
+        return np.fromiter((lookup.get(f, 0.0) for f in features), dtype=np.float64, count=len(features))
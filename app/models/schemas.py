@@ -1,10 +1,21 @@
-"""Pydantic schemas for request/response validation"""
-from pydantic import BaseModel, Field
+"""
+Pydantic schemas for request/response validation
+
+Services work on columnar results (app.models.results); reports are
+validated against these schemas only when they leave the API. Report
+sections declare every field and reject unknown ones, so a key added to
+the report without a schema change fails validation. Only the per-feature
+result schemas allow extra fields, so method-specific keys (p-values,
+confidence intervals, model importance, ...) pass through unchanged.
+"""
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Dict, Optional
 from datetime import datetime
 
 class DriftResult(BaseModel):
     """Schema for drift detection result"""
+    model_config = ConfigDict(extra="allow")
+    
     feature: str
     method: str
     drift: bool
@@ -14,6 +25,8 @@ class DriftResult(BaseModel):
     
 class ImpactResult(BaseModel):
     """Schema for impact analysis result"""
+    model_config = ConfigDict(extra="allow")
+    
     feature: str
     impact_score: float
     impact_level: str
@@ -31,6 +44,8 @@ class TimelineEvent(BaseModel):
 
 class Diagnosis(BaseModel):
     """Schema for LLM diagnosis"""
+    model_config = ConfigDict(extra="forbid")
+    
     executive_summary: str
     root_cause_analysis: str
     severity_assessment: str
@@ -38,16 +53,120 @@ class Diagnosis(BaseModel):
     technical_recommendations: List[str]
     full_diagnosis: str
 
+class DriftTests(BaseModel):
+    """KS tests run and the p-value correction applied to them"""
+    model_config = ConfigDict(extra="forbid")
+    
+    correction: str
+    ks_tests: int
+    screened_out: int
+
+class ReportMetadata(BaseModel):
+    """Metadata section of an autopsy report"""
+    model_config = ConfigDict(extra="forbid")
+    
+    report_type: str
+    generated_at: str
+    version: str
+    status: str
+    report_id: Optional[str] = None
+    drift_tests: Optional[DriftTests] = None
+    incremental: Optional[Dict] = None
+    sampling: Optional[Dict] = None
+
+class ExecutiveSummary(BaseModel):
+    """Executive summary section of an autopsy report"""
+    model_config = ConfigDict(extra="forbid")
+    
+    summary: str
+    severity: str
+    business_impact: str
+    critical_features_count: int
+    recommendation_priority: str
+
+class DriftSummary(BaseModel):
+    """Drift counts of an autopsy report"""
+    model_config = ConfigDict(extra="forbid")
+    
+    total_features_analyzed: int
+    drifted_features_count: int
+    severe_drift_count: int
+
+class DriftAnalysis(BaseModel):
+    """Drift section of an autopsy report"""
+    model_config = ConfigDict(extra="forbid")
+    
+    summary: DriftSummary
+    drift_leaderboard: List[DriftResult]
+    all_results: List[DriftResult]
+
+class ImpactSummary(BaseModel):
+    """Impact counts of an autopsy report"""
+    model_config = ConfigDict(extra="forbid")
+    
+    high_impact_count: int
+    moderate_impact_count: int
+    low_impact_count: int
+
+class ImpactAnalysis(BaseModel):
+    """Impact section of an autopsy report"""
+    model_config = ConfigDict(extra="forbid")
+    
+    summary: ImpactSummary
+    impact_leaderboard: List[ImpactResult]
+    all_results: List[ImpactResult]
+
+class TimelineSummary(BaseModel):
+    """Timeline counts and overall severity"""
+    model_config = ConfigDict(extra="forbid")
+    
+    total_features_analyzed: int
+    drifted_features: int
+    high_impact_features: int
+    critical_features: int
+    severity_assessment: str
+
+class Timeline(BaseModel):
+    """Timeline section of an autopsy report"""
+    model_config = ConfigDict(extra="forbid")
+    
+    events: List[TimelineEvent]
+    summary: TimelineSummary
+    critical_features: List[str]
+    recommendations: List[str]
+
+class Recommendations(BaseModel):
+    """Recommendations section of an autopsy report"""
+    model_config = ConfigDict(extra="forbid")
+    
+    immediate_actions: List[str]
+    all_recommendations: List[str]
+
+class Visualizations(BaseModel):
+    """Chart data section of an autopsy report"""
+    model_config = ConfigDict(extra="forbid")
+    
+    drift_chart_data: Dict
+    impact_chart_data: Dict
+    correlation_data: Dict
+    distributions: Optional[Dict] = None
+
 class AutopsyReport(BaseModel):
     """Complete autopsy report schema"""
-    metadata: Dict
-    executive_summary: Dict
-    drift_analysis: Dict
-    impact_analysis: Dict
-    timeline: Dict
-    diagnosis: Dict
-    recommendations: Dict
-    visualizations: Optional[Dict] = None
+    model_config = ConfigDict(extra="forbid")
+    
+    metadata: ReportMetadata
+    executive_summary: ExecutiveSummary
+    drift_analysis: DriftAnalysis
+    impact_analysis: ImpactAnalysis
+    timeline: Timeline
+    diagnosis: Diagnosis
+    recommendations: Recommendations
+    visualizations: Visualizations
+    # Optional analyses (run_autopsy flags and uploads)
+    multivariate_drift: Optional[Dict] = None
+    correlation_drift: Optional[Dict] = None
+    error_attribution: Optional[Dict] = None
 
 class UploadResponse(BaseModel):
     """Response schema for file upload"""
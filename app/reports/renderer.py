@@ -0,0 +1,338 @@
+"""
+Report rendering: HTML (streamed in chunks) and PDF from precompiled templates
+
+Page fragments are string.Template objects compiled once at import; table
+rows use per-width format strings built once and cached, so a report with
+100k features renders as a stream of `chunk_rows`-row strings instead of one
+giant f-string. The PDF writer is dependency-free (Courier text pages).
+"""
+import html
+import json
+import textwrap
+import zlib
+from functools import lru_cache
+from string import Template
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from app.config import REPORT_RENDER_CHUNK_ROWS
+
+CSS = """
+body { font-family: Arial, sans-serif; margin: 40px; color: #111827; }
+.meta { color: #6B7280; }
+.critical, .high { color: #DC2626; font-weight: bold; }
+.moderate { color: #F59E0B; }
+.low, .none { color: #10B981; }
+table { border-collapse: collapse; width: 100%; margin: 20px 0; }
+th, td { border: 1px solid #ddd; padding: 8px 12px; text-align: left; }
+th { background-color: #4F46E5; color: white; }
+tr.drift td:first-child { font-weight: bold; }
+pre { background: #F3F4F6; padding: 12px; white-space: pre-wrap; }
+"""
+
+PAGE_HEAD = Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Model Autopsy Report $report_id</title>
+<style>$css</style>
+</head>
+<body>
+<h1>🔬 Model Autopsy Report</h1>
+<p class="meta"><strong>Generated:</strong> $generated_at &middot; <strong>Report:</strong> $report_id &middot; <strong>Version:</strong> $version</p>
+""")
+
+SUMMARY = Template("""<h2>Executive Summary</h2>
+<p class="$severity_class"><strong>$severity</strong> &middot; $priority</p>
+<p>$summary</p>
+<p><strong>Business impact:</strong> $business_impact</p>
+<p><strong>Critical features:</strong> $critical_features</p>
+""")
+
+SECTION = Template("<h2>$title</h2>\n")
+PARAGRAPH = Template("<p>$text</p>\n")
+PRE = Template("<pre>$text</pre>\n")
+TABLE_OPEN = Template('<table class="$css_class">\n<thead><tr>$header</tr></thead>\n<tbody>\n')
+TABLE_CLOSE = "</tbody>\n</table>\n"
+PAGE_FOOT = "</body>\n</html>\n"
+
+# (header, result key) of the full per-feature tables
+DRIFT_COLUMNS = (
+    ("Feature", "feature"),
+    ("Method", "method"),
+    ("Drift", "drift"),
+    ("Score", "drift_score"),
+    ("Severity", "severity"),
+    ("p-value (adj.)", "p_value_adjusted")
+)
+IMPACT_COLUMNS = (
+    ("Feature", "feature"),
+    ("Impact", "impact_score"),
+    ("Level", "impact_level"),
+    ("Model-weighted", "weighted_impact_score")
+)
+TIMELINE_COLUMNS = (
+    ("When", "timestamp"),
+    ("Event", "event_type"),
+    ("Severity", "severity"),
+    ("Description", "description"),
+    ("Features", "features")
+)
+
+# Optional pipeline sections, rendered generically
+EXTRA_SECTIONS = (
+    ("multivariate_drift", "Multivariate Drift"),
+    ("correlation_drift", "Correlation Drift"),
+    ("error_attribution", "Error Attribution")
+)
+
+# PDF layout: US Letter, 8pt Courier
+PDF_PAGE_WIDTH, PDF_PAGE_HEIGHT = 612, 792
+PDF_MARGIN = 36
+PDF_FONT_SIZE = 8
+PDF_LEADING = 11
+PDF_LINE_CHARS = 110
+PDF_LINES_PER_PAGE = (PDF_PAGE_HEIGHT - 2 * PDF_MARGIN) // PDF_LEADING
+
+
+def _format(value) -> str:
+    """Cell text for a result value"""
+    if value is None:
+        return "—"
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    if isinstance(value, float):
+        return f"{value:.4f}"
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(v) for v in value)
+    return str(value)
+
+
+@lru_cache(maxsize=16)
+def _row_template(width: int) -> str:
+    """Compiled row format string for a table `width` cells wide"""
+    return '<tr class="{}">' + "<td>{}</td>" * width + "</tr>\n"
+
+
+def _sorted_results(results: List[Dict], key: str) -> List[Dict]:
+    return sorted(results, key=lambda r: r.get(key) or 0, reverse=True)
+
+
+def _table_chunks(
+    rows: Sequence[Dict],
+    columns: Sequence[Tuple[str, str]],
+    css_class: str,
+    chunk_rows: int,
+    row_class=lambda row: ""
+) -> Iterator[str]:
+    """One table as a header string followed by `chunk_rows`-row strings"""
+    header = "".join(f"<th>{html.escape(title)}</th>" for title, _ in columns)
+    yield TABLE_OPEN.substitute(css_class=css_class, header=header)
+    row_format = _row_template(len(columns)).format
+    for start in range(0, len(rows), chunk_rows):
+        yield "".join(
+            row_format(row_class(row), *(html.escape(_format(row.get(key))) for _, key in columns))
+            for row in rows[start:start + chunk_rows]
+        )
+    yield TABLE_CLOSE
+
+
+def _list_html(items: Iterable) -> str:
+    return "<ul>\n" + "".join(f"<li>{html.escape(str(item))}</li>\n" for item in items) + "</ul>\n"
+
+
+def render_html_chunks(report: Dict, chunk_rows: int = REPORT_RENDER_CHUNK_ROWS) -> Iterator[str]:
+    """
+    Render a full report as a stream of HTML fragments
+
+    Covers the executive summary, every drift and impact result (sorted by
+    score), the timeline, diagnosis, recommendations and any multivariate,
+    correlation or error-attribution sections.
+
+    Args:
+        report: Autopsy report (as returned by run_pipeline or the report store)
+        chunk_rows: Table rows per yielded fragment
+
+    Yields:
+        HTML strings; their concatenation is the complete page
+    """
+    metadata = report.get("metadata", {})
+    summary = report.get("executive_summary", {})
+    drift = report.get("drift_analysis", {})
+    impact = report.get("impact_analysis", {})
+    timeline = report.get("timeline", {})
+    diagnosis = report.get("diagnosis", {})
+    recommendations = report.get("recommendations", {})
+
+    yield PAGE_HEAD.substitute(
+        css=CSS,
+        report_id=html.escape(str(metadata.get("report_id", "unsaved"))),
+        generated_at=html.escape(str(metadata.get("generated_at", ""))),
+        version=html.escape(str(metadata.get("version", "")))
+    )
+    severity = str(summary.get("severity", "Unknown"))
+    yield SUMMARY.substitute(
+        severity_class=html.escape(severity.split()[0].lower() if severity else ""),
+        severity=html.escape(severity),
+        priority=html.escape(str(summary.get("recommendation_priority", ""))),
+        summary=html.escape(str(summary.get("summary", ""))),
+        business_impact=html.escape(str(summary.get("business_impact", ""))),
+        critical_features=html.escape(str(summary.get("critical_features_count", 0)))
+    )
+
+    counts = drift.get("summary", {})
+    yield SECTION.substitute(title="Drift Analysis")
+    yield PARAGRAPH.substitute(text=html.escape(
+        f"{counts.get('drifted_features_count', 0)} of {counts.get('total_features_analyzed', 0)} features "
+        f"drifted ({counts.get('severe_drift_count', 0)} severe)"
+    ))
+    yield from _table_chunks(
+        _sorted_results(drift.get("all_results", []), "drift_score"), DRIFT_COLUMNS, "drift", chunk_rows,
+        row_class=lambda row: "drift" if row.get("drift") else ""
+    )
+
+    levels = impact.get("summary", {})
+    yield SECTION.substitute(title="Impact Analysis")
+    yield PARAGRAPH.substitute(text=html.escape(
+        f"High: {levels.get('high_impact_count', 0)}, Moderate: {levels.get('moderate_impact_count', 0)}, "
+        f"Low: {levels.get('low_impact_count', 0)}"
+    ))
+    yield from _table_chunks(
+        _sorted_results(impact.get("all_results", []), "impact_score"), IMPACT_COLUMNS, "impact", chunk_rows,
+        row_class=lambda row: str(row.get("impact_level", "")).lower()
+    )
+
+    yield SECTION.substitute(title="Timeline")
+    yield from _table_chunks(timeline.get("events", []), TIMELINE_COLUMNS, "timeline", chunk_rows)
+
+    yield SECTION.substitute(title="Diagnosis")
+    yield PRE.substitute(text=html.escape(str(diagnosis.get("full_diagnosis", "N/A"))))
+
+    yield SECTION.substitute(title="Recommendations")
+    yield _list_html(recommendations.get("immediate_actions", []))
+    if recommendations.get("all_recommendations"):
+        yield _list_html(recommendations["all_recommendations"])
+
+    for key, title in EXTRA_SECTIONS:
+        if report.get(key) is not None:
+            yield SECTION.substitute(title=title)
+            yield PRE.substitute(text=html.escape(json.dumps(report[key], indent=2, default=str)))
+
+    yield PAGE_FOOT
+
+
+def render_html(report: Dict, chunk_rows: int = REPORT_RENDER_CHUNK_ROWS) -> str:
+    """Complete HTML page for a report (see render_html_chunks)"""
+    return "".join(render_html_chunks(report, chunk_rows))
+
+
+# ----------------------------------------------------------------------
+# PDF
+# ----------------------------------------------------------------------
+
+def _text_table(rows: Sequence[Dict], columns: Sequence[Tuple[str, str]], widths: Sequence[int]) -> Iterator[str]:
+    def line(cells):
+        return "  ".join(cell[:width].ljust(width) for cell, width in zip(cells, widths)).rstrip()
+
+    yield line([title for title, _ in columns])
+    yield line(["-" * width for width in widths])
+    for row in rows:
+        yield line([_format(row.get(key)) for _, key in columns])
+
+
+def _text_lines(report: Dict) -> Iterator[str]:
+    """The report as plain-text lines, at most PDF_LINE_CHARS wide"""
+    metadata = report.get("metadata", {})
+    summary = report.get("executive_summary", {})
+    drift = report.get("drift_analysis", {})
+    impact = report.get("impact_analysis", {})
+
+    def paragraph(text):
+        for part in str(text).splitlines() or [""]:
+            yield from textwrap.wrap(part, PDF_LINE_CHARS) or [""]
+
+    def heading(title):
+        return ["", title.upper(), "=" * len(title)]
+
+    yield "MODEL AUTOPSY REPORT"
+    yield f"Generated: {metadata.get('generated_at', '')}   Report: {metadata.get('report_id', 'unsaved')}"
+    yield from heading("Executive Summary")
+    yield f"Severity: {summary.get('severity', 'Unknown')}   Priority: {summary.get('recommendation_priority', '')}"
+    yield from paragraph(summary.get("summary", ""))
+    yield from paragraph(f"Business impact: {summary.get('business_impact', '')}")
+
+    yield from heading("Drift Analysis")
+    yield from _text_table(
+        _sorted_results(drift.get("all_results", []), "drift_score"), DRIFT_COLUMNS, (40, 12, 5, 10, 10, 14)
+    )
+    yield from heading("Impact Analysis")
+    yield from _text_table(
+        _sorted_results(impact.get("all_results", []), "impact_score"), IMPACT_COLUMNS, (48, 10, 10, 14)
+    )
+    yield from heading("Timeline")
+    for event in report.get("timeline", {}).get("events", []):
+        yield from paragraph(
+            f"[{event.get('severity', '')}] {event.get('event_type', '')}: {event.get('description', '')}"
+        )
+    yield from heading("Diagnosis")
+    yield from paragraph(report.get("diagnosis", {}).get("full_diagnosis", "N/A"))
+    yield from heading("Recommendations")
+    for item in report.get("recommendations", {}).get("immediate_actions", []):
+        yield from paragraph(f"- {item}")
+    for key, title in EXTRA_SECTIONS:
+        if report.get(key) is not None:
+            yield from heading(title)
+            yield from paragraph(json.dumps(report[key], indent=2, default=str))
+
+
+def _pdf_escape(line: str) -> bytes:
+    text = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return text.encode("latin-1", errors="replace")
+
+
+def _page_stream(lines: List[str]) -> bytes:
+    top = PDF_PAGE_HEIGHT - PDF_MARGIN
+    body = b"".join(b"(" + _pdf_escape(line) + b") '\n" for line in lines)
+    return b"BT /F1 %d Tf %d TL %d %d Td\n" % (PDF_FONT_SIZE, PDF_LEADING, PDF_MARGIN, top) + body + b"ET"
+
+
+def render_pdf(report: Dict) -> bytes:
+    """
+    Render a full report as a PDF document
+
+    Plain Courier text pages (tables as fixed-width columns); characters
+    outside Latin-1 are replaced.
+    """
+    pages, page = [], []
+    for line in _text_lines(report):
+        page.append(line)
+        if len(page) == PDF_LINES_PER_PAGE:
+            pages.append(page)
+            page = []
+    if page or not pages:
+        pages.append(page)
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then (page, content) pairs
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % i for i in page_ids), len(pages)),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>"
+    ]
+    for page_id, lines in zip(page_ids, pages):
+        stream = zlib.compress(_page_stream(lines))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % (PDF_PAGE_WIDTH, PDF_PAGE_HEIGHT, page_id + 1)
+        )
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
@@ -1,28 +1,35 @@
 """Report builder - assembles final autopsy report"""
-from typing import List, Dict
+from typing import Dict, Iterable, Union
 from datetime import datetime
 
+from app.models.results import DriftColumns, ImpactColumns, IMPACT_LEVELS, SEVERITY_LEVELS
+from app.reports.renderer import render_html, render_pdf
+
 def build_report(
-    drift_results: List[Dict],
-    impact_results: List[Dict],
+    drift_results: Union[DriftColumns, Iterable[Dict]],
+    impact_results: Union[ImpactColumns, Iterable[Dict]],
     timeline: Dict,
     diagnosis: Dict
 ) -> Dict:
     """
     Build comprehensive autopsy report
     
-    This is what gets returned to the user/dashboard
+    This is what gets returned to the user/dashboard. Leaderboards, counts
+    and charts are computed on the columnar results; per-feature dicts are
+    only built here, for the JSON report.
     
     Args:
-        drift_results: Drift detection results
-        impact_results: Impact analysis results
+        drift_results: DriftColumns from drift detection (or per-feature dicts)
+        impact_results: ImpactColumns from impact analysis (or per-feature dicts)
         timeline: Timeline analysis
         diagnosis: LLM diagnosis
         
     Returns:
         Complete autopsy report
     """
-    
+    drift_columns = DriftColumns.coerce(drift_results)
+    impact_columns = ImpactColumns.coerce(impact_results)
+
     report = {
         "metadata": {
             "report_type": "ML Model Autopsy",
@@ -41,30 +48,24 @@ def build_report(
         
         "drift_analysis": {
             "summary": {
-                "total_features_analyzed": len(drift_results),
-                "drifted_features_count": sum(1 for d in drift_results if d.get("drift", False)),
-                "severe_drift_count": sum(1 for d in drift_results if d.get("severity") == "High")
+                "total_features_analyzed": len(drift_columns),
+                "drifted_features_count": len(drift_columns.drifted()),
+                "severe_drift_count": drift_columns.count_severity("High")
             },
-            "drift_leaderboard": sorted(
-                [d for d in drift_results if d.get("drift", False)],
-                key=lambda x: x.get("drift_score", 0),
-                reverse=True
-            )[:10],  # Top 10 drifted features
-            "all_results": drift_results
+            # Top 10 drifted features
+            "drift_leaderboard": drift_columns.records(drift_columns.top_drifted(10)),
+            "all_results": drift_columns.records()
         },
         
         "impact_analysis": {
             "summary": {
-                "high_impact_count": sum(1 for i in impact_results if i.get("impact_level") == "High"),
-                "moderate_impact_count": sum(1 for i in impact_results if i.get("impact_level") == "Moderate"),
-                "low_impact_count": sum(1 for i in impact_results if i.get("impact_level") == "Low")
+                "high_impact_count": impact_columns.count_level("High"),
+                "moderate_impact_count": impact_columns.count_level("Moderate"),
+                "low_impact_count": impact_columns.count_level("Low")
             },
-            "impact_leaderboard": sorted(
-                impact_results,
-                key=lambda x: x.get("impact_score", 0),
-                reverse=True
-            )[:10],  # Top 10 impactful features
-            "all_results": impact_results
+            # Top 10 impactful features (model-weighted score when a model was supplied)
+            "impact_leaderboard": impact_columns.records(impact_columns.top(10)),
+            "all_results": impact_columns.records()
         },
         
         "timeline": timeline,
@@ -77,9 +78,9 @@ def build_report(
         },
         
         "visualizations": {
-            "drift_chart_data": _prepare_drift_chart_data(drift_results),
-            "impact_chart_data": _prepare_impact_chart_data(impact_results),
-            "correlation_data": _prepare_correlation_data(drift_results, impact_results)
+            "drift_chart_data": _prepare_drift_chart_data(drift_columns),
+            "impact_chart_data": _prepare_impact_chart_data(impact_columns),
+            "correlation_data": _prepare_correlation_data(drift_columns, impact_columns)
         }
     }
     
@@ -100,59 +101,55 @@ def _get_priority_level(diagnosis: Dict) -> str:
         return "P3 - Low"
 
 
-def _prepare_drift_chart_data(drift_results: List[Dict]) -> Dict:
+def _prepare_drift_chart_data(drift_columns: DriftColumns) -> Dict:
     """Prepare data for drift visualization"""
     
-    drifted = [d for d in drift_results if d.get("drift", False)]
+    drifted = drift_columns.drifted()[:15]  # Top 15
     
     chart_data = {
         "type": "bar_chart",
         "title": "Drift Severity by Feature",
-        "x_axis": [d["feature"] for d in drifted[:15]],  # Top 15
-        "y_axis": [d.get("drift_score", 0) for d in drifted[:15]],
-        "colors": [_get_severity_color(d.get("severity", "None")) for d in drifted[:15]]
+        "x_axis": drift_columns.features[drifted].tolist(),
+        "y_axis": drift_columns.drift_score[drifted].tolist(),
+        "colors": [_get_severity_color(SEVERITY_LEVELS[code] if code >= 0 else "None")
+                   for code in drift_columns.severity[drifted].tolist()]
     }
     
     return chart_data
 
 
-def _prepare_impact_chart_data(impact_results: List[Dict]) -> Dict:
+def _prepare_impact_chart_data(impact_columns: ImpactColumns) -> Dict:
     """Prepare data for impact visualization"""
     
-    top_impact = sorted(
-        impact_results,
-        key=lambda x: x.get("impact_score", 0),
-        reverse=True
-    )[:15]
+    top_impact = impact_columns.top(15, weighted=False)
     
     chart_data = {
         "type": "horizontal_bar",
         "title": "Feature Impact Scores",
-        "y_axis": [i["feature"] for i in top_impact],
-        "x_axis": [i.get("impact_score", 0) for i in top_impact],
-        "colors": [_get_impact_color(i.get("impact_level", "Low")) for i in top_impact]
+        "y_axis": impact_columns.features[top_impact].tolist(),
+        "x_axis": impact_columns.impact_score[top_impact].tolist(),
+        "colors": [_get_impact_color(IMPACT_LEVELS[code] if code >= 0 else "Low")
+                   for code in impact_columns.level[top_impact].tolist()]
     }
     
     return chart_data
 
 
-def _prepare_correlation_data(drift_results: List[Dict], impact_results: List[Dict]) -> Dict:
+def _prepare_correlation_data(drift_columns: DriftColumns, impact_columns: ImpactColumns) -> Dict:
     """Prepare drift vs impact correlation data"""
     
-    # Create feature map
-    impact_map = {i["feature"]: i.get("impact_score", 0) for i in impact_results}
+    drifted = drift_columns.drifted()
+    features = drift_columns.features[drifted]
+    drift_scores = drift_columns.drift_score[drifted]
+    impact_scores = impact_columns.score_of(features)
+    is_critical = (drift_scores > 0.2) & (impact_scores > 0.3)
     
-    correlation_points = []
-    
-    for drift in drift_results:
-        if drift.get("drift", False):
-            feature = drift["feature"]
-            correlation_points.append({
-                "feature": feature,
-                "drift_score": drift.get("drift_score", 0),
-                "impact_score": impact_map.get(feature, 0),
-                "is_critical": drift.get("drift_score", 0) > 0.2 and impact_map.get(feature, 0) > 0.3
-            })
+    correlation_points = [
+        {"feature": feature, "drift_score": drift, "impact_score": impact, "is_critical": critical}
+        for feature, drift, impact, critical in zip(
+            features.tolist(), drift_scores.tolist(), impact_scores.tolist(), is_critical.tolist()
+        )
+    ]
     
     return {
         "type": "scatter_plot",
@@ -186,47 +183,18 @@ def _get_impact_color(impact_level: str) -> str:
 
 def generate_pdf_report(report: Dict) -> bytes:
     """
-    Generate PDF version of report (optional enhancement)
-    
-    For hackathon: return JSON/HTML is sufficient
+    Generate PDF version of report
+
+    Renders synchronously; the API serves stored reports through the
+    background render queue instead (app.services.report_rendering).
     """
-    # TODO: Implement PDF generation using reportlab or similar
-    pass
+    return render_pdf(report)
 
 
 def generate_html_report(report: Dict) -> str:
     """
     Generate HTML version of report for email/viewing
-    
-    For hackathon: return JSON is sufficient
-    """
-    html = f"""
-    <html>
-    <head>
-        <title>Model Autopsy Report</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; margin: 40px; }}
-            .critical {{ color: #DC2626; font-weight: bold; }}
-            .moderate {{ color: #F59E0B; }}
-            .low {{ color: #10B981; }}
-            table {{ border-collapse: collapse; width: 100%; margin: 20px 0; }}
-            th, td {{ border: 1px solid #ddd; padding: 12px; text-align: left; }}
-            th {{ background-color: #4F46E5; color: white; }}
-        </style>
-    </head>
-    <body>
-        <h1>🔬 Model Autopsy Report</h1>
-        <p><strong>Generated:</strong> {report['metadata']['generated_at']}</p>
-        
-        <h2>Executive Summary</h2>
-        <p class="{report['executive_summary']['severity'].lower()}">{report['executive_summary']['summary']}</p>
-        
-        <h2>Drift Analysis</h2>
-        <p>Features with drift: {report['drift_analysis']['summary']['drifted_features_count']}</p>
-        
-        <h2>Diagnosis</h2>
-        <pre>{report['diagnosis'].get('full_diagnosis', 'N/A')}</pre>
-    </body>
-    </html>
+
+    Full report, every feature included; use render_html_chunks to stream it.
     """
-    return html
+    return render_html(report)
@@ -0,0 +1,219 @@
+"""Admission control: cap concurrent analyses and their estimated memory"""
+import asyncio
+import csv
+import io
+import math
+import time
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.config import (
+    ADMISSION_MEMORY_BUDGET_MB,
+    ADMISSION_MAX_CONCURRENT,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    ADMISSION_BYTES_PER_CELL
+)
+
+# Bytes read from the head of an upload to count columns and estimate rows
+PEEK_BYTES = 64 * 1024
+# Retry-After hint before any run has finished (no duration history yet)
+DEFAULT_RUN_SECONDS = 10.0
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request cannot be admitted
+
+    status_code is 429 when the server is busy (retry after `retry_after`
+    seconds) and 413 when the request alone exceeds the memory budget.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[int] = None, status_code: int = 429):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+    @property
+    def headers(self) -> Optional[Dict[str, str]]:
+        return {"Retry-After": str(self.retry_after)} if self.retry_after else None
+
+
+def peek_csv_shape(fileobj, size_bytes: int) -> Tuple[int, int]:
+    """
+    Estimate (rows, columns) of a CSV from its first PEEK_BYTES, without parsing it
+
+    The file position is restored, so the upload can be parsed afterwards.
+    """
+    position = fileobj.tell()
+    head = fileobj.read(PEEK_BYTES)
+    fileobj.seek(position)
+    if not head:
+        return 0, 0
+
+    lines = head.split(b"\n")
+    header = lines[0].decode("utf-8", errors="replace")
+    columns = len(next(csv.reader(io.StringIO(header)), []))
+
+    complete = lines[1:] if len(head) >= size_bytes else lines[1:-1]
+    if len(head) >= size_bytes:
+        rows = sum(1 for line in complete if line.strip())
+    else:
+        sampled = sum(len(line) + 1 for line in complete)
+        rows = math.ceil((size_bytes - len(lines[0])) / (sampled / len(complete))) if complete else 1
+    return rows, columns
+
+
+def estimate_cost(shapes: Iterable[Tuple[int, int, int]], sample_size: Optional[int] = None) -> int:
+    """
+    Estimated peak memory (bytes) of analysing the given inputs
+
+    Args:
+        shapes: (rows, columns, raw_bytes) per input; raw_bytes is what is
+            held in memory while parsing (0 for memory-mapped datasets)
+        sample_size: Sampling mode row cap per input
+
+    Returns:
+        rows * columns * ADMISSION_BYTES_PER_CELL (parsed frames plus the
+        pipeline's working copies) plus the raw bytes, summed over inputs
+    """
+    total = 0
+    for rows, columns, raw_bytes in shapes:
+        if sample_size is not None:
+            rows, raw_bytes = min(rows, sample_size), 0
+        total += rows * columns * ADMISSION_BYTES_PER_CELL + raw_bytes
+    return int(total)
+
+
+class AdmissionController:
+    """
+    Bounds running analyses by count and by total estimated memory
+
+    Requests that do not fit wait in a FIFO queue (at most `max_queue`, for
+    at most `queue_timeout` seconds) and are rejected with a Retry-After hint
+    otherwise. All state lives on the event loop thread, so no locks are
+    needed; acquire/release are only called from request handlers.
+    """
+
+    def __init__(
+        self,
+        memory_budget_mb: float = ADMISSION_MEMORY_BUDGET_MB,
+        max_concurrent: int = ADMISSION_MAX_CONCURRENT,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT_SECONDS
+    ):
+        self.budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._running = 0
+        self._memory = 0
+        self._waiters = deque()  # (cost, future) in arrival order
+        self._admitted_total = 0
+        self._rejected_total = 0
+        self._avg_run_seconds = None
+
+    def _fits(self, cost: int) -> bool:
+        return self._running < self.max_concurrent and self._memory + cost <= self.budget_bytes
+
+    def _start(self, cost: int) -> Dict:
+        self._running += 1
+        self._memory += cost
+        self._admitted_total += 1
+        return {"cost": cost, "started": time.monotonic()}
+
+    def _grant_waiters(self):
+        # Strict FIFO: a large request at the head is not starved by small ones
+        while self._waiters and self._fits(self._waiters[0][0]):
+            cost, future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(self._start(cost))
+
+    def retry_after(self) -> int:
+        """Seconds until capacity is likely free: queue depth times the mean run time"""
+        run_seconds = self._avg_run_seconds or DEFAULT_RUN_SECONDS
+        waves = (len(self._waiters) + self._running) / self.max_concurrent
+        return max(1, math.ceil(run_seconds * max(1.0, waves)))
+
+    def _reject(self, message: str):
+        self._rejected_total += 1
+        raise AdmissionRejected(message, retry_after=self.retry_after())
+
+    async def acquire(self, cost: int) -> Dict:
+        """
+        Wait for capacity for a request with the given estimated cost
+
+        Returns:
+            Ticket to pass to release()
+
+        Raises:
+            AdmissionRejected: 413 if the cost alone exceeds the budget,
+                429 if the queue is full or the wait times out
+        """
+        if cost > self.budget_bytes:
+            self._rejected_total += 1
+            raise AdmissionRejected(
+                f"Request needs an estimated {cost / 2**20:.0f} MB, above the "
+                f"{self.budget_bytes / 2**20:.0f} MB analysis budget; use sample_size or smaller inputs",
+                status_code=413
+            )
+        if not self._waiters and self._fits(cost):
+            return self._start(cost)
+        if len(self._waiters) >= self.max_queue:
+            self._reject(f"Server busy: {self._running} analyses running, {len(self._waiters)} queued")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (cost, future)
+        self._waiters.append(entry)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done():  # granted at the deadline; keep it
+                return future.result()
+            self._waiters.remove(entry)
+            self._grant_waiters()
+            self._reject(f"Server busy: waited {self.queue_timeout:.0f}s for analysis capacity")
+        except asyncio.CancelledError:
+            # Client went away: give back the slot if it was granted meanwhile
+            if future.done():
+                self.release(future.result())
+            else:
+                self._waiters.remove(entry)
+                self._grant_waiters()
+            raise
+
+    def release(self, ticket: Dict):
+        """Return a ticket's capacity and admit queued requests that now fit"""
+        elapsed = time.monotonic() - ticket["started"]
+        self._running -= 1
+        self._memory -= ticket["cost"]
+        self._avg_run_seconds = elapsed if self._avg_run_seconds is None else \
+            0.8 * self._avg_run_seconds + 0.2 * elapsed
+        self._grant_waiters()
+
+    def status(self) -> Dict:
+        """Queue and budget state for the status endpoint"""
+        return {
+            "running": self._running,
+            "queued": len(self._waiters),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "memory_in_use_mb": round(self._memory / 2**20, 1),
+            "memory_budget_mb": round(self.budget_bytes / 2**20, 1),
+            "admitted_total": self._admitted_total,
+            "rejected_total": self._rejected_total,
+            "avg_run_seconds": round(self._avg_run_seconds, 3) if self._avg_run_seconds is not None else None,
+            "retry_after_seconds": self.retry_after()
+        }
+
+
+_admission_controller = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the process-wide admission controller (created on first use)"""
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController()
+    return _admission_controller
@@ -0,0 +1,73 @@
+"""Baseline profiles: per-column training statistics computed once and reused"""
+from typing import Dict
+import numpy as np
+import pandas as pd
+
+from app.config import NUMERICAL_TYPES, DRIFT_METRIC_BINS
+from app.utils.sketches import CategoricalSketch, is_high_cardinality
+from app.utils.stats import quantile_bin_edges
+
+
+def profile_column(series: pd.Series) -> Dict:
+    """
+    Precompute everything drift and impact analysis need from a training column
+
+    Numerical columns keep the cleaned values (sorted) plus moments, range and
+    the DRIFT_METRIC_BINS quantile bin edges shared by the drift metrics and
+    the visualization histograms;
+    categorical columns keep the normalized category distribution. Columns
+    with more than HIGH_CARDINALITY_THRESHOLD distinct values (IDs, URLs)
+    keep a CategoricalSketch instead, and their distribution is the sketch's
+    heavy hitters.
+    """
+    clean = series.dropna()
+
+    if series.dtype in NUMERICAL_TYPES:
+        profile = {
+            "kind": "numeric",
+            "count": len(clean),
+            "values": np.sort(clean.to_numpy())
+        }
+        if len(clean) > 0:
+            profile.update({
+                "mean": clean.mean(),
+                "std": clean.std(),
+                "min": clean.min(),
+                "max": clean.max(),
+                "bin_edges": quantile_bin_edges(profile["values"], DRIFT_METRIC_BINS)
+            })
+        return profile
+
+    if is_high_cardinality(clean):
+        sketch = CategoricalSketch.from_series(clean)
+        dist = sketch.top()
+        return {
+            "kind": "categorical",
+            "count": len(clean),
+            "high_cardinality": True,
+            "sketch": sketch,
+            "distinct": sketch.distinct(),
+            "distribution": dist,
+            "categories": set(dist.index)
+        }
+
+    dist = clean.value_counts(normalize=True)
+    # Categorical dtypes report unobserved categories with zero counts
+    dist = dist[dist > 0]
+    return {
+        "kind": "categorical",
+        "count": len(clean),
+        "distribution": dist,
+        "categories": set(dist.index)
+    }
+
+
+def build_baseline_profile(train_df: pd.DataFrame) -> Dict[str, Dict]:
+    """
+    Profile every column of the training data
+
+    Pass the result as `baseline` to detect_drift / analyze_impact to skip
+    recomputing training statistics when one baseline is compared against
+    many production snapshots.
+    """
+    return {col: profile_column(train_df[col]) for col in train_df.columns}
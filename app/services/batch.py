@@ -0,0 +1,171 @@
+"""Batch autopsy: many models against one shared training baseline"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Tuple, Optional
+import time
+import traceback
+import pandas as pd
+
+from app.config import BATCH_MAX_WORKERS
+from app.services.baseline import build_baseline_profile
+from app.services.data_loader import validate_frames
+from app.services.pipeline import run_pipeline
+
+# Severity ranking for the fleet summary (highest first)
+SEVERITY_RANK = {"CRITICAL": 3, "HIGH": 2, "MODERATE": 1, "LOW": 0}
+
+# Per-worker shared state, set once by _init_worker
+_worker_train_df = None
+_worker_baseline = None
+
+
+def _init_worker(train_df: pd.DataFrame, baseline: Dict[str, Dict]):
+    """Receive the shared baseline once per worker instead of once per model"""
+    global _worker_train_df, _worker_baseline
+    _worker_train_df = train_df
+    _worker_baseline = baseline
+
+
+def _run_model(name: str, old_df: pd.DataFrame, new_df: pd.DataFrame) -> Dict:
+    """Run the full pipeline for one model against the worker's baseline"""
+    try:
+        report = run_pipeline(
+            _worker_train_df, old_df, new_df,
+            incremental=False,
+            baseline=_worker_baseline
+        )
+        return {"model": name, "status": "completed", "report": report}
+    except Exception as e:
+        return {
+            "model": name,
+            "status": "failed",
+            "error": str(e),
+            "traceback": traceback.format_exc()
+        }
+
+
+def _severity_rank(report: Dict) -> int:
+    severity = report.get("executive_summary", {}).get("severity", "")
+    return SEVERITY_RANK.get(severity.split(" ")[0].upper(), -1)
+
+
+def build_fleet_summary(results: List[Dict]) -> Dict:
+    """
+    Rank models by severity for a fleet-level overview
+
+    Ordering: overall severity, then critical, high-impact and drifted feature counts.
+    """
+    ranking = []
+    severity_counts = {}
+
+    for result in results:
+        if result["status"] != "completed":
+            continue
+        report = result["report"]
+        summary = report.get("timeline", {}).get("summary", {})
+        severity = report.get("executive_summary", {}).get("severity", "Unknown")
+        severity_counts[severity] = severity_counts.get(severity, 0) + 1
+
+        ranking.append({
+            "model": result["model"],
+            "severity": severity,
+            "priority": report.get("executive_summary", {}).get("recommendation_priority"),
+            "critical_features_count": summary.get("critical_features", 0),
+            "high_impact_features_count": summary.get("high_impact_features", 0),
+            "drifted_features_count": summary.get("drifted_features", 0),
+            "critical_features": report.get("timeline", {}).get("critical_features", []),
+            "top_drifted_features": [
+                d["feature"] for d in report.get("drift_analysis", {}).get("drift_leaderboard", [])[:3]
+            ],
+            "_rank": _severity_rank(report)
+        })
+
+    ranking.sort(
+        key=lambda r: (
+            r["_rank"],
+            r["critical_features_count"],
+            r["high_impact_features_count"],
+            r["drifted_features_count"]
+        ),
+        reverse=True
+    )
+    for entry in ranking:
+        del entry["_rank"]
+
+    return {
+        "models_total": len(results),
+        "models_completed": len(ranking),
+        "models_failed": [r["model"] for r in results if r["status"] != "completed"],
+        "severity_counts": severity_counts,
+        "ranking": ranking
+    }
+
+
+def run_batch_autopsy(
+    train_df: pd.DataFrame,
+    models: List[Tuple[str, pd.DataFrame, pd.DataFrame]],
+    max_workers: Optional[int] = None,
+    baseline: Optional[Dict[str, Dict]] = None
+) -> Dict:
+    """
+    Run autopsies for many (prod_old, prod_new) pairs sharing one baseline
+
+    Training statistics are computed once (build_baseline_profile) and
+    shipped to each worker process once; the model pairs are then fanned
+    out across the pool.
+
+    Args:
+        train_df: Shared training data (baseline)
+        models: List of (model_name, old_df, new_df)
+        max_workers: Worker processes (defaults to BATCH_MAX_WORKERS)
+        baseline: Optional precomputed training profile (e.g. preloaded at warm-up)
+
+    Returns:
+        Dict with per-model results and a fleet summary ranked by severity
+
+    Raises:
+        ValueError: If no models are given or model names are duplicated
+    """
+    if not models:
+        raise ValueError("Batch autopsy needs at least one (prod_old, prod_new) pair")
+    names = [name for name, _, _ in models]
+    if len(set(names)) != len(names):
+        raise ValueError("Model names in a batch must be unique")
+
+    start = time.time()
+    max_workers = max(1, min(max_workers or BATCH_MAX_WORKERS, len(models)))
+
+    # Validate every pair up front; a failing pair is reported, not fatal
+    results = {}
+    pending = []
+    for name, old_df, new_df in models:
+        try:
+            train_df, old_df, new_df = validate_frames(train_df, old_df, new_df, fingerprint=False)
+            pending.append((name, old_df, new_df))
+        except ValueError as e:
+            results[name] = {"model": name, "status": "failed", "error": str(e)}
+
+    if baseline is None:
+        baseline = build_baseline_profile(train_df)
+    print(f"📊 Batch autopsy: {len(pending)} models, baseline profiled once, {max_workers} workers")
+
+    if max_workers == 1:
+        _init_worker(train_df, baseline)
+        for name, old_df, new_df in pending:
+            results[name] = _run_model(name, old_df, new_df)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(train_df, baseline)
+        ) as pool:
+            futures = [pool.submit(_run_model, name, old_df, new_df) for name, old_df, new_df in pending]
+            for future in as_completed(futures):
+                result = future.result()
+                results[result["model"]] = result
+
+    ordered = [results[name] for name in names]
+    return {
+        "fleet_summary": build_fleet_summary(ordered),
+        "models": ordered,
+        "elapsed_seconds": round(time.time() - start, 3)
+    }
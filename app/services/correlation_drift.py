@@ -0,0 +1,152 @@
+"""Correlation-structure drift with streaming, chunked covariance"""
+from typing import List, Dict, Iterable, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from app.config import (
+    CORRELATION_CHUNK_ROWS,
+    CORRELATION_MAX_FEATURES,
+    CORRELATION_CHANGE_THRESHOLD,
+    NUMERICAL_TYPES
+)
+from app.models.results import DriftColumns
+
+
+def streaming_covariance(
+    df: pd.DataFrame,
+    columns: List[str],
+    fill_values: np.ndarray,
+    chunk_rows: int = CORRELATION_CHUNK_ROWS
+) -> Tuple[int, np.ndarray, np.ndarray]:
+    """
+    Covariance accumulated over row chunks (Chan et al. parallel merge)
+
+    Each chunk contributes its count, mean and centered cross-product
+    Xc^T Xc (one BLAS matmul); chunks are merged with
+    M2 = M2_a + M2_b + outer(delta, delta) * n_a * n_b / n, so only one
+    chunk is ever converted to a dense float matrix. Missing values are
+    filled with `fill_values` (the training means).
+
+    Returns:
+        Tuple of (rows, mean vector, co-moment matrix M2); cov = M2 / (n - 1)
+    """
+    d = len(columns)
+    n, mean, m2 = 0, np.zeros(d), np.zeros((d, d))
+
+    for start in range(0, len(df), chunk_rows):
+        X = df.iloc[start:start + chunk_rows][columns].to_numpy(dtype=float)
+        X = np.where(np.isnan(X), fill_values, X)
+
+        n_b = len(X)
+        mean_b = X.mean(axis=0)
+        centered = X - mean_b
+        m2_b = centered.T @ centered
+
+        delta = mean_b - mean
+        total = n + n_b
+        m2 += m2_b + np.outer(delta, delta) * (n * n_b / total)
+        mean += delta * (n_b / total)
+        n = total
+
+    return n, mean, m2
+
+
+def _correlation(m2: np.ndarray) -> np.ndarray:
+    """Correlation from a co-moment matrix; zero-variance features get 0"""
+    std = np.sqrt(np.diag(m2))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = m2 / np.outer(std, std)
+    return np.nan_to_num(corr, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def select_features(
+    train_df: pd.DataFrame,
+    drift_results: Optional[Union[DriftColumns, Iterable[Dict]]] = None,
+    top_k: Optional[int] = None
+) -> Tuple[List[str], str]:
+    """
+    Numerical features to correlate, restricted to the top-k drifted if needed
+
+    Correlating all d features costs O(d^2); past CORRELATION_MAX_FEATURES
+    (or when top_k is given) only the most drifted features are kept.
+    """
+    numeric = [col for col in train_df.columns if train_df[col].dtype in NUMERICAL_TYPES]
+    limit = top_k or (CORRELATION_MAX_FEATURES if len(numeric) > CORRELATION_MAX_FEATURES else None)
+    if limit is None or limit >= len(numeric):
+        return numeric, "all"
+
+    drift_results = DriftColumns.coerce(drift_results if drift_results is not None else [])
+    scores = dict(zip(drift_results.features.tolist(), drift_results.drift_score.tolist()))
+    ranked = sorted(numeric, key=lambda col: scores.get(col, 0), reverse=True)[:limit]
+    # Keep the original column order for stable output
+    keep = set(ranked)
+    return [col for col in numeric if col in keep], "top_k_drifted"
+
+
+def detect_correlation_drift(
+    train_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    drift_results: Optional[Union[DriftColumns, Iterable[Dict]]] = None,
+    top_k: Optional[int] = None,
+    top_pairs: int = 10,
+    chunk_rows: int = CORRELATION_CHUNK_ROWS
+) -> Dict:
+    """
+    Compare train and production correlation matrices
+
+    Args:
+        train_df: Training data (baseline)
+        new_df: Production data after failure
+        drift_results: Univariate drift results, used to pick top-k drifted features
+        top_k: Only correlate the k most drifted numerical features
+        top_pairs: Number of most-changed pairs reported
+        chunk_rows: Rows per covariance chunk
+
+    Returns:
+        Dict with the most-changed feature pairs and per-feature summaries
+    """
+    features, selection = select_features(train_df, drift_results, top_k)
+    if len(features) < 2:
+        return {"drift": False, "features_analyzed": len(features), "reason": "Fewer than two numerical features"}
+
+    fill_values = train_df[features].mean().to_numpy(dtype=float)
+    fill_values = np.nan_to_num(fill_values)
+    train_rows, _, train_m2 = streaming_covariance(train_df, features, fill_values, chunk_rows)
+    new_rows, _, new_m2 = streaming_covariance(new_df, features, fill_values, chunk_rows)
+
+    train_corr, new_corr = _correlation(train_m2), _correlation(new_m2)
+    change = new_corr - train_corr
+
+    upper_i, upper_j = np.triu_indices(len(features), k=1)
+    pair_change = np.abs(change[upper_i, upper_j])
+    count = min(top_pairs, len(pair_change))
+    top = np.argpartition(-pair_change, count - 1)[:count]
+    top = top[np.argsort(-pair_change[top])]
+
+    feature_change = np.abs(change).sum(axis=1) / (len(features) - 1)
+    broken = pair_change >= CORRELATION_CHANGE_THRESHOLD
+
+    return {
+        "drift": bool(broken.any()),
+        "features_analyzed": len(features),
+        "selection": selection,
+        "rows": {"train": train_rows, "new": new_rows},
+        "pairs_analyzed": int(len(pair_change)),
+        "broken_pairs_count": int(broken.sum()),
+        "mean_abs_change": round(float(pair_change.mean()), 4),
+        "max_abs_change": round(float(pair_change.max()), 4),
+        "top_changed_pairs": [
+            {
+                "feature_a": features[upper_i[p]],
+                "feature_b": features[upper_j[p]],
+                "train_correlation": round(float(train_corr[upper_i[p], upper_j[p]]), 4),
+                "new_correlation": round(float(new_corr[upper_i[p], upper_j[p]]), 4),
+                "change": round(float(change[upper_i[p], upper_j[p]]), 4)
+            }
+            for p in top
+        ],
+        "most_affected_features": [
+            {"feature": features[i], "mean_abs_change": round(float(feature_change[i]), 4)}
+            for i in np.argsort(-feature_change)[:top_pairs]
+        ]
+    }
@@ -1,8 +1,34 @@
 """Data loading and validation service"""
 import pandas as pd
-from typing import Tuple
-from fastapi import UploadFile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Dict, List, Optional, Sequence, TYPE_CHECKING
+import asyncio
+import codecs
+import hashlib
+import importlib.util
 import io
+import os
+import re
+
+from app.config import CSV_PARSE_ENGINE
+from app.services.drift_policy import get_policy
+from app.utils.sketches import CategoricalSketch, compare_to_sketch, is_high_cardinality
+
+if TYPE_CHECKING:  # the CLI imports this module and must not pull in the web stack
+    from fastapi import UploadFile
+
+# Bytes inspected to pick a file's encoding before parsing
+SNIFF_BYTES = 64 * 1024
+
+# Longest BOMs first: the UTF-32 LE BOM starts with the UTF-16 LE one
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16')
+)
+
 
 def normalize_columns(df):
     """
@@ -21,10 +47,181 @@ def normalize_columns(df):
     return df
 
 
+def normalize_name(name) -> str:
+    """Single-name version of normalize_columns (same steps, same order)"""
+    name = str(name).strip().lower().replace('\ufeff', '').replace('\u200b', '')
+    return re.sub(r'\s+', ' ', name)
+
+
+def policy_usecols(keep: Sequence[str] = ()):
+    """
+    read_csv `usecols` callable that drops columns the drift policy skips
+    
+    Skipped features are never parsed, except those in `keep` (join,
+    segment or stratification keys a run still needs); drift and impact
+    analysis leave them out either way. Returns None when nothing is skipped.
+    """
+    policy = get_policy()
+    if not policy.has_skips:
+        return None
+    keep = {normalize_name(name) for name in keep if name}
+    return lambda name: normalize_name(name) in keep or not policy.is_skipped(normalize_name(name))
+
+
+def fingerprint_column(series: pd.Series) -> str:
+    """
+    Compute a content fingerprint for a single column.
+
+    Uses pandas' vectorized row hashing, then digests the hash array, so the
+    cost is one pass over the column. Any change in values, order or dtype
+    produces a different fingerprint.
+    """
+    row_hashes = pd.util.hash_pandas_object(series, index=False).to_numpy()
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(series.dtype).encode())
+    digest.update(row_hashes.tobytes())
+    return digest.hexdigest()
+
+
+def fingerprint_columns(df: pd.DataFrame) -> Dict[str, str]:
+    """Compute per-column fingerprints for a DataFrame"""
+    return {col: fingerprint_column(df[col]) for col in df.columns}
+
+
+def sniff_encoding(prefix: bytes) -> str:
+    """
+    Pick a CSV encoding from the first bytes of a file
+    
+    A BOM decides outright. Without one, NUL bytes concentrated on even or
+    odd positions mean BOM-less UTF-16; otherwise the prefix is UTF-8 if it
+    decodes as such (a multi-byte character cut at the end is fine) and
+    latin1, which accepts any byte sequence, if not.
+    """
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    
+    if b'\x00' in prefix:
+        even, odd = prefix[0::2].count(0), prefix[1::2].count(0)
+        if max(even, odd) > 0.3 * len(prefix) / 2:
+            return 'utf-16-le' if odd > even else 'utf-16-be'
+    
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(prefix, final=False)
+        return 'utf-8-sig'
+    except UnicodeDecodeError:
+        return 'latin1'
+
+
+# Options for every C-parser read_csv. The default float converter can be
+# one ulp off; round-trip parsing is exact, like pyarrow's, so a file gets
+# the same values (and fingerprints) whichever engine or entry point reads it
+C_PARSER_OPTIONS = {'float_precision': 'round_trip'}
+
+
+def _use_pyarrow() -> bool:
+    # find_spec only locates the package; pyarrow is imported by pandas on first use
+    if CSV_PARSE_ENGINE == 'auto':
+        return importlib.util.find_spec('pyarrow') is not None
+    return CSV_PARSE_ENGINE == 'pyarrow'
+
+
+def _pyarrow_mismatches(df: pd.DataFrame) -> List[str]:
+    """
+    Columns whose pyarrow parse may differ from the C parser's
+    
+    pyarrow reads timestamps, dates and times the C parser leaves as
+    strings, takes "1"/"0" for booleans and turns integers past int64 into
+    floats (the C parser keeps Python ints). Plain integer, float and string
+    columns come out identical (floats too, see C_PARSER_OPTIONS).
+    """
+    def matches(series: pd.Series) -> bool:
+        if series.dtype.kind in 'iu':
+            return True
+        if series.dtype.kind == 'f':
+            return not (series.abs() >= 2 ** 63).any()
+        return series.dtype.kind != 'O' and pd.api.types.is_string_dtype(series)
+    return [col for col in df.columns if not matches(df[col])]
+
+
+def _read_csv(buffer, encoding: str, usecols) -> pd.DataFrame:
+    """
+    read_csv with the pyarrow engine when available, the C parser otherwise
+    
+    Either way a file gets the same dtypes and values, hence the same
+    fingerprints as read_csv_path and sample_csv_stream give it: columns
+    pyarrow infers differently (see _pyarrow_mismatches) are re-parsed
+    alone with the C parser. pyarrow cannot take a callable `usecols`, so
+    policy skips, duplicate headers and anything pyarrow rejects (e.g.
+    ragged rows) go through the C parser entirely.
+    """
+    if usecols is None and _use_pyarrow():
+        try:
+            df = pd.read_csv(buffer, encoding='utf-8' if encoding == 'utf-8-sig' else encoding, engine='pyarrow')
+        except Exception:
+            df = None
+        buffer.seek(0)
+        if df is not None and df.columns.is_unique:
+            mismatched = _pyarrow_mismatches(df)
+            if len(mismatched) < len(df.columns):
+                if mismatched:
+                    reparsed = pd.read_csv(buffer, encoding=encoding, usecols=mismatched, **C_PARSER_OPTIONS)
+                    for col in mismatched:
+                        df[col] = reparsed[col]
+                return df
+    return pd.read_csv(buffer, encoding=encoding, usecols=usecols, **C_PARSER_OPTIONS)
+
+
+def _parse_csv_buffer(content: bytes, usecols, label: str = "") -> pd.DataFrame:
+    """Parse one payload with its sniffed encoding; a late decode error re-parses only this file"""
+    buffer = io.BytesIO(content)
+    encoding = sniff_encoding(content[:SNIFF_BYTES])
+    try:
+        return normalize_columns(_read_csv(buffer, encoding, usecols))
+    except UnicodeDecodeError:
+        # Only reachable when the invalid bytes lie past the sniffed prefix
+        print(f"⚠️ UTF-8 failed{label}, trying latin1 encoding...")
+        buffer.seek(0)
+        return normalize_columns(_read_csv(buffer, 'latin1', usecols))
+
+
+def parse_csv_many(
+    contents: List[bytes],
+    names: Optional[List[str]] = None,
+    keep: Sequence[str] = ()
+) -> List[pd.DataFrame]:
+    """
+    Parse several CSV payloads concurrently and normalize their columns
+    
+    Each file gets its own encoding (see sniff_encoding), so one latin1 file
+    never forces the others to be parsed again. Columns in `keep` are parsed
+    even when the drift policy skips them.
+    
+    Raises:
+        ValueError: If any file fails to parse (the message names it)
+    """
+    names = names or [f"file {i + 1}" for i in range(len(contents))]
+    usecols = policy_usecols(keep)
+    
+    with ThreadPoolExecutor(max_workers=max(1, len(contents))) as pool:
+        futures = [
+            pool.submit(_parse_csv_buffer, content, usecols, f" for {name}")
+            for content, name in zip(contents, names)
+        ]
+        frames = []
+        for future, name in zip(futures, names):
+            try:
+                frames.append(future.result())
+            except Exception as e:
+                raise ValueError(f"CSV parsing failed for {name}: {str(e)}")
+    return frames
+
+
 async def load_and_validate(
-    train: UploadFile, 
-    old: UploadFile, 
-    new: UploadFile
+    train: "UploadFile", 
+    old: "UploadFile", 
+    new: "UploadFile",
+    keep: Sequence[str] = ()
 ) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
     Load and validate CSV files for autopsy analysis
@@ -33,6 +230,7 @@ async def load_and_validate(
         train: Training data (baseline)
         old: Production data before failure
         new: Production data after failure
+        keep: Key columns to load even if the drift policy skips them
         
     Returns:
         Tuple of three DataFrames (train_df, old_df, new_df)
@@ -40,31 +238,92 @@ async def load_and_validate(
     Raises:
         ValueError: If validation fails
     """
+    # Read file contents asynchronously, then parse all three concurrently
+    # off the event loop, each with its own sniffed encoding
+    contents = [await upload.read() for upload in (train, old, new)]
+    train_df, old_df, new_df = await asyncio.to_thread(
+        parse_csv_many, contents, ["train", "prod_old", "prod_new"], keep
+    )
+
+    return validate_frames(train_df, old_df, new_df, keep=keep)
+
+
+def parse_csv_bytes(content: bytes, keep: Sequence[str] = ()) -> pd.DataFrame:
+    """
+    Parse a single CSV payload (sniffed encoding, latin1 fallback) and normalize its columns
+    
+    Raises:
+        ValueError: If parsing fails
+    """
     try:
-        # Read file contents asynchronously
-        train_content = await train.read()
-        old_content = await old.read()
-        new_content = await new.read()
-        
-        # Parse CSV from bytes with encoding handling
-        # Try UTF-8 first (most common), fallback to latin1 which accepts anything
-        train_df = pd.read_csv(io.BytesIO(train_content), encoding='utf-8-sig')  # utf-8-sig removes BOM
-        old_df = pd.read_csv(io.BytesIO(old_content), encoding='utf-8-sig')
-        new_df = pd.read_csv(io.BytesIO(new_content), encoding='utf-8-sig')
-    except UnicodeDecodeError:
-        # Fallback to latin1 if UTF-8 fails
-        print("⚠️ UTF-8 failed, trying latin1 encoding...")
-        train_df = pd.read_csv(io.BytesIO(train_content), encoding='latin1')
-        old_df = pd.read_csv(io.BytesIO(old_content), encoding='latin1')
-        new_df = pd.read_csv(io.BytesIO(new_content), encoding='latin1')
+        return _parse_csv_buffer(content, policy_usecols(keep))
     except Exception as e:
         raise ValueError(f"CSV parsing failed: {str(e)}")
 
+
+def read_csv_path(path: str, keep: Sequence[str] = ()) -> pd.DataFrame:
+    """
+    Parse a CSV straight from disk and normalize its columns
+    
+    For local runs (CLI, cron jobs): the file is memory-mapped instead of
+    being read into an upload buffer first. Same encoding fallback and
+    policy column skipping (and `keep` exceptions) as uploads.
+    
+    Raises:
+        ValueError: If the file is missing or parsing fails
+    """
+    if not os.path.isfile(path):
+        raise ValueError(f"File not found: {path}")
+    
+    usecols = policy_usecols(keep)
+    with open(path, 'rb') as f:
+        encoding = sniff_encoding(f.read(SNIFF_BYTES))
+    try:
+        try:
+            df = pd.read_csv(path, encoding=encoding, memory_map=True, usecols=usecols, **C_PARSER_OPTIONS)
+        except UnicodeDecodeError:
+            print(f"⚠️ UTF-8 failed for {path}, trying latin1 encoding...")
+            df = pd.read_csv(path, encoding='latin1', memory_map=True, usecols=usecols, **C_PARSER_OPTIONS)
+    except Exception as e:
+        raise ValueError(f"CSV parsing failed for {path}: {str(e)}")
+    
+    return normalize_columns(df)
+
+
+def validate_frames(
+    train_df: pd.DataFrame,
+    old_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    fingerprint: bool = True,
+    keep: Sequence[str] = ()
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Validate already-parsed DataFrames for autopsy analysis
+    
+    Shared by uploads and registered datasets: normalizes and checks columns,
+    drops columns the drift policy skips (except the `keep` key columns),
+    aligns column order and attaches per-column fingerprints (skipped with
+    fingerprint=False when results will not be reused incrementally).
+    
+    Raises:
+        ValueError: If validation fails
+    """
     # Normalize columns to handle whitespace and case issues
     train_df = normalize_columns(train_df)
     old_df = normalize_columns(old_df)
     new_df = normalize_columns(new_df)
 
+    # Drop features the drift policy skips (uploads never parse them; this
+    # covers registered datasets and frames passed in directly). Key columns
+    # stay: drift and impact analysis leave skipped features out themselves
+    policy = get_policy()
+    if policy.has_skips:
+        keep = {normalize_name(name) for name in keep if name}
+        train_df, old_df, new_df = (
+            df[[col for col in df.columns if col in keep or not policy.is_skipped(col)]]
+            for df in (train_df, old_df, new_df)
+        )
+
     # DEBUG: Log columns for production debugging (helps diagnose invisible characters)
     print("🔍 DEBUG - Column comparison:")
     print(f"  TRAIN columns: {list(train_df.columns)}")
@@ -116,33 +375,72 @@ async def load_and_validate(
     new_values_detected = {}
     
     for col in train_df.columns:
-        if train_df[col].dtype == 'object':
-            train_unique = set(train_df[col].dropna().unique())
-            new_unique = set(new_df[col].dropna().unique())
-            
-            new_vals = new_unique - train_unique
-            if new_vals:
-                new_values_detected[col] = list(new_vals)
+        if pd.api.types.is_numeric_dtype(train_df[col]) or pd.api.types.is_bool_dtype(train_df[col]):
+            continue
+        train_clean = train_df[col].dropna()
+        if is_high_cardinality(train_clean):
+            # ID-like column: estimate from sketches instead of two huge sets
+            comparison = compare_to_sketch(CategoricalSketch.from_series(train_clean), new_df[col])
+            if comparison["new_distinct"]:
+                new_values_detected[col] = {
+                    "estimated_new_values": comparison["new_distinct"],
+                    "examples": comparison["new_examples"]
+                }
+            continue
+        new_vals = pd.Index(new_df[col].dropna().unique(), dtype=object).difference(pd.Index(train_clean.unique(), dtype=object))
+        if len(new_vals):
+            new_values_detected[col] = list(new_vals)
     
     # Warning about new categorical values (not blocking, but important)
     if new_values_detected:
         print(f"⚠️ WARNING: New categorical values detected: {new_values_detected}")
     
+    # Fingerprint every column so re-runs can reuse unchanged per-feature results
+    # (registered datasets already carry fingerprints computed at ingest)
+    if fingerprint:
+        for df in (train_df, old_df, new_df):
+            fingerprints = df.attrs.get("column_fingerprints")
+            if fingerprints is None or set(fingerprints) != set(df.columns):
+                df.attrs["column_fingerprints"] = fingerprint_columns(df)
+    
     return train_df, old_df, new_df
 
 
-def validate_predictions(predictions_file: UploadFile) -> pd.DataFrame:
+def validate_predictions(predictions_file, key: Optional[str] = None, chunksize: int = 100_000):
     """
-    Validate and load predictions CSV for SHAP analysis
+    Validate a predictions CSV header and return a chunked reader over it
+    
+    Expected columns: prediction, actual, plus `key` when joining by key.
+    Only those columns are parsed, so wide or very long files stream in
+    bounded memory.
     
-    Expected columns: prediction, actual (optional), timestamp (optional)
+    Args:
+        predictions_file: Binary file-like object (e.g. UploadFile.file)
+        key: Optional join column shared with prod_new
+        chunksize: Rows per chunk
+        
+    Returns:
+        Iterator of DataFrames with normalized column names
     """
     try:
-        pred_df = pd.read_csv(predictions_file.file)
+        predictions_file.seek(0)
+        header = pd.read_csv(predictions_file, nrows=0, encoding="utf-8-sig").columns
+        normalized = normalize_columns(pd.DataFrame(columns=header)).columns
+        raw_names = dict(zip(normalized, header))
         
-        if 'prediction' not in pred_df.columns:
-            raise ValueError("Predictions file must contain 'prediction' column")
+        required = ['prediction', 'actual'] + ([key] if key else [])
+        missing = [col for col in required if col not in raw_names]
+        if missing:
+            raise ValueError(f"Predictions file must contain columns: {missing}")
         
-        return pred_df
-    except Exception as e:
+        predictions_file.seek(0)
+        reader = pd.read_csv(
+            predictions_file,
+            usecols=[raw_names[col] for col in required],
+            encoding="utf-8-sig",
+            chunksize=chunksize
+        )
+    except ValueError as e:
         raise ValueError(f"Failed to load predictions: {str(e)}")
+    
+    return (normalize_columns(chunk) for chunk in reader)
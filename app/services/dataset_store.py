@@ -0,0 +1,231 @@
+"""Dataset registry: ingest CSV snapshots once into a memory-mappable columnar store"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+
+from app.config import DATASET_STORE_DIR, DATASET_STORE_QUOTA_MB
+from app.services.data_loader import parse_csv_bytes, fingerprint_columns
+
+INDEX_FILE = "index.json"
+META_FILE = "meta.json"
+
+
+class DatasetStore:
+    """
+    On-disk registry of parsed datasets.
+
+    Layout (one directory per dataset id):
+    - <id>/meta.json: column names, kinds, categories and fingerprints
+    - <id>/<n>.npy: numeric column n as a plain .npy array
+    - <id>/<n>.codes.npy: categorical codes for non-numeric column n
+
+    Columns are opened with np.load(mmap_mode='r'), so reading a dataset maps
+    the files instead of copying them. Datasets are evicted least-recently-used
+    first when the total size exceeds the disk quota.
+    """
+
+    def __init__(self, root: str = DATASET_STORE_DIR, quota_mb: float = DATASET_STORE_QUOTA_MB):
+        self.root = root
+        self.quota_bytes = int(quota_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Index bookkeeping
+    # ------------------------------------------------------------------
+
+    def _read_index(self) -> Dict:
+        path = os.path.join(self.root, INDEX_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_index(self, index: Dict):
+        # Atomic replace so concurrent readers never see a partial file
+        path = os.path.join(self.root, INDEX_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _evict(self, index: Dict, keep: str):
+        """Evict least recently accessed datasets until the quota is met"""
+        total = sum(entry["size_bytes"] for entry in index.values())
+        for dataset_id in sorted(index, key=lambda k: index[k]["last_accessed"]):
+            if total <= self.quota_bytes:
+                break
+            if dataset_id == keep:
+                continue
+            total -= index[dataset_id]["size_bytes"]
+            print(f"🗑️ Evicting dataset {dataset_id} ({index[dataset_id]['name']}) to stay within quota")
+            shutil.rmtree(os.path.join(self.root, dataset_id), ignore_errors=True)
+            del index[dataset_id]
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def ingest(self, content: bytes, name: str = "dataset") -> Dict:
+        """
+        Parse a CSV payload once and store it column by column
+
+        The dataset id is derived from the file content, so re-registering
+        the same snapshot returns the existing entry without re-parsing.
+
+        Returns:
+            Dataset metadata including its dataset_id
+
+        Raises:
+            ValueError: If parsing fails or the dataset exceeds the quota
+        """
+        dataset_id = hashlib.blake2b(content, digest_size=12).hexdigest()
+
+        with self._lock:
+            index = self._read_index()
+            if dataset_id in index:
+                index[dataset_id]["last_accessed"] = time.time()
+                self._write_index(index)
+                return dict(index[dataset_id], dataset_id=dataset_id)
+
+        df = parse_csv_bytes(content)
+        if df.empty:
+            raise ValueError(f"Dataset '{name}' is empty")
+
+        dataset_dir = os.path.join(self.root, dataset_id)
+        tmp_dir = f"{dataset_dir}.{os.getpid()}.tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        columns = []
+        for n, col in enumerate(df.columns):
+            series = df[col]
+            if series.dtype.kind in "biuf":
+                np.save(os.path.join(tmp_dir, f"{n}.npy"), series.to_numpy())
+                columns.append({"name": col, "kind": "numeric"})
+            else:
+                categorical = pd.Categorical(series)
+                np.save(os.path.join(tmp_dir, f"{n}.codes.npy"), categorical.codes)
+                columns.append({
+                    "name": col,
+                    "kind": "categorical",
+                    "categories": [str(c) for c in categorical.categories]
+                })
+
+        # Fingerprints come from the parsed frame so they match an equivalent upload
+        meta = {
+            "name": name,
+            "rows": len(df),
+            "columns": columns,
+            "fingerprints": fingerprint_columns(df)
+        }
+        with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        size_bytes = sum(
+            os.path.getsize(os.path.join(tmp_dir, fname)) for fname in os.listdir(tmp_dir)
+        )
+        if size_bytes > self.quota_bytes:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise ValueError(
+                f"Dataset '{name}' needs {size_bytes} bytes, above the store quota of {self.quota_bytes} bytes"
+            )
+
+        with self._lock:
+            if os.path.exists(dataset_dir):
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            else:
+                os.replace(tmp_dir, dataset_dir)
+
+            now = time.time()
+            index = self._read_index()
+            index[dataset_id] = {
+                "name": name,
+                "rows": len(df),
+                "num_columns": len(columns),
+                "size_bytes": size_bytes,
+                "created_at": now,
+                "last_accessed": now
+            }
+            self._evict(index, keep=dataset_id)
+            self._write_index(index)
+
+        print(f"📦 Registered dataset {dataset_id} ({name}): {len(df)} rows, {len(columns)} columns")
+        return dict(index[dataset_id], dataset_id=dataset_id)
+
+    def load(self, dataset_id: str) -> pd.DataFrame:
+        """
+        Open a registered dataset as a DataFrame backed by memory-mapped columns
+
+        Raises:
+            KeyError: If the dataset id is unknown (or was evicted)
+        """
+        with self._lock:
+            index = self._read_index()
+            if dataset_id not in index:
+                raise KeyError(f"Unknown dataset id: {dataset_id}")
+            index[dataset_id]["last_accessed"] = time.time()
+            self._write_index(index)
+
+        dataset_dir = os.path.join(self.root, dataset_id)
+        with open(os.path.join(dataset_dir, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        data = {}
+        for n, column in enumerate(meta["columns"]):
+            if column["kind"] == "numeric":
+                values = np.load(os.path.join(dataset_dir, f"{n}.npy"), mmap_mode="r")
+                data[column["name"]] = pd.Series(values, copy=False)
+            else:
+                codes = np.load(os.path.join(dataset_dir, f"{n}.codes.npy"), mmap_mode="r")
+                dtype = pd.CategoricalDtype(pd.Index(column["categories"], dtype=object))
+                # validate=False keeps the mapped codes instead of copying them
+                categorical = pd.Categorical.from_codes(codes, dtype=dtype, validate=False)
+                data[column["name"]] = pd.Series(categorical, copy=False)
+
+        df = pd.DataFrame(data, copy=False)
+        df.attrs["column_fingerprints"] = meta["fingerprints"]
+        df.attrs["dataset_id"] = dataset_id
+        return df
+
+    def list(self) -> List[Dict]:
+        """List registered datasets, most recently used first"""
+        index = self._read_index()
+        entries = [dict(entry, dataset_id=dataset_id) for dataset_id, entry in index.items()]
+        return sorted(entries, key=lambda e: e["last_accessed"], reverse=True)
+
+    def get(self, dataset_id: str) -> Dict:
+        """Get metadata for one dataset"""
+        index = self._read_index()
+        if dataset_id not in index:
+            raise KeyError(f"Unknown dataset id: {dataset_id}")
+        return dict(index[dataset_id], dataset_id=dataset_id)
+
+    def delete(self, dataset_id: str):
+        """Remove a dataset from the registry"""
+        with self._lock:
+            index = self._read_index()
+            if dataset_id not in index:
+                raise KeyError(f"Unknown dataset id: {dataset_id}")
+            del index[dataset_id]
+            self._write_index(index)
+        shutil.rmtree(os.path.join(self.root, dataset_id), ignore_errors=True)
+
+    def total_bytes(self) -> int:
+        return sum(entry["size_bytes"] for entry in self._read_index().values())
+
+
+_dataset_store = None
+
+
+def get_dataset_store() -> DatasetStore:
+    """Return the process-wide dataset store (created on first use)"""
+    global _dataset_store
+    if _dataset_store is None:
+        _dataset_store = DatasetStore()
+    return _dataset_store
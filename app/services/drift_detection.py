@@ -1,11 +1,32 @@
 """Drift detection engine using statistical tests"""
 import pandas as pd
 import numpy as np
-from scipy.stats import ks_2samp, chi2_contingency
-from typing import List, Dict
-from app.utils.stats import calculate_psi, get_severity_level
+from typing import List, Dict, Optional, Iterable, Iterator, Union
+from app.config import DRIFT_PVALUE_CORRECTION, DRIFT_SCREENING_BINS
+from app.utils.stats import (
+    calculate_psi_from_distributions,
+    ks_bounds,
+    ks_asymptotic_pvalue,
+    adjust_pvalues,
+    parse_drift_metrics,
+    align_distributions,
+    histogram_drift_metrics,
+    numeric_drift_metrics
+)
+from app.services.baseline import profile_column
+from app.services.drift_policy import DriftPolicy, FeaturePolicy, get_policy
+from app.models.results import DriftColumns, SEVERITY_LEVELS
+from app.utils.sketches import compare_to_sketch
 
-def detect_drift(train_df: pd.DataFrame, prod_df: pd.DataFrame) -> List[Dict]:
+def detect_drift(
+    train_df: pd.DataFrame,
+    prod_df: pd.DataFrame,
+    baseline: Optional[Dict[str, Dict]] = None,
+    metrics: Optional[Union[str, Iterable[str]]] = None,
+    policy: Optional[DriftPolicy] = None,
+    correction: Optional[str] = None,
+    screening_bins: int = DRIFT_SCREENING_BINS
+) -> DriftColumns:
     """
     Detect distribution drift across all features
     
@@ -14,49 +35,98 @@ def detect_drift(train_df: pd.DataFrame, prod_df: pd.DataFrame) -> List[Dict]:
     - PSI (Population Stability Index) for categorical features
     - Chi-Square test as alternative for categorical
     
+    Thresholds, extra metrics and skip rules come from the drift policy
+    (see drift_policy; defaults to the config constants).
+    
+    Multi-metric mode: when `metrics` (or the policy) selects any of
+    ks, psi, wasserstein, js, hellinger, energy, each result also gets a
+    `drift_metrics` dict. All selected metrics come from one sorted array
+    (numerical) or one aligned histogram (categorical) per column;
+    KS/Wasserstein/energy are only defined for numerical features.
+    
+    Wide feature sets: numerical features are first screened with cheap
+    KS bounds from coarse bins (see _screen_ks), and the exact KS test only
+    runs on candidates. KS p-values are then corrected across all features
+    (Benjamini-Hochberg by default) so thousands of tests do not produce
+    dozens of false drift flags.
+    
     Args:
         train_df: Training/baseline data
         prod_df: Production data
+        baseline: Optional precomputed profile from build_baseline_profile(train_df)
+        metrics: Extra metrics for every feature (defaults to the policy's)
+        policy: Compiled drift policy (defaults to the process-wide policy)
+        correction: "bh", "holm" or "none" (defaults to DRIFT_PVALUE_CORRECTION)
+        screening_bins: Minimum coarse bins for KS screening (0 disables it)
         
     Returns:
-        List of drift analysis results per feature
+        DriftColumns with one result per feature, highest drift score first
+        (records() gives the per-feature dicts)
+    
+    Raises:
+        ValueError: If an unknown metric or correction is requested
     """
-    drift_results = []
+    policy = policy or get_policy()
+    metrics = parse_drift_metrics(metrics) if metrics is not None else None
+    drift_results = DriftColumns.from_results(
+        _feature_drift(train_df, prod_df, baseline, metrics, policy, screening_bins)
+    )
+    apply_pvalue_correction(drift_results, correction, policy)
     
+    # Sort by drift severity (highest first)
+    return drift_results.sorted()
+
+
+def _feature_drift(train_df: pd.DataFrame, prod_df: pd.DataFrame, baseline: Optional[Dict[str, Dict]],
+                   metrics: Optional[List[str]], policy: DriftPolicy, screening_bins: int) -> Iterator[Dict]:
+    """Per-feature drift results, one at a time (detect_drift splits them into columns)"""
     for col in train_df.columns:
+        feature_policy = policy.resolve(col)
+        if feature_policy.skip:
+            continue
+        col_metrics = feature_policy.metrics if metrics is None else metrics
+        train_profile = baseline[col] if baseline and col in baseline else profile_column(train_df[col])
+        
         # Skip if all NaN
-        if train_df[col].isna().all() or prod_df[col].isna().all():
+        if train_profile["count"] == 0 or prod_df[col].isna().all():
             continue
             
-        if train_df[col].dtype in ['int64', 'float64', 'int32', 'float32']:
+        if train_profile["kind"] == "numeric":
             # Numerical feature: Use KS Test
-            result = _detect_numerical_drift(train_df[col], prod_df[col], col)
+            result = _detect_numerical_drift(
+                train_profile, prod_df[col], col, col_metrics, feature_policy, screening_bins
+            )
         else:
             # Categorical feature: Use PSI
-            result = _detect_categorical_drift(train_df[col], prod_df[col], col)
+            result = _detect_categorical_drift(train_profile, prod_df[col], col, col_metrics, feature_policy)
         
-        drift_results.append(result)
-    
-    # Sort by drift severity (highest first)
-    drift_results.sort(key=lambda x: x.get('drift_score', 0), reverse=True)
-    
-    return drift_results
+        yield result
+
+
+def _rounded(values: Dict[str, float]) -> Dict[str, float]:
+    return {name: round(value, 5) for name, value in values.items()}
 
 
-def _detect_numerical_drift(train_series: pd.Series, prod_series: pd.Series, feature_name: str) -> Dict:
+def _detect_numerical_drift(train_profile: Dict, prod_series: pd.Series, feature_name: str,
+                            metrics: Iterable[str] = (),
+                            feature_policy: Optional[FeaturePolicy] = None,
+                            screening_bins: int = DRIFT_SCREENING_BINS) -> Dict:
     """
     Detect drift in numerical features using KS Test
     
     KS Test (Kolmogorov-Smirnov):
     - Non-parametric
     - Compares cumulative distributions
-    - p-value < 0.05 indicates significant drift
+    - p-value below the policy threshold (KS_TEST_THRESHOLD) indicates significant drift
+    
+    Features that pass the cheap screen skip the exact test; their result
+    has `screened: True`, with `ks_statistic` an upper bound and `p_value`
+    a lower bound.
     """
-    # Remove NaN values
-    train_clean = train_series.dropna()
+    # Remove NaN values (training values are already cleaned in the profile)
     prod_clean = prod_series.dropna()
     
-    if len(train_clean) == 0 or len(prod_clean) == 0:
+    if train_profile["count"] == 0 or len(prod_clean) == 0:
         return {
             "feature": feature_name,
             "method": "KS-Test",
@@ -66,26 +136,33 @@ def _detect_numerical_drift(train_series: pd.Series, prod_series: pd.Series, fea
             "severity": "None"
         }
     
-    # Perform KS test
-    ks_stat, p_value = ks_2samp(train_clean, prod_clean)
+    feature_policy = feature_policy or get_policy().default_policy
+    
+    # Screen first; perform the exact KS test only on candidates
+    screen = _screen_ks(train_profile["values"], prod_clean, feature_policy, screening_bins)
+    if screen is not None:
+        ks_stat, p_value = screen
+    else:
+        from scipy.stats import ks_2samp  # deferred: scipy.stats dominates cold start
+        ks_stat, p_value = ks_2samp(train_profile["values"], prod_clean)
     
     # Calculate distribution metrics
-    train_mean = train_clean.mean()
+    train_mean = train_profile["mean"]
     prod_mean = prod_clean.mean()
     mean_shift = abs(prod_mean - train_mean) / (abs(train_mean) + 1e-10)
     
-    train_std = train_clean.std()
+    train_std = train_profile["std"]
     prod_std = prod_clean.std()
     std_shift = abs(prod_std - train_std) / (abs(train_std) + 1e-10)
     
-    drift_detected = p_value < 0.05
-    severity = get_severity_level(ks_stat, method="ks")
+    drift_detected = feature_policy.ks_drift(p_value)
+    severity = feature_policy.ks_level(ks_stat)
     
-    return {
+    result = {
         "feature": feature_name,
         "method": "KS-Test",
         "ks_statistic": round(ks_stat, 5),
-        "p_value": round(p_value, 5),
+        "p_value": _round_p(p_value),
         "drift": drift_detected,
         "drift_score": round(ks_stat, 4),
         "severity": severity,
@@ -98,9 +175,98 @@ def _detect_numerical_drift(train_series: pd.Series, prod_series: pd.Series, fea
             "std_shift_pct": round(std_shift * 100, 2)
         }
     }
+    if screen is not None:
+        result["screened"] = True
+    if metrics:
+        prod_sorted = np.sort(prod_clean.to_numpy(dtype=float))
+        result["drift_metrics"] = _rounded(numeric_drift_metrics(
+            train_profile["values"], prod_sorted, metrics, edges=train_profile.get("bin_edges")
+        ))
+    return result
+
+
+def _round_p(p_value: float) -> float:
+    """Five significant digits, so tiny p-values survive for the correction"""
+    return float(f"{p_value:.5g}")
+
+
+def _screen_ks(train_sorted: np.ndarray, prod_clean: pd.Series, feature_policy: FeaturePolicy,
+               bins: int) -> Optional[tuple]:
+    """
+    Cheap early exit for clearly unchanged numerical features
+    
+    An upper bound on the KS statistic comes from the two CDFs at coarse
+    training quantiles (stats.ks_bounds; the bin count grows with
+    sqrt(n * m / (n + m)) so the bound stays tight enough to be useful).
+    A feature exits when even that bound is below the first severity cutoff
+    and its asymptotic p-value is at least twice the threshold (the margin
+    covers the gap to scipy's exact small-sample p-values).
+    
+    Returns:
+        (ks upper bound, p-value lower bound), or None if the exact test must run
+    """
+    n, m = len(train_sorted), len(prod_clean)
+    if bins <= 0 or n < 2 or m < 2:
+        return None
+    effective = n * m / (n + m)
+    bins = int(min(n, max(bins, np.ceil(4 * np.sqrt(effective)))))
+    
+    _, upper = ks_bounds(train_sorted, prod_clean.to_numpy(dtype=float), bins)
+    if upper >= feature_policy.ks_severity[0]:
+        return None
+    p_lower = ks_asymptotic_pvalue(upper, n, m)
+    if p_lower < 2 * feature_policy.ks_p_value:
+        return None
+    return upper, p_lower
+
 
+def apply_pvalue_correction(
+    drift_results: DriftColumns,
+    correction: Optional[str] = None,
+    policy: Optional[DriftPolicy] = None
+) -> DriftColumns:
+    """
+    Multiple-testing correction across all KS results, in place
+    
+    Adds `p_value_adjusted` and re-derives `drift` from it with each
+    feature's policy threshold. Safe to re-run on merged results (the
+    incremental path re-adjusts cached and fresh results together).
+    Screened features carry a p-value lower bound at least twice the
+    threshold, so they can never be rejected and do not shift the ranks of
+    the features that can.
+    
+    Args:
+        drift_results: DriftColumns from detect_drift (or merged by the incremental path)
+        correction: "bh", "holm" or "none" (defaults to DRIFT_PVALUE_CORRECTION)
+        policy: Compiled drift policy (defaults to the process-wide policy)
+    
+    Raises:
+        ValueError: If the correction method is unknown
+    """
+    correction = (correction or DRIFT_PVALUE_CORRECTION).strip().lower()
+    if correction not in ("bh", "holm", "none"):
+        raise ValueError(f"Unknown p-value correction '{correction}'; use 'bh', 'holm' or 'none'")
+    policy = policy or get_policy()
+    
+    tests = [i for i, details in enumerate(drift_results.details) if "p_value" in details]
+    if not tests:
+        return drift_results
+    
+    p_values = np.array([drift_results.details[i]["p_value"] for i in tests])
+    adjusted = p_values if correction == "none" else adjust_pvalues(p_values, correction)
+    for i, p_adjusted in zip(tests, adjusted):
+        details = drift_results.details[i]
+        if correction == "none":
+            details.pop("p_value_adjusted", None)
+        else:
+            details["p_value_adjusted"] = _round_p(p_adjusted)
+        drift_results.drift[i] = policy.resolve(drift_results.features[i]).ks_drift(p_adjusted)
+    return drift_results
 
-def _detect_categorical_drift(train_series: pd.Series, prod_series: pd.Series, feature_name: str) -> Dict:
+
+def _detect_categorical_drift(train_profile: Dict, prod_series: pd.Series, feature_name: str,
+                              metrics: Iterable[str] = (),
+                              feature_policy: Optional[FeaturePolicy] = None) -> Dict:
     """
     Detect drift in categorical features using PSI
     
@@ -110,11 +276,10 @@ def _detect_categorical_drift(train_series: pd.Series, prod_series: pd.Series, f
     - 0.1 ≤ PSI < 0.25: Moderate drift
     - PSI ≥ 0.25: Severe drift
     """
-    # Remove NaN
-    train_clean = train_series.dropna()
+    # Remove NaN (training values are already cleaned in the profile)
     prod_clean = prod_series.dropna()
     
-    if len(train_clean) == 0 or len(prod_clean) == 0:
+    if train_profile["count"] == 0 or len(prod_clean) == 0:
         return {
             "feature": feature_name,
             "method": "PSI",
@@ -124,31 +289,24 @@ def _detect_categorical_drift(train_series: pd.Series, prod_series: pd.Series, f
             "severity": "None"
         }
     
-    # Calculate PSI
-    psi_value = calculate_psi(train_clean, prod_clean)
+    if train_profile.get("high_cardinality"):
+        return _detect_sketch_drift(train_profile, prod_clean, feature_name, metrics, feature_policy)
     
-    # Determine drift based on PSI thresholds
-    if psi_value < 0.1:
-        drift_detected = False
-        severity = "None"
-    elif psi_value < 0.25:
-        drift_detected = True
-        severity = "Moderate"
-    else:
-        drift_detected = True
-        severity = "High"
+    # Calculate PSI against the precomputed training distribution
+    train_dist = train_profile["distribution"]
+    prod_dist = prod_clean.value_counts(normalize=True)
+    psi_value = calculate_psi_from_distributions(train_dist, prod_dist)
     
-    # Calculate category distribution changes
-    train_dist = train_clean.value_counts(normalize=True).to_dict()
-    prod_dist = prod_clean.value_counts(normalize=True).to_dict()
+    # Determine drift based on PSI thresholds
+    drift_detected, severity = (feature_policy or get_policy().default_policy).psi_level(psi_value)
     
     # Find new categories
-    train_categories = set(train_clean.unique())
-    prod_categories = set(prod_clean.unique())
+    train_categories = train_profile["categories"]
+    prod_categories = set(prod_dist.index)
     new_categories = list(prod_categories - train_categories)
     missing_categories = list(train_categories - prod_categories)
     
-    return {
+    result = {
         "feature": feature_name,
         "method": "PSI",
         "psi_value": round(psi_value, 5),
@@ -160,10 +318,53 @@ def _detect_categorical_drift(train_series: pd.Series, prod_series: pd.Series, f
             "prod_unique_values": len(prod_categories),
             "new_categories": new_categories if new_categories else None,
             "missing_categories": missing_categories if missing_categories else None,
-            "top_train_categories": dict(list(train_dist.items())[:5]),
-            "top_prod_categories": dict(list(prod_dist.items())[:5])
+            "top_train_categories": train_dist.head(5).to_dict(),
+            "top_prod_categories": prod_dist.head(5).to_dict()
+        }
+    }
+    if metrics:
+        result["drift_metrics"] = _rounded(histogram_drift_metrics(*align_distributions(train_dist, prod_dist), metrics))
+    return result
+
+
+def _detect_sketch_drift(train_profile: Dict, prod_clean: pd.Series, feature_name: str,
+                         metrics: Iterable[str] = (),
+                         feature_policy: Optional[FeaturePolicy] = None) -> Dict:
+    """
+    PSI for high-cardinality categoricals from frequency sketches
+    
+    Exact value_counts on an ID-like column allocates one entry per distinct
+    value; here both sides are summarized by count-min + HyperLogLog and PSI
+    is taken over the heavy hitters plus an "<other>" bin.
+    """
+    comparison = compare_to_sketch(train_profile["sketch"], prod_clean)
+    psi_value = calculate_psi_from_distributions(comparison["train_dist"], comparison["prod_dist"])
+    drift_detected, severity = (feature_policy or get_policy().default_policy).psi_level(psi_value)
+    
+    result = {
+        "feature": feature_name,
+        "method": "PSI",
+        "high_cardinality": True,
+        "psi_value": round(psi_value, 5),
+        "drift": drift_detected,
+        "drift_score": round(psi_value, 4),
+        "severity": severity,
+        "statistics": {
+            "train_unique_values": train_profile["distinct"],
+            "prod_unique_values": comparison["prod_distinct"],
+            "new_categories": comparison["new_examples"] or None,
+            "new_categories_estimate": comparison["new_distinct"],
+            "new_value_row_share": round(comparison["new_row_share"], 4),
+            "missing_categories": comparison["missing_examples"] or None,
+            "top_train_categories": train_profile["distribution"].head(5).to_dict(),
+            "top_prod_categories": comparison["prod_sketch"].top().head(5).to_dict()
         }
     }
+    if metrics:
+        result["drift_metrics"] = _rounded(histogram_drift_metrics(
+            comparison["train_dist"].to_numpy(), comparison["prod_dist"].to_numpy(), metrics
+        ))
+    return result
 
 
 def detect_drift_timeline(dataframes: List[pd.DataFrame], timestamps: List[str]) -> Dict:
@@ -182,11 +383,12 @@ def detect_drift_timeline(dataframes: List[pd.DataFrame], timestamps: List[str])
     for i, (df, timestamp) in enumerate(zip(dataframes[1:], timestamps[1:]), 1):
         drift_results = detect_drift(baseline, df)
         
+        drifted = drift_results.drifted()
         timeline[timestamp] = {
             "snapshot_index": i,
-            "features_drifted": [r["feature"] for r in drift_results if r["drift"]],
-            "drift_count": sum(1 for r in drift_results if r["drift"]),
-            "severe_drifts": [r["feature"] for r in drift_results if r["severity"] == "High"]
+            "features_drifted": drift_results.features[drifted].tolist(),
+            "drift_count": len(drifted),
+            "severe_drifts": drift_results.features[drift_results.severity == SEVERITY_LEVELS.index("High")].tolist()
         }
     
     return timeline
@@ -0,0 +1,220 @@
+"""Per-feature drift policy: thresholds, weights, metrics and skip rules"""
+import bisect
+import copy
+import fnmatch
+import hashlib
+import json
+import os
+import re
+from typing import Dict, Optional
+
+from app.config import (
+    DRIFT_METRICS,
+    DRIFT_POLICY_PATH,
+    KS_TEST_THRESHOLD,
+    KS_SEVERITY_THRESHOLDS,
+    PSI_MODERATE_THRESHOLD,
+    PSI_SEVERE_THRESHOLD,
+    IMPACT_MODERATE_THRESHOLD,
+    IMPACT_HIGH_THRESHOLD,
+    CATEGORICAL_IMPACT_MODERATE_THRESHOLD,
+    CATEGORICAL_IMPACT_HIGH_THRESHOLD,
+    PROXY_IMPACT_WEIGHTS
+)
+from app.utils.stats import parse_drift_metrics
+
+# Settings a policy may set, with their config defaults
+DEFAULT_SETTINGS = {
+    "skip": False,
+    "ks_p_value": KS_TEST_THRESHOLD,
+    "ks_severity": list(KS_SEVERITY_THRESHOLDS),
+    "psi": [PSI_MODERATE_THRESHOLD, PSI_SEVERE_THRESHOLD],
+    "impact": [IMPACT_MODERATE_THRESHOLD, IMPACT_HIGH_THRESHOLD],
+    "categorical_impact": [CATEGORICAL_IMPACT_MODERATE_THRESHOLD, CATEGORICAL_IMPACT_HIGH_THRESHOLD],
+    "impact_weights": dict(PROXY_IMPACT_WEIGHTS),
+    "metrics": DRIFT_METRICS
+}
+
+_CUTOFF_COUNTS = {"ks_severity": 3, "psi": 2, "impact": 2, "categorical_impact": 2}
+
+
+def _cutoffs(name: str, values) -> tuple:
+    """Validate an ascending list of level cutoffs"""
+    try:
+        cutoffs = tuple(float(v) for v in values)
+    except (TypeError, ValueError):
+        raise ValueError(f"Policy setting '{name}' must be a list of numbers")
+    if len(cutoffs) != _CUTOFF_COUNTS[name] or list(cutoffs) != sorted(cutoffs):
+        raise ValueError(f"Policy setting '{name}' needs {_CUTOFF_COUNTS[name]} ascending cutoffs, got {list(cutoffs)}")
+    return cutoffs
+
+
+class FeaturePolicy:
+    """
+    Resolved settings for one feature, with the level lookups drift and
+    impact analysis need (each a bisect over at most three cutoffs)
+    """
+
+    __slots__ = ("skip", "ks_p_value", "ks_severity", "psi", "impact", "categorical_impact",
+                 "impact_weights", "metrics")
+
+    def __init__(self, settings: Dict):
+        unknown = set(settings) - set(DEFAULT_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown policy settings: {sorted(unknown)}")
+        settings = dict(DEFAULT_SETTINGS, **settings)
+
+        self.skip = bool(settings["skip"])
+        self.ks_p_value = float(settings["ks_p_value"])
+        for name in _CUTOFF_COUNTS:
+            setattr(self, name, _cutoffs(name, settings[name]))
+
+        weights = dict(PROXY_IMPACT_WEIGHTS, **settings["impact_weights"])
+        if set(weights) != set(PROXY_IMPACT_WEIGHTS):
+            raise ValueError(f"impact_weights keys must be {sorted(PROXY_IMPACT_WEIGHTS)}")
+        self.impact_weights = (
+            float(weights["mean_shift"]), float(weights["variance_change"]), float(weights["overlap_loss"])
+        )
+        self.metrics = parse_drift_metrics(settings["metrics"])
+
+    def ks_drift(self, p_value: float) -> bool:
+        return bool(p_value < self.ks_p_value)
+
+    def ks_level(self, ks_stat: float) -> str:
+        return ("None", "Low", "Moderate", "High")[bisect.bisect_right(self.ks_severity, ks_stat)]
+
+    def psi_level(self, psi_value: float):
+        """(drift, severity) from the PSI cutoffs"""
+        index = bisect.bisect_right(self.psi, psi_value)
+        return index > 0, ("None", "Moderate", "High")[index]
+
+    def impact_level(self, score: float) -> str:
+        return ("Low", "Moderate", "High")[bisect.bisect_right(self.impact, score)]
+
+    def categorical_impact_level(self, score: float) -> str:
+        return ("Low", "Moderate", "High")[bisect.bisect_right(self.categorical_impact, score)]
+
+
+class DriftPolicy:
+    """
+    A compiled policy file
+
+    Format (YAML or JSON):
+
+        defaults:                  # optional, overrides the config constants
+          ks_p_value: 0.05
+          psi: [0.1, 0.25]
+        features:
+          customer_id: {skip: true}
+          "score_*": {psi: [0.05, 0.1], metrics: [wasserstein]}
+
+    Keys under `features` containing *, ? or [ are fnmatch patterns. A
+    feature's settings are the defaults, then every matching pattern in file
+    order, then its exact entry. Exact entries are compiled up front and
+    pattern results are memoized per feature name, so after the first lookup
+    resolve() is a single dict hit.
+    """
+
+    def __init__(self, data: Optional[Dict] = None):
+        data = copy.deepcopy(data or {})
+        unknown = set(data) - {"defaults", "features"}
+        if unknown:
+            raise ValueError(f"Unknown policy sections: {sorted(unknown)}")
+
+        self.defaults = data.get("defaults") or {}
+        features = data.get("features") or {}
+        if not isinstance(self.defaults, dict) or not isinstance(features, dict):
+            raise ValueError("Policy 'defaults' and 'features' must be mappings")
+
+        for key, overrides in features.items():
+            if overrides is not None and not isinstance(overrides, dict):
+                raise ValueError(f"Policy entry for '{key}' must be a mapping")
+
+        self.patterns = [
+            (re.compile(fnmatch.translate(str(key))), overrides or {})
+            for key, overrides in features.items() if any(ch in str(key) for ch in "*?[")
+        ]
+        self.exact = {
+            str(key): overrides or {}
+            for key, overrides in features.items() if not any(ch in str(key) for ch in "*?[")
+        }
+        self.has_skips = bool(self.defaults.get("skip")) or any(
+            (overrides or {}).get("skip") for overrides in features.values()
+        )
+        self.default_policy = FeaturePolicy(self.defaults)
+        self._resolved = {name: self._compile(name) for name in self.exact}
+        self.version = hashlib.blake2b(
+            json.dumps(data, sort_keys=True, default=str).encode(), digest_size=8
+        ).hexdigest()
+
+    def _compile(self, name: str) -> FeaturePolicy:
+        settings = dict(self.defaults)
+        matched = False
+        for pattern, overrides in self.patterns:
+            if pattern.match(name):
+                settings.update(overrides)
+                matched = True
+        if name in self.exact:
+            settings.update(self.exact[name])
+            matched = True
+        return FeaturePolicy(settings) if matched else self.default_policy
+
+    def resolve(self, name: str) -> FeaturePolicy:
+        policy = self._resolved.get(name)
+        if policy is None:
+            policy = self._resolved[name] = self._compile(name)
+        return policy
+
+    def is_skipped(self, name: str) -> bool:
+        return self.resolve(name).skip
+
+
+def load_policy(path: str) -> DriftPolicy:
+    """
+    Load and compile a YAML or JSON policy file
+
+    Raises:
+        ValueError: If the file is missing, unreadable or invalid
+    """
+    if not os.path.exists(path):
+        raise ValueError(f"Drift policy file not found: {path}")
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+
+    if path.lower().endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("YAML drift policies need PyYAML (pip install pyyaml); use a .json file instead")
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid drift policy YAML: {e}")
+    else:
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid drift policy JSON: {e}")
+
+    if data is not None and not isinstance(data, dict):
+        raise ValueError("Drift policy must be a mapping")
+    return DriftPolicy(data)
+
+
+_active_policy: Optional[DriftPolicy] = None
+
+
+def get_policy() -> DriftPolicy:
+    """The process-wide policy, compiled from DRIFT_POLICY_PATH on first use"""
+    global _active_policy
+    if _active_policy is None:
+        _active_policy = load_policy(DRIFT_POLICY_PATH) if DRIFT_POLICY_PATH else DriftPolicy()
+        if DRIFT_POLICY_PATH:
+            print(f"✅ Drift policy loaded from {DRIFT_POLICY_PATH} (version {_active_policy.version})")
+    return _active_policy
+
+
+def set_policy(policy: Optional[DriftPolicy]):
+    """Replace the process-wide policy (None reloads from DRIFT_POLICY_PATH)"""
+    global _active_policy
+    _active_policy = policy
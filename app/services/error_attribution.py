@@ -0,0 +1,207 @@
+"""Prediction-error attribution: which feature shifts explain the new errors"""
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from app.config import ERROR_ATTRIBUTION_BINS, ERROR_ATTRIBUTION_CHUNK_ROWS
+from app.services.baseline import profile_column
+from app.services.data_loader import validate_predictions
+from app.services.drift_policy import get_policy
+from app.utils.stats import quantile_bin_edges, assign_bins
+from app.utils.sketches import OTHER_BIN
+
+
+def _encode_feature(profile: Dict, new_series: pd.Series, bins: int) -> Tuple[np.ndarray, List, np.ndarray]:
+    """
+    Bin codes for prod_new plus bin labels and the training share per bin
+
+    Numerical features use the PSI quantile bins of the training data;
+    categorical features use one bin per category. High-cardinality
+    categoricals keep bins only for the training heavy hitters and pool
+    every other value into an "<other>" bin. Missing values get a final bin
+    of their own.
+    """
+    if profile["kind"] == "numeric":
+        if profile["count"] == 0:
+            edges = np.array([0.0, 0.0])
+        else:
+            edges = quantile_bin_edges(profile["values"], bins)
+        n_bins = max(len(edges) - 1, 1)
+        values = new_series.to_numpy(dtype=float)
+        codes = assign_bins(values, edges)
+        train_counts = np.bincount(assign_bins(profile["values"], edges), minlength=n_bins)
+        labels = [f"({edges[i]:.4g}, {edges[i + 1]:.4g}]" for i in range(n_bins)] if len(edges) > 1 else ["all"]
+        missing = np.isnan(values)
+    elif profile.get("high_cardinality"):
+        train_dist = profile["distribution"]
+        categories = pd.Index(train_dist.index.astype(object))
+        new_values = new_series.astype(object)
+        codes = categories.get_indexer(new_values)
+        missing = new_values.isna().to_numpy()
+        codes = np.where((codes < 0) & ~missing, len(categories), codes)
+        n_bins = len(categories) + 1
+        train_share = train_dist.to_numpy(dtype=float)
+        train_counts = np.append(train_share, max(0.0, 1.0 - train_share.sum())) * profile["count"]
+        labels = [str(c) for c in categories] + [OTHER_BIN]
+    else:
+        train_dist = profile["distribution"]
+        train_categories = pd.Index(train_dist.index.astype(object))
+        new_values = new_series.astype(object)
+        new_only = pd.Index(new_values.dropna().unique()).difference(train_categories)
+        categories = train_categories.append(new_only)
+        codes = categories.get_indexer(new_values)
+        n_bins = len(categories)
+        train_counts = np.concatenate([train_dist.to_numpy() * profile["count"], np.zeros(len(new_only))])
+        labels = [str(c) for c in categories]
+        missing = codes < 0
+
+    codes = np.where(missing, n_bins, codes)
+    train_share = np.append(train_counts, 0.0)
+    train_share = train_share / train_share.sum() if train_share.sum() > 0 else train_share
+    return codes.astype(np.int64), labels + ["<missing>"], train_share
+
+
+def _row_errors(chunk: pd.DataFrame, error_type: str) -> np.ndarray:
+    if error_type == "absolute_error":
+        return np.abs(chunk["prediction"].to_numpy(dtype=float) - chunk["actual"].to_numpy(dtype=float))
+    return (chunk["prediction"].astype(str).to_numpy() != chunk["actual"].astype(str).to_numpy()).astype(float)
+
+
+def _detect_error_type(chunk: pd.DataFrame) -> str:
+    """Regression (absolute error) for non-integral numbers, else misclassification"""
+    values = []
+    for col in ("prediction", "actual"):
+        if not pd.api.types.is_numeric_dtype(chunk[col]):
+            return "misclassification"
+        values.append(chunk[col].dropna().to_numpy(dtype=float))
+    values = np.concatenate(values)
+    return "absolute_error" if len(values) and np.any(values != np.round(values)) else "misclassification"
+
+
+def attribute_errors(
+    predictions_file,
+    train_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    join_key: Optional[str] = None,
+    baseline: Optional[Dict[str, Dict]] = None,
+    bins: int = ERROR_ATTRIBUTION_BINS,
+    chunksize: int = ERROR_ATTRIBUTION_CHUNK_ROWS,
+    top_bins: int = 3
+) -> Dict:
+    """
+    Rank features by how much their shift explains prod_new's errors
+
+    Predictions are streamed in chunks and joined to prod_new by row order
+    (default) or by `join_key`. Per-bin error sums and counts for every
+    feature are accumulated with a single bincount per chunk over offset
+    bin codes. A feature's contribution is the mix-shift term
+    sum_b (p_new(b) - p_train(b)) * error(b): the error the model would
+    NOT have made had the feature kept its training distribution.
+
+    Args:
+        predictions_file: Binary file-like object with prediction, actual (and key) columns
+        train_df: Training data (defines the bins)
+        new_df: Production data after failure
+        join_key: Optional column present in both predictions and prod_new
+        baseline: Optional precomputed training profile
+        bins: Quantile bins for numerical features
+        chunksize: Prediction rows parsed per chunk
+        top_bins: Worst bins reported per feature
+
+    Returns:
+        Dict with overall error, match counts and the ranked features
+
+    Raises:
+        ValueError: If predictions cannot be joined to prod_new
+    """
+    join_key = join_key.strip().lower() if join_key else None
+    policy = get_policy()
+    features = [col for col in train_df.columns if col != join_key and not policy.is_skipped(col)]
+
+    # Bin codes for every prod_new row, offset so all features share one bincount
+    codes, labels, train_shares, offsets = [], [], [], [0]
+    for col in features:
+        profile = baseline[col] if baseline and col in baseline else profile_column(train_df[col])
+        col_codes, col_labels, train_share = _encode_feature(profile, new_df[col], bins)
+        codes.append(col_codes + offsets[-1])
+        labels.append(col_labels)
+        train_shares.append(train_share)
+        offsets.append(offsets[-1] + len(col_labels))
+    code_matrix = np.column_stack(codes) if codes else np.empty((len(new_df), 0), dtype=np.int64)
+    total_bins = offsets[-1]
+
+    if join_key is not None:
+        if join_key not in new_df.columns:
+            raise ValueError(f"Join key '{join_key}' not found in prod_new")
+        key_index = pd.Index(new_df[join_key].astype(str))
+        if not key_index.is_unique:
+            raise ValueError(f"Join key '{join_key}' is not unique in prod_new")
+
+    error_sums = np.zeros(total_bins)
+    row_counts = np.zeros(total_bins)
+    rows_read = rows_matched = 0
+    error_type = None
+
+    for chunk in validate_predictions(predictions_file, key=join_key, chunksize=chunksize):
+        if join_key is not None:
+            positions = key_index.get_indexer(chunk[join_key].astype(str))
+        else:
+            positions = np.arange(rows_read, rows_read + len(chunk))
+            positions[positions >= len(new_df)] = -1
+        rows_read += len(chunk)
+
+        labelled = chunk[["prediction", "actual"]].notna().all(axis=1).to_numpy()
+        if error_type is None and labelled.any():
+            error_type = _detect_error_type(chunk[labelled])
+
+        matched = (positions >= 0) & labelled
+        if not matched.any():
+            continue
+        errors = _row_errors(chunk[matched], error_type)
+        chunk_codes = code_matrix[positions[matched]]
+        rows_matched += int(matched.sum())
+
+        error_sums += np.bincount(chunk_codes.ravel(), weights=np.repeat(errors, len(features)), minlength=total_bins)
+        row_counts += np.bincount(chunk_codes.ravel(), minlength=total_bins)
+
+    if rows_matched == 0:
+        raise ValueError("No prediction rows could be joined to prod_new")
+
+    overall_error = float(error_sums[:offsets[1]].sum() / rows_matched) if features else 0.0
+
+    results = []
+    for i, col in enumerate(features):
+        sums = error_sums[offsets[i]:offsets[i + 1]]
+        counts = row_counts[offsets[i]:offsets[i + 1]]
+        new_share = counts / rows_matched
+        # Bins never observed in prod_new carry the overall error (no evidence either way)
+        bin_error = np.divide(sums, counts, out=np.full(len(sums), overall_error), where=counts > 0)
+
+        contribution = float(((new_share - train_shares[i]) * bin_error).sum())
+        worst = [
+            {
+                "bin": labels[i][b],
+                "error": round(float(bin_error[b]), 4),
+                "rows": int(counts[b]),
+                "train_share": round(float(train_shares[i][b]), 4),
+                "new_share": round(float(new_share[b]), 4)
+            }
+            for b in np.argsort(-bin_error * (counts > 0))[:top_bins] if counts[b] > 0
+        ]
+        results.append({
+            "feature": col,
+            "error_contribution": round(contribution, 4),
+            "error_spread": round(float(bin_error[counts > 0].max() - bin_error[counts > 0].min()), 4),
+            "worst_bins": worst
+        })
+
+    results.sort(key=lambda x: x["error_contribution"], reverse=True)
+
+    return {
+        "error_type": error_type,
+        "overall_error": round(overall_error, 4),
+        "rows_read": rows_read,
+        "rows_matched": rows_matched,
+        "join": f"key:{join_key}" if join_key else "row_order",
+        "features": results
+    }
@@ -1,54 +1,84 @@
 """Feature impact analysis service"""
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
+from app.models.results import ImpactColumns
+from app.services.baseline import profile_column
+from app.services.drift_policy import DriftPolicy, FeaturePolicy, get_policy
+from app.services.model_impact import apply_model_impact, model_features
+from app.services.shap_impact import shap_importance
+from app.utils.sketches import compare_to_sketch
 
 def analyze_impact(
     train_df: pd.DataFrame, 
     old_df: pd.DataFrame, 
     new_df: pd.DataFrame,
     model=None,
-    predictions_df: Optional[pd.DataFrame] = None
-) -> List[Dict]:
+    predictions_df: Optional[pd.DataFrame] = None,
+    baseline: Optional[Dict[str, Dict]] = None,
+    impact_method: str = "permutation",
+    policy: Optional[DriftPolicy] = None
+) -> ImpactColumns:
     """
     Analyze the impact of drifted features on model performance
     
     Two approaches:
-    1. If model available: Use SHAP values (best)
-    2. If model not available: Use proxy metrics (hackathon-safe)
+    1. Proxy metrics on the feature distributions (always computed)
+    2. If model available: permutation or SHAP importance on old vs new
+       data re-weights the proxy scores (see model_impact.apply_model_impact)
     
     Args:
         train_df: Training data
         old_df: Production data before failure
         new_df: Production data after failure
-        model: Optional trained model for SHAP analysis
+        model: Optional fitted sklearn-compatible model
         predictions_df: Optional predictions for error correlation
+        baseline: Optional precomputed profile from build_baseline_profile(train_df)
+        impact_method: "permutation" or "shap" when a model is given
+        policy: Compiled drift policy for weights, levels and skips
+            (defaults to the process-wide policy)
         
     Returns:
-        List of feature impact scores
+        ImpactColumns with one result per feature, highest (model-weighted)
+        impact score first (records() gives the per-feature dicts)
     """
-    impact_results = []
+    policy = policy or get_policy()
     
-    # Approach 1: Proxy impact (works without model)
-    for col in train_df.columns:
-        if train_df[col].dtype in ['int64', 'float64', 'int32', 'float32']:
-            impact = _calculate_proxy_impact(train_df[col], old_df[col], new_df[col], col)
-        else:
-            impact = _calculate_categorical_impact(train_df[col], old_df[col], new_df[col], col)
-        
-        impact_results.append(impact)
+    # Approach 1: Proxy impact (works without model), sorted by impact score
+    impact_results = ImpactColumns.from_results(_feature_impact(train_df, old_df, new_df, baseline, policy)).sorted()
     
-    # Sort by impact score
-    impact_results.sort(key=lambda x: x['impact_score'], reverse=True)
+    # Approach 2: Model-aware re-weighting
+    if model is not None:
+        impact_results = apply_model_impact(
+            impact_results, model, old_df, new_df, method=impact_method, train_df=train_df
+        )
     
     return impact_results
 
 
+def _feature_impact(train_df: pd.DataFrame, old_df: pd.DataFrame, new_df: pd.DataFrame,
+                    baseline: Optional[Dict[str, Dict]], policy: DriftPolicy) -> Iterator[Dict]:
+    """Per-feature proxy impact results, one at a time (analyze_impact splits them into columns)"""
+    for col in train_df.columns:
+        feature_policy = policy.resolve(col)
+        if feature_policy.skip:
+            continue
+        train_profile = baseline[col] if baseline and col in baseline else profile_column(train_df[col])
+        
+        if train_profile["kind"] == "numeric":
+            impact = _calculate_proxy_impact(train_profile, old_df[col], new_df[col], col, feature_policy)
+        else:
+            impact = _calculate_categorical_impact(train_profile, old_df[col], new_df[col], col, feature_policy)
+        
+        yield impact
+
+
 def _calculate_proxy_impact(
-    train_series: pd.Series,
+    train_profile: Dict,
     old_series: pd.Series, 
     new_series: pd.Series,
-    feature_name: str
+    feature_name: str,
+    feature_policy: Optional[FeaturePolicy] = None
 ) -> Dict:
     """
     Calculate proxy impact for numerical features
@@ -58,11 +88,10 @@ def _calculate_proxy_impact(
     - Standard deviation change
     - Distribution overlap reduction
     """
-    train_clean = train_series.dropna()
     old_clean = old_series.dropna()
     new_clean = new_series.dropna()
     
-    if len(train_clean) == 0 or len(new_clean) == 0:
+    if train_profile["count"] == 0 or len(new_clean) == 0:
         return {
             "feature": feature_name,
             "impact_score": 0,
@@ -71,36 +100,33 @@ def _calculate_proxy_impact(
         }
     
     # Calculate mean shift
-    train_mean = train_clean.mean()
+    train_mean = train_profile["mean"]
     new_mean = new_clean.mean()
     mean_shift = abs(new_mean - train_mean) / (abs(train_mean) + 1e-10)
     
     # Calculate variance change
-    train_std = train_clean.std()
+    train_std = train_profile["std"]
     new_std = new_clean.std()
     variance_change = abs(new_std - train_std) / (abs(train_std) + 1e-10)
     
     # Calculate distribution overlap (simplified)
-    train_range = (train_clean.min(), train_clean.max())
+    train_range = (train_profile["min"], train_profile["max"])
     new_range = (new_clean.min(), new_clean.max())
     
     overlap = _calculate_range_overlap(train_range, new_range)
     overlap_loss = 1 - overlap
     
     # Combined impact score (weighted)
+    feature_policy = feature_policy or get_policy().default_policy
+    mean_weight, variance_weight, overlap_weight = feature_policy.impact_weights
     impact_score = (
-        0.4 * mean_shift + 
-        0.3 * variance_change + 
-        0.3 * overlap_loss
+        mean_weight * mean_shift + 
+        variance_weight * variance_change + 
+        overlap_weight * overlap_loss
     )
     
     # Determine impact level
-    if impact_score < 0.1:
-        impact_level = "Low"
-    elif impact_score < 0.3:
-        impact_level = "Moderate"
-    else:
-        impact_level = "High"
+    impact_level = feature_policy.impact_level(impact_score)
     
     return {
         "feature": feature_name,
@@ -121,10 +147,11 @@ def _calculate_proxy_impact(
 
 
 def _calculate_categorical_impact(
-    train_series: pd.Series,
+    train_profile: Dict,
     old_series: pd.Series,
     new_series: pd.Series,
-    feature_name: str
+    feature_name: str,
+    feature_policy: Optional[FeaturePolicy] = None
 ) -> Dict:
     """
     Calculate impact for categorical features
@@ -134,10 +161,9 @@ def _calculate_categorical_impact(
     - New categories introduced
     - Rare category emergence
     """
-    train_clean = train_series.dropna()
     new_clean = new_series.dropna()
     
-    if len(train_clean) == 0 or len(new_clean) == 0:
+    if train_profile["count"] == 0 or len(new_clean) == 0:
         return {
             "feature": feature_name,
             "impact_score": 0,
@@ -145,12 +171,16 @@ def _calculate_categorical_impact(
             "reason": "Insufficient data"
         }
     
-    # Get distributions
-    train_dist = train_clean.value_counts(normalize=True)
+    if train_profile.get("high_cardinality"):
+        return _calculate_sketch_impact(train_profile, new_clean, feature_name, feature_policy)
+    
+    # Get distributions (training side is precomputed in the profile)
+    train_dist = train_profile["distribution"]
     new_dist = new_clean.value_counts(normalize=True)
+    new_dist = new_dist[new_dist > 0]
     
     # Calculate category changes
-    train_categories = set(train_dist.index)
+    train_categories = train_profile["categories"]
     new_categories = set(new_dist.index)
     
     newly_appeared = new_categories - train_categories
@@ -171,12 +201,7 @@ def _calculate_categorical_impact(
     impact_score = tvd + new_cat_penalty
     
     # Determine impact level
-    if impact_score < 0.2:
-        impact_level = "Low"
-    elif impact_score < 0.4:
-        impact_level = "Moderate"
-    else:
-        impact_level = "High"
+    impact_level = (feature_policy or get_policy().default_policy).categorical_impact_level(impact_score)
     
     return {
         "feature": feature_name,
@@ -196,6 +221,42 @@ def _calculate_categorical_impact(
     }
 
 
+def _calculate_sketch_impact(train_profile: Dict, new_clean: pd.Series, feature_name: str,
+                             feature_policy: Optional[FeaturePolicy] = None) -> Dict:
+    """
+    Categorical impact for high-cardinality columns from frequency sketches
+    
+    TVD is taken over the heavy hitters plus an "<other>" bin, and only new
+    heavy hitters add the 0.1 new-category penalty (a fresh ID per row would
+    otherwise dominate every other feature).
+    """
+    comparison = compare_to_sketch(train_profile["sketch"], new_clean)
+    tvd = float(np.abs(comparison["prod_dist"] - comparison["train_dist"]).sum()) / 2
+    impact_score = tvd + len(comparison["new_examples"]) * 0.1
+    
+    impact_level = (feature_policy or get_policy().default_policy).categorical_impact_level(impact_score)
+    
+    prod_top = comparison["prod_sketch"].top()
+    return {
+        "feature": feature_name,
+        "impact_score": round(impact_score, 4),
+        "impact_level": impact_level,
+        "high_cardinality": True,
+        "metrics": {
+            "distribution_shift": round(tvd, 4),
+            "new_categories_count": comparison["new_distinct"],
+            "disappeared_categories_count": len(comparison["missing_examples"]),
+            "new_value_row_share": round(comparison["new_row_share"], 4)
+        },
+        "statistics": {
+            "new_categories": comparison["new_examples"] or None,
+            "disappeared_categories": comparison["missing_examples"] or None,
+            "top_train_category": train_profile["distribution"].index[0] if len(train_profile["distribution"]) > 0 else None,
+            "top_new_category": prod_top.index[0] if len(prod_top) > 0 else None
+        }
+    }
+
+
 def _calculate_range_overlap(range1, range2):
     """Calculate overlap ratio between two ranges"""
     min1, max1 = range1
@@ -220,24 +281,18 @@ def calculate_shap_impact(model, train_df: pd.DataFrame, new_df: pd.DataFrame) -
     """
     Calculate feature importance using SHAP values (advanced version)
     
-    Use this when model is available for more accurate impact analysis
+    Use this when model is available for more accurate impact analysis.
+    The background is summarized and only a sample of new_df is explained
+    (see shap_impact.shap_importance), so cost no longer grows with data size.
     """
-    import shap
-    
-    # Create explainer
-    explainer = shap.Explainer(model, train_df)
-    
-    # Calculate SHAP values for production data
-    shap_values = explainer(new_df)
-    
-    # Get mean absolute SHAP values per feature
-    feature_importance = np.abs(shap_values.values).mean(axis=0)
+    features = model_features(model, new_df)
+    feature_importance = shap_importance(model, train_df, new_df, features)
     
     results = []
-    for idx, col in enumerate(train_df.columns):
+    for col in features:
         results.append({
             "feature": col,
-            "shap_importance": round(feature_importance[idx], 4),
+            "shap_importance": round(feature_importance[col], 4),
             "method": "SHAP"
         })
     
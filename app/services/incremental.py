@@ -0,0 +1,164 @@
+"""Incremental re-autopsy: reuse per-feature results for unchanged columns"""
+import copy
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple, Optional
+import pandas as pd
+
+from app.config import INCREMENTAL_STORE_MAX_ENTRIES
+from app.models.results import DriftColumns, ImpactColumns
+from app.services.data_loader import fingerprint_columns
+from app.services.drift_detection import detect_drift, apply_pvalue_correction
+from app.services.impact_analysis import analyze_impact
+from app.services.drift_policy import DriftPolicy, get_policy
+from app.utils.stats import parse_drift_metrics
+
+# Marker for "not in store" (a stored None means the feature was skipped)
+_MISSING = object()
+
+
+class FeatureResultStore:
+    """
+    Bounded LRU store of per-feature drift and impact results.
+
+    Entries are keyed by the fingerprints of the input columns a result
+    depends on:
+    - drift:  (feature, train fingerprint, prod_new fingerprint, drift metrics, policy version)
+    - impact: (feature, train fingerprint, prod_old fingerprint, prod_new fingerprint, policy version)
+    """
+
+    def __init__(self, max_entries: int = INCREMENTAL_STORE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, key: Tuple):
+        """Return a copy of the stored result, or _MISSING"""
+        with self._lock:
+            result = self._entries.get((kind, key), _MISSING)
+            if result is _MISSING:
+                return _MISSING
+            self._entries.move_to_end((kind, key))
+        return copy.deepcopy(result)
+
+    def put(self, kind: str, key: Tuple, result: Optional[Dict]):
+        """Store a result (None records a skipped feature)"""
+        with self._lock:
+            self._entries[(kind, key)] = copy.deepcopy(result)
+            self._entries.move_to_end((kind, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Process-wide store shared by API requests
+feature_result_store = FeatureResultStore()
+
+
+def _get_fingerprints(df: pd.DataFrame) -> Dict[str, str]:
+    """
+    Use fingerprints computed during parsing, computing them if absent
+
+    load_and_validate attaches fingerprints to the frames it returns. They are
+    not written back here because pandas copies attrs along with the frame,
+    and a modified copy would then carry stale fingerprints.
+    """
+    fingerprints = df.attrs.get("column_fingerprints")
+    if fingerprints is None or set(fingerprints) != set(df.columns):
+        fingerprints = fingerprint_columns(df)
+    return fingerprints
+
+
+def analyze_incremental(
+    train_df: pd.DataFrame,
+    old_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    store: Optional[FeatureResultStore] = None,
+    baseline: Optional[Dict[str, Dict]] = None,
+    drift_metrics=None,
+    policy: Optional[DriftPolicy] = None,
+    correction: Optional[str] = None
+) -> Tuple[DriftColumns, ImpactColumns, Dict]:
+    """
+    Run drift detection and impact analysis, recomputing only features
+    whose input columns changed since a previous run
+
+    Args:
+        train_df: Training data
+        old_df: Production data before failure
+        new_df: Production data after failure
+        store: Result store (defaults to the process-wide store)
+        baseline: Optional precomputed training profile (see build_baseline_profile)
+        drift_metrics: Extra drift metrics (see detect_drift; defaults to the policy's)
+        policy: Compiled drift policy (defaults to the process-wide policy)
+        correction: Multiple-testing correction (see detect_drift); cached
+            results store raw p-values and are re-adjusted with the fresh ones
+
+    Returns:
+        Tuple of (drift_results, impact_results, incremental_stats)
+    """
+    store = store if store is not None else feature_result_store
+    policy = policy or get_policy()
+    drift_metrics = parse_drift_metrics(drift_metrics) if drift_metrics is not None else None
+
+    train_fp = _get_fingerprints(train_df)
+    old_fp = _get_fingerprints(old_df)
+    new_fp = _get_fingerprints(new_df)
+
+    columns = list(train_df.columns)
+    drift_keys = {col: (col, train_fp[col], new_fp[col], drift_metrics, policy.version) for col in columns}
+    impact_keys = {col: (col, train_fp[col], old_fp[col], new_fp[col], policy.version) for col in columns}
+
+    drift_by_feature = {col: store.get("drift", drift_keys[col]) for col in columns}
+    impact_by_feature = {col: store.get("impact", impact_keys[col]) for col in columns}
+
+    drift_stale = [col for col in columns if drift_by_feature[col] is _MISSING]
+    impact_stale = [col for col in columns if impact_by_feature[col] is _MISSING]
+
+    if drift_stale:
+        computed = {r["feature"]: r for r in detect_drift(
+            train_df[drift_stale], new_df[drift_stale], baseline=baseline, metrics=drift_metrics, policy=policy,
+            correction="none"
+        )}
+        for col in drift_stale:
+            # detect_drift skips all-NaN columns; remember that as None
+            drift_by_feature[col] = computed.get(col)
+            store.put("drift", drift_keys[col], drift_by_feature[col])
+
+    if impact_stale:
+        computed = {
+            r["feature"]: r
+            for r in analyze_impact(
+                train_df[impact_stale], old_df[impact_stale], new_df[impact_stale], baseline=baseline, policy=policy
+            )
+        }
+        for col in impact_stale:
+            impact_by_feature[col] = computed.get(col)
+            store.put("impact", impact_keys[col], impact_by_feature[col])
+
+    # Merge in column order, then sort exactly as the full services do
+    drift_results = DriftColumns.from_results(
+        drift_by_feature[col] for col in columns if drift_by_feature[col] is not None
+    )
+    impact_results = ImpactColumns.from_results(
+        impact_by_feature[col] for col in columns if impact_by_feature[col] is not None
+    ).sorted()
+    # The correction depends on every feature's p-value, so it is never cached
+    drift_results = apply_pvalue_correction(drift_results, correction, policy).sorted()
+
+    stats = {
+        "features_total": len(columns),
+        "drift_recomputed": len(drift_stale),
+        "drift_reused": len(columns) - len(drift_stale),
+        "impact_recomputed": len(impact_stale),
+        "impact_reused": len(columns) - len(impact_stale),
+        "recomputed_features": sorted(set(drift_stale) | set(impact_stale))
+    }
+
+    return drift_results, impact_results, stats
@@ -1,12 +1,13 @@
 """LLM-powered diagnosis engine"""
 import os
 import json
-from typing import List, Dict
+from typing import List, Dict, Iterable, Union
 from app.config import OPENAI_API_KEY
+from app.models.results import DriftColumns, ImpactColumns, SEVERITY_LEVELS
 
 def generate_diagnosis(
-    drift_results: List[Dict],
-    impact_results: List[Dict],
+    drift_results: Union[DriftColumns, Iterable[Dict]],
+    impact_results: Union[ImpactColumns, Iterable[Dict]],
     timeline: Dict
 ) -> Dict:
     """
@@ -15,8 +16,8 @@ def generate_diagnosis(
     This converts statistical results into actionable insights
     
     Args:
-        drift_results: Drift detection results
-        impact_results: Impact analysis results
+        drift_results: DriftColumns from drift detection (or per-feature dicts)
+        impact_results: ImpactColumns from impact analysis (or per-feature dicts)
         timeline: Timeline analysis
         
     Returns:
@@ -51,28 +52,27 @@ def generate_diagnosis(
 def _prepare_evidence(drift_results, impact_results, timeline) -> Dict:
     """Prepare structured evidence for LLM"""
     
-    # Get top drifted features
-    drifted = [d for d in drift_results if d.get("drift", False)]
-    top_drift = sorted(drifted, key=lambda x: x.get("drift_score", 0), reverse=True)[:5]
+    drift_results = DriftColumns.coerce(drift_results)
+    impact_results = ImpactColumns.coerce(impact_results)
     
-    # Get high impact features
-    high_impact = [i for i in impact_results if i.get("impact_level") == "High"]
+    # Get top drifted features
+    top_drift = drift_results.top_drifted(5)
     
     # Get critical features (drift + impact)
     critical = timeline.get("critical_features", [])
     
     evidence = {
         "total_features": len(drift_results),
-        "drifted_count": len(drifted),
-        "high_impact_count": len(high_impact),
+        "drifted_count": len(drift_results.drifted()),
+        "high_impact_count": impact_results.count_level("High"),
         "critical_count": len(critical),
         "top_drifted_features": [
             {
-                "feature": d["feature"],
-                "method": d.get("method", "Unknown"),
-                "score": d.get("drift_score", 0),
-                "severity": d.get("severity", "Unknown")
-            } for d in top_drift
+                "feature": drift_results.features[i],
+                "method": drift_results.details[i].get("method", "Unknown"),
+                "score": float(drift_results.drift_score[i]),
+                "severity": SEVERITY_LEVELS[drift_results.severity[i]] if drift_results.severity[i] >= 0 else "Unknown"
+            } for i in top_drift
         ],
         "critical_features": critical,
         "timeline_events": timeline.get("events", []),
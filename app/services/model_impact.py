@@ -0,0 +1,218 @@
+"""Model-aware impact analysis: permutation importance with batched predictions"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+import io
+import pickle
+import numpy as np
+import pandas as pd
+
+from app.config import (
+    MODEL_IMPACT_SAMPLE_ROWS,
+    MODEL_IMPACT_BATCH_ROWS,
+    MODEL_IMPACT_REPEATS,
+    MODEL_IMPACT_WORKERS
+)
+from app.models.results import ImpactColumns
+from app.services.shap_impact import model_hash, shap_importance
+
+IMPACT_METHODS = ("permutation", "shap")
+
+
+def load_model(content: bytes):
+    """
+    Load a pickled (or joblib-dumped) sklearn-compatible model
+
+    Only load models from trusted sources: unpickling runs arbitrary code.
+
+    Raises:
+        ValueError: If the payload cannot be loaded or has no predict method
+    """
+    try:
+        model = pickle.loads(content)
+    except Exception:
+        try:
+            import joblib
+            model = joblib.load(io.BytesIO(content))
+        except Exception as e:
+            raise ValueError(f"Could not load model: {str(e)}")
+
+    if not hasattr(model, "predict"):
+        raise ValueError("Uploaded model has no predict() method")
+    return model
+
+
+def model_features(model, df: pd.DataFrame) -> List[str]:
+    """Columns the model was fitted on (all columns if the model does not say)"""
+    features = getattr(model, "feature_names_in_", None)
+    if features is None:
+        return list(df.columns)
+
+    features = [str(f) for f in features]
+    missing = [f for f in features if f not in df.columns]
+    if missing:
+        raise ValueError(f"Model expects features missing from the data: {missing[:5]}")
+    return features
+
+
+def _model_output(model, X: pd.DataFrame) -> np.ndarray:
+    """Probabilities when available, otherwise raw predictions, as a 2-D array"""
+    if hasattr(model, "predict_proba"):
+        return np.asarray(model.predict_proba(X), dtype=float)
+    output = np.asarray(model.predict(X))
+    return output.reshape(len(X), -1)
+
+
+def _output_distance(base: np.ndarray, perturbed: np.ndarray) -> np.ndarray:
+    """Per-row change in model output (L1 for numbers, mismatch for labels)"""
+    if base.dtype.kind in "biuf":
+        return np.abs(perturbed - base).sum(axis=1)
+    return (perturbed != base).any(axis=1).astype(float)
+
+
+def _permutation_block(model, X: pd.DataFrame, base: np.ndarray, features: List[str],
+                       repeats: int, seed: int) -> Dict[str, float]:
+    """
+    Importance for a group of features from ONE predict call
+
+    The sampled rows are tiled once per (feature, repeat) and only the
+    permuted column of each tile is overwritten, so a group of features
+    costs a single batched predict instead of one full-frame copy each.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(X)
+    tiles = len(features) * repeats
+    batch = X.iloc[np.tile(np.arange(n), tiles)].reset_index(drop=True)
+
+    for i, feature in enumerate(features):
+        position = batch.columns.get_loc(feature)
+        values = X[feature].to_numpy()
+        for r in range(repeats):
+            start = (i * repeats + r) * n
+            batch.iloc[start:start + n, position] = values[rng.permutation(n)]
+
+    distances = _output_distance(np.tile(base, (tiles, 1)), _model_output(model, batch))
+    per_tile = distances.reshape(tiles, n).mean(axis=1)
+    return {
+        feature: float(per_tile[i * repeats:(i + 1) * repeats].mean())
+        for i, feature in enumerate(features)
+    }
+
+
+def permutation_importance(
+    model,
+    df: pd.DataFrame,
+    features: Optional[List[str]] = None,
+    sample_rows: int = MODEL_IMPACT_SAMPLE_ROWS,
+    batch_rows: int = MODEL_IMPACT_BATCH_ROWS,
+    repeats: int = MODEL_IMPACT_REPEATS,
+    max_workers: int = MODEL_IMPACT_WORKERS,
+    seed: int = 42
+) -> Dict[str, float]:
+    """
+    Label-free permutation importance: mean change in model output when a
+    feature's values are shuffled across rows
+
+    Args:
+        model: Fitted model with predict (and optionally predict_proba)
+        df: Data to measure importance on
+        features: Features to permute (defaults to model_features)
+        sample_rows: Background rows subsampled from df
+        batch_rows: Max rows per predict call; features are grouped to fit
+        repeats: Permutations per feature
+        max_workers: Threads predicting feature groups in parallel
+        seed: Random seed
+
+    Returns:
+        Dict of feature -> importance
+    """
+    columns = model_features(model, df)
+    features = features or columns
+
+    X = df[columns]
+    if len(X) > sample_rows:
+        X = X.sample(n=sample_rows, random_state=seed)
+    X = X.reset_index(drop=True)
+    if len(X) == 0:
+        return {feature: 0.0 for feature in features}
+
+    base = _model_output(model, X)
+
+    per_call = max(1, batch_rows // (len(X) * repeats))
+    groups = [features[i:i + per_call] for i in range(0, len(features), per_call)]
+
+    importance = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(groups)))) as pool:
+        for scores in pool.map(
+            lambda args: _permutation_block(model, X, base, args[1], repeats, seed + args[0]),
+            enumerate(groups)
+        ):
+            importance.update(scores)
+    return importance
+
+
+def apply_model_impact(
+    impact_results: ImpactColumns,
+    model,
+    old_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    method: str = "permutation",
+    train_df: Optional[pd.DataFrame] = None,
+    stratify_by: Optional[str] = None
+) -> ImpactColumns:
+    """
+    Attach model importance on old vs new production data to impact results
+
+    Each result gets `model_impact` and a `weighted_impact_score` (the proxy
+    impact score scaled by the feature's share of the model's importance),
+    and results are re-sorted by it so features the model ignores sink.
+
+    Args:
+        method: "permutation" or "shap" (SHAP needs train_df for its background)
+        stratify_by: Column to stratify the SHAP row sample on
+
+    Returns:
+        New ImpactColumns with the weighted scores, in weighted order
+
+    Raises:
+        ValueError: For an unknown method
+    """
+    if method not in IMPACT_METHODS:
+        raise ValueError(f"Unknown impact method '{method}'; use one of {IMPACT_METHODS}")
+
+    features = model_features(model, new_df)
+    print(f"🤖 {method} importance for {len(features)} features (old vs new)...")
+
+    if method == "shap":
+        background = train_df if train_df is not None else old_df
+        # Both calls share one explainer, looked up by a hash computed once
+        model_key = model_hash(model)
+        old_importance = shap_importance(
+            model, background, old_df, features, stratify_by=stratify_by, model_key=model_key
+        )
+        new_importance = shap_importance(
+            model, background, new_df, features, stratify_by=stratify_by, model_key=model_key
+        )
+    else:
+        old_importance = permutation_importance(model, old_df, features)
+        new_importance = permutation_importance(model, new_df, features)
+    total_new = sum(new_importance.values())
+
+    weighted = np.zeros(len(impact_results))
+    for i, feature in enumerate(impact_results.features.tolist()):
+        details = impact_results.details[i]
+        if feature not in new_importance:
+            details["model_impact"] = None
+            continue
+
+        old_score, new_score = old_importance[feature], new_importance[feature]
+        share = new_score / total_new if total_new > 0 else 0.0
+        details["model_impact"] = {
+            "method": "SHAP" if method == "shap" else "Permutation",
+            "old_importance": round(old_score, 4),
+            "new_importance": round(new_score, 4),
+            "importance_change": round(new_score - old_score, 4),
+            "importance_share": round(share, 4)
+        }
+        weighted[i] = round(impact_results.impact_score[i] * share, 4)
+
+    return impact_results.with_weighted_score(weighted).sorted()
@@ -0,0 +1,296 @@
+"""Multivariate drift: domain classifier and PCA reconstruction error"""
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from app.config import (
+    KS_TEST_THRESHOLD,
+    MULTIVARIATE_SAMPLE_ROWS,
+    MULTIVARIATE_BATCH_ROWS,
+    MULTIVARIATE_MAX_CATEGORIES,
+    MULTIVARIATE_CLASSIFIER_ROWS,
+    MULTIVARIATE_CLASSIFIER_ITERATIONS,
+    MULTIVARIATE_AUC_SEVERITY_THRESHOLDS
+)
+from app.services.baseline import profile_column
+
+
+class FeatureEncoder:
+    """
+    Numeric matrix encoding fitted from training profiles
+
+    Numerical columns are standardized with the training mean/std (missing
+    values map to 0, the training mean). Categorical columns are one-hot
+    encoded over their most frequent training categories; everything else
+    shares an "other" column. Encoding is done per batch, so the full
+    encoded matrix is never materialized.
+    """
+
+    def __init__(self, train_df: pd.DataFrame, baseline: Optional[Dict[str, Dict]] = None,
+                 max_categories: int = MULTIVARIATE_MAX_CATEGORIES):
+        self.columns = []
+        self.groups = []  # (feature, slice of encoded columns)
+        width = 0
+        for col in train_df.columns:
+            profile = baseline[col] if baseline and col in baseline else profile_column(train_df[col])
+            if profile["count"] == 0:
+                continue
+            if profile["kind"] == "numeric":
+                std = profile["std"] if profile["std"] and not np.isnan(profile["std"]) else 1.0
+                self.columns.append((col, "numeric", (float(profile["mean"]), float(std))))
+                size = 1
+            else:
+                categories = pd.Index(profile["distribution"].index[:max_categories].astype(object))
+                self.columns.append((col, "categorical", categories))
+                size = len(categories) + 1
+            self.groups.append((col, slice(width, width + size)))
+            width += size
+        self.width = width
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        out = np.zeros((len(df), self.width), dtype=np.float32)
+        for (col, kind, params), (_, cols) in zip(self.columns, self.groups):
+            if kind == "numeric":
+                mean, std = params
+                values = (df[col].to_numpy(dtype=float) - mean) / std
+                out[:, cols.start] = np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)
+            else:
+                codes = params.get_indexer(df[col].astype(object))
+                codes = np.where(codes < 0, len(params), codes)
+                out[np.arange(len(df)), cols.start + codes] = 1.0
+        return out
+
+    def feature_totals(self, per_column: np.ndarray) -> Dict[str, float]:
+        """Sum an encoded-column vector back to original features"""
+        return {col: float(per_column[cols].sum()) for col, cols in self.groups}
+
+
+def _subsample(df: pd.DataFrame, rows: int, seed: int) -> pd.DataFrame:
+    if len(df) > rows:
+        df = df.sample(n=rows, random_state=seed)
+    return df.reset_index(drop=True)
+
+
+def _batches(n: int, batch_rows: int):
+    for start in range(0, n, batch_rows):
+        yield slice(start, min(start + batch_rows, n))
+
+
+def _contribution_shares(totals: Dict[str, float], top: int = 10) -> List[Dict]:
+    total = sum(totals.values())
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [
+        {"feature": feature, "contribution": round(value / total, 4) if total > 0 else 0.0}
+        for feature, value in ranked
+    ]
+
+
+def _auc_severity(auc: float, drift: bool) -> str:
+    """Severity from the hold-out AUC; a significant AUC below every cutoff is still Low"""
+    if not drift:
+        return "None"
+    low, moderate, high = MULTIVARIATE_AUC_SEVERITY_THRESHOLDS
+    if auc >= high:
+        return "High"
+    elif auc >= moderate:
+        return "Moderate"
+    return "Low"
+
+
+def _auc_p_value(scores: np.ndarray, labels: np.ndarray) -> float:
+    """
+    One-sided p-value of the hold-out AUC against chance (0.5)
+
+    The AUC is the Mann-Whitney U statistic scaled by n0 * n1, so this is
+    the exact label-permutation test in its normal approximation.
+    """
+    from scipy.stats import mannwhitneyu
+
+    return float(mannwhitneyu(scores[labels == 1], scores[labels == 0], alternative="greater").pvalue)
+
+
+def _predict_scores(classifier, X: np.ndarray, batch_rows: int) -> np.ndarray:
+    return np.concatenate([
+        classifier.predict_proba(X[batch])[:, 1] for batch in _batches(len(X), batch_rows)
+    ])
+
+
+def domain_classifier_drift(
+    encoder: FeatureEncoder,
+    train_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    batch_rows: int = MULTIVARIATE_BATCH_ROWS,
+    fit_rows: int = MULTIVARIATE_CLASSIFIER_ROWS,
+    max_iter: int = MULTIVARIATE_CLASSIFIER_ITERATIONS,
+    seed: int = 42
+) -> Dict:
+    """
+    Train a gradient-boosted classifier to tell train rows from prod_new rows
+
+    Trees split on feature interactions, so a change in the joint
+    distribution (e.g. a flipped correlation with identical marginals) is
+    separable, not only mean shifts. Each side is subsampled to `fit_rows`
+    rows and 30% of the pooled rows are held out. Drift is decided by a
+    one-sided test of the hold-out AUC against chance at KS_TEST_THRESHOLD;
+    feature contributions are the per-feature share of the AUC lost when
+    that feature's encoded columns are permuted on the hold-out set.
+    """
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    from sklearn.metrics import roc_auc_score
+
+    train_df = _subsample(train_df, fit_rows, seed)
+    new_df = _subsample(new_df, fit_rows, seed + 1)
+    rng = np.random.default_rng(seed)
+    labels = np.concatenate([np.zeros(len(train_df), dtype=int), np.ones(len(new_df), dtype=int)])
+    order = rng.permutation(len(labels))
+    split = int(0.3 * len(labels))
+    test_rows, train_rows = order[:split], order[split:]
+
+    combined = pd.concat([train_df, new_df], ignore_index=True)
+    X = np.concatenate([encoder.transform(combined.iloc[batch]) for batch in _batches(len(combined), batch_rows)])
+    X_test, y_test = X[test_rows], labels[test_rows]
+
+    if len(set(labels[train_rows])) < 2 or len(set(y_test)) < 2:
+        auc, p_value, contributions = 0.5, 1.0, []
+    else:
+        classifier = HistGradientBoostingClassifier(max_iter=max_iter, early_stopping=False, random_state=seed)
+        classifier.fit(X[train_rows], labels[train_rows])
+        scores = _predict_scores(classifier, X_test, batch_rows)
+        auc = float(roc_auc_score(y_test, scores))
+        p_value = _auc_p_value(scores, y_test)
+
+        auc_loss = {}
+        for col, cols in encoder.groups:
+            permuted = X_test.copy()
+            permuted[:, cols] = X_test[rng.permutation(len(X_test)), cols]
+            auc_loss[col] = max(auc - float(roc_auc_score(y_test, _predict_scores(classifier, permuted, batch_rows))), 0.0)
+        contributions = _contribution_shares(auc_loss)
+
+    drift = bool(p_value < KS_TEST_THRESHOLD)
+    return {
+        "method": "Domain classifier (gradient boosting)",
+        "auc": round(auc, 4),
+        "p_value": round(p_value, 6),
+        "drift": drift,
+        "severity": _auc_severity(auc, drift),
+        "train_rows": int(len(train_rows)),
+        "holdout_rows": int(len(test_rows)),
+        "feature_contributions": contributions
+    }
+
+
+def _reconstruction_errors(pca, encoder: FeatureEncoder, df: pd.DataFrame, batch_rows: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-row squared reconstruction error and per-column mean squared residual"""
+    row_errors = []
+    column_sums = np.zeros(encoder.width)
+    for batch in _batches(len(df), batch_rows):
+        X = encoder.transform(df.iloc[batch])
+        residual = X - pca.inverse_transform(pca.transform(X))
+        row_errors.append((residual ** 2).sum(axis=1))
+        column_sums += (residual ** 2).sum(axis=0)
+    return np.concatenate(row_errors), column_sums / max(len(df), 1)
+
+
+def pca_reconstruction_drift(
+    encoder: FeatureEncoder,
+    train_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    batch_rows: int = MULTIVARIATE_BATCH_ROWS,
+    n_components: Optional[int] = None,
+    seed: int = 42
+) -> Dict:
+    """
+    Fit IncrementalPCA on training batches and compare reconstruction errors
+
+    Production rows that break the training correlation structure fall off
+    the principal subspace even when every marginal looks unchanged. 70% of
+    the training rows fit the PCA and the rest are the reference errors;
+    with too few rows for either, the result says so instead of raising.
+    """
+    from sklearn.decomposition import IncrementalPCA
+    from scipy.stats import ks_2samp
+
+    fit_df = train_df.sample(frac=0.7, random_state=seed)
+    reference_df = train_df.drop(index=fit_df.index)
+    fit_df, reference_df = fit_df.reset_index(drop=True), reference_df.reset_index(drop=True)
+    # PCA needs two rows to fit; the KS comparison needs reference and new errors
+    if len(fit_df) < 2 or len(reference_df) == 0 or len(new_df) == 0:
+        return {
+            "method": "PCA reconstruction error",
+            "drift": False,
+            "reason": "Insufficient rows",
+            "fit_rows": int(len(fit_df)),
+            "reference_rows": int(len(reference_df)),
+            "new_rows": int(len(new_df)),
+            "feature_contributions": []
+        }
+
+    n_components = n_components or max(1, encoder.width // 2)
+    n_components = min(n_components, encoder.width, len(fit_df))
+    # Every partial_fit batch needs at least n_components rows
+    batch_rows = max(batch_rows, n_components)
+
+    pca = IncrementalPCA(n_components=n_components)
+    for batch in _batches(len(fit_df), batch_rows):
+        X = encoder.transform(fit_df.iloc[batch])
+        if len(X) >= n_components:
+            pca.partial_fit(X)
+
+    reference_errors, reference_columns = _reconstruction_errors(pca, encoder, reference_df, batch_rows)
+    new_errors, new_columns = _reconstruction_errors(pca, encoder, new_df, batch_rows)
+    ks_stat, p_value = ks_2samp(reference_errors, new_errors)
+
+    reference_mean = float(reference_errors.mean())
+    new_mean = float(new_errors.mean())
+    return {
+        "method": "PCA reconstruction error",
+        "n_components": int(n_components),
+        "explained_variance": round(float(pca.explained_variance_ratio_.sum()), 4),
+        "train_mean_error": round(reference_mean, 4),
+        "new_mean_error": round(new_mean, 4),
+        "error_ratio": round(new_mean / reference_mean, 4) if reference_mean > 0 else None,
+        "ks_statistic": round(float(ks_stat), 4),
+        "p_value": round(float(p_value), 6),
+        "drift": bool(p_value < KS_TEST_THRESHOLD and ks_stat >= 0.1),
+        "feature_contributions": _contribution_shares(
+            encoder.feature_totals(np.maximum(new_columns - reference_columns, 0))
+        )
+    }
+
+
+def detect_multivariate_drift(
+    train_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    baseline: Optional[Dict[str, Dict]] = None,
+    sample_rows: int = MULTIVARIATE_SAMPLE_ROWS,
+    seed: int = 42
+) -> Dict:
+    """
+    Run both multivariate drift checks on subsamples of train and prod_new
+
+    Args:
+        train_df: Training data (baseline)
+        new_df: Production data after failure
+        baseline: Optional precomputed training profile
+        sample_rows: Max rows drawn from each side
+        seed: Random seed
+
+    Returns:
+        Dict with `domain_classifier` and `pca_reconstruction` results
+    """
+    encoder = FeatureEncoder(train_df, baseline)
+    if encoder.width == 0:
+        return {"drift": False, "reason": "No usable features"}
+
+    train_sample = _subsample(train_df, sample_rows, seed)
+    new_sample = _subsample(new_df, sample_rows, seed + 1)
+
+    classifier = domain_classifier_drift(encoder, train_sample, new_sample, seed=seed)
+    reconstruction = pca_reconstruction_drift(encoder, train_sample, new_sample, seed=seed)
+
+    return {
+        "drift": classifier["drift"] or reconstruction["drift"],
+        "sample_rows": {"train": len(train_sample), "new": len(new_sample)},
+        "domain_classifier": classifier,
+        "pca_reconstruction": reconstruction
+    }
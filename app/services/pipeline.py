@@ -0,0 +1,178 @@
+"""End-to-end autopsy pipeline shared by the API and batch callers"""
+from typing import Dict, Optional
+import pandas as pd
+
+from app.config import DRIFT_PVALUE_CORRECTION
+from app.services.baseline import build_baseline_profile
+from app.services.drift_detection import detect_drift
+from app.services.drift_policy import get_policy
+from app.services.impact_analysis import analyze_impact
+from app.services.incremental import analyze_incremental, FeatureResultStore
+from app.services.sampling import attach_confidence_intervals
+from app.services.model_impact import apply_model_impact
+from app.services.error_attribution import attribute_errors
+from app.services.multivariate_drift import detect_multivariate_drift
+from app.services.correlation_drift import detect_correlation_drift
+from app.services.visualization import build_visualization_data
+from app.services.report_store import get_report_store
+from app.services.timeline import build_timeline
+from app.services.llm_diagnosis import generate_diagnosis
+from app.reports.report_builder import build_report
+
+
+def run_pipeline(
+    train_df: pd.DataFrame,
+    old_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    incremental: bool = True,
+    store: Optional[FeatureResultStore] = None,
+    baseline: Optional[Dict[str, Dict]] = None,
+    sampling_info: Optional[Dict] = None,
+    model=None,
+    impact_method: str = "permutation",
+    stratify_by: Optional[str] = None,
+    predictions_file=None,
+    join_key: Optional[str] = None,
+    multivariate: bool = True,
+    correlation: bool = True,
+    correlation_top_k: Optional[int] = None,
+    drift_metrics: Optional[str] = None,
+    pvalue_correction: Optional[str] = None,
+    visualization: bool = True,
+    save_as: Optional[str] = None
+) -> Dict:
+    """
+    Run drift detection, impact analysis, timeline, diagnosis and report
+
+    Args:
+        train_df: Training data (baseline)
+        old_df: Production data before failure
+        new_df: Production data after failure
+        incremental: Reuse stored per-feature results for unchanged columns
+        store: Result store for incremental runs (defaults to the shared store)
+        baseline: Optional precomputed training profile shared across runs
+            (built once here otherwise, and shared by every stage)
+        sampling_info: Set when the frames are samples; adds confidence
+            intervals and never touches the incremental store
+        model: Optional fitted model; adds model importance (old vs new)
+        impact_method: "permutation" or "shap"
+        stratify_by: Column to stratify the SHAP row sample on
+        predictions_file: Optional file-like predictions/actuals CSV for prod_new;
+            adds an `error_attribution` section
+        join_key: Column joining predictions to prod_new (row order if None)
+        multivariate: Add domain-classifier and PCA reconstruction drift checks
+        correlation: Compare train and production correlation matrices
+        correlation_top_k: Only correlate the k most drifted numerical features
+        drift_metrics: Extra per-feature drift metrics, e.g. "wasserstein,js"
+            (defaults to the drift policy's)
+        pvalue_correction: "bh", "holm" or "none" across the KS tests
+            (defaults to DRIFT_PVALUE_CORRECTION)
+        visualization: Add histograms and quantile summaries; the charted
+            features are inlined, the rest are only kept with a saved report
+        save_as: Persist the report (and every feature's distribution data)
+            in the report store under this name
+
+    Returns:
+        Complete autopsy report
+    """
+    incremental_stats = None
+
+    # Key columns the drift policy skips are loaded for joins and strata
+    # only; every analysis leaves them out
+    skipped = [col for col in train_df.columns if get_policy().is_skipped(col)]
+    analysis_train = train_df.drop(columns=skipped) if skipped else train_df
+    analysis_new = new_df.drop(columns=skipped) if skipped else new_df
+
+    # Training statistics (sorted values, sketches, bin edges) are computed
+    # once and shared by drift, impact, multivariate, attribution and charts
+    baseline = baseline or build_baseline_profile(analysis_train)
+
+    print("Step 2-3: Detecting drift and analyzing impact...")
+    if incremental and sampling_info is None:
+        drift_results, impact_results, incremental_stats = analyze_incremental(
+            train_df, old_df, new_df, store=store, baseline=baseline, drift_metrics=drift_metrics,
+            correction=pvalue_correction
+        )
+        print(
+            f"Incremental run: recomputed drift for {incremental_stats['drift_recomputed']}, "
+            f"impact for {incremental_stats['impact_recomputed']} of "
+            f"{incremental_stats['features_total']} features"
+        )
+    else:
+        drift_results = detect_drift(
+            train_df, new_df, baseline=baseline, metrics=drift_metrics, correction=pvalue_correction
+        )
+        impact_results = analyze_impact(train_df, old_df, new_df, baseline=baseline)
+    print(f"Drift detection complete: {len(drift_results)} features analyzed")
+    if model is not None:
+        # Model importance is not fingerprint-cached, so it runs after the
+        # (possibly incremental) proxy impact on every request
+        impact_results = apply_model_impact(
+            impact_results, model, old_df, new_df,
+            method=impact_method, train_df=train_df, stratify_by=stratify_by
+        )
+    print(f"Impact analysis complete: {len(impact_results)} features")
+
+    escalate_features = None
+    if sampling_info is not None:
+        escalate_features = attach_confidence_intervals(drift_results, impact_results, train_df, new_df)
+        print(f"Sampled run: {len(escalate_features)} borderline features to escalate")
+
+    multivariate_drift = None
+    if multivariate:
+        print("Step 3a: Detecting multivariate drift...")
+        multivariate_drift = detect_multivariate_drift(analysis_train, analysis_new, baseline=baseline)
+
+    correlation_drift = None
+    if correlation:
+        print("Step 3a: Comparing correlation structure...")
+        correlation_drift = detect_correlation_drift(
+            analysis_train, analysis_new, drift_results, top_k=correlation_top_k
+        )
+
+    error_attribution = None
+    if predictions_file is not None:
+        if sampling_info is not None and join_key is None:
+            raise ValueError("Sampled runs need a join_key to attribute prediction errors")
+        print("Step 3b: Attributing prediction errors...")
+        error_attribution = attribute_errors(predictions_file, train_df, new_df, join_key=join_key, baseline=baseline)
+
+    print("Step 4: Building timeline...")
+    timeline = build_timeline(drift_results, impact_results)
+
+    print("Step 5: Generating diagnosis...")
+    diagnosis = generate_diagnosis(drift_results, impact_results, timeline)
+
+    print("Step 6: Building report...")
+    report = build_report(drift_results, impact_results, timeline, diagnosis)
+    report["metadata"]["drift_tests"] = {
+        "correction": (pvalue_correction or DRIFT_PVALUE_CORRECTION).strip().lower(),
+        "ks_tests": sum(1 for d in drift_results.details if "p_value" in d),
+        "screened_out": sum(1 for d in drift_results.details if d.get("screened"))
+    }
+    if incremental_stats is not None:
+        report["metadata"]["incremental"] = incremental_stats
+    if multivariate_drift is not None:
+        report["multivariate_drift"] = multivariate_drift
+    if correlation_drift is not None:
+        report["correlation_drift"] = correlation_drift
+    if error_attribution is not None:
+        report["error_attribution"] = error_attribution
+    if sampling_info is not None:
+        report["metadata"]["sampling"] = dict(sampling_info, escalate_features=escalate_features)
+
+    distributions = None
+    if visualization:
+        print("Step 6a: Preparing distribution data...")
+        charted = report["visualizations"]["drift_chart_data"]["x_axis"]
+        # Every feature is kept with a saved report; otherwise only the charted ones are used
+        distributions = build_visualization_data(
+            train_df, old_df, new_df, baseline=baseline,
+            features=drift_results.features.tolist() if save_as is not None else charted
+        )
+        report["visualizations"]["distributions"] = {f: distributions[f] for f in charted if f in distributions}
+
+    if save_as is not None:
+        get_report_store().save(report, save_as, distributions=distributions)
+
+    return report
@@ -0,0 +1,124 @@
+"""Background PDF rendering of stored reports, cached on disk by report id"""
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+
+from app.config import REPORT_RENDER_WORKERS, REPORT_RENDER_CACHE_DIR, REPORT_RENDER_CACHE_MAX_FILES
+from app.reports.renderer import render_pdf
+from app.services.report_store import get_report_store
+
+logger = logging.getLogger(__name__)
+
+
+class PdfRenderQueue:
+    """
+    Renders stored reports to PDF off the request path
+
+    A request for a report that is not cached submits one job (concurrent
+    requests for the same id share it) and returns immediately; callers
+    poll status() until the file is ready. Stored reports are immutable, so
+    a cached PDF stays valid until the report is deleted. Only the newest
+    `max_files` PDFs are kept.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = REPORT_RENDER_CACHE_DIR,
+        max_workers: int = REPORT_RENDER_WORKERS,
+        max_files: int = REPORT_RENDER_CACHE_MAX_FILES
+    ):
+        self.cache_dir = cache_dir
+        self.max_workers = max(1, max_workers)
+        self.max_files = max_files
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._jobs: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def path(self, report_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{report_id}.pdf")
+
+    def cached_path(self, report_id: str) -> Optional[str]:
+        """Path of the rendered PDF, or None if it is not ready yet"""
+        path = self.path(report_id)
+        return path if os.path.exists(path) else None
+
+    def _render(self, report_id: str) -> str:
+        data = render_pdf(get_report_store().get(report_id))
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(report_id)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)  # readers never see a partial file
+        self._trim()
+        logger.info("Rendered PDF for report %s (%.0f KB)", report_id, len(data) / 1024)
+        return path
+
+    def _trim(self):
+        if not self.max_files:
+            return
+        files = [os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir) if f.endswith(".pdf")]
+        if len(files) > self.max_files:
+            files.sort(key=os.path.getmtime, reverse=True)
+            for stale in files[self.max_files:]:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+
+    def submit(self, report_id: str) -> Dict:
+        """Start rendering a report unless it is cached or already in progress; returns status()"""
+        with self._lock:
+            if self.cached_path(report_id) is None and report_id not in self._jobs:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pdf-render")
+                self._jobs[report_id] = self._pool.submit(self._render, report_id)
+        return self.status(report_id)
+
+    def status(self, report_id: str) -> Dict:
+        """
+        Rendering state of one report: "ready", "pending", "failed" or "missing"
+
+        A failed job is reported once and then forgotten, so the next
+        submit() retries it.
+        """
+        with self._lock:
+            job = self._jobs.get(report_id)
+            if job is not None and job.done():
+                del self._jobs[report_id]
+                if job.exception() is not None:
+                    return {"report_id": report_id, "status": "failed", "error": str(job.exception())}
+        if self.cached_path(report_id) is not None:
+            return {"report_id": report_id, "status": "ready"}
+        return {"report_id": report_id, "status": "pending" if job is not None else "missing"}
+
+    def wait(self, report_id: str, timeout: Optional[float] = None) -> Dict:
+        """Block until a submitted job finishes (CLI and tests); returns status()"""
+        with self._lock:
+            job = self._jobs.get(report_id)
+        if job is not None:
+            try:
+                job.result(timeout=timeout)
+            except Exception:
+                pass
+        return self.status(report_id)
+
+    def evict(self, report_id: str):
+        """Drop the cached PDF of a deleted or pruned report"""
+        try:
+            os.remove(self.path(report_id))
+        except FileNotFoundError:
+            pass
+
+
+_pdf_render_queue = None
+
+
+def get_pdf_render_queue() -> PdfRenderQueue:
+    """Return the process-wide PDF render queue (created on first use)"""
+    global _pdf_render_queue
+    if _pdf_render_queue is None:
+        _pdf_render_queue = PdfRenderQueue()
+    return _pdf_render_queue
@@ -0,0 +1,598 @@
+"""Report store: persisted autopsy reports and per-feature score history (pluggable backends)"""
+import json
+import os
+import sqlite3
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from app.config import (
+    REPORT_STORE_BACKEND,
+    REPORT_STORE_PATH,
+    REPORT_STORE_MAX_REPORTS,
+    REPORT_DIFF_TOP_K,
+    REPORT_DIFF_MIN_SCORE_CHANGE
+)
+
+SEVERITY_ORDER = {"None": 0, "Low": 1, "Moderate": 2, "High": 3}
+
+META_FIELDS = ("report_id", "name", "created_at", "severity", "feature_count")
+HISTORY_FIELDS = (
+    "report_id", "name", "created_at", "drift", "drift_score", "severity", "impact_score", "impact_level"
+)
+TOP_DRIFTING_FIELDS = (
+    "feature", "runs", "drifted_runs", "avg_drift_score", "max_drift_score", "avg_impact_score"
+)
+
+
+def _number(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def _feature_rows(report: Dict) -> Dict[str, List]:
+    """feature -> [drift, drift_score, severity, method, impact_score, impact_level]"""
+    rows = {}
+    for d in report.get("drift_analysis", {}).get("all_results", []):
+        rows[d["feature"]] = [
+            int(bool(d.get("drift", False))), _number(d.get("drift_score")),
+            d.get("severity"), d.get("method"), None, None
+        ]
+    for i in report.get("impact_analysis", {}).get("all_results", []):
+        row = rows.setdefault(i["feature"], [0, None, None, None, None, None])
+        row[4] = _number(i.get("impact_score"))
+        row[5] = i.get("impact_level")
+    return rows
+
+
+def _delta(before, after) -> Optional[float]:
+    if before is None or after is None:
+        return None
+    return round(float(after) - float(before), 4)
+
+
+def _round(value) -> Optional[float]:
+    return None if value is None else round(float(value), 4)
+
+
+class ReportStore(ABC):
+    """
+    Storage backend interface for autopsy reports.
+
+    Backends persist the full report plus one row of drift/impact scores per
+    (report, feature) and answer the diff and history queries from those
+    rows, never by decoding stored reports. Per-feature distribution data
+    (app.services.visualization) is stored separately so one feature can be
+    fetched without loading the report. save() and diff() are shared;
+    see SQLiteReportStore (default) and MemoryReportStore.
+    """
+
+    max_reports: int = REPORT_STORE_MAX_REPORTS
+
+    # ------------------------------------------------------------------
+    # Backend hooks
+    # ------------------------------------------------------------------
+
+    @abstractmethod
+    def _insert(self, meta: Dict, report: Dict, rows: Dict[str, List], distributions: Dict[str, Dict]):
+        """Store one report, its feature rows and distributions atomically"""
+
+    @abstractmethod
+    def _prune(self, keep: int):
+        """Drop all but the `keep` newest reports"""
+
+    @abstractmethod
+    def _meta(self, report_id: str) -> Dict:
+        """META_FIELDS of one report; KeyError if unknown"""
+
+    @abstractmethod
+    def _diff_rows(self, base_id: str, target_id: str) -> List[tuple]:
+        """
+        Feature rows of both reports joined by feature:
+        (feature, drift_a, drift_b, score_a, score_b, severity_a, severity_b,
+        impact_a, impact_b, level_a, level_b), None on the side that lacks it
+        """
+
+    @abstractmethod
+    def get(self, report_id: str) -> Dict:
+        """Load a full stored report; KeyError if unknown"""
+
+    @abstractmethod
+    def list(self, name: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """Stored report summaries, newest first (optionally for one name)"""
+
+    @abstractmethod
+    def delete(self, report_id: str):
+        """Remove a report, its feature rows and distributions; KeyError if unknown"""
+
+    @abstractmethod
+    def get_distribution(self, report_id: str, feature: str) -> Dict:
+        """Stored distribution data of one feature; KeyError if unknown"""
+
+    @abstractmethod
+    def feature_history(self, feature: str, name: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """HISTORY_FIELDS of one feature over its last `limit` runs, oldest first"""
+
+    @abstractmethod
+    def top_drifting(self, runs: int = 10, name: Optional[str] = None, top_k: int = 20) -> List[Dict]:
+        """
+        TOP_DRIFTING_FIELDS over the last `runs` reports, ranked by how many
+        of them flagged drift, then by mean drift score
+        """
+
+    # ------------------------------------------------------------------
+    # Shared API
+    # ------------------------------------------------------------------
+
+    def save(self, report: Dict, name: str = "autopsy", distributions: Optional[Dict[str, Dict]] = None) -> str:
+        """
+        Persist a report and its per-feature scores
+
+        Args:
+            report: Autopsy report
+            name: Name to store it under, e.g. the model name
+            distributions: Optional feature -> distribution data
+                (build_visualization_data), served per feature by get_distribution
+
+        Returns:
+            The new report id (also written to report["metadata"]["report_id"])
+        """
+        report_id = uuid.uuid4().hex
+        report.setdefault("metadata", {})["report_id"] = report_id
+        rows = _feature_rows(report)
+        meta = {
+            "report_id": report_id,
+            "name": name,
+            "created_at": time.time(),
+            "severity": report.get("executive_summary", {}).get("severity"),
+            "feature_count": len(rows)
+        }
+        self._insert(meta, report, rows, distributions or {})
+        if self.max_reports:
+            self._prune(self.max_reports)
+        print(f"💾 Saved report {report_id} ({name}): {len(rows)} features")
+        return report_id
+
+    def exists(self, report_id: str) -> bool:
+        try:
+            self._meta(report_id)
+            return True
+        except KeyError:
+            return False
+
+    def diff(
+        self,
+        base_id: str,
+        target_id: str,
+        top_k: int = REPORT_DIFF_TOP_K,
+        min_score_change: float = REPORT_DIFF_MIN_SCORE_CHANGE
+    ) -> Dict:
+        """
+        Compare two stored reports feature by feature
+
+        Args:
+            base_id: Earlier report (e.g. yesterday's)
+            target_id: Later report
+            top_k: Largest drift/impact score changes to list
+            min_score_change: Ignore score changes smaller than this
+
+        Returns:
+            Change report: newly drifted and resolved features, severity and
+            impact-level changes, top score movers, added/removed features
+
+        Raises:
+            KeyError: If either report id is unknown
+        """
+        base, target = self._meta(base_id), self._meta(target_id)
+        rows = self._diff_rows(base_id, target_id)
+
+        newly_drifted, resolved, severity_changes, impact_changes = [], [], [], []
+        added, removed, movers = [], [], []
+        for (feature, drift_a, drift_b, score_a, score_b, sev_a, sev_b,
+             impact_a, impact_b, level_a, level_b) in rows:
+            if drift_a is None:
+                added.append(feature)
+                if drift_b:
+                    newly_drifted.append({"feature": feature, "drift_score": score_b, "severity": sev_b})
+                continue
+            if drift_b is None:
+                removed.append(feature)
+                continue
+
+            drift_delta = _delta(score_a, score_b)
+            impact_delta = _delta(impact_a, impact_b)
+            if drift_b and not drift_a:
+                newly_drifted.append({"feature": feature, "drift_score": score_b, "severity": sev_b})
+            elif drift_a and not drift_b:
+                resolved.append({"feature": feature, "previous_drift_score": score_a, "previous_severity": sev_a})
+            if sev_a != sev_b:
+                severity_changes.append({
+                    "feature": feature, "from": sev_a, "to": sev_b,
+                    "direction": "worse" if SEVERITY_ORDER.get(sev_b, 0) > SEVERITY_ORDER.get(sev_a, 0) else "better"
+                })
+            if level_a != level_b:
+                impact_changes.append({"feature": feature, "from": level_a, "to": level_b})
+            change = max(abs(drift_delta or 0), abs(impact_delta or 0))
+            if change >= min_score_change:
+                movers.append((change, {
+                    "feature": feature,
+                    "drift_score": score_b, "drift_score_delta": drift_delta,
+                    "impact_score": impact_b, "impact_score_delta": impact_delta
+                }))
+
+        movers.sort(key=lambda m: m[0], reverse=True)
+        newly_drifted.sort(key=lambda d: d["drift_score"] or 0, reverse=True)
+        return {
+            "base": base,
+            "target": target,
+            "summary": {
+                "features_compared": len(rows) - len(added) - len(removed),
+                "newly_drifted": len(newly_drifted),
+                "resolved": len(resolved),
+                "severity_worsened": sum(1 for c in severity_changes if c["direction"] == "worse"),
+                "severity_improved": sum(1 for c in severity_changes if c["direction"] == "better"),
+                "impact_level_changes": len(impact_changes),
+                "added_features": len(added),
+                "removed_features": len(removed)
+            },
+            "newly_drifted": newly_drifted,
+            "resolved": resolved,
+            "severity_changes": severity_changes,
+            "impact_level_changes": impact_changes,
+            "top_score_changes": [m for _, m in movers[:top_k]],
+            "added_features": added,
+            "removed_features": removed
+        }
+
+
+# ----------------------------------------------------------------------
+# SQLite backend (default)
+# ----------------------------------------------------------------------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    report_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    severity TEXT,
+    feature_count INTEGER NOT NULL,
+    report BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_by_name ON reports (name, created_at);
+CREATE INDEX IF NOT EXISTS reports_by_time ON reports (created_at);
+CREATE TABLE IF NOT EXISTS feature_results (
+    report_id TEXT NOT NULL,
+    feature TEXT NOT NULL,
+    drift INTEGER NOT NULL,
+    drift_score REAL,
+    severity TEXT,
+    method TEXT,
+    impact_score REAL,
+    impact_level TEXT,
+    created_at REAL,
+    PRIMARY KEY (report_id, feature)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS feature_distributions (
+    report_id TEXT NOT NULL,
+    feature TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (report_id, feature)
+) WITHOUT ROWID;
+"""
+
+# Created after the created_at migration so stores from before it upgrade in place
+HISTORY_INDEX = "CREATE INDEX IF NOT EXISTS feature_results_by_feature ON feature_results (feature, created_at)"
+
+# One pass over both reports' feature rows, each side read through the
+# (report_id, feature) primary key: matched + base-only rows, then target-only rows
+DIFF_QUERY = """
+SELECT a.feature, a.drift, b.drift, a.drift_score, b.drift_score, a.severity, b.severity,
+       a.impact_score, b.impact_score, a.impact_level, b.impact_level
+FROM feature_results a
+LEFT JOIN feature_results b ON b.report_id = :target AND b.feature = a.feature
+WHERE a.report_id = :base
+UNION ALL
+SELECT b.feature, NULL, b.drift, NULL, b.drift_score, NULL, b.severity,
+       NULL, b.impact_score, NULL, b.impact_level
+FROM feature_results b
+WHERE b.report_id = :target
+  AND NOT EXISTS (SELECT 1 FROM feature_results a WHERE a.report_id = :base AND a.feature = b.feature)
+"""
+
+# Walks the (feature, created_at) index backwards; reports is only touched by
+# primary key for the rows returned (and for the name filter)
+HISTORY_QUERY = """
+SELECT f.report_id, r.name, f.created_at, f.drift, f.drift_score, f.severity, f.impact_score, f.impact_level
+FROM feature_results f
+JOIN reports r ON r.report_id = f.report_id
+WHERE f.feature = :feature AND (:name IS NULL OR r.name = :name)
+ORDER BY f.created_at DESC
+LIMIT :limit
+"""
+
+# The last N reports come from a created_at index; their feature rows are
+# (report_id, feature) primary key ranges
+TOP_DRIFTING_QUERY = """
+WITH recent AS (
+    SELECT report_id FROM reports
+    WHERE :name IS NULL OR name = :name
+    ORDER BY created_at DESC
+    LIMIT :runs
+)
+SELECT f.feature, COUNT(*), SUM(f.drift), AVG(f.drift_score), MAX(f.drift_score), AVG(f.impact_score)
+FROM recent JOIN feature_results f ON f.report_id = recent.report_id
+GROUP BY f.feature
+ORDER BY SUM(f.drift) DESC, AVG(f.drift_score) DESC
+LIMIT :top_k
+"""
+
+
+class SQLiteReportStore(ReportStore):
+    """
+    SQLite backend.
+
+    The full report is kept as compressed JSON; scores go in a WITHOUT ROWID
+    table clustered on (report_id, feature), with a (feature, created_at)
+    index for per-feature history.
+    """
+
+    def __init__(self, path: str = REPORT_STORE_PATH, max_reports: int = REPORT_STORE_MAX_REPORTS):
+        self.path = path
+        self.max_reports = max_reports
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(feature_results)")}
+            if "created_at" not in columns:
+                conn.execute("ALTER TABLE feature_results ADD COLUMN created_at REAL")
+                conn.execute(
+                    "UPDATE feature_results SET created_at = "
+                    "(SELECT created_at FROM reports WHERE reports.report_id = feature_results.report_id)"
+                )
+            conn.execute(HISTORY_INDEX)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call: safe across request threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:  # commit on success, roll back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def _insert(self, meta: Dict, report: Dict, rows: Dict[str, List], distributions: Dict[str, Dict]):
+        blob = zlib.compress(json.dumps(report, default=str).encode("utf-8"))
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO reports VALUES (?, ?, ?, ?, ?, ?)",
+                tuple(meta[field] for field in META_FIELDS) + (blob,)
+            )
+            conn.executemany(
+                "INSERT INTO feature_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(meta["report_id"], feature, *row, meta["created_at"]) for feature, row in rows.items()]
+            )
+            conn.executemany(
+                "INSERT INTO feature_distributions VALUES (?, ?, ?)",
+                [
+                    (meta["report_id"], feature, zlib.compress(json.dumps(data, default=str).encode("utf-8")))
+                    for feature, data in distributions.items()
+                ]
+            )
+
+    def _prune(self, keep: int):
+        with self._connect() as conn:
+            stale = [r[0] for r in conn.execute(
+                "SELECT report_id FROM reports ORDER BY created_at DESC LIMIT -1 OFFSET ?", (keep,)
+            )]
+            for report_id in stale:
+                conn.execute("DELETE FROM reports WHERE report_id = ?", (report_id,))
+                conn.execute("DELETE FROM feature_results WHERE report_id = ?", (report_id,))
+                conn.execute("DELETE FROM feature_distributions WHERE report_id = ?", (report_id,))
+
+    def _meta(self, report_id: str) -> Dict:
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(META_FIELDS)} FROM reports WHERE report_id = ?", (report_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown report id: {report_id}")
+        return dict(zip(META_FIELDS, row))
+
+    def _diff_rows(self, base_id: str, target_id: str) -> List[tuple]:
+        with self._connect() as conn:
+            return conn.execute(DIFF_QUERY, {"base": base_id, "target": target_id}).fetchall()
+
+    def get(self, report_id: str) -> Dict:
+        with self._connect() as conn:
+            row = conn.execute("SELECT report FROM reports WHERE report_id = ?", (report_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown report id: {report_id}")
+        return json.loads(zlib.decompress(row[0]))
+
+    def list(self, name: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(META_FIELDS)} FROM reports WHERE :name IS NULL OR name = :name "
+                "ORDER BY created_at DESC LIMIT :limit",
+                {"name": name, "limit": limit}
+            ).fetchall()
+        return [dict(zip(META_FIELDS, r)) for r in rows]
+
+    def delete(self, report_id: str):
+        with self._connect() as conn:
+            if conn.execute("DELETE FROM reports WHERE report_id = ?", (report_id,)).rowcount == 0:
+                raise KeyError(f"Unknown report id: {report_id}")
+            conn.execute("DELETE FROM feature_results WHERE report_id = ?", (report_id,))
+            conn.execute("DELETE FROM feature_distributions WHERE report_id = ?", (report_id,))
+
+    def get_distribution(self, report_id: str, feature: str) -> Dict:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data FROM feature_distributions WHERE report_id = ? AND feature = ?", (report_id, feature)
+            ).fetchone()
+        if row is None:
+            self._meta(report_id)  # unknown report -> KeyError naming the report
+            raise KeyError(f"No distribution stored for feature '{feature}' in report {report_id}")
+        return json.loads(zlib.decompress(row[0]))
+
+    def feature_history(self, feature: str, name: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        with self._connect() as conn:
+            rows = conn.execute(HISTORY_QUERY, {"feature": feature, "name": name, "limit": limit}).fetchall()
+        return [dict(zip(HISTORY_FIELDS, r)) for r in reversed(rows)]
+
+    def top_drifting(self, runs: int = 10, name: Optional[str] = None, top_k: int = 20) -> List[Dict]:
+        with self._connect() as conn:
+            rows = conn.execute(TOP_DRIFTING_QUERY, {"runs": runs, "name": name, "top_k": top_k}).fetchall()
+        return [
+            dict(zip(TOP_DRIFTING_FIELDS, (feature, count, drifted, _round(avg), _round(peak), _round(impact))))
+            for feature, count, drifted, avg, peak, impact in rows
+        ]
+
+
+# ----------------------------------------------------------------------
+# In-memory backend (tests, ephemeral deployments)
+# ----------------------------------------------------------------------
+
+class MemoryReportStore(ReportStore):
+    """Process-local backend with the same semantics; nothing survives a restart"""
+
+    def __init__(self, max_reports: int = REPORT_STORE_MAX_REPORTS):
+        self.max_reports = max_reports
+        self._meta_by_id: Dict[str, Dict] = {}
+        self._reports: Dict[str, Dict] = {}
+        self._rows: Dict[str, Dict[str, List]] = {}
+        self._distributions: Dict[str, Dict[str, str]] = {}
+
+    def _insert(self, meta: Dict, report: Dict, rows: Dict[str, List], distributions: Dict[str, Dict]):
+        # Stored as JSON text, like the SQLite blob, so callers cannot mutate it
+        self._meta_by_id[meta["report_id"]] = meta
+        self._reports[meta["report_id"]] = json.dumps(report, default=str)
+        self._rows[meta["report_id"]] = rows
+        self._distributions[meta["report_id"]] = {
+            feature: json.dumps(data, default=str) for feature, data in distributions.items()
+        }
+
+    def _newest(self, name: Optional[str] = None) -> List[Dict]:
+        metas = [m for m in self._meta_by_id.values() if name is None or m["name"] == name]
+        return sorted(metas, key=lambda m: m["created_at"], reverse=True)
+
+    def _prune(self, keep: int):
+        for meta in self._newest()[keep:]:
+            self.delete(meta["report_id"])
+
+    def _meta(self, report_id: str) -> Dict:
+        if report_id not in self._meta_by_id:
+            raise KeyError(f"Unknown report id: {report_id}")
+        return dict(self._meta_by_id[report_id])
+
+    def _diff_rows(self, base_id: str, target_id: str) -> List[tuple]:
+        base, target = self._rows[base_id], self._rows[target_id]
+        missing = [None] * 6
+        rows = []
+        for feature in list(base) + [f for f in target if f not in base]:
+            a, b = base.get(feature, missing), target.get(feature, missing)
+            rows.append((feature, a[0], b[0], a[1], b[1], a[2], b[2], a[4], b[4], a[5], b[5]))
+        return rows
+
+    def get(self, report_id: str) -> Dict:
+        if report_id not in self._reports:
+            raise KeyError(f"Unknown report id: {report_id}")
+        return json.loads(self._reports[report_id])
+
+    def list(self, name: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        return [dict(m) for m in self._newest(name)[:limit]]
+
+    def delete(self, report_id: str):
+        if report_id not in self._meta_by_id:
+            raise KeyError(f"Unknown report id: {report_id}")
+        for table in (self._meta_by_id, self._reports, self._rows, self._distributions):
+            del table[report_id]
+
+    def get_distribution(self, report_id: str, feature: str) -> Dict:
+        self._meta(report_id)
+        if feature not in self._distributions[report_id]:
+            raise KeyError(f"No distribution stored for feature '{feature}' in report {report_id}")
+        return json.loads(self._distributions[report_id][feature])
+
+    def feature_history(self, feature: str, name: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        history = []
+        for meta in self._newest(name):
+            row = self._rows[meta["report_id"]].get(feature)
+            if row is not None:
+                history.append(dict(zip(HISTORY_FIELDS, (
+                    meta["report_id"], meta["name"], meta["created_at"], row[0], row[1], row[2], row[4], row[5]
+                ))))
+                if len(history) == limit:
+                    break
+        return history[::-1]
+
+    def top_drifting(self, runs: int = 10, name: Optional[str] = None, top_k: int = 20) -> List[Dict]:
+        totals = {}
+        for meta in self._newest(name)[:runs]:
+            for feature, row in self._rows[meta["report_id"]].items():
+                entry = totals.setdefault(feature, {"runs": 0, "drifted": 0, "scores": [], "impacts": []})
+                entry["runs"] += 1
+                entry["drifted"] += row[0]
+                if row[1] is not None:
+                    entry["scores"].append(row[1])
+                if row[4] is not None:
+                    entry["impacts"].append(row[4])
+
+        def mean(values):
+            return _round(sum(values) / len(values)) if values else None
+
+        ranked = sorted(
+            totals.items(),
+            key=lambda item: (item[1]["drifted"], mean(item[1]["scores"]) or 0),
+            reverse=True
+        )
+        return [
+            dict(zip(TOP_DRIFTING_FIELDS, (
+                feature, entry["runs"], entry["drifted"], mean(entry["scores"]),
+                _round(max(entry["scores"])) if entry["scores"] else None, mean(entry["impacts"])
+            )))
+            for feature, entry in ranked[:top_k]
+        ]
+
+
+# ----------------------------------------------------------------------
+# Backend registry
+# ----------------------------------------------------------------------
+
+REPORT_STORE_BACKENDS: Dict[str, Callable[..., ReportStore]] = {
+    "sqlite": SQLiteReportStore,
+    "memory": MemoryReportStore
+}
+
+
+def register_report_store_backend(name: str, factory: Callable[..., ReportStore]):
+    """Make a custom ReportStore implementation selectable via REPORT_STORE_BACKEND"""
+    REPORT_STORE_BACKENDS[name] = factory
+
+
+def create_report_store(backend: str = REPORT_STORE_BACKEND, **options) -> ReportStore:
+    """
+    Instantiate a report store backend by name
+
+    Raises:
+        ValueError: If the backend is not registered
+    """
+    if backend not in REPORT_STORE_BACKENDS:
+        raise ValueError(f"Unknown report store backend '{backend}'; use one of {sorted(REPORT_STORE_BACKENDS)}")
+    return REPORT_STORE_BACKENDS[backend](**options)
+
+
+_report_store = None
+
+
+def get_report_store() -> ReportStore:
+    """Return the process-wide report store (created on first use)"""
+    global _report_store
+    if _report_store is None:
+        _report_store = create_report_store()
+    return _report_store
@@ -0,0 +1,392 @@
+"""Sampling mode: streamed reservoir/stratified samples with confidence-aware scores"""
+from typing import List, Dict, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+from app.config import (
+    SAMPLING_CHUNK_ROWS,
+    SAMPLING_BOOTSTRAP_ROUNDS,
+    SAMPLING_CONFIDENCE,
+    SAMPLING_MAX_ROWS,
+    SAMPLING_MAX_STRATA,
+    SAMPLING_STRATIFIED_OVERSAMPLE,
+    SAMPLING_BOOTSTRAP_BLOCK_CELLS,
+    NUMERICAL_TYPES
+)
+from app.models.results import DriftColumns, ImpactColumns
+from app.services.data_loader import C_PARSER_OPTIONS, normalize_columns, policy_usecols
+from app.services.drift_policy import DriftPolicy, get_policy
+
+
+# ----------------------------------------------------------------------
+# Sampling
+# ----------------------------------------------------------------------
+
+OTHER_STRATUM = "<other>"
+
+
+def _stratum_keys(series: pd.Series, known: Optional[Dict[str, None]] = None,
+                  max_strata: int = SAMPLING_MAX_STRATA) -> np.ndarray:
+    """
+    Stratum labels as strings, with missing values as their own stratum
+
+    With `known` (insertion-ordered strata seen so far, updated in place),
+    only the first `max_strata` distinct values keep their own stratum and
+    later ones pool into "<other>", so an ID-like column cannot blow up the
+    per-stratum counts.
+    """
+    labels = series.astype(object).where(series.notna(), "<NA>").astype(str).to_numpy()
+    if known is None:
+        return labels
+    for value in pd.unique(labels):
+        if len(known) >= max_strata:
+            break
+        known.setdefault(value, None)
+    return np.where(pd.Index(list(known)).get_indexer(labels) >= 0, labels, OTHER_STRATUM)
+
+
+def _keep_smallest_keys(df: pd.DataFrame, keys: np.ndarray, sample_size: int,
+                        strata: Optional[np.ndarray]) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Keep the rows with the smallest random keys
+
+    Assigning each row a uniform key and keeping the k smallest is a reservoir
+    sample: it is uniform over every row seen so far and merges chunk by chunk.
+    It also holds the smallest-key rows of every stratum, so with strata the
+    reservoir is oversampled (SAMPLING_STRATIFIED_OVERSAMPLE) and each
+    stratum's smallest-key row is kept too, leaving enough of every stratum
+    for the final proportional allocation.
+    """
+    if strata is not None:
+        sample_size = int(np.ceil(sample_size * SAMPLING_STRATIFIED_OVERSAMPLE))
+    if len(df) <= sample_size:
+        return df, keys
+    keep = np.zeros(len(df), dtype=bool)
+    keep[np.argpartition(keys, sample_size - 1)[:sample_size]] = True
+    if strata is not None:
+        keep |= pd.Series(keys).groupby(strata).rank(method="first").to_numpy() <= 1
+    keep = np.flatnonzero(keep)
+    return df.iloc[keep], keys[keep]
+
+
+def _allocate(stratum_counts: pd.Series, sample_size: int) -> pd.Series:
+    """
+    Proportional allocation n_h ~ N_h / N * sample_size that sums to at most sample_size
+
+    Every stratum gets a row while the budget lasts (largest strata first);
+    the rest goes by largest remainder.
+    """
+    total = int(min(sample_size, stratum_counts.sum()))
+    share = stratum_counts / stratum_counts.sum() * total
+    allocation = np.floor(share).astype(int)
+    budget = total - int(allocation.sum())
+
+    empty = stratum_counts[allocation == 0].sort_values(ascending=False, kind="stable").index[:budget]
+    allocation[empty] += 1
+    budget -= len(empty)
+
+    remainder = (share - np.floor(share)).drop(empty)
+    allocation[remainder.sort_values(ascending=False, kind="stable").index[:max(budget, 0)]] += 1
+    return allocation
+
+
+def _finalize_stratified(df: pd.DataFrame, keys: np.ndarray, sample_size: int,
+                         strata: np.ndarray, stratum_counts: pd.Series) -> pd.DataFrame:
+    """Keep each stratum's smallest-key rows up to its allocation (never more than sample_size in total)"""
+    ranks = pd.Series(keys).groupby(strata).rank(method="first").to_numpy()
+    limits = pd.Series(strata).map(_allocate(stratum_counts, sample_size)).to_numpy()
+    return df.iloc[np.flatnonzero(ranks <= limits)]
+
+
+def sample_csv_stream(
+    file_obj,
+    sample_size: int,
+    stratify_by: Optional[str] = None,
+    seed: int = 42,
+    chunksize: int = SAMPLING_CHUNK_ROWS,
+    keep: Sequence[str] = ()
+) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Draw a reservoir (or stratified reservoir) sample while streaming a CSV
+
+    Only one chunk plus the current reservoir is held in memory, so the input
+    can be far larger than RAM.
+
+    Args:
+        file_obj: Binary file-like object positioned at the CSV start
+        sample_size: Target number of sampled rows
+        stratify_by: Optional (normalized) column name to stratify on
+        seed: Random seed
+        chunksize: Rows parsed per chunk
+        keep: Key columns to parse even if the drift policy skips them
+            (`stratify_by` always is)
+
+    Returns:
+        Tuple of (sample DataFrame, sampling info)
+
+    Raises:
+        ValueError: If parsing fails or the stratification column is missing
+    """
+    for encoding in ("utf-8-sig", "latin1"):
+        file_obj.seek(0)
+        try:
+            return _sample_chunks(
+                pd.read_csv(
+                    file_obj, encoding=encoding, chunksize=chunksize,
+                    usecols=policy_usecols([stratify_by, *keep]), **C_PARSER_OPTIONS
+                ),
+                sample_size, stratify_by, seed
+            )
+        except UnicodeDecodeError:
+            print("⚠️ UTF-8 failed, trying latin1 encoding...")
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"CSV parsing failed: {str(e)}")
+    raise ValueError("CSV parsing failed: unsupported encoding")
+
+
+def sample_frame(
+    df: pd.DataFrame,
+    sample_size: int,
+    stratify_by: Optional[str] = None,
+    seed: int = 42
+) -> Tuple[pd.DataFrame, Dict]:
+    """Same sampling as sample_csv_stream, for an already-loaded DataFrame"""
+    return _sample_chunks([df], sample_size, stratify_by, seed)
+
+
+def _sample_chunks(chunks, sample_size: int, stratify_by: Optional[str], seed: int) -> Tuple[pd.DataFrame, Dict]:
+    if sample_size <= 0:
+        raise ValueError("sample_size must be positive")
+    if sample_size > SAMPLING_MAX_ROWS:
+        raise ValueError(f"sample_size must be at most {SAMPLING_MAX_ROWS}")
+
+    rng = np.random.default_rng(seed)
+    reservoir, reservoir_keys, reservoir_strata = None, np.empty(0), None
+    stratum_counts = pd.Series(dtype="int64")
+    known_strata = {}
+    rows_seen = 0
+
+    for chunk in chunks:
+        chunk = normalize_columns(chunk.reset_index(drop=True))
+        if stratify_by is not None and stratify_by not in chunk.columns:
+            raise ValueError(f"Stratification column '{stratify_by}' not found")
+
+        keys = rng.random(len(chunk))
+        rows_seen += len(chunk)
+        strata = None
+        if stratify_by is not None:
+            strata = _stratum_keys(chunk[stratify_by], known_strata)
+            stratum_counts = stratum_counts.add(pd.Series(strata).value_counts(), fill_value=0)
+
+        if reservoir is not None:
+            chunk = pd.concat([reservoir, chunk], ignore_index=True)
+            keys = np.concatenate([reservoir_keys, keys])
+            if strata is not None:
+                strata = np.concatenate([reservoir_strata, strata])
+
+        # The reservoir stays within ~sample_size * SAMPLING_STRATIFIED_OVERSAMPLE
+        # rows plus one per tracked stratum until the final allocation
+        reservoir, reservoir_keys = _keep_smallest_keys(chunk, keys, sample_size, strata)
+        if strata is not None:
+            reservoir_strata = strata[reservoir.index.to_numpy()]
+        reservoir = reservoir.reset_index(drop=True)
+
+    if reservoir is None:
+        raise ValueError("CSV file is empty")
+
+    if stratify_by is not None:
+        reservoir = _finalize_stratified(reservoir, reservoir_keys, sample_size, reservoir_strata, stratum_counts)
+
+    info = {
+        "strategy": "stratified" if stratify_by else "reservoir",
+        "stratify_by": stratify_by,
+        "rows_seen": rows_seen,
+        "sample_rows": len(reservoir),
+        "sampling_fraction": round(len(reservoir) / rows_seen, 6) if rows_seen else 0
+    }
+    if stratify_by is not None:
+        info["strata"] = len(stratum_counts)
+
+    return reservoir.reset_index(drop=True), info
+
+
+# ----------------------------------------------------------------------
+# Confidence intervals
+# ----------------------------------------------------------------------
+
+def ks_confidence_interval(ks_stat: float, n: int, m: int, confidence: float = SAMPLING_CONFIDENCE) -> List[float]:
+    """
+    Analytic interval for the two-sample KS statistic
+
+    By the DKW inequality each empirical CDF is within
+    sqrt(ln(2/alpha) / 2n) of the truth, so D moves by at most the sum.
+    """
+    alpha = 1 - confidence
+    half_width = np.sqrt(np.log(2 / alpha) / 2) * (1 / np.sqrt(n) + 1 / np.sqrt(m))
+    return [round(max(0.0, ks_stat - half_width), 4), round(min(1.0, ks_stat + half_width), 4)]
+
+
+def _percentile_interval(samples: np.ndarray, confidence: float) -> List[float]:
+    alpha = 1 - confidence
+    low, high = np.percentile(samples, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+    return [round(float(low), 4), round(float(high), 4)]
+
+
+def _aligned_counts(train: pd.Series, prod: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    train_counts = train.value_counts()
+    prod_counts = prod.value_counts()
+    categories = train_counts.index.union(prod_counts.index)
+    return (
+        train_counts.reindex(categories, fill_value=0).to_numpy(dtype=float),
+        prod_counts.reindex(categories, fill_value=0).to_numpy(dtype=float)
+    )
+
+
+def _bootstrap_category_counts(rng, counts: np.ndarray, rounds: int) -> np.ndarray:
+    """Multinomial resampling of category counts: one draw per bootstrap round"""
+    total = int(counts.sum())
+    return rng.multinomial(total, counts / total, size=rounds).astype(float) / total
+
+
+def bootstrap_psi(train: pd.Series, prod: pd.Series, rounds: int, confidence: float, rng) -> List[float]:
+    """Bootstrap interval for categorical PSI, vectorized across rounds"""
+    train_counts, prod_counts = _aligned_counts(train, prod)
+    expected = _bootstrap_category_counts(rng, train_counts, rounds)
+    actual = _bootstrap_category_counts(rng, prod_counts, rounds)
+    expected = np.where(expected == 0, 0.0001, expected)
+    actual = np.where(actual == 0, 0.0001, actual)
+    psi = ((actual - expected) * np.log(actual / expected)).sum(axis=1)
+    return _percentile_interval(psi, confidence)
+
+
+def bootstrap_categorical_impact(train: pd.Series, new: pd.Series, rounds: int, confidence: float, rng) -> List[float]:
+    """Bootstrap interval for the categorical impact score (TVD + new-category penalty)"""
+    train_counts, new_counts = _aligned_counts(train, new)
+    train_p = _bootstrap_category_counts(rng, train_counts, rounds)
+    new_p = _bootstrap_category_counts(rng, new_counts, rounds)
+    tvd = np.abs(new_p - train_p).sum(axis=1) / 2
+    new_categories = ((new_p > 0) & (train_p == 0)).sum(axis=1)
+    return _percentile_interval(tvd + 0.1 * new_categories, confidence)
+
+
+def _bootstrap_moments(values: np.ndarray, rounds: int, rng, block_cells: int) -> Tuple[np.ndarray, ...]:
+    """Per-round mean, std (ddof=1), min and max of bootstrap resamples, in blocks of rounds"""
+    stats = np.empty((4, rounds))
+    block = max(1, block_cells // max(1, len(values)))
+    for start in range(0, rounds, block):
+        stop = min(rounds, start + block)
+        resampled = values[rng.integers(0, len(values), (stop - start, len(values)))]
+        stats[0, start:stop] = resampled.mean(axis=1)
+        stats[1, start:stop] = resampled.std(axis=1, ddof=1)
+        stats[2, start:stop] = resampled.min(axis=1)
+        stats[3, start:stop] = resampled.max(axis=1)
+    return tuple(stats)
+
+
+def bootstrap_numeric_impact(
+    train: np.ndarray,
+    new: np.ndarray,
+    rounds: int,
+    confidence: float,
+    rng,
+    block_cells: int = SAMPLING_BOOTSTRAP_BLOCK_CELLS,
+    weights: Optional[Tuple[float, float, float]] = None
+) -> List[float]:
+    """
+    Bootstrap interval for the numerical proxy impact score
+
+    Mirrors _calculate_proxy_impact: weighted mean shift + std change
+    + range-overlap loss, with the feature policy's `weights` (the default
+    policy's when None). Rounds are resampled in blocks of at most
+    `block_cells` values per side, so memory stays bounded for large samples.
+    """
+    t_mean, t_std, t_min, t_max = _bootstrap_moments(train, rounds, rng, block_cells)
+    n_mean, n_std, n_min, n_max = _bootstrap_moments(new, rounds, rng, block_cells)
+
+    mean_shift = np.abs(n_mean - t_mean) / (np.abs(t_mean) + 1e-10)
+    variance_change = np.abs(n_std - t_std) / (np.abs(t_std) + 1e-10)
+
+    overlap_length = np.minimum(t_max, n_max) - np.maximum(t_min, n_min)
+    total_range = np.maximum(t_max, n_max) - np.minimum(t_min, n_min)
+    overlap = np.where(
+        overlap_length <= 0, 0.0,
+        np.where(total_range == 0, 1.0, overlap_length / np.where(total_range == 0, 1, total_range))
+    )
+
+    mean_weight, variance_weight, overlap_weight = weights or get_policy().default_policy.impact_weights
+    score = mean_weight * mean_shift + variance_weight * variance_change + overlap_weight * (1 - overlap)
+    return _percentile_interval(score, confidence)
+
+
+def _is_borderline(interval: List[float], cutoffs: Sequence[float]) -> bool:
+    """A score is borderline when its interval straddles a decision cutoff"""
+    return any(interval[0] < cutoff <= interval[1] for cutoff in cutoffs)
+
+
+def attach_confidence_intervals(
+    drift_results: DriftColumns,
+    impact_results: ImpactColumns,
+    train_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    rounds: int = SAMPLING_BOOTSTRAP_ROUNDS,
+    confidence: float = SAMPLING_CONFIDENCE,
+    seed: int = 42,
+    policy: Optional[DriftPolicy] = None
+) -> List[str]:
+    """
+    Add confidence intervals to sampled drift and impact results in place
+
+    KS uses the analytic DKW interval; PSI and impact scores use a vectorized
+    bootstrap. Each result gets `confidence_interval` and `borderline`, which
+    is checked against the feature's policy cutoffs (and impact weights), so
+    escalation follows the same thresholds as the drift and impact levels.
+
+    Returns:
+        Features whose interval straddles a cutoff (candidates for an exact run)
+    """
+    rng = np.random.default_rng(seed)
+    policy = policy or get_policy()
+    borderline = set()
+
+    for col, result in zip(drift_results.features.tolist(), drift_results.details):
+        feature_policy = policy.resolve(col)
+        train_clean, prod_clean = train_df[col].dropna(), new_df[col].dropna()
+        if len(train_clean) == 0 or len(prod_clean) == 0:
+            continue
+
+        if result.get("method") == "KS-Test":
+            interval = ks_confidence_interval(result["ks_statistic"], len(train_clean), len(prod_clean), confidence)
+            cutoffs = feature_policy.ks_severity
+        else:
+            interval = bootstrap_psi(train_clean, prod_clean, rounds, confidence, rng)
+            cutoffs = feature_policy.psi
+
+        result["confidence_interval"] = interval
+        result["borderline"] = _is_borderline(interval, cutoffs)
+        if result["borderline"]:
+            borderline.add(col)
+
+    for col, result in zip(impact_results.features.tolist(), impact_results.details):
+        feature_policy = policy.resolve(col)
+        train_clean, new_clean = train_df[col].dropna(), new_df[col].dropna()
+        if len(train_clean) == 0 or len(new_clean) == 0:
+            continue
+
+        if train_df[col].dtype in NUMERICAL_TYPES:
+            interval = bootstrap_numeric_impact(
+                train_clean.to_numpy(dtype=float), new_clean.to_numpy(dtype=float), rounds, confidence, rng,
+                weights=feature_policy.impact_weights
+            )
+            cutoffs = feature_policy.impact
+        else:
+            interval = bootstrap_categorical_impact(train_clean, new_clean, rounds, confidence, rng)
+            cutoffs = feature_policy.categorical_impact
+
+        result["confidence_interval"] = interval
+        result["borderline"] = _is_borderline(interval, cutoffs)
+        if result["borderline"]:
+            borderline.add(col)
+
+    return sorted(borderline)
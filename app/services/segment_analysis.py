@@ -0,0 +1,227 @@
+"""Segment drill-down: drift and impact for every slice in one grouped pass"""
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from app.config import SEGMENT_MIN_ROWS, SEGMENT_TOP_K, NUMERICAL_TYPES
+from app.services.drift_policy import DriftPolicy, get_policy
+from app.utils.stats import quantile_bin_edges, assign_bins
+from app.utils.sketches import CategoricalSketch, is_high_cardinality
+
+
+def _segment_codes(train_df: pd.DataFrame, new_df: pd.DataFrame, segment_by: List[str]):
+    """One integer code per segment, shared by train and prod rows"""
+    keys = pd.concat([train_df[segment_by], new_df[segment_by]], ignore_index=True).astype(object)
+    codes = keys.groupby(segment_by, dropna=False, sort=False).ngroup().to_numpy()
+    first_rows = pd.Series(np.arange(len(codes))).groupby(codes).first().to_numpy()
+    labels = keys.iloc[first_rows].reset_index(drop=True)
+    return codes[:len(train_df)], codes[len(train_df):], labels
+
+
+def _category_codes(train_values: pd.Series, new_values: pd.Series) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Shared category codes for train and prod rows (missing values get -1)
+
+    High-cardinality columns keep codes only for the training heavy hitters
+    and pool every other value into a final "<other>" code, so the
+    (segments x categories) histograms stay small for ID-like columns.
+    """
+    if is_high_cardinality(train_values.dropna()) or is_high_cardinality(new_values.dropna()):
+        categories = pd.Index(CategoricalSketch.from_series(train_values.dropna()).top().index)
+        codes = []
+        for values in (train_values.astype(object), new_values.astype(object)):
+            value_codes = categories.get_indexer(values)
+            value_codes[(value_codes < 0) & values.notna().to_numpy()] = len(categories)
+            codes.append(value_codes)
+        return codes[0], codes[1], len(categories) + 1
+
+    codes, categories = pd.factorize(pd.concat([train_values, new_values], ignore_index=True).astype(object))
+    return codes[:len(train_values)], codes[len(train_values):], max(len(categories), 1)
+
+
+def _grouped_hist(seg_codes: np.ndarray, bin_codes: np.ndarray, n_segments: int, n_bins: int) -> np.ndarray:
+    """(segments x bins) counts from one bincount; rows with bin code < 0 are skipped"""
+    valid = bin_codes >= 0
+    flat = seg_codes[valid] * n_bins + bin_codes[valid]
+    return np.bincount(flat, minlength=n_segments * n_bins).reshape(n_segments, n_bins).astype(float)
+
+
+def _psi_rows(expected: np.ndarray, actual: np.ndarray) -> np.ndarray:
+    """Row-wise PSI between count histograms, with calculate_psi's 0.0001 floor"""
+    expected = expected / np.maximum(expected.sum(axis=1, keepdims=True), 1)
+    actual = actual / np.maximum(actual.sum(axis=1, keepdims=True), 1)
+    expected = np.where(expected == 0, 0.0001, expected)
+    actual = np.where(actual == 0, 0.0001, actual)
+    return ((actual - expected) * np.log(actual / expected)).sum(axis=1)
+
+
+def _binned_ks_rows(expected: np.ndarray, actual: np.ndarray) -> np.ndarray:
+    """Row-wise max CDF gap over the bin edges (a lower bound on the KS statistic)"""
+    expected_cdf = np.cumsum(expected, axis=1) / np.maximum(expected.sum(axis=1, keepdims=True), 1)
+    actual_cdf = np.cumsum(actual, axis=1) / np.maximum(actual.sum(axis=1, keepdims=True), 1)
+    return np.abs(actual_cdf - expected_cdf).max(axis=1)
+
+
+def _moments(values: np.ndarray, seg_codes: np.ndarray, n_segments: int) -> pd.DataFrame:
+    stats = pd.Series(values).groupby(seg_codes).agg(["mean", "std", "min", "max"])
+    return stats.reindex(np.arange(n_segments))
+
+
+def _numeric_impact(base: pd.DataFrame, new: pd.DataFrame, weights: Tuple[float, float, float]) -> np.ndarray:
+    """Vectorized _calculate_proxy_impact: weighted mean shift + std change + overlap loss"""
+    mean_shift = np.abs(new["mean"] - base["mean"]) / (np.abs(base["mean"]) + 1e-10)
+    variance_change = np.abs(new["std"].fillna(0) - base["std"].fillna(0)) / (np.abs(base["std"].fillna(0)) + 1e-10)
+    overlap_length = np.minimum(base["max"], new["max"]) - np.maximum(base["min"], new["min"])
+    total_range = np.maximum(base["max"], new["max"]) - np.minimum(base["min"], new["min"])
+    overlap = np.where(overlap_length <= 0, 0.0, overlap_length / total_range.where(total_range > 0, 1.0))
+    mean_weight, variance_weight, overlap_weight = weights
+    return (mean_weight * mean_shift + variance_weight * variance_change + overlap_weight * (1 - overlap)).to_numpy()
+
+
+def _severity(psi: np.ndarray, moderate: np.ndarray, severe: np.ndarray) -> np.ndarray:
+    """(segments x features) PSI levels against per-feature cutoffs"""
+    return np.select([psi >= severe, psi >= moderate], ["High", "Moderate"], default="None")
+
+
+def analyze_segments(
+    train_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    segment_by: List[str],
+    min_rows: int = SEGMENT_MIN_ROWS,
+    top_k: int = SEGMENT_TOP_K,
+    bins: int = 10,
+    features: Optional[List[str]] = None,
+    policy: Optional[DriftPolicy] = None
+) -> Dict:
+    """
+    Per-segment drift and impact for every combination of `segment_by` values
+
+    Every feature is processed once for all segments: histograms come from a
+    single bincount over (segment, bin) codes and moments from one grouped
+    aggregation, so thousands of segments cost about as much as a global run.
+    Each prod segment is compared with the same segment in training, or with
+    the whole training set when the training segment is smaller than min_rows.
+
+    Args:
+        train_df: Training data (baseline)
+        new_df: Production data to drill into
+        segment_by: Slicing columns
+        min_rows: Segments with fewer prod rows are pruned
+        top_k: Number of top drifting segments returned
+        bins: Quantile bins for numerical features (PSI binning)
+        features: Features to analyze (defaults to all non-segment columns
+            the drift policy does not skip)
+        policy: Compiled drift policy for PSI cutoffs and impact weights
+            (defaults to the process-wide policy)
+
+    Returns:
+        Dict with global PSI per feature and the top drifting segments
+
+    Raises:
+        ValueError: If a segment column is missing
+    """
+    missing = [col for col in segment_by if col not in train_df.columns or col not in new_df.columns]
+    if not segment_by or missing:
+        raise ValueError(f"Segment columns not found: {missing or segment_by}")
+
+    policy = policy or get_policy()
+    features = features or [
+        col for col in train_df.columns if col not in segment_by and not policy.is_skipped(col)
+    ]
+    feature_policies = [policy.resolve(col) for col in features]
+    psi_moderate = np.array([p.psi[0] for p in feature_policies])
+    psi_severe = np.array([p.psi[1] for p in feature_policies])
+    train_seg, new_seg, labels = _segment_codes(train_df, new_df, segment_by)
+    n_segments = len(labels)
+
+    train_rows = np.bincount(train_seg, minlength=n_segments)
+    new_rows = np.bincount(new_seg, minlength=n_segments)
+    kept = np.flatnonzero(new_rows >= min_rows)
+    own_baseline = train_rows[kept] >= min_rows
+
+    psi = np.zeros((len(kept), len(features)))
+    ks = np.full((len(kept), len(features)), np.nan)
+    impact = np.zeros((len(kept), len(features)))
+    global_psi = {}
+
+    for j, col in enumerate(features):
+        train_values, new_values = train_df[col], new_df[col]
+
+        if train_values.dtype in NUMERICAL_TYPES:
+            train_clean = train_values.dropna().to_numpy(dtype=float)
+            if len(train_clean) == 0:
+                continue
+            edges = quantile_bin_edges(train_clean, bins)
+            n_bins = max(len(edges) - 1, 1)
+            train_arr, new_arr = train_values.to_numpy(dtype=float), new_values.to_numpy(dtype=float)
+            train_bins = np.where(np.isnan(train_arr), -1, assign_bins(train_arr, edges))
+            new_bins = np.where(np.isnan(new_arr), -1, assign_bins(new_arr, edges))
+
+            train_moments = _moments(train_arr, train_seg, n_segments).iloc[kept]
+            global_moments = pd.Series(train_arr).agg(["mean", "std", "min", "max"])
+            use_own = np.repeat(own_baseline[:, None], train_moments.shape[1], axis=1)
+            base_moments = train_moments.where(use_own, global_moments, axis=1)
+            new_moments = _moments(new_arr, new_seg, n_segments).iloc[kept]
+            impact[:, j] = np.nan_to_num(_numeric_impact(base_moments, new_moments, feature_policies[j].impact_weights))
+        else:
+            train_bins, new_bins, n_bins = _category_codes(train_values, new_values)
+
+        train_hist = _grouped_hist(train_seg, train_bins, n_segments, n_bins)
+        all_new_hist = _grouped_hist(new_seg, new_bins, n_segments, n_bins)
+        new_hist = all_new_hist[kept]
+        global_hist = train_hist.sum(axis=0, keepdims=True)
+        base_hist = np.where(own_baseline[:, None], train_hist[kept], global_hist)
+
+        psi[:, j] = _psi_rows(base_hist, new_hist)
+        global_psi[col] = round(float(_psi_rows(global_hist, all_new_hist.sum(axis=0, keepdims=True))[0]), 4)
+
+        if train_values.dtype in NUMERICAL_TYPES:
+            ks[:, j] = _binned_ks_rows(base_hist, new_hist)
+        else:
+            # Vectorized _calculate_categorical_impact: TVD + 0.1 per new category
+            base_p = base_hist / np.maximum(base_hist.sum(axis=1, keepdims=True), 1)
+            new_p = new_hist / np.maximum(new_hist.sum(axis=1, keepdims=True), 1)
+            new_categories = ((new_hist > 0) & (base_hist == 0)).sum(axis=1)
+            impact[:, j] = np.abs(new_p - base_p).sum(axis=1) / 2 + 0.1 * new_categories
+
+    max_psi = psi.max(axis=1) if len(features) else np.zeros(len(kept))
+    order = np.argsort(-max_psi)[:top_k]
+    severity = _severity(psi, psi_moderate, psi_severe)
+    drifted = psi >= psi_moderate
+
+    top_segments = []
+    for i in order:
+        feature_order = np.argsort(-psi[i])[:5]
+        top_segments.append({
+            "segment": {
+                col: None if pd.isna(value) else value
+                for col, value in labels.iloc[kept[i]].items()
+            },
+            "rows_new": int(new_rows[kept[i]]),
+            "rows_train": int(train_rows[kept[i]]),
+            "baseline": "segment" if own_baseline[i] else "global",
+            "max_psi": round(float(max_psi[i]), 4),
+            "drifted_features": int(drifted[i].sum()),
+            "features": [
+                {
+                    "feature": features[j],
+                    "psi": round(float(psi[i, j]), 4),
+                    "ks_binned": None if np.isnan(ks[i, j]) else round(float(ks[i, j]), 4),
+                    "severity": str(severity[i, j]),
+                    "drift": bool(drifted[i, j]),
+                    "impact_score": round(float(impact[i, j]), 4),
+                    "global_psi": global_psi.get(features[j])
+                }
+                for j in feature_order
+            ]
+        })
+
+    return {
+        "segment_by": segment_by,
+        "segments_total": int(n_segments),
+        "segments_analyzed": int(len(kept)),
+        "segments_pruned": int((new_rows > 0).sum() - len(kept)),
+        "min_rows": min_rows,
+        "global_psi": global_psi,
+        "top_segments": top_segments
+    }
@@ -0,0 +1,203 @@
+"""Scalable SHAP impact: summarized background, sampled rows, chunked explanation"""
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional
+import hashlib
+import pickle
+import threading
+import numpy as np
+import pandas as pd
+
+from app.config import (
+    SHAP_BACKGROUND_SIZE,
+    SHAP_EXPLAIN_ROWS,
+    SHAP_CHUNK_ROWS,
+    SHAP_WORKERS,
+    SHAP_PROCESS_MIN_ROWS,
+    SHAP_EXPLAINER_CACHE_SIZE
+)
+from app.services.sampling import sample_frame
+
+# Explainers keyed by (model hash, background fingerprint), most recent last.
+# Worker processes of the shared pool keep their own copy of this cache.
+_explainer_cache = OrderedDict()
+_explainer_cache_lock = threading.Lock()
+
+# Process pool shared by all requests (created on first use)
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def model_hash(model) -> str:
+    """Stable content hash of a fitted model (pickles it: compute once per request)"""
+    return hashlib.blake2b(pickle.dumps(model), digest_size=16).hexdigest()
+
+
+def _background_hash(background: pd.DataFrame) -> str:
+    return hashlib.blake2b(
+        pd.util.hash_pandas_object(background, index=False).to_numpy().tobytes(), digest_size=16
+    ).hexdigest()
+
+
+def summarize_background(train_df: pd.DataFrame, size: int = SHAP_BACKGROUND_SIZE, seed: int = 42) -> pd.DataFrame:
+    """
+    Reduce the training set to `size` representative rows
+
+    All-numeric data is summarized with k-means centroids; anything with
+    categorical columns falls back to a uniform random sample.
+    """
+    clean = train_df.dropna()
+    if len(clean) <= size:
+        return clean.reset_index(drop=True)
+
+    if all(dtype.kind in "biuf" for dtype in clean.dtypes):
+        import shap
+        centroids = shap.kmeans(clean.to_numpy(dtype=float), size).data
+        return pd.DataFrame(centroids, columns=clean.columns).astype(clean.dtypes.to_dict(), errors="ignore")
+
+    return clean.sample(n=size, random_state=seed).reset_index(drop=True)
+
+
+def _build_explainer(model, background: pd.DataFrame):
+    """Pick the cheapest exact-enough explainer the model supports"""
+    import shap
+
+    # Tree ensembles: path-dependent TreeExplainer needs no background at all
+    try:
+        return shap.TreeExplainer(model)
+    except Exception:
+        pass
+
+    masker = shap.maskers.Independent(background, max_samples=len(background))
+    if hasattr(model, "coef_"):
+        try:
+            return shap.LinearExplainer(model, masker)
+        except Exception:
+            pass
+
+    predict = model.predict_proba if hasattr(model, "predict_proba") else model.predict
+    return shap.Explainer(predict, masker)
+
+
+def _cached_explainer(key, build):
+    """Explainer for `key` from this process's cache, built by build() on a miss"""
+    with _explainer_cache_lock:
+        if key in _explainer_cache:
+            _explainer_cache.move_to_end(key)
+            return _explainer_cache[key]
+
+    explainer = build()
+    with _explainer_cache_lock:
+        _explainer_cache[key] = explainer
+        while len(_explainer_cache) > SHAP_EXPLAINER_CACHE_SIZE:
+            _explainer_cache.popitem(last=False)
+    return explainer
+
+
+def get_explainer(model, background: pd.DataFrame, model_key: Optional[str] = None):
+    """
+    Cached explainer per (model hash, background) pair
+
+    Args:
+        model_key: Precomputed model_hash(model), to avoid re-pickling the model
+    """
+    key = (model_key or model_hash(model), _background_hash(background))
+    return _cached_explainer(key, lambda: _build_explainer(model, background))
+
+
+def _explain(explainer, X: pd.DataFrame) -> np.ndarray:
+    """Sum of |SHAP| per feature for a chunk (summed over rows and outputs)"""
+    import shap
+
+    if isinstance(explainer, shap.TreeExplainer):
+        values = explainer(X, check_additivity=False).values
+    elif isinstance(explainer, shap.LinearExplainer):
+        values = explainer(X).values
+    else:
+        values = explainer(X, max_evals=max(500, 2 * X.shape[1] + 1), silent=True).values
+
+    values = np.abs(np.asarray(values, dtype=float))
+    # (rows, features) or (rows, features, outputs)
+    return values.reshape(values.shape[0], values.shape[1], -1).sum(axis=(0, 2))
+
+
+def _explain_chunk(key, model_bytes: bytes, background: pd.DataFrame, X: pd.DataFrame) -> np.ndarray:
+    """Pool task: explain a chunk with the worker's cached explainer (unpickled only on a miss)"""
+    explainer = _cached_explainer(key, lambda: _build_explainer(pickle.loads(model_bytes), background))
+    return _explain(explainer, X)
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """The shared process pool, resized if a different worker count is requested"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool, _pool_workers = ProcessPoolExecutor(max_workers=workers), workers
+        return _pool
+
+
+def shap_importance(
+    model,
+    train_df: pd.DataFrame,
+    df: pd.DataFrame,
+    features: List[str],
+    stratify_by: Optional[str] = None,
+    explain_rows: int = SHAP_EXPLAIN_ROWS,
+    chunk_rows: int = SHAP_CHUNK_ROWS,
+    max_workers: int = SHAP_WORKERS,
+    process_min_rows: int = SHAP_PROCESS_MIN_ROWS,
+    model_key: Optional[str] = None,
+    seed: int = 42
+) -> Dict[str, float]:
+    """
+    Mean |SHAP| per feature on a sample of `df`
+
+    Samples below `process_min_rows` are explained inline with the cached
+    explainer. Larger ones fan out over a process pool shared by all
+    requests; each worker caches explainers by the same (model hash,
+    background) key, so a model is only rebuilt the first time a worker
+    sees it.
+
+    Args:
+        model: Fitted model
+        train_df: Training data, summarized into the explainer background
+        df: Rows to explain (a stratified sample of at most explain_rows is used)
+        features: Model input columns, in the model's order
+        stratify_by: Optional column in df to stratify the explained sample on
+        explain_rows: Max rows explained
+        chunk_rows: Rows per explanation chunk; chunks fan out across processes
+        max_workers: Worker processes (1 always explains inline)
+        process_min_rows: Smallest sample sent to the process pool
+        model_key: Precomputed model_hash(model); pass it when explaining
+            the same model more than once per request
+        seed: Random seed
+
+    Returns:
+        Dict of feature -> mean absolute SHAP value
+    """
+    background = summarize_background(train_df[features], seed=seed)
+    if stratify_by is not None and stratify_by not in df.columns:
+        raise ValueError(f"Stratification column '{stratify_by}' not found")
+
+    sample, _ = sample_frame(df, explain_rows, stratify_by, seed)
+    X = sample[features]
+    if len(X) == 0:
+        return {feature: 0.0 for feature in features}
+
+    chunks = [X.iloc[i:i + chunk_rows] for i in range(0, len(X), chunk_rows)]
+    workers = max(1, min(max_workers, len(chunks)))
+    model_key = model_key or model_hash(model)
+
+    if workers == 1 or len(X) < process_min_rows:
+        explainer = get_explainer(model, background, model_key)
+        totals = sum(_explain(explainer, chunk) for chunk in chunks)
+    else:
+        key = (model_key, _background_hash(background))
+        model_bytes = pickle.dumps(model)
+        pool = _get_pool(max_workers)
+        totals = sum(pool.map(_explain_chunk, *zip(*[(key, model_bytes, background, chunk) for chunk in chunks])))
+
+    return {feature: float(totals[i] / len(X)) for i, feature in enumerate(features)}
@@ -1,20 +1,29 @@
 """Timeline reconstruction service"""
-from typing import List, Dict
+from typing import List, Dict, Iterable, Union
 from datetime import datetime
+import numpy as np
 
-def build_timeline(drift_results: List[Dict], impact_results: List[Dict]) -> Dict:
+from app.models.results import DriftColumns, ImpactColumns, SEVERITY_LEVELS, rank_descending
+
+def build_timeline(
+    drift_results: Union[DriftColumns, Iterable[Dict]],
+    impact_results: Union[ImpactColumns, Iterable[Dict]]
+) -> Dict:
     """
     Build failure timeline by correlating drift and impact
     
     This creates a chronological story of what went wrong
     
     Args:
-        drift_results: Results from drift detection
-        impact_results: Results from impact analysis
+        drift_results: DriftColumns from drift detection (or per-feature dicts)
+        impact_results: ImpactColumns from impact analysis (or per-feature dicts)
         
     Returns:
         Timeline dict with events and analysis
     """
+    drift_columns = DriftColumns.coerce(drift_results)
+    impact_columns = ImpactColumns.coerce(impact_results)
+    
     timeline = {
         "events": [],
         "summary": {},
@@ -23,34 +32,38 @@ def build_timeline(drift_results: List[Dict], impact_results: List[Dict]) -> Dic
     }
     
     # Event 1: Identify drifted features
-    drifted_features = [d for d in drift_results if d.get("drift", False)]
+    drifted_idx = drift_columns.drifted()
+    drifted_features = drift_columns.features[drifted_idx].tolist()
     
     if drifted_features:
         timeline["events"].append({
             "event_type": "drift_detected",
             "severity": "critical" if len(drifted_features) > 5 else "moderate",
             "description": f"Drift detected in {len(drifted_features)} features",
-            "features": [d["feature"] for d in drifted_features],
+            "features": drifted_features,
             "timestamp": "production_period"
         })
     
     # Event 2: Identify high-impact features
-    high_impact = [i for i in impact_results if i.get("impact_level") == "High"]
+    high_impact = impact_columns.features[impact_columns.with_level("High")].tolist()
     
     if high_impact:
         timeline["events"].append({
             "event_type": "high_impact_detected",
             "severity": "critical",
             "description": f"{len(high_impact)} high-impact features identified",
-            "features": [i["feature"] for i in high_impact],
+            "features": high_impact,
             "timestamp": "analysis_time"
         })
     
-    # Event 3: Correlate drift + impact (critical features)
-    drifted_feature_names = set(d["feature"] for d in drifted_features)
-    impact_feature_names = set(i["feature"] for i in high_impact)
-    
-    critical_features = list(drifted_feature_names & impact_feature_names)
+    # Event 3: Correlate drift + impact (critical features), strongest drift first
+    high_impact_set = set(high_impact)
+    critical_idx = drifted_idx[np.fromiter(
+        (f in high_impact_set for f in drifted_features),
+        dtype=bool, count=len(drifted_idx)
+    )]
+    critical_idx = rank_descending(drift_columns.drift_score, critical_idx)
+    critical_features = list(dict.fromkeys(drift_columns.features[critical_idx].tolist()))
     
     if critical_features:
         timeline["critical_features"] = critical_features
@@ -65,7 +78,7 @@ def build_timeline(drift_results: List[Dict], impact_results: List[Dict]) -> Dic
     
     # Generate summary
     timeline["summary"] = {
-        "total_features_analyzed": len(drift_results),
+        "total_features_analyzed": len(drift_columns),
         "drifted_features": len(drifted_features),
         "high_impact_features": len(high_impact),
         "critical_features": len(critical_features),
@@ -73,8 +86,15 @@ def build_timeline(drift_results: List[Dict], impact_results: List[Dict]) -> Dic
     }
     
     # Generate recommendations
+    severe_drift_count = int(np.count_nonzero(
+        drift_columns.severity[drifted_idx] == SEVERITY_LEVELS.index("High")
+    ))
+    new_categories = [
+        (drift_columns.features[i], drift_columns.details[i].get("statistics", {}).get("new_categories"))
+        for i in drifted_idx
+    ]
     timeline["recommendations"] = _generate_timeline_recommendations(
-        drifted_features, high_impact, critical_features
+        critical_features, [(f, cats) for f, cats in new_categories if cats], severe_drift_count
     )
     
     return timeline
@@ -92,7 +112,7 @@ def _assess_overall_severity(drifted, high_impact, critical) -> str:
         return "LOW - Routine monitoring"
 
 
-def _generate_timeline_recommendations(drifted, high_impact, critical) -> List[str]:
+def _generate_timeline_recommendations(critical, new_categories, severe_drift_count: int) -> List[str]:
     """Generate actionable recommendations based on timeline"""
     recommendations = []
     
@@ -106,19 +126,16 @@ def _generate_timeline_recommendations(drifted, high_impact, critical) -> List[s
             f"🔍 Investigate data pipeline for: {', '.join(feature_names)}"
         )
     
-    # Check for new categorical values
-    for feature in drifted:
-        if feature.get("statistics", {}).get("new_categories"):
-            new_cats = feature["statistics"]["new_categories"]
-            recommendations.append(
-                f"⚠️ Handle new categorical values in '{feature['feature']}': {new_cats}"
-            )
+    # Check for new categorical values (drifted features only)
+    for feature, new_cats in new_categories:
+        recommendations.append(
+            f"⚠️ Handle new categorical values in '{feature}': {new_cats}"
+        )
     
     # Check for severe distribution shifts
-    severe_drifts = [d for d in drifted if d.get("severity") == "High"]
-    if severe_drifts:
+    if severe_drift_count:
         recommendations.append(
-            f"📊 Severe distribution shifts detected in {len(severe_drifts)} features - consider feature engineering"
+            f"📊 Severe distribution shifts detected in {severe_drift_count} features - consider feature engineering"
         )
     
     if len(recommendations) == 0:
@@ -0,0 +1,165 @@
+"""Visualization data: fixed-size histograms and quantile summaries per feature"""
+from typing import Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+
+from app.config import DRIFT_METRIC_BINS, VISUALIZATION_MAX_CATEGORIES
+from app.services.baseline import profile_column
+from app.utils.stats import quantile_bin_edges, assign_bins
+
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+OTHER_CATEGORY = "<other>"
+
+
+def _round(values) -> list:
+    return [round(float(v), 4) for v in values]
+
+
+def _quantile_summary(values: np.ndarray) -> Optional[Dict]:
+    """Count, mean, range and fixed quantiles (np.quantile partitions, no full sort)"""
+    if len(values) == 0:
+        return None
+    quantiles = np.quantile(values, QUANTILES)
+    return {
+        "count": int(len(values)),
+        "mean": round(float(values.mean()), 4),
+        "min": round(float(values.min()), 4),
+        "max": round(float(values.max()), 4),
+        "quantiles": {f"p{int(q * 100)}": round(float(v), 4) for q, v in zip(QUANTILES, quantiles)}
+    }
+
+
+def _binned_shares(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    n_bins = max(len(edges) - 1, 1)
+    counts = np.bincount(assign_bins(values, edges), minlength=n_bins).astype(float)
+    return counts / counts.sum() if counts.sum() > 0 else counts
+
+
+def numeric_distribution(
+    train_sorted: np.ndarray,
+    old_values: np.ndarray,
+    new_values: np.ndarray,
+    edges: Optional[np.ndarray] = None,
+    bins: int = DRIFT_METRIC_BINS
+) -> Dict:
+    """
+    Histogram and quantile summary of one numerical feature for all three datasets
+
+    Bins are the training-quantile bins the drift metrics use (PSI, JS,
+    Hellinger): pass the profile's `bin_edges`, so the chart shows exactly
+    what was scored. Production values
+    outside the training range are counted in the edge bins, and their share
+    is reported separately under `out_of_range`.
+
+    Args:
+        train_sorted: Sorted, NaN-free training values (baseline profile)
+        old_values: NaN-free prod_old values
+        new_values: NaN-free prod_new values
+        edges: Bin edges of the drift pass (profile "bin_edges")
+        bins: Number of quantile bins when no edges are given (fewer if the
+            training data has ties)
+
+    Raises:
+        ValueError: If there are no training values to bin
+    """
+    if len(train_sorted) == 0:
+        raise ValueError("Cannot bin a feature with no training values")
+    if edges is None:
+        edges = quantile_bin_edges(train_sorted, bins)
+    widths = np.diff(edges)
+    samples = {"train": train_sorted, "prod_old": old_values, "prod_new": new_values}
+
+    histograms, out_of_range = {}, {}
+    for name, values in samples.items():
+        shares = _binned_shares(values, edges)
+        histograms[name] = {
+            "shares": _round(shares),
+            # share / width; None for a constant column (zero-width bin)
+            "density": _round(shares / widths) if len(widths) and np.all(widths > 0) else None
+        }
+        if name != "train" and len(values):
+            out_of_range[name] = {
+                "below": round(float(np.mean(values < edges[0])), 4),
+                "above": round(float(np.mean(values > edges[-1])), 4)
+            }
+
+    return {
+        "kind": "numeric",
+        "bin_edges": [float(e) for e in edges],
+        "histograms": histograms,
+        "out_of_range": out_of_range,
+        "summary": {name: _quantile_summary(values) for name, values in samples.items()}
+    }
+
+
+def categorical_distribution(
+    train_dist: pd.Series,
+    old_values: pd.Series,
+    new_values: pd.Series,
+    max_categories: int = VISUALIZATION_MAX_CATEGORIES
+) -> Dict:
+    """
+    Category shares of one categorical feature for all three datasets
+
+    Keeps the `max_categories` categories with the largest share in any
+    dataset (so new production categories show up) and folds the rest into
+    "<other>". For high-cardinality columns the training distribution is the
+    sketch's heavy hitters, as in drift detection.
+    """
+    dists = {
+        "train": train_dist,
+        "prod_old": old_values.value_counts(normalize=True),
+        "prod_new": new_values.value_counts(normalize=True)
+    }
+    peak = pd.concat(dists.values(), axis=1).max(axis=1)
+    categories = list(peak.nlargest(max_categories).index)
+
+    shares = {}
+    for name, dist in dists.items():
+        kept = dist.reindex(categories, fill_value=0.0).to_numpy(dtype=float)
+        shares[name] = _round(np.append(kept, max(0.0, 1.0 - kept.sum())))
+
+    return {
+        "kind": "categorical",
+        "categories": [str(c) for c in categories] + [OTHER_CATEGORY],
+        "shares": shares,
+        "distinct": {name: int(len(dist)) for name, dist in dists.items()}
+    }
+
+
+def build_visualization_data(
+    train_df: pd.DataFrame,
+    old_df: pd.DataFrame,
+    new_df: pd.DataFrame,
+    baseline: Optional[Dict[str, Dict]] = None,
+    features: Optional[Iterable[str]] = None
+) -> Dict[str, Dict]:
+    """
+    Fixed-size distribution data per feature, independent of row counts
+
+    Args:
+        train_df: Training data (baseline)
+        old_df: Production data before failure
+        new_df: Production data after failure
+        baseline: Optional precomputed profile from build_baseline_profile(train_df)
+        features: Restrict to these features (default: all columns)
+
+    Returns:
+        Dict of feature -> numeric_distribution / categorical_distribution
+        (all-missing numerical features are left out)
+    """
+    data = {}
+    for col in features if features is not None else train_df.columns:
+        profile = baseline[col] if baseline and col in baseline else profile_column(train_df[col])
+        old_clean, new_clean = old_df[col].dropna(), new_df[col].dropna()
+        if profile["kind"] == "numeric":
+            if profile["count"] == 0:
+                continue
+            data[col] = numeric_distribution(
+                profile["values"], old_clean.to_numpy(), new_clean.to_numpy(), edges=profile.get("bin_edges")
+            )
+        else:
+            data[col] = categorical_distribution(profile["distribution"], old_clean, new_clean)
+            if profile.get("high_cardinality"):
+                data[col]["distinct"]["train"] = int(profile["distinct"])
+    return data
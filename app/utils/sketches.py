@@ -0,0 +1,282 @@
+"""Probabilistic sketches for high-cardinality categorical columns"""
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+
+from app.config import (
+    HIGH_CARDINALITY_THRESHOLD,
+    SKETCH_WIDTH,
+    SKETCH_DEPTH,
+    SKETCH_HLL_PRECISION,
+    SKETCH_TOP_K,
+    SKETCH_BLOOM_FP_RATE
+)
+
+
+def hash_values(series: pd.Series) -> np.ndarray:
+    """Vectorized 64-bit hash of every value (same value -> same hash across frames)"""
+    return pd.util.hash_pandas_object(series.astype(object), index=False, categorize=False).to_numpy()
+
+
+def is_high_cardinality(series: pd.Series, threshold: int = HIGH_CARDINALITY_THRESHOLD) -> bool:
+    """True when a column has more than `threshold` distinct values
+
+    Only the first 2 * threshold rows are inspected, so the check is cheap
+    even on huge ID-like columns.
+    """
+    return bool(series.iloc[:2 * threshold].nunique() > threshold)
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Vectorized bit length of uint64 values (binary search over 6 shifts)"""
+    x = x.copy()
+    length = np.zeros(len(x), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = x >= (np.uint64(1) << np.uint64(shift))
+        length[high] += shift
+        x[high] >>= np.uint64(shift)
+    return length + (x > 0)
+
+
+class CountMinSketch:
+    """
+    Count-min sketch: frequency estimates that never undercount
+
+    Row indices use double hashing (h1 + d * h2) on one 64-bit hash, and
+    updates are one bincount per row, so a chunk of any size is O(n * depth).
+    """
+
+    def __init__(self, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+
+    def _indices(self, hashes: np.ndarray) -> np.ndarray:
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1 + rows * h2) % np.uint64(self.width)).astype(np.int64)
+
+    def update(self, hashes: np.ndarray):
+        for row, idx in enumerate(self._indices(hashes)):
+            self.table[row] += np.bincount(idx, minlength=self.width)
+        self.total += len(hashes)
+
+    def query(self, hashes: np.ndarray) -> np.ndarray:
+        indices = self._indices(hashes)
+        return self.table[np.arange(self.depth)[:, None], indices].min(axis=0)
+
+
+class HyperLogLog:
+    """HyperLogLog distinct-count estimator (mergeable via register max)"""
+
+    def __init__(self, precision: int = SKETCH_HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray):
+        p = np.uint64(self.precision)
+        idx = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        rest = hashes & ((np.uint64(1) << (np.uint64(64) - p)) - np.uint64(1))
+        rank = (64 - self.precision) - _bit_length(rest) + 1
+        # Max rank per register without a Python-level scatter: mark which
+        # (register, rank) pairs occur, then take the highest marked rank
+        seen = np.bincount(idx * 66 + rank, minlength=len(self.registers) * 66).reshape(-1, 66) > 0
+        highest = 65 - np.argmax(seen[:, ::-1], axis=1)
+        highest[~seen.any(axis=1)] = 0
+        self.registers = np.maximum(self.registers, highest.astype(np.uint8))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        merged = HyperLogLog(self.precision)
+        merged.registers = np.maximum(self.registers, other.registers)
+        return merged
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(float)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Small-range correction: linear counting
+            return float(m * np.log(m / zeros))
+        return float(raw)
+
+
+class BloomFilter:
+    """
+    Bloom filter over 64-bit hashes: membership with no false negatives
+
+    Sized for `capacity` distinct values at false-positive rate `fp_rate`;
+    bit positions use double hashing (h1 + i * h2) like CountMinSketch.
+    """
+
+    def __init__(self, capacity: int, fp_rate: float = SKETCH_BLOOM_FP_RATE):
+        capacity = max(int(capacity), 1)
+        self.size = max(64, int(np.ceil(-capacity * np.log(fp_rate) / np.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.size / capacity * np.log(2))))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, hashes: np.ndarray) -> np.ndarray:
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.hashes, dtype=np.uint64)[:, None]
+        return ((h1 + rows * h2) % np.uint64(self.size)).astype(np.int64)
+
+    def add(self, hashes: np.ndarray):
+        positions = self._positions(hashes).ravel()
+        np.bitwise_or.at(self.bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        positions = self._positions(hashes)
+        return ((self.bits[positions >> 3] >> (positions & 7)) & 1).all(axis=0)
+
+
+class CategoricalSketch:
+    """
+    Count-min + HyperLogLog + Bloom filter + heavy hitters for one categorical column
+
+    Heavy hitters are candidates from each chunk with high count-min
+    estimates, re-ranked by their estimate and pruned to top_k. The Bloom
+    filter answers "was this value ever seen?", which count-min cannot once
+    the distinct values outnumber its width and every cell is non-zero.
+    """
+
+    def __init__(self, top_k: int = SKETCH_TOP_K, expected_distinct: int = SKETCH_WIDTH):
+        self.top_k = top_k
+        self.cms = CountMinSketch()
+        self.hll = HyperLogLog()
+        self.bloom = BloomFilter(expected_distinct)
+        self.heavy_hitters: Dict = {}  # value -> hash
+
+    @classmethod
+    def from_series(cls, series: pd.Series, chunk_rows: int = 1_000_000,
+                    hashes: Optional[np.ndarray] = None, top_k: int = SKETCH_TOP_K) -> "CategoricalSketch":
+        """Sketch a column; a HyperLogLog pre-pass sizes the Bloom filter"""
+        clean = series.dropna()
+        if hashes is None:
+            hashes = hash_values(clean)
+        hll = HyperLogLog()
+        for start in range(0, len(clean), chunk_rows):
+            hll.update(hashes[start:start + chunk_rows])
+        sketch = cls(top_k, expected_distinct=int(hll.estimate() * 1.1) + 1)
+        sketch.hll = hll
+        for start in range(0, len(clean), chunk_rows):
+            sketch._update_counts(clean.iloc[start:start + chunk_rows], hashes[start:start + chunk_rows])
+        return sketch
+
+    def update(self, values: pd.Series, hashes: np.ndarray):
+        """Add a chunk (the Bloom filter keeps its construction-time capacity)"""
+        self.hll.update(hashes)
+        self._update_counts(values, hashes)
+
+    def _update_counts(self, values: pd.Series, hashes: np.ndarray):
+        self.cms.update(hashes)
+        self.bloom.add(hashes)
+
+        # Candidates: rows with the highest count-min estimates (no value_counts,
+        # whose hash table would grow with the number of distinct values)
+        # Any value holding >= 1/(4 * top_k) of the rows so far is a candidate;
+        # if none qualify, fall back to the rows with the highest estimates
+        estimates = self.cms.query(hashes)
+        rows = np.flatnonzero(estimates >= self.cms.total / (4 * self.top_k))
+        if len(rows) == 0:
+            top_rows = min(len(hashes), self.top_k * 4)
+            if top_rows == 0:
+                return
+            rows = np.argpartition(-estimates, top_rows - 1)[:top_rows]
+        rows = rows[~pd.Index(hashes[rows]).duplicated()]
+        for row in rows:
+            self.heavy_hitters.setdefault(values.iloc[row], hashes[row])
+        self._prune()
+
+    def _prune(self):
+        values = list(self.heavy_hitters)
+        hashes = np.array(list(self.heavy_hitters.values()), dtype=np.uint64)
+        counts = self.cms.query(hashes)
+        keep = np.argsort(-counts, kind="stable")[:self.top_k]
+        self.heavy_hitters = {values[i]: hashes[i] for i in keep}
+
+    @property
+    def count(self) -> int:
+        return self.cms.total
+
+    def distinct(self) -> int:
+        return int(round(self.hll.estimate()))
+
+    def top(self) -> pd.Series:
+        """Heavy hitters with estimated frequencies (proportions), most frequent first"""
+        if not self.heavy_hitters:
+            return pd.Series(dtype=float)
+        values = list(self.heavy_hitters)
+        counts = self.cms.query(np.array(list(self.heavy_hitters.values()), dtype=np.uint64))
+        dist = pd.Series(counts / max(self.count, 1), index=pd.Index(values, dtype=object))
+        return dist.sort_values(ascending=False)
+
+    def frequency(self, values) -> np.ndarray:
+        """Estimated proportions for arbitrary values"""
+        hashes = hash_values(pd.Series(list(values), dtype=object))
+        return self.cms.query(hashes) / max(self.count, 1)
+
+    def seen(self, values) -> np.ndarray:
+        """Whether each value occurred (no false negatives, SKETCH_BLOOM_FP_RATE false positives)"""
+        return self.bloom.contains(hash_values(pd.Series(list(values), dtype=object)))
+
+
+OTHER_BIN = "<other>"
+NEW_BIN = "<new>"
+
+
+def _tail_bins(values: pd.Index, freqs: np.ndarray, new_tail: float) -> pd.Series:
+    """Heavy-hitter proportions plus "<other>" and "<new>" bins for the tail"""
+    freqs = np.clip(freqs, 0, 1)
+    other = max(0.0, 1.0 - float(freqs.sum()) - new_tail)
+    return pd.Series(
+        np.append(freqs, [other, new_tail]),
+        index=pd.Index(list(values) + [OTHER_BIN, NEW_BIN], dtype=object)
+    )
+
+
+def compare_to_sketch(train_sketch: CategoricalSketch, prod_series: pd.Series, examples: int = 5) -> Dict:
+    """
+    Compare a production column with a training sketch without exact counting
+
+    Both sides are reduced to the union of their heavy hitters plus an
+    "<other>" bin, and prod tail rows whose value training never saw go to
+    a "<new>" bin, so PSI/TVD work on at most 2 * top_k + 2 bins. A value
+    is "never seen" when the training Bloom filter does not contain it, so
+    the new-row share is undercounted by at most the filter's false-positive
+    rate at any cardinality. The number of distinct new values is estimated
+    from the merged HyperLogLog.
+
+    Returns:
+        Dict with aligned train/prod distributions, the prod sketch and
+        new/missing value estimates
+    """
+    clean = prod_series.dropna()
+    hashes = hash_values(clean)
+    prod_sketch = CategoricalSketch.from_series(clean, hashes=hashes, top_k=train_sketch.top_k)
+
+    train_top, prod_top = train_sketch.top(), prod_sketch.top()
+    values = train_top.index.union(prod_top.index, sort=False)
+    value_hashes = hash_values(pd.Series(list(values), dtype=object))
+
+    unseen_rows = ~train_sketch.bloom.contains(hashes)
+    new_tail = float((unseen_rows & ~np.isin(hashes, value_hashes)).mean()) if len(hashes) else 0.0
+    train_dist = _tail_bins(values, train_sketch.cms.query(value_hashes) / max(train_sketch.count, 1), 0.0)
+    prod_dist = _tail_bins(values, prod_sketch.cms.query(value_hashes) / max(prod_sketch.count, 1), new_tail)
+
+    union_distinct = int(round(train_sketch.hll.merge(prod_sketch.hll).estimate()))
+    new_values = prod_top.index[~train_sketch.seen(prod_top.index)]
+    missing_values = train_top.index[~prod_sketch.seen(train_top.index)]
+
+    return {
+        "train_dist": train_dist,
+        "prod_dist": prod_dist,
+        "prod_sketch": prod_sketch,
+        "prod_distinct": prod_sketch.distinct(),
+        "new_distinct": max(0, union_distinct - train_sketch.distinct()),
+        "new_row_share": float(unseen_rows.mean()) if len(unseen_rows) else 0.0,
+        "new_examples": list(new_values[:examples]),
+        "missing_examples": list(missing_values[:examples])
+    }
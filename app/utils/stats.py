@@ -1,7 +1,12 @@
 """Statistical utility functions"""
 import numpy as np
 import pandas as pd
-from typing import Union
+from typing import Union, Dict, Iterable, Optional, Tuple
+
+from app.config import KS_SEVERITY_THRESHOLDS, PSI_MODERATE_THRESHOLD, PSI_SEVERE_THRESHOLD, DRIFT_METRIC_BINS
+
+# Metrics available in detect_drift's multi-metric mode
+SUPPORTED_DRIFT_METRICS = ("ks", "psi", "wasserstein", "js", "hellinger", "energy")
 
 def calculate_psi(baseline: pd.Series, current: pd.Series, bins: int = 10) -> float:
     """
@@ -41,23 +46,7 @@ def calculate_psi(baseline: pd.Series, current: pd.Series, bins: int = 10) -> fl
         baseline_dist = baseline.value_counts(normalize=True, dropna=False)
         current_dist = current.value_counts(normalize=True, dropna=False)
         
-        # Align both distributions
-        all_categories = set(baseline_dist.index) | set(current_dist.index)
-        
-        psi = 0
-        for category in all_categories:
-            expected_pct = baseline_dist.get(category, 0.0001)  # Small value to avoid log(0)
-            actual_pct = current_dist.get(category, 0.0001)
-            
-            # Ensure no zero values
-            if expected_pct == 0:
-                expected_pct = 0.0001
-            if actual_pct == 0:
-                actual_pct = 0.0001
-            
-            psi += (actual_pct - expected_pct) * np.log(actual_pct / expected_pct)
-        
-        return psi
+        return calculate_psi_from_distributions(baseline_dist, current_dist)
     
     # Handle numerical data - bin it first
     else:
@@ -97,6 +86,237 @@ def calculate_psi(baseline: pd.Series, current: pd.Series, bins: int = 10) -> fl
         return psi
 
 
+def calculate_psi_from_distributions(baseline_dist: pd.Series, current_dist: pd.Series) -> float:
+    """
+    Calculate PSI from two precomputed category distributions (proportions)
+    
+    Lets callers reuse a baseline distribution across many comparisons.
+    """
+    expected_pct, actual_pct = align_distributions(baseline_dist, current_dist)
+    
+    # Small value to avoid log(0)
+    expected_pct = np.where(expected_pct == 0, 0.0001, expected_pct)
+    actual_pct = np.where(actual_pct == 0, 0.0001, actual_pct)
+    
+    return float(np.sum((actual_pct - expected_pct) * np.log(actual_pct / expected_pct)))
+
+
+def align_distributions(baseline_dist: pd.Series, current_dist: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Two distributions as arrays over the union of their categories
+    
+    Vectorized (index union plus reindex); a category missing on one side counts as 0.
+    """
+    baseline = pd.Series(baseline_dist.to_numpy(dtype=float), index=baseline_dist.index.astype(object))
+    current = pd.Series(current_dist.to_numpy(dtype=float), index=current_dist.index.astype(object))
+    all_categories = baseline.index.union(current.index, sort=False)
+    return (
+        baseline.reindex(all_categories, fill_value=0).to_numpy(),
+        current.reindex(all_categories, fill_value=0).to_numpy()
+    )
+
+
+def quantile_bin_edges(values: np.ndarray, bins: int = 10) -> np.ndarray:
+    """
+    Quantile bin edges of a baseline sample, as used by calculate_psi
+    
+    Equivalent to pd.qcut(values, q=bins, retbins=True, duplicates='drop').
+    """
+    return np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)))
+
+
+def assign_bins(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """
+    Vectorized bin index for each value given quantile_bin_edges
+    
+    Bins are right-closed like pd.cut(include_lowest=True); values outside
+    the baseline range are clipped into the first/last bin.
+    """
+    n_bins = max(len(edges) - 1, 1)
+    return np.clip(np.searchsorted(edges, values, side="left") - 1, 0, n_bins - 1)
+
+
+def parse_drift_metrics(metrics: Optional[Union[str, Iterable[str]]]) -> Tuple[str, ...]:
+    """
+    Normalize a metric selection ("ks,psi" or a list) to a tuple
+    
+    Raises:
+        ValueError: If a metric is not in SUPPORTED_DRIFT_METRICS
+    """
+    if metrics is None:
+        return ()
+    if isinstance(metrics, str):
+        metrics = metrics.split(",")
+    selected = tuple(dict.fromkeys(m.strip().lower() for m in metrics if m and m.strip()))
+    unknown = [m for m in selected if m not in SUPPORTED_DRIFT_METRICS]
+    if unknown:
+        raise ValueError(f"Unknown drift metrics {unknown}; supported: {list(SUPPORTED_DRIFT_METRICS)}")
+    return selected
+
+
+def _sorted_histogram(sorted_values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """
+    Bin counts of an already sorted array, matching assign_bins
+    
+    Only the inner edges are searched (O(bins * log n)); values outside the
+    baseline range fall into the first/last bin.
+    """
+    inner = np.searchsorted(sorted_values, edges[1:-1], side="left")
+    return np.diff(np.concatenate([[0], inner, [len(sorted_values)]])).astype(float)
+
+
+def histogram_drift_metrics(expected: np.ndarray, actual: np.ndarray, metrics: Iterable[str]) -> Dict[str, float]:
+    """
+    PSI, Jensen-Shannon distance and Hellinger distance from two aligned histograms
+    
+    Args:
+        expected: Baseline counts or proportions per bin
+        actual: Current counts or proportions per bin (same bins)
+        metrics: Any of "psi", "js", "hellinger" (others are ignored)
+        
+    Returns:
+        Dict of metric name -> value
+    """
+    p = expected / expected.sum() if expected.sum() > 0 else expected
+    q = actual / actual.sum() if actual.sum() > 0 else actual
+    result = {}
+    
+    if "psi" in metrics:
+        p_floor = np.where(p == 0, 0.0001, p)
+        q_floor = np.where(q == 0, 0.0001, q)
+        result["psi"] = float(np.sum((q_floor - p_floor) * np.log(q_floor / p_floor)))
+    
+    if "js" in metrics:
+        # Same as scipy.spatial.distance.jensenshannon (natural log)
+        m = (p + q) / 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            kl_p = np.where(p > 0, p * np.log(p / m), 0.0).sum()
+            kl_q = np.where(q > 0, q * np.log(q / m), 0.0).sum()
+        result["js"] = float(np.sqrt(max(0.0, (kl_p + kl_q) / 2)))
+    
+    if "hellinger" in metrics:
+        result["hellinger"] = float(np.sqrt(0.5 * np.sum((np.sqrt(p) - np.sqrt(q)) ** 2)))
+    
+    return result
+
+
+def numeric_drift_metrics(
+    train_sorted: np.ndarray,
+    prod_sorted: np.ndarray,
+    metrics: Iterable[str],
+    bins: int = DRIFT_METRIC_BINS,
+    edges: Optional[np.ndarray] = None
+) -> Dict[str, float]:
+    """
+    Any subset of SUPPORTED_DRIFT_METRICS for one numerical column in one pass
+    
+    Both inputs must be sorted and NaN-free. KS, Wasserstein and energy
+    distance share a single pair of empirical CDFs evaluated on the merged
+    sample (the formulas scipy uses for ks_2samp, wasserstein_distance and
+    energy_distance); PSI, JS and Hellinger share one histogram over the
+    training quantile bins (`edges` from the baseline profile, or computed
+    from `bins`).
+    
+    Returns:
+        Dict of metric name -> value (empty if either side is empty)
+    """
+    metrics = set(metrics)
+    result = {}
+    if len(train_sorted) == 0 or len(prod_sorted) == 0:
+        return result
+    
+    if metrics & {"ks", "wasserstein", "energy"}:
+        grid = np.sort(np.concatenate([train_sorted, prod_sorted]), kind="mergesort")
+        gap = np.abs(
+            np.searchsorted(train_sorted, grid, side="right") / len(train_sorted)
+            - np.searchsorted(prod_sorted, grid, side="right") / len(prod_sorted)
+        )
+        deltas = np.diff(grid)
+        if "ks" in metrics:
+            result["ks"] = float(gap.max())
+        if "wasserstein" in metrics:
+            result["wasserstein"] = float(np.sum(gap[:-1] * deltas))
+        if "energy" in metrics:
+            result["energy"] = float(np.sqrt(2 * np.sum(gap[:-1] ** 2 * deltas)))
+    
+    if metrics & {"psi", "js", "hellinger"}:
+        if edges is None:
+            edges = quantile_bin_edges(train_sorted, bins)
+        result.update(histogram_drift_metrics(
+            _sorted_histogram(train_sorted, edges), _sorted_histogram(prod_sorted, edges), metrics
+        ))
+    
+    return result
+
+
+def ks_bounds(train_sorted: np.ndarray, prod_values: np.ndarray, bins: int = 32) -> Tuple[float, float]:
+    """
+    Lower and upper bounds on the two-sample KS statistic from coarse bins
+    
+    Both empirical CDFs are evaluated exactly at `bins` training quantiles
+    (a binary search per edge on the sorted training values, one
+    searchsorted of the production values against the edges). Between two
+    edges each CDF can only rise to its value at the next edge, so
+    max(F(e_i+1) - G(e_i), G(e_i+1) - F(e_i)) bounds the gap inside the bin.
+    Costs O(m log bins) instead of sorting both samples.
+    
+    Returns:
+        Tuple of (lower bound, upper bound)
+    """
+    n, m = len(train_sorted), len(prod_values)
+    positions = (np.linspace(0, 1, bins + 1)[1:-1] * (n - 1)).astype(np.int64)
+    edges = np.unique(train_sorted[positions])
+    
+    train_cdf = np.searchsorted(train_sorted, edges, side="right") / n
+    prod_counts = np.bincount(np.searchsorted(edges, prod_values, side="left"), minlength=len(edges) + 1)
+    prod_cdf = np.cumsum(prod_counts)[:len(edges)] / m
+    
+    train_cdf = np.concatenate([[0.0], train_cdf, [1.0]])
+    prod_cdf = np.concatenate([[0.0], prod_cdf, [1.0]])
+    lower = float(np.abs(train_cdf - prod_cdf).max())
+    upper = float(np.maximum(train_cdf[1:] - prod_cdf[:-1], prod_cdf[1:] - train_cdf[:-1]).max())
+    return lower, upper
+
+
+def ks_asymptotic_pvalue(ks_stat: float, n: int, m: int) -> float:
+    """Asymptotic two-sample KS p-value (Kolmogorov distribution)"""
+    from scipy.stats import kstwobign
+    
+    return float(kstwobign.sf(ks_stat * np.sqrt(n * m / (n + m))))
+
+
+def adjust_pvalues(p_values: np.ndarray, method: str = "bh") -> np.ndarray:
+    """
+    Multiple-testing adjusted p-values
+    
+    Args:
+        p_values: Raw p-values, one per test
+        method: "bh" (Benjamini-Hochberg, false discovery rate) or
+            "holm" (Holm-Bonferroni, family-wise error rate)
+        
+    Returns:
+        Adjusted p-values in the input order
+    """
+    p_values = np.asarray(p_values, dtype=float)
+    m = len(p_values)
+    if m == 0:
+        return p_values
+    order = np.argsort(p_values, kind="stable")
+    ranked = p_values[order]
+    
+    if method == "bh":
+        scaled = ranked * m / np.arange(1, m + 1)
+        adjusted = np.minimum.accumulate(scaled[::-1])[::-1]
+    elif method == "holm":
+        adjusted = np.maximum.accumulate(ranked * (m - np.arange(m)))
+    else:
+        raise ValueError(f"Unknown p-value correction '{method}'; use 'bh', 'holm' or 'none'")
+    
+    result = np.empty(m)
+    result[order] = np.minimum(adjusted, 1.0)
+    return result
+
+
 def get_severity_level(score: float, method: str = "ks") -> str:
     """
     Convert drift score to severity level
@@ -110,20 +330,21 @@ def get_severity_level(score: float, method: str = "ks") -> str:
     """
     if method == "ks":
         # KS statistic ranges from 0 to 1
-        if score < 0.1:
+        low, moderate, high = KS_SEVERITY_THRESHOLDS
+        if score < low:
             return "None"
-        elif score < 0.2:
+        elif score < moderate:
             return "Low"
-        elif score < 0.3:
+        elif score < high:
             return "Moderate"
         else:
             return "High"
     
     elif method == "psi":
         # PSI thresholds
-        if score < 0.1:
+        if score < PSI_MODERATE_THRESHOLD:
             return "None"
-        elif score < 0.25:
+        elif score < PSI_SEVERE_THRESHOLD:
             return "Moderate"
         else:
             return "High"
@@ -154,24 +375,8 @@ def calculate_jensen_shannon_divergence(baseline: pd.Series, current: pd.Series)
     
     Symmetric measure of distribution similarity (range: 0 to 1)
     """
-    from scipy.spatial.distance import jensenshannon
-    
-    # Get probability distributions
-    baseline_dist = baseline.value_counts(normalize=True, dropna=False).sort_index()
-    current_dist = current.value_counts(normalize=True, dropna=False).sort_index()
-    
-    # Align indices
-    all_vals = sorted(set(baseline_dist.index) | set(current_dist.index))
-    
-    p = np.array([baseline_dist.get(v, 0) for v in all_vals])
-    q = np.array([current_dist.get(v, 0) for v in all_vals])
-    
-    # Add small epsilon to avoid log(0)
-    p = p + 1e-10
-    q = q + 1e-10
-    
-    # Normalize
-    p = p / p.sum()
-    q = q / q.sum()
+    baseline_dist = baseline.value_counts(normalize=True, dropna=False)
+    current_dist = current.value_counts(normalize=True, dropna=False)
     
-    return jensenshannon(p, q)
+    p, q = align_distributions(baseline_dist, current_dist)
+    return histogram_drift_metrics(p, q, ("js",))["js"]
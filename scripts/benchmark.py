@@ -0,0 +1,227 @@
+# Benchmark Suite for Model Autopsy AI
+#
+# Times every pipeline stage on synthetic data of a chosen shape, stores the
+# results as JSON and flags regressions against a saved baseline.
+#
+#   python scripts/benchmark.py --rows 100000 --numeric-cols 50 --categorical-cols 10
+#   python scripts/benchmark.py --rows 100000 --save-baseline benchmarks/baseline.json
+#   python scripts/benchmark.py --rows 100000 --baseline benchmarks/baseline.json
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from unittest import mock
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+from starlette.datastructures import UploadFile
+
+from generate_sample_data import generate_synthetic_data
+from app.services import llm_diagnosis
+from app.services.data_loader import load_and_validate
+from app.services.drift_detection import detect_drift
+from app.services.impact_analysis import analyze_impact
+from app.services.timeline import build_timeline
+from app.services.llm_diagnosis import generate_diagnosis
+from app.reports.report_builder import build_report
+
+STAGES = [
+    "load_and_validate",
+    "detect_drift",
+    "analyze_impact",
+    "build_timeline",
+    "generate_diagnosis",
+    "build_report"
+]
+
+
+def _load(paths):
+    """Run the async loader on local files wrapped as uploads"""
+    handles = [open(paths[name], "rb") for name in ("train", "prod_old", "prod_new")]
+    try:
+        uploads = [UploadFile(file=h, filename=os.path.basename(h.name)) for h in handles]
+        return asyncio.run(load_and_validate(*uploads))
+    finally:
+        for h in handles:
+            h.close()
+
+
+def run_stages(paths):
+    """Run the pipeline once, returning per-stage wall-clock seconds"""
+    timings = {}
+
+    def timed(stage, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings[stage] = time.perf_counter() - start
+        return result
+
+    train_df, old_df, new_df = timed("load_and_validate", _load, paths)
+    drift_results = timed("detect_drift", detect_drift, train_df, new_df)
+    impact_results = timed("analyze_impact", analyze_impact, train_df, old_df, new_df)
+    timeline = timed("build_timeline", build_timeline, drift_results, impact_results)
+    diagnosis = timed("generate_diagnosis", generate_diagnosis, drift_results, impact_results, timeline)
+    timed("build_report", build_report, drift_results, impact_results, timeline, diagnosis)
+
+    return timings
+
+
+def run_benchmark(paths, repeat=3):
+    """Run the pipeline `repeat` times and summarize each stage"""
+    # Benchmark the deterministic rule-based diagnosis, never a network call;
+    # the key is only blanked for the duration of the runs
+    runs = []
+    with mock.patch.object(llm_diagnosis, "OPENAI_API_KEY", ""):
+        for i in range(repeat):
+            runs.append(run_stages(paths))
+            print(f"  run {i + 1}/{repeat}: total {sum(runs[-1].values()):.3f}s")
+
+    stages = {}
+    for stage in STAGES:
+        samples = [run[stage] for run in runs]
+        stages[stage] = {
+            "min_s": round(min(samples), 6),
+            "median_s": round(statistics.median(samples), 6),
+            "runs_s": [round(x, 6) for x in samples]
+        }
+    return stages
+
+
+def _max_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+
+
+def compare_to_baseline(results, baseline, tolerance=0.25, min_delta_s=0.01):
+    """
+    Flag stages whose median time grew beyond tolerance vs the baseline
+
+    A stage regresses when it is both `tolerance` (relative) and `min_delta_s`
+    (absolute) slower, so sub-millisecond noise never trips the check.
+    """
+    regressions = []
+    for stage, current in results["stages"].items():
+        previous = baseline.get("stages", {}).get(stage)
+        if previous is None:
+            continue
+        before, after = previous["median_s"], current["median_s"]
+        if after > before * (1 + tolerance) and after - before > min_delta_s:
+            regressions.append({
+                "stage": stage,
+                "baseline_median_s": before,
+                "current_median_s": after,
+                "slowdown_pct": round((after / before - 1) * 100, 1) if before else None
+            })
+    return regressions
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark every autopsy pipeline stage")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--numeric-cols", type=int, default=8)
+    parser.add_argument("--categorical-cols", type=int, default=2)
+    parser.add_argument("--cardinality", type=int, default=10)
+    parser.add_argument("--drift", type=float, default=0.5)
+    parser.add_argument("--drift-fraction", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-dir", help="Reuse/generate data here instead of a temp dir")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Baseline results JSON to compare against")
+    parser.add_argument("--save-baseline", help="Also write these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown")
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    config = {
+        "rows": args.rows,
+        "numeric_cols": args.numeric_cols,
+        "categorical_cols": args.categorical_cols,
+        "cardinality": args.cardinality,
+        "drift": args.drift,
+        "drift_fraction": args.drift_fraction,
+        "seed": args.seed,
+        "repeat": args.repeat
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or tmp_dir
+        existing = {name: os.path.join(data_dir, f"{name}.csv") for name in ("train", "prod_old", "prod_new")}
+        if args.data_dir and all(os.path.exists(p) for p in existing.values()):
+            print(f"📂 Reusing data in {data_dir}")
+            paths = existing
+        else:
+            print(f"🧪 Generating {args.rows} rows x {args.numeric_cols + args.categorical_cols} columns...")
+            paths = generate_synthetic_data(
+                data_dir, rows=args.rows,
+                numeric_cols=args.numeric_cols, categorical_cols=args.categorical_cols,
+                cardinality=args.cardinality, drift=args.drift,
+                drift_fraction=args.drift_fraction, seed=args.seed
+            )
+
+        print("⏱️ Running benchmark...")
+        stages = run_benchmark(paths, repeat=args.repeat)
+
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "config": config,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__
+        },
+        "max_rss_mb": _max_rss_mb(),
+        "stages": stages
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print("⚠️ Baseline was recorded with a different config; comparison may be meaningless")
+        results["regressions"] = compare_to_baseline(results, baseline, tolerance=args.tolerance)
+        if results["regressions"]:
+            exit_code = 1
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    print("\n📊 Stage medians:")
+    for stage in STAGES:
+        print(f"   {stage:<20} {stages[stage]['median_s']:.4f}s")
+    for regression in results.get("regressions", []):
+        print(f"❌ REGRESSION: {regression['stage']} {regression['baseline_median_s']:.4f}s -> "
+              f"{regression['current_median_s']:.4f}s")
+    if args.baseline and exit_code == 0:
+        print("✅ No regressions against baseline")
+    print(f"\nResults written to {args.output}")
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,7 @@
 # Sample Test Data Generator for Model Autopsy AI
 
+import argparse
+import os
 import pandas as pd
 import numpy as np
 
@@ -74,5 +76,119 @@ def generate_sample_data():
     print("   - location (new category: 'remote')")
     print("   - education (new category: 'phd')")
 
+def _synthetic_chunk(rng, rows, spec, drifted):
+    """Generate one chunk of rows for a synthetic dataset"""
+    data = {}
+    for col in spec["columns"]:
+        name, kind = col["name"], col["kind"]
+        shift = col["drift"] if drifted else 0.0
+        
+        if kind == "float":
+            data[name] = rng.normal(col["mean"] + shift * col["std"], col["std"] * (1 + shift / 2), rows)
+        elif kind == "int":
+            data[name] = rng.poisson(col["lam"] * (1 + shift), rows)
+        elif kind == "bool":
+            data[name] = rng.random(rows) < min(0.95, col["p"] + shift / 4)
+        else:
+            # Zipf-like categorical; drift moves mass onto categories unseen in training
+            cardinality = col["cardinality"]
+            new_categories = int(cardinality * shift / 2) if drifted else 0
+            codes = np.minimum(rng.zipf(1.3, rows) - 1, cardinality + new_categories - 1)
+            if new_categories:
+                tail = rng.random(rows) < shift / 2
+                codes[tail] = cardinality + rng.integers(0, new_categories, int(tail.sum()))
+            data[name] = np.char.add(f"{name}_", codes.astype(str))
+    
+    return pd.DataFrame(data)
+
+
+def build_synthetic_spec(numeric_cols=8, categorical_cols=2, cardinality=10,
+                         drift=0.5, drift_fraction=0.5, seed=42):
+    """
+    Describe a synthetic schema: mixed float/int/bool numeric columns plus
+    categorical columns, with a `drift_fraction` of columns drifting by
+    `drift` (in standard deviations for floats) in prod_new
+    """
+    rng = np.random.default_rng(seed)
+    kinds = ["float", "float", "int", "bool"]
+    columns = []
+    
+    for i in range(numeric_cols):
+        columns.append({
+            "name": f"num_{i}",
+            "kind": kinds[i % len(kinds)],
+            "mean": float(rng.uniform(-100, 100)),
+            "std": float(rng.uniform(1, 20)),
+            "lam": float(rng.uniform(1, 50)),
+            "p": float(rng.uniform(0.1, 0.9))
+        })
+    for i in range(categorical_cols):
+        columns.append({"name": f"cat_{i}", "kind": "category", "cardinality": cardinality})
+    
+    drifted = rng.random(len(columns)) < drift_fraction
+    for col, is_drifted in zip(columns, drifted):
+        col["drift"] = float(drift) if is_drifted else 0.0
+    
+    return {"seed": seed, "columns": columns}
+
+
+def generate_synthetic_data(output_dir, rows=100_000, numeric_cols=8, categorical_cols=2,
+                            cardinality=10, drift=0.5, drift_fraction=0.5,
+                            chunk_size=None, seed=42):
+    """
+    Generate train / prod_old / prod_new CSVs of arbitrary shape
+    
+    Rows are generated and appended in chunks, so row counts up to 10^8 never
+    need the full frame in memory. Chunk size defaults to ~5M cells per chunk.
+    
+    Returns:
+        Dict of file paths keyed by 'train', 'prod_old', 'prod_new'
+    """
+    spec = build_synthetic_spec(numeric_cols, categorical_cols, cardinality, drift, drift_fraction, seed)
+    total_cols = max(1, numeric_cols + categorical_cols)
+    chunk_size = chunk_size or max(1_000, 5_000_000 // total_cols)
+    os.makedirs(output_dir, exist_ok=True)
+    
+    paths = {}
+    for offset, (name, drifted) in enumerate([("train", False), ("prod_old", False), ("prod_new", True)]):
+        rng = np.random.default_rng(seed + offset + 1)
+        path = os.path.join(output_dir, f"{name}.csv")
+        written = 0
+        while written < rows:
+            n = min(chunk_size, rows - written)
+            chunk = _synthetic_chunk(rng, n, spec, drifted)
+            chunk.to_csv(path, mode="w" if written == 0 else "a", header=written == 0, index=False)
+            written += n
+        paths[name] = path
+    
+    return paths
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Generate sample or synthetic autopsy datasets")
+    parser.add_argument("--rows", type=int, help="Rows per file (enables synthetic mode)")
+    parser.add_argument("--numeric-cols", type=int, default=8)
+    parser.add_argument("--categorical-cols", type=int, default=2)
+    parser.add_argument("--cardinality", type=int, default=10, help="Categories per categorical column")
+    parser.add_argument("--drift", type=float, default=0.5, help="Drift magnitude for drifted columns")
+    parser.add_argument("--drift-fraction", type=float, default=0.5, help="Fraction of columns that drift")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Rows generated per chunk")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", default="synthetic_data")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    generate_sample_data()
+    args = _parse_args()
+    if args.rows is None:
+        generate_sample_data()
+    else:
+        paths = generate_synthetic_data(
+            args.output_dir, rows=args.rows,
+            numeric_cols=args.numeric_cols, categorical_cols=args.categorical_cols,
+            cardinality=args.cardinality, drift=args.drift, drift_fraction=args.drift_fraction,
+            chunk_size=args.chunk_size, seed=args.seed
+        )
+        print("✅ Synthetic data files created:")
+        for path in paths.values():
+            print(f"   - {path}")
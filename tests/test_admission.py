@@ -0,0 +1,120 @@
+"""Tests for upload limits and admission control"""
+import asyncio
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main
+from app.main import app as api
+from app.services import admission
+from app.services.admission import AdmissionController, AdmissionRejected, estimate_cost, peek_csv_shape
+
+
+def _csv_bytes(seed=0, n=200):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'income': rng.normal(50000, 10000, n),
+        'age': rng.integers(18, 90, n),
+        'location': rng.choice(['urban', 'rural'], n)
+    }).to_csv(index=False).encode()
+
+
+@pytest.mark.parametrize('n', [50, 20000])
+def test_peek_estimates_shape_without_moving_the_file(n):
+    content = _csv_bytes(n=n)
+    fileobj = io.BytesIO(content)
+    fileobj.seek(0)
+
+    rows, columns = peek_csv_shape(fileobj, len(content))
+
+    assert columns == 3
+    assert rows == pytest.approx(n, rel=0.05)
+    assert fileobj.tell() == 0
+
+
+def test_estimate_cost_caps_rows_in_sampling_mode():
+    full = estimate_cost([(1_000_000, 10, 50_000_000)])
+    sampled = estimate_cost([(1_000_000, 10, 50_000_000)], sample_size=1000)
+
+    assert sampled < full / 100
+
+
+def test_queue_then_reject_then_admit_in_order():
+    async def scenario():
+        controller = AdmissionController(memory_budget_mb=1, max_concurrent=1, max_queue=1, queue_timeout=5)
+        first = await controller.acquire(100)
+        waiting = asyncio.create_task(controller.acquire(100))
+        await asyncio.sleep(0)
+        assert controller.status()['queued'] == 1
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire(100)
+        assert rejected.value.status_code == 429 and rejected.value.retry_after >= 1
+
+        controller.release(first)
+        second = await waiting
+        assert controller.status()['running'] == 1
+        controller.release(second)
+        return controller.status()
+
+    status = asyncio.run(scenario())
+    assert status['running'] == 0 and status['admitted_total'] == 2 and status['rejected_total'] == 1
+
+
+def test_queue_timeout_and_oversized_requests():
+    async def scenario():
+        controller = AdmissionController(memory_budget_mb=1, max_concurrent=4, max_queue=4, queue_timeout=0.05)
+        held = await controller.acquire(800_000)
+        with pytest.raises(AdmissionRejected, match='waited'):
+            await controller.acquire(800_000)  # over the memory budget until `held` is released
+        with pytest.raises(AdmissionRejected) as oversized:
+            await controller.acquire(2 * 2**20)
+        assert oversized.value.status_code == 413
+        controller.release(held)
+        assert controller.status()['queued'] == 0
+
+    asyncio.run(scenario())
+
+
+def test_routes_return_429_with_retry_after(monkeypatch):
+    controller = AdmissionController(max_concurrent=1, max_queue=0)
+    controller._start(0)  # saturate the only slot
+    monkeypatch.setattr(admission, '_admission_controller', controller)
+    client = TestClient(api)
+
+    response = client.post('/analyze-drift', files={
+        'train': ('train.csv', _csv_bytes(0)),
+        'production': ('prod.csv', _csv_bytes(1))
+    })
+
+    assert response.status_code == 429
+    assert int(response.headers['retry-after']) >= 1
+    assert client.get('/admission/status').json()['rejected_total'] == 1
+
+
+def test_routes_release_capacity_after_success(monkeypatch):
+    controller = AdmissionController(max_concurrent=1, max_queue=0)
+    monkeypatch.setattr(admission, '_admission_controller', controller)
+    client = TestClient(api)
+
+    for seed in range(2):
+        response = client.post('/analyze-drift', files={
+            'train': ('train.csv', _csv_bytes(0)),
+            'production': ('prod.csv', _csv_bytes(seed + 1))
+        })
+        assert response.status_code == 200
+
+    status = client.get('/admission/status').json()
+    assert status['running'] == 0 and status['memory_in_use_mb'] == 0 and status['admitted_total'] == 2
+
+
+def test_oversized_body_rejected_before_reading(monkeypatch):
+    monkeypatch.setattr(app.main, 'MAX_UPLOAD_MB', 0.001)
+    client = TestClient(api)
+
+    response = client.post('/analyze-drift', files={'train': ('train.csv', _csv_bytes(n=2000))})
+
+    assert response.status_code == 413
@@ -0,0 +1,45 @@
+"""Tests for batch autopsy with a shared baseline profile"""
+import numpy as np
+import pandas as pd
+
+from app.services.baseline import build_baseline_profile
+from app.services.batch import run_batch_autopsy
+from app.services.drift_detection import detect_drift
+from app.services.impact_analysis import analyze_impact
+
+
+def _frame(rng, n=400, age_mean=35, extra_category=False):
+    locations = ['urban', 'rural', 'remote'] if extra_category else ['urban', 'rural']
+    return pd.DataFrame({
+        'age': rng.normal(age_mean, 10, n),
+        'income': rng.normal(50000, 15000, n),
+        'location': rng.choice(locations, n)
+    })
+
+
+def test_baseline_profile_gives_identical_results():
+    rng = np.random.default_rng(1)
+    train, old, new = _frame(rng), _frame(rng), _frame(rng, age_mean=45, extra_category=True)
+    baseline = build_baseline_profile(train)
+
+    assert detect_drift(train, new, baseline=baseline) == detect_drift(train, new)
+    assert analyze_impact(train, old, new, baseline=baseline) == analyze_impact(train, old, new)
+
+
+def test_batch_ranks_models_by_severity():
+    rng = np.random.default_rng(2)
+    train = _frame(rng)
+    models = [
+        ("stable", _frame(rng), _frame(rng)),
+        ("drifted", _frame(rng), _frame(rng, age_mean=80, extra_category=True)),
+        ("broken", _frame(rng), pd.DataFrame({'other': [1, 2, 3]}))
+    ]
+
+    result = run_batch_autopsy(train, models, max_workers=2)
+
+    statuses = {m["model"]: m["status"] for m in result["models"]}
+    assert statuses == {"stable": "completed", "drifted": "completed", "broken": "failed"}
+
+    summary = result["fleet_summary"]
+    assert summary["models_failed"] == ["broken"]
+    assert [r["model"] for r in summary["ranking"]] == ["drifted", "stable"]
@@ -0,0 +1,45 @@
+"""Tests for the synthetic data generator and benchmark regression check"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from generate_sample_data import generate_synthetic_data
+from benchmark import run_benchmark, compare_to_baseline, STAGES
+from app.services import llm_diagnosis
+
+
+def test_chunked_generation_has_requested_shape(tmp_path):
+    paths = generate_synthetic_data(
+        str(tmp_path), rows=2500, numeric_cols=6, categorical_cols=3,
+        cardinality=20, chunk_size=1000
+    )
+
+    train = pd.read_csv(paths['train'])
+    new = pd.read_csv(paths['prod_new'])
+    assert train.shape == (2500, 9)
+    assert list(train.columns) == list(new.columns)
+    assert train['cat_0'].nunique() <= 20
+
+
+def test_benchmark_times_every_stage(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_diagnosis, 'OPENAI_API_KEY', 'sk-test')
+    paths = generate_synthetic_data(str(tmp_path), rows=300, numeric_cols=4, categorical_cols=1)
+    stages = run_benchmark(paths, repeat=1)
+
+    assert set(stages) == set(STAGES)
+    assert all(stage['median_s'] >= 0 for stage in stages.values())
+    # The rule-based diagnosis is only forced for the benchmark itself
+    assert llm_diagnosis.OPENAI_API_KEY == 'sk-test'
+
+
+def test_regression_check_respects_tolerance_and_noise_floor():
+    baseline = {"stages": {"detect_drift": {"median_s": 1.0}, "build_report": {"median_s": 0.001}}}
+    current = {"stages": {"detect_drift": {"median_s": 1.5}, "build_report": {"median_s": 0.004}}}
+
+    regressions = compare_to_baseline(current, baseline, tolerance=0.25)
+
+    # build_report is 4x slower but only by 3ms, below the noise floor
+    assert [r['stage'] for r in regressions] == ['detect_drift']
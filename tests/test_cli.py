@@ -0,0 +1,71 @@
+"""Tests for the offline command-line runner"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.cli import discover_models, main
+from app.services.data_loader import read_csv_path
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'samples')
+TRAIN = os.path.join(SAMPLES_DIR, 'sample_train.csv')
+PROD_OLD = os.path.join(SAMPLES_DIR, 'sample_prod_old.csv')
+PROD_NEW = os.path.join(SAMPLES_DIR, 'sample_prod_new.csv')
+
+
+def test_read_csv_path_normalizes_columns(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_bytes(b'\xef\xbb\xbf Income ,Credit_Score\n1,2\n3,4\n')
+
+    df = read_csv_path(str(path))
+
+    assert list(df.columns) == ['income', 'credit_score']
+    with pytest.raises(ValueError, match='File not found'):
+        read_csv_path(str(tmp_path / 'missing.csv'))
+
+
+def test_run_writes_json_html_and_pdf(tmp_path):
+    out = tmp_path / 'reports'
+
+    code = main([
+        'run', '--train', TRAIN, '--prod-old', PROD_OLD, '--prod-new', PROD_NEW,
+        '--out', str(out), '--format', 'json,html,pdf', '--no-correlation'
+    ])
+
+    assert code == 0
+    report = json.loads((out / 'autopsy_report.json').read_text())
+    assert report['drift_analysis']['summary']['drifted_features_count'] > 0
+    assert '<html' in (out / 'autopsy_report.html').read_text().lower()
+    assert (out / 'autopsy_report.pdf').read_bytes().startswith(b'%PDF')
+
+
+def test_batch_over_snapshot_directory(tmp_path):
+    rng = np.random.default_rng(0)
+    train = pd.DataFrame({'income': rng.normal(50000, 10000, 500), 'age': rng.normal(40, 10, 500)})
+    train.to_csv(tmp_path / 'train.csv', index=False)
+    models_dir = tmp_path / 'snapshots'
+    for i, name in enumerate(['churn', 'fraud']):
+        (models_dir / name).mkdir(parents=True)
+        train.sample(frac=1, random_state=i).to_csv(models_dir / name / 'prod_old.csv', index=False)
+        (train + 5000 * i).to_csv(models_dir / name / 'prod_new.csv', index=False)
+    (models_dir / 'incomplete').mkdir()
+
+    out = tmp_path / 'reports'
+    code = main([
+        'batch', '--train', str(tmp_path / 'train.csv'), '--models-dir', str(models_dir),
+        '--out', str(out), '--workers', '2'
+    ])
+
+    assert code == 0
+    assert [m[0] for m in discover_models(str(models_dir))] == ['churn', 'fraud']
+    assert (out / 'churn.json').exists() and (out / 'fraud.json').exists()
+    summary = json.loads((out / 'fleet_summary.json').read_text())
+    assert summary['models_failed'] == []
+
+
+def test_missing_input_exits_non_zero(tmp_path):
+    code = main(['run', '--train', str(tmp_path / 'nope.csv'), '--prod-old', PROD_OLD, '--prod-new', PROD_NEW])
+
+    assert code == 2
@@ -0,0 +1,46 @@
+"""Tests for correlation-structure drift"""
+import numpy as np
+import pandas as pd
+
+from app.services.correlation_drift import detect_correlation_drift, streaming_covariance
+
+
+def _frame(rng, n=5000, sign=1.0):
+    df = pd.DataFrame(rng.normal(size=(n, 6)), columns=[f'f{i}' for i in range(6)])
+    df['f1'] = sign * (0.8 * df['f0'] + 0.6 * df['f1'])
+    df['location'] = rng.choice(['urban', 'rural'], n)
+    return df
+
+
+def test_chunked_covariance_matches_pandas():
+    rng = np.random.default_rng(0)
+    df = _frame(rng).drop(columns='location')
+    df.iloc[::5, 2] = np.nan
+    fill = df.mean().to_numpy()
+
+    n, _, m2 = streaming_covariance(df, list(df.columns), fill, chunk_rows=333)
+
+    assert n == len(df)
+    assert np.allclose(m2 / (n - 1), df.fillna(df.mean()).cov().to_numpy())
+
+
+def test_reports_the_broken_pair():
+    rng = np.random.default_rng(1)
+
+    result = detect_correlation_drift(_frame(rng), _frame(rng, sign=-1.0))
+
+    top = result['top_changed_pairs'][0]
+    assert (top['feature_a'], top['feature_b']) == ('f0', 'f1')
+    assert top['change'] < -1.5
+    assert result['broken_pairs_count'] == 1
+
+
+def test_top_k_restricts_to_most_drifted_features():
+    rng = np.random.default_rng(2)
+    drift_results = [{'feature': f'f{i}', 'drift_score': score} for i, score in enumerate([0.9, 0.8, 0, 0, 0.5, 0])]
+
+    result = detect_correlation_drift(_frame(rng), _frame(rng), drift_results, top_k=3)
+
+    assert result['selection'] == 'top_k_drifted'
+    assert result['pairs_analyzed'] == 3
+    assert {f['feature'] for f in result['most_affected_features']} == {'f0', 'f1', 'f4'}
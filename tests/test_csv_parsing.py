@@ -0,0 +1,122 @@
+"""Tests for per-file encoding sniffing and concurrent CSV parsing"""
+import asyncio
+import codecs
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import data_loader
+from app.services.data_loader import (
+    SNIFF_BYTES,
+    fingerprint_columns,
+    load_and_validate,
+    parse_csv_bytes,
+    parse_csv_many,
+    read_csv_path,
+    sniff_encoding
+)
+from app.services.sampling import sample_csv_stream
+
+TEXT = 'city,income\nZürich,10\nSão Paulo,20\n'
+
+
+class UploadStub:
+    def __init__(self, content):
+        self.content = content
+
+    async def read(self):
+        return self.content
+
+
+@pytest.mark.parametrize('content, expected', [
+    (TEXT.encode('utf-8'), 'utf-8-sig'),
+    (codecs.BOM_UTF8 + TEXT.encode('utf-8'), 'utf-8-sig'),
+    (TEXT.encode('utf-16'), 'utf-16'),
+    (TEXT.encode('utf-32'), 'utf-32'),
+    (TEXT.encode('utf-16-le'), 'utf-16-le'),
+    (TEXT.encode('latin1'), 'latin1'),
+    ('Zürich'.encode('utf-8')[:2], 'utf-8-sig'),  # character cut at the prefix boundary
+])
+def test_sniff_encoding(content, expected):
+    assert sniff_encoding(content) == expected
+
+
+def test_each_file_parsed_once_with_its_own_encoding(monkeypatch):
+    monkeypatch.setattr(data_loader, 'CSV_PARSE_ENGINE', 'c')
+    calls = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(data_loader.pd, 'read_csv', lambda buf, **kw: calls.append(kw['encoding']) or read_csv(buf, **kw))
+
+    frames = parse_csv_many([TEXT.encode('utf-8'), TEXT.encode('latin1'), TEXT.encode('utf-16')])
+
+    assert sorted(calls) == ['latin1', 'utf-16', 'utf-8-sig']
+    for df in frames:
+        assert df['city'].tolist() == ['Zürich', 'São Paulo']
+
+
+def test_late_invalid_bytes_reparse_only_that_file(monkeypatch):
+    monkeypatch.setattr(data_loader, 'CSV_PARSE_ENGINE', 'c')
+    late_latin1 = ('city,income\n' + 'Bern,1\n' * (SNIFF_BYTES // 7 + 10) + 'Zürich,2\n').encode('latin1')
+    calls = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(data_loader.pd, 'read_csv', lambda buf, **kw: calls.append(kw['encoding']) or read_csv(buf, **kw))
+
+    good, late = parse_csv_many([TEXT.encode('utf-8'), late_latin1])
+
+    assert calls.count('utf-8-sig') == 2 and calls.count('latin1') == 1
+    assert late['city'].iloc[-1] == 'Zürich' and len(good) == 2
+
+
+def test_load_and_validate_mixed_encodings():
+    uploads = [UploadStub(TEXT.encode(enc)) for enc in ('utf-8', 'latin1', 'utf-16')]
+
+    train, old, new = asyncio.run(load_and_validate(*uploads))
+
+    assert list(train.columns) == ['city', 'income']
+    assert new['income'].tolist() == [10, 20]
+
+
+def test_parse_errors_name_the_file():
+    with pytest.raises(ValueError, match='prod_new'):
+        parse_csv_many([TEXT.encode(), b'a,b\n1,2,3,4\n"unterminated'], ['train', 'prod_new'])
+
+
+@pytest.mark.parametrize('extra', [
+    None,
+    ['True', 'False'],
+    ['1', '0', 'true'],                                  # bool to pyarrow, strings to the C parser
+    ['2024-01-01', '2024-02-01'],                        # dates
+    ['2024-01-01 10:00:00', '2024-01-02 11:30:00'],      # timestamps
+    ['10:00:00', '11:30:00'],                            # times
+    ['99999999999999999999', '1'],                       # past int64
+])
+def test_pyarrow_engine_matches_the_c_parser(monkeypatch, tmp_path, extra):
+    pytest.importorskip('pyarrow')
+    rng = np.random.default_rng(0)
+    n = 500
+    df = pd.DataFrame({
+        'income': rng.normal(50000, 10000, n) * 10.0 ** rng.integers(-8, 8, n),
+        'age': rng.integers(18, 80, n),
+        'visits': np.where(rng.random(n) < 0.1, np.nan, rng.integers(0, 9, n)),
+        'city': rng.choice(['Bern', 'Zürich', ''], n)
+    })
+    if extra:
+        df['extra'] = rng.choice(extra, n)
+    content = df.to_csv(index=False).encode()
+    path = tmp_path / 'train.csv'
+    path.write_bytes(content)
+
+    monkeypatch.setattr(data_loader, 'CSV_PARSE_ENGINE', 'pyarrow')
+    fast = parse_csv_bytes(content)
+    monkeypatch.setattr(data_loader, 'CSV_PARSE_ENGINE', 'c')
+    parsed = parse_csv_bytes(content)
+
+    # Same dtypes and values whichever engine or entry point parses the file
+    assert dict(fast.dtypes) == dict(parsed.dtypes)
+    expected = fingerprint_columns(parsed)
+    assert fingerprint_columns(fast) == expected
+    assert fingerprint_columns(read_csv_path(str(path))) == expected
+    with open(path, 'rb') as f:
+        sample, _ = sample_csv_stream(f, sample_size=n)
+    assert fingerprint_columns(sample) == expected
@@ -1,4 +1,6 @@
 """Direct test of the analysis functions"""
+import asyncio
+import os
 import pandas as pd
 import sys
 import traceback
@@ -11,19 +13,25 @@ from app.services.timeline import build_timeline
 from app.services.llm_diagnosis import generate_diagnosis
 from app.reports.report_builder import build_report
 
-# Create mock file objects
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'samples')
+
+# Create mock file objects (UploadFile-like: async read)
 class MockFile:
     def __init__(self, filepath):
         self.filepath = filepath
+        self.filename = os.path.basename(filepath)
         self.file = open(filepath, 'rb')
 
+    async def read(self):
+        return self.file.read()
+
 try:
     print("Step 1: Loading data...")
-    train_file = MockFile('sample_train.csv')
-    old_file = MockFile('sample_prod_old.csv')
-    new_file = MockFile('sample_prod_new.csv')
+    train_file = MockFile(os.path.join(SAMPLES_DIR, 'sample_train.csv'))
+    old_file = MockFile(os.path.join(SAMPLES_DIR, 'sample_prod_old.csv'))
+    new_file = MockFile(os.path.join(SAMPLES_DIR, 'sample_prod_new.csv'))
     
-    train_df, old_df, new_df = load_and_validate(train_file, old_file, new_file)
+    train_df, old_df, new_df = asyncio.run(load_and_validate(train_file, old_file, new_file))
     print(f"✅ Data loaded: train={len(train_df)}, old={len(old_df)}, new={len(new_df)}")
     
     print("\nStep 2: Detecting drift...")
@@ -0,0 +1,73 @@
+"""Tests for multi-metric drift mode"""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.spatial.distance import jensenshannon
+from scipy.stats import energy_distance, ks_2samp, wasserstein_distance
+
+from app.services.drift_detection import detect_drift
+from app.services.incremental import FeatureResultStore, analyze_incremental
+from app.utils.stats import SUPPORTED_DRIFT_METRICS, calculate_jensen_shannon_divergence, numeric_drift_metrics
+
+
+def _frames(rng, n=4000):
+    train = pd.DataFrame({
+        'income': rng.normal(50000, 10000, n),
+        'location': rng.choice(['urban', 'rural', 'remote'], n, p=[0.5, 0.3, 0.2])
+    })
+    new = pd.DataFrame({
+        'income': rng.normal(56000, 12000, n),
+        'location': rng.choice(['urban', 'rural', 'remote'], n, p=[0.2, 0.3, 0.5])
+    })
+    return train, new
+
+
+def test_shared_pass_matches_scipy():
+    rng = np.random.default_rng(0)
+    train, new = np.sort(rng.normal(size=3000)), np.sort(rng.normal(0.4, 1.3, size=2000))
+
+    result = numeric_drift_metrics(train, new, SUPPORTED_DRIFT_METRICS)
+
+    assert result['ks'] == pytest.approx(ks_2samp(train, new).statistic)
+    assert result['wasserstein'] == pytest.approx(wasserstein_distance(train, new))
+    assert result['energy'] == pytest.approx(energy_distance(train, new))
+    assert 0 < result['js'] < 1 and 0 < result['hellinger'] < 1
+
+
+def test_jensen_shannon_matches_scipy():
+    rng = np.random.default_rng(1)
+    a = pd.Series(rng.choice(['a', 'b', 'c'], 1000))
+    b = pd.Series(rng.choice(['b', 'c', 'd'], 1000))
+
+    p = a.value_counts(normalize=True).reindex(['a', 'b', 'c', 'd'], fill_value=0)
+    q = b.value_counts(normalize=True).reindex(['a', 'b', 'c', 'd'], fill_value=0)
+    assert calculate_jensen_shannon_divergence(a, b) == pytest.approx(jensenshannon(p, q))
+
+
+def test_detect_drift_reports_selected_metrics():
+    train, new = _frames(np.random.default_rng(2))
+
+    results = {r['feature']: r for r in detect_drift(train, new, metrics='ks,wasserstein,js,hellinger')}
+
+    assert set(results['income']['drift_metrics']) == {'ks', 'wasserstein', 'js', 'hellinger'}
+    assert results['income']['drift_metrics']['ks'] == results['income']['ks_statistic']
+    # Distance metrics on the CDFs are only defined for numerical features
+    assert set(results['location']['drift_metrics']) == {'js', 'hellinger'}
+    assert 'drift_metrics' not in detect_drift(train, new, metrics='')[0]
+
+
+def test_unknown_metric_rejected():
+    train, new = _frames(np.random.default_rng(3))
+    with pytest.raises(ValueError, match='Unknown drift metrics'):
+        detect_drift(train, new, metrics='ks,kl')
+
+
+def test_incremental_store_keys_on_metrics():
+    train, new = _frames(np.random.default_rng(4))
+    store = FeatureResultStore()
+
+    analyze_incremental(train, new, new, store=store, drift_metrics='psi')
+    drift, _, stats = analyze_incremental(train, new, new, store=store, drift_metrics='psi,energy')
+
+    assert stats['drift_recomputed'] == 2
+    assert 'energy' in {r['feature']: r for r in drift}['income']['drift_metrics']
@@ -0,0 +1,157 @@
+"""Tests for per-feature drift policies"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.data_loader import parse_csv_bytes, validate_frames
+from app.services.drift_detection import detect_drift
+from app.services.drift_policy import DriftPolicy, load_policy, set_policy
+from app.services.impact_analysis import analyze_impact
+from app.services.incremental import FeatureResultStore, analyze_incremental
+
+
+@pytest.fixture(autouse=True)
+def reset_policy():
+    yield
+    set_policy(None)
+
+
+def _frames(seed=0, n=2000):
+    rng = np.random.default_rng(seed)
+    train = pd.DataFrame({
+        'income': rng.normal(50000, 10000, n),
+        'score_a': rng.normal(0, 1, n),
+        'customer_id': np.arange(n),
+        'location': rng.choice(['urban', 'rural'], n)
+    })
+    new = pd.DataFrame({
+        'income': rng.normal(50600, 10000, n),
+        'score_a': rng.normal(0.1, 1, n),
+        'customer_id': np.arange(n) + n,
+        'location': rng.choice(['urban', 'rural'], n, p=[0.3, 0.7])
+    })
+    return train, new
+
+
+def test_defaults_match_config_constants():
+    policy = DriftPolicy().resolve('anything')
+
+    assert policy.ks_level(0.05) == 'None' and policy.ks_level(0.25) == 'Moderate'
+    assert policy.psi_level(0.1) == (True, 'Moderate')
+    assert policy.impact_level(0.3) == 'High'
+    assert policy.impact_weights == (0.4, 0.3, 0.3)
+
+
+def test_precedence_exact_over_patterns_over_defaults():
+    policy = DriftPolicy({
+        'defaults': {'ks_p_value': 0.01},
+        'features': {
+            'score_*': {'psi': [0.05, 0.1], 'metrics': ['wasserstein']},
+            'score_a': {'metrics': ['js']},
+            'customer_id': {'skip': True}
+        }
+    })
+
+    score_a, score_b = policy.resolve('score_a'), policy.resolve('score_b')
+    assert score_a.metrics == ('js',) and score_a.psi == (0.05, 0.1)
+    assert score_b.metrics == ('wasserstein',) and score_b.ks_p_value == 0.01
+    assert policy.resolve('income') is policy.default_policy
+    assert policy.resolve('score_b') is score_b
+    assert policy.is_skipped('customer_id') and policy.has_skips
+
+
+def test_policy_drives_thresholds_and_skips():
+    train, new = _frames()
+    strict = DriftPolicy({'features': {'income': {'ks_p_value': 1e-12}, 'customer_id': {'skip': True}}})
+
+    default = {r['feature']: r for r in detect_drift(train, new, policy=DriftPolicy())}
+    results = {r['feature']: r for r in detect_drift(train, new, policy=strict)}
+
+    assert default['income']['drift'] and not results['income']['drift']
+    assert 'customer_id' not in results
+    assert 'customer_id' not in {r['feature'] for r in analyze_impact(train, new, new, policy=strict)}
+
+
+def test_impact_weights_applied():
+    train, new = _frames()
+    mean_only = DriftPolicy({'defaults': {'impact_weights': {'variance_change': 0, 'overlap_loss': 0}}})
+
+    impact = {r['feature']: r for r in analyze_impact(train, new, new, policy=mean_only)}['income']
+
+    assert impact['impact_score'] == pytest.approx(0.4 * impact['metrics']['mean_shift'], abs=1e-4)
+
+
+def test_invalid_policies_rejected(tmp_path):
+    with pytest.raises(ValueError, match='Unknown policy settings'):
+        DriftPolicy({'features': {'x': {'threshold': 1}}})
+    with pytest.raises(ValueError, match='ascending'):
+        DriftPolicy({'defaults': {'psi': [0.3, 0.1]}})
+
+    path = tmp_path / 'policy.json'
+    path.write_text('[1, 2]')
+    with pytest.raises(ValueError, match='mapping'):
+        load_policy(str(path))
+
+
+def test_skipped_columns_never_parsed(tmp_path):
+    path = tmp_path / 'policy.yaml'
+    path.write_text('features:\n  "customer_*": {skip: true}\n')
+    set_policy(load_policy(str(path)))
+
+    df = parse_csv_bytes(b' Customer_ID ,income\n1,10\n2,20\n')
+    assert list(df.columns) == ['income']
+
+    train, new = _frames()
+    frames = validate_frames(train, new, new)
+    assert 'customer_id' not in frames[0].columns
+
+
+def _upload(df):
+    return io.BytesIO(df.to_csv(index=False).encode())
+
+
+def test_skipped_columns_still_load_as_keys():
+    set_policy(DriftPolicy({'features': {'customer_id': {'skip': True}, 'location': {'skip': True}}}))
+    train, new = _frames()
+    predictions = pd.DataFrame({'customer_id': new['customer_id'], 'prediction': 1.0, 'actual': 0.0})
+    client = TestClient(app)
+    data = {'save_report': 'false', 'multivariate': 'false', 'correlation': 'false'}
+
+    def autopsy(**extra):
+        files = {'train': _upload(train), 'prod_old': _upload(new), 'prod_new': _upload(new),
+                 'predictions': _upload(predictions)}
+        return client.post('/run-autopsy', files=files, data=dict(data, join_key='customer_id', **extra))
+
+    response = autopsy()
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report['error_attribution']['rows_matched'] == len(new)
+    analyzed = {d['feature'] for d in report['drift_analysis']['all_results']}
+    assert analyzed == {'income', 'score_a'}
+    assert 'customer_id' not in {f['feature'] for f in report['error_attribution']['features']}
+
+    sampled = autopsy(sample_size='500', stratify_by='location')
+    assert sampled.status_code == 200, sampled.text
+    assert sampled.json()['metadata']['sampling']['inputs']['train']['strata'] == 2
+
+    segments = client.post(
+        '/analyze-segments', files={'train': _upload(train), 'production': _upload(new)},
+        data={'segment_by': 'location'}
+    )
+    assert segments.status_code == 200, segments.text
+
+
+def test_incremental_store_keys_on_policy_version():
+    train, new = _frames()
+    store = FeatureResultStore()
+
+    analyze_incremental(train, new, new, store=store, policy=DriftPolicy())
+    _, _, stats = analyze_incremental(
+        train, new, new, store=store, policy=DriftPolicy({'defaults': {'ks_p_value': 0.01}})
+    )
+
+    assert stats['drift_recomputed'] == len(train.columns)
@@ -0,0 +1,64 @@
+"""Tests for KS screening and multiple-testing correction"""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import ks_2samp
+
+from app.services.drift_detection import detect_drift
+from app.utils.stats import adjust_pvalues, ks_bounds
+
+
+def _wide_frames(seed=0, n=5000, features=200, drifted=('f0', 'f1')):
+    rng = np.random.default_rng(seed)
+    columns = [f'f{i}' for i in range(features)]
+    train = pd.DataFrame(rng.normal(size=(n, features)), columns=columns)
+    new = pd.DataFrame(rng.normal(size=(n, features)), columns=columns)
+    for col in drifted:
+        new[col] += 0.3
+    return train, new
+
+
+def test_ks_bounds_bracket_exact_statistic():
+    rng = np.random.default_rng(0)
+    train = np.sort(rng.normal(size=20000))
+    for shift in (0.0, 0.05, 0.5):
+        prod = rng.normal(shift, 1, size=15000)
+        lower, upper = ks_bounds(train, prod, bins=64)
+        exact = ks_2samp(train, prod).statistic
+        assert lower - 1e-12 <= exact <= upper + 1e-12
+
+
+def test_adjust_pvalues():
+    p = np.array([0.01, 0.04, 0.03, 0.005])
+
+    assert adjust_pvalues(p, 'bh') == pytest.approx([0.02, 0.04, 0.04, 0.02])
+    assert adjust_pvalues(p, 'holm') == pytest.approx([0.03, 0.06, 0.06, 0.02])
+    with pytest.raises(ValueError):
+        adjust_pvalues(p, 'bonferroni')
+
+
+def test_correction_removes_false_flags_on_wide_data():
+    train, new = _wide_frames()
+
+    raw = detect_drift(train, new, correction='none', screening_bins=0)
+    corrected = detect_drift(train, new, correction='bh')
+
+    false_raw = {r['feature'] for r in raw if r['drift']} - {'f0', 'f1'}
+    flagged = {r['feature'] for r in corrected if r['drift']}
+    assert len(false_raw) > 0
+    assert flagged == {'f0', 'f1'}
+    assert all(r['p_value_adjusted'] >= r['p_value'] for r in corrected)
+
+
+def test_screening_skips_unchanged_features_only():
+    train, new = _wide_frames(seed=1)
+
+    results = {r['feature']: r for r in detect_drift(train, new)}
+    exact = {r['feature']: r for r in detect_drift(train, new, screening_bins=0)}
+
+    screened = [f for f, r in results.items() if r.get('screened')]
+    assert len(screened) > len(results) / 2
+    assert not results['f0'].get('screened') and results['f0']['drift']
+    for feature in screened:
+        assert results[feature]['ks_statistic'] >= exact[feature]['ks_statistic']
+        assert not exact[feature]['drift']
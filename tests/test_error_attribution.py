@@ -0,0 +1,69 @@
+"""Tests for prediction-error attribution"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.error_attribution import attribute_errors
+from app.utils.stats import assign_bins, quantile_bin_edges
+
+
+def _frames(n=4000, seed=0):
+    rng = np.random.default_rng(seed)
+    train = pd.DataFrame({'a': rng.normal(0, 1, n), 'b': rng.normal(0, 1, n), 'c': rng.choice(['x', 'y'], n)})
+    new = pd.DataFrame({
+        'a': rng.normal(1.5, 1, n),
+        'b': rng.normal(0, 1, n),
+        'c': rng.choice(['x', 'y', 'z'], n),
+        'id': np.arange(n)
+    })
+    return rng, train, new
+
+
+def _csv(df):
+    return io.BytesIO(df.to_csv(index=False).encode())
+
+
+def test_bins_match_pandas_qcut():
+    values = np.random.default_rng(3).normal(size=1000)
+    edges = quantile_bin_edges(np.sort(values), 10)
+    expected = pd.cut(values, bins=pd.qcut(values, 10, retbins=True)[1], include_lowest=True, labels=False)
+
+    assert (assign_bins(values, edges) == expected).all()
+
+
+def test_shifted_feature_explains_the_errors():
+    rng, train, new = _frames()
+    actual = rng.integers(0, 2, len(new))
+    # The model fails exactly where `a` moved outside its training range
+    prediction = np.where(new['a'] > 1, 1 - actual, actual)
+    predictions = pd.DataFrame({'prediction': prediction, 'actual': actual})
+
+    result = attribute_errors(_csv(predictions), train, new.drop(columns='id'), chunksize=500)
+
+    assert result['error_type'] == 'misclassification'
+    assert result['rows_matched'] == len(new)
+    assert result['features'][0]['feature'] == 'a'
+    assert result['features'][0]['error_contribution'] > 0.3
+
+
+def test_join_by_key_handles_shuffled_and_unmatched_rows():
+    rng, train, new = _frames()
+    actual = rng.normal(0, 1, len(new))
+    predictions = pd.DataFrame({'ID': new['id'], 'prediction': actual + np.abs(new['a']), 'actual': actual})
+    predictions = pd.concat([predictions.iloc[::-1], pd.DataFrame({'ID': [-1], 'prediction': [0.5], 'actual': [0.0]})])
+
+    result = attribute_errors(_csv(predictions), train, new, join_key='id', chunksize=700)
+
+    assert result['error_type'] == 'absolute_error'
+    assert result['rows_read'] == len(new) + 1
+    assert result['rows_matched'] == len(new)
+    assert result['features'][0]['feature'] == 'a'
+
+
+def test_missing_actual_column_is_rejected():
+    _, train, new = _frames(n=100)
+
+    with pytest.raises(ValueError):
+        attribute_errors(_csv(pd.DataFrame({'prediction': [1]})), train, new)
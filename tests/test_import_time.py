@@ -0,0 +1,58 @@
+"""Cold-start import budget for the API and CLI entry points"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy optional stacks that must load on first use, never at import time
+DEFERRED_MODULES = ('scipy', 'sklearn', 'shap', 'openai')
+
+# Cumulative `python -X importtime` budget in seconds (override for slow CI hosts)
+IMPORT_BUDGET_SECONDS = float(os.getenv('IMPORT_BUDGET_SECONDS', '2.0'))
+
+
+def _run(code, *flags):
+    return subprocess.run(
+        [sys.executable, *flags, '-c', code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+
+
+def _cumulative_import_seconds(stderr, module):
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and line.split('|')[-1].strip() == module:
+            return int(line.split('|')[1]) / 1e6
+    raise AssertionError(f'{module} missing from -X importtime output')
+
+
+@pytest.mark.parametrize('module', ['app.main', 'app.cli'])
+def test_entry_points_defer_heavy_modules(module):
+    loaded = _run(
+        f'import sys, {module}; '
+        f'print(",".join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))'
+    ).stdout.strip()
+
+    assert loaded == ''
+
+
+def test_health_endpoints_stay_light():
+    loaded = _run(
+        'import sys\n'
+        'from fastapi.testclient import TestClient\n'
+        'from app.main import app\n'
+        'client = TestClient(app)\n'
+        'assert client.get("/health").status_code == 200\n'
+        'assert client.get("/").status_code == 200\n'
+        f'print(",".join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))'
+    ).stdout.strip()
+
+    assert loaded == ''
+
+
+def test_import_time_budget():
+    stderr = _run('import app.main', '-X', 'importtime').stderr
+
+    assert _cumulative_import_seconds(stderr, 'app.main') < IMPORT_BUDGET_SECONDS
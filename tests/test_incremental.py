@@ -0,0 +1,72 @@
+"""Tests for incremental re-autopsy (per-column fingerprints + result store)"""
+import numpy as np
+import pandas as pd
+
+from app.services.data_loader import fingerprint_columns
+from app.services.drift_detection import detect_drift
+from app.services.impact_analysis import analyze_impact
+from app.services.incremental import analyze_incremental, FeatureResultStore, _MISSING
+
+
+def _make_frames(seed=0, n=500):
+    rng = np.random.default_rng(seed)
+    train = pd.DataFrame({
+        'age': rng.normal(35, 10, n),
+        'income': rng.normal(50000, 15000, n),
+        'location': rng.choice(['urban', 'rural'], n)
+    })
+    old = pd.DataFrame({
+        'age': rng.normal(35, 10, n),
+        'income': rng.normal(50000, 15000, n),
+        'location': rng.choice(['urban', 'rural'], n)
+    })
+    new = pd.DataFrame({
+        'age': rng.normal(30, 12, n),
+        'income': rng.normal(50000, 15000, n),
+        'location': rng.choice(['urban', 'rural', 'remote'], n)
+    })
+    return train, old, new
+
+
+def test_fingerprints_change_only_for_modified_columns():
+    train, _, _ = _make_frames()
+    before = fingerprint_columns(train)
+    modified = train.copy()
+    modified['age'] = modified['age'] + 1
+    after = fingerprint_columns(modified)
+
+    assert before['age'] != after['age']
+    assert before['income'] == after['income']
+    assert before['location'] == after['location']
+
+
+def test_incremental_matches_full_run_and_reuses_results():
+    train, old, new = _make_frames()
+    store = FeatureResultStore()
+
+    drift, impact, stats = analyze_incremental(train, old, new, store=store)
+    assert stats['drift_recomputed'] == 3
+    assert drift == detect_drift(train, new)
+    assert impact == analyze_impact(train, old, new)
+
+    # Only prod_new 'age' changes: just that feature is recomputed
+    new2 = new.copy()
+    new2['age'] = new2['age'] * 1.5
+    drift2, impact2, stats2 = analyze_incremental(train, old, new2, store=store)
+
+    assert stats2['recomputed_features'] == ['age']
+    assert stats2['drift_reused'] == 2
+    assert drift2 == detect_drift(train, new2)
+    assert impact2 == analyze_impact(train, old, new2)
+
+
+def test_store_evicts_least_recently_used():
+    store = FeatureResultStore(max_entries=2)
+    store.put("drift", ("a",), {"feature": "a"})
+    store.put("drift", ("b",), {"feature": "b"})
+    store.get("drift", ("a",))
+    store.put("drift", ("c",), {"feature": "c"})
+
+    assert len(store) == 2
+    assert store.get("drift", ("a",)) == {"feature": "a"}
+    assert store.get("drift", ("b",)) is _MISSING
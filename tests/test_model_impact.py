@@ -0,0 +1,80 @@
+"""Tests for the permutation-based model impact engine"""
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.linear_model import LinearRegression
+
+from app.api import routes
+from app.main import app
+from app.services.impact_analysis import analyze_impact
+from app.services.model_impact import load_model, permutation_importance
+
+
+def _frame(rng, n=1000, noise_scale=1.0):
+    return pd.DataFrame({
+        'signal': rng.normal(0, 1, n),
+        'noise': rng.normal(0, noise_scale, n),
+        'location': rng.choice(['urban', 'rural'], n)
+    })
+
+
+def _model(rng):
+    train = _frame(rng)
+    return LinearRegression().fit(train[['signal', 'noise']], 3 * train['signal'] + 0.01 * train['noise'])
+
+
+def test_permutation_importance_finds_the_signal_feature():
+    rng = np.random.default_rng(0)
+    model = _model(rng)
+
+    # Tiny batch_rows forces one predict call per feature group
+    importance = permutation_importance(model, _frame(rng), batch_rows=500, max_workers=2)
+
+    assert set(importance) == {'signal', 'noise'}
+    assert importance['signal'] > 50 * importance['noise']
+
+
+def test_analyze_impact_reports_old_vs_new_importance():
+    rng = np.random.default_rng(1)
+    model = _model(rng)
+    train, old = _frame(rng), _frame(rng)
+    new = _frame(rng, noise_scale=5.0)
+
+    results = analyze_impact(train, old, new, model=load_model(pickle.dumps(model)))
+    by_feature = {r['feature']: r for r in results}
+
+    assert by_feature['location']['model_impact'] is None
+    assert by_feature['noise']['model_impact']['importance_change'] > 0
+    assert results[0]['feature'] == 'signal'
+
+
+def test_load_model_rejects_objects_without_predict():
+    with pytest.raises(ValueError):
+        load_model(pickle.dumps({'not': 'a model'}))
+
+
+def _post_with_model(model_bytes):
+    samples = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'samples')
+    files = {name: open(os.path.join(samples, f'sample_{name}.csv'), 'rb') for name in ('train', 'prod_old', 'prod_new')}
+    try:
+        return TestClient(app).post(
+            '/run-autopsy', files={**files, 'model': ('model.pkl', model_bytes)},
+            data={'save_report': 'false', 'multivariate': 'false', 'correlation': 'false'}
+        )
+    finally:
+        for f in files.values():
+            f.close()
+
+
+def test_model_uploads_are_refused_unless_enabled(monkeypatch, tmp_path):
+    # The route appends failures to backend.log in the working directory
+    monkeypatch.chdir(tmp_path)
+    # Never unpickled while disabled: this payload would fail to load
+    assert _post_with_model(b'not a pickle').status_code == 403
+
+    monkeypatch.setattr(routes, 'ALLOW_MODEL_UPLOADS', True)
+    assert _post_with_model(b'not a pickle').status_code == 400
@@ -0,0 +1,125 @@
+"""Tests for HTML/PDF report rendering and background PDF generation"""
+import os
+import re
+import zlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.reports.renderer import render_html, render_html_chunks, render_pdf, PDF_LINES_PER_PAGE
+from app.services import report_rendering, report_store
+from app.services.report_rendering import PdfRenderQueue
+from app.services.report_store import MemoryReportStore
+
+
+def _report(n_features=3):
+    drift = [
+        {'feature': f'f{i}', 'method': 'KS-Test', 'drift': i % 2 == 0, 'drift_score': i / n_features,
+         'severity': 'High' if i % 2 == 0 else 'None', 'p_value_adjusted': 0.01}
+        for i in range(n_features)
+    ]
+    impact = [{'feature': f'f{i}', 'impact_score': 0.1, 'impact_level': 'Low'} for i in range(n_features)]
+    return {
+        'metadata': {'generated_at': '2026-01-01T00:00:00', 'version': '1.0.0'},
+        'executive_summary': {'summary': 'Income <shifted> & more', 'severity': 'HIGH', 'critical_features_count': 1},
+        'drift_analysis': {'summary': {'drifted_features_count': 2}, 'all_results': drift},
+        'impact_analysis': {'summary': {}, 'all_results': impact},
+        'timeline': {'events': [{'event_type': 'drift_detected', 'severity': 'High',
+                                 'description': 'Drift in f0', 'features': ['f0', 'f2']}]},
+        'diagnosis': {'full_diagnosis': 'Root cause (upstream)'},
+        'recommendations': {'immediate_actions': ['Retrain']},
+        'multivariate_drift': {'drift': True}
+    }
+
+
+def test_html_includes_every_feature_and_escapes():
+    report = _report(1200)
+    chunks = list(render_html_chunks(report, chunk_rows=100))
+    page = ''.join(chunks)
+
+    assert page == render_html(report, chunk_rows=100)
+    assert page.count('<tr class="drift">') == 600
+    assert 'f1199' in page and 'Multivariate Drift' in page
+    assert 'Income &lt;shifted&gt; &amp; more' in page
+    # Table bodies arrive in bounded chunks
+    assert max(len(c) for c in chunks) < len(page) / 10
+
+
+def _pdf_text(pdf):
+    streams = re.findall(rb'stream\n(.*?)\nendstream', pdf, re.S)
+    return b''.join(zlib.decompress(s) for s in streams)
+
+
+def test_pdf_is_well_formed_and_paginated():
+    pdf = render_pdf(_report(200))
+    assert pdf.startswith(b'%PDF-1.4') and pdf.rstrip().endswith(b'%%EOF')
+    pages = int(re.search(rb'/Count (\d+)', pdf).group(1))
+    assert pages == len(re.findall(rb'/Type /Page /Parent', pdf)) > 200 // PDF_LINES_PER_PAGE
+
+    # xref offsets point at their objects
+    xref = int(re.search(rb'startxref\n(\d+)', pdf).group(1))
+    offsets = re.findall(rb'(\d{10}) 00000 n', pdf[xref:])
+    for number, offset in enumerate(offsets, start=1):
+        assert pdf[int(offset):].startswith(b'%d 0 obj' % number)
+
+    text = _pdf_text(pdf)
+    assert b'f199' in text and b'Root cause \\(upstream\\)' in text
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    store = MemoryReportStore()
+    render_queue = PdfRenderQueue(cache_dir=str(tmp_path / 'rendered'))
+    monkeypatch.setattr(report_store, '_report_store', store)
+    monkeypatch.setattr(report_rendering, '_pdf_render_queue', render_queue)
+    return render_queue
+
+
+def test_pdf_renders_in_background_and_is_cached(queue):
+    report_id = report_store.get_report_store().save(_report())
+    assert queue.status(report_id)['status'] == 'missing'
+
+    assert queue.submit(report_id)['status'] in ('pending', 'ready')
+    assert queue.wait(report_id, timeout=30)['status'] == 'ready'
+    mtime = os.path.getmtime(queue.cached_path(report_id))
+    assert queue.submit(report_id)['status'] == 'ready'  # cached, not re-rendered
+    assert os.path.getmtime(queue.cached_path(report_id)) == mtime
+
+    queue.submit('unknown')
+    assert queue.wait('unknown', timeout=30)['status'] == 'failed'
+    assert queue.status('unknown')['status'] == 'missing'  # forgotten, so a retry resubmits
+
+
+def test_download_endpoints(queue):
+    client = TestClient(app)
+    report_id = report_store.get_report_store().save(_report())
+
+    html = client.get(f'/reports/{report_id}/html')
+    assert html.status_code == 200 and report_id in html.text
+
+    first = client.get(f'/reports/{report_id}/pdf')
+    assert first.status_code in (200, 202)
+    queue.wait(report_id, timeout=30)
+    pdf = client.get(f'/reports/{report_id}/pdf')
+    assert pdf.status_code == 200 and pdf.headers['content-type'] == 'application/pdf'
+    assert pdf.content.startswith(b'%PDF')
+
+    assert client.get('/reports/unknown/pdf').status_code == 404
+    assert client.get('/reports/unknown/html').status_code == 404
+    client.delete(f'/reports/{report_id}')
+    assert queue.cached_path(report_id) is None
+
+
+def test_pruned_report_pdf_is_not_served(queue, monkeypatch):
+    store = MemoryReportStore(max_reports=1)
+    monkeypatch.setattr(report_store, '_report_store', store)
+    client = TestClient(app)
+    old_id = store.save(_report())
+    queue.submit(old_id)
+    assert queue.wait(old_id, timeout=30)['status'] == 'ready'
+
+    store.save(_report())  # prunes old_id, leaving its cached PDF behind
+    assert not store.exists(old_id)
+    assert client.get(f'/reports/{old_id}/pdf').status_code == 404
+    assert queue.cached_path(old_id) is None
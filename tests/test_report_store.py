@@ -0,0 +1,177 @@
+"""Tests for persisted reports and report diffs"""
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import report_store
+from app.services.report_store import MemoryReportStore, SQLiteReportStore, create_report_store
+
+
+def _report(scores, drifted, severities, impacts=None):
+    drift = [
+        {'feature': f, 'drift': bool(drifted[f]), 'drift_score': np.float64(scores[f]),
+         'severity': severities[f], 'method': 'KS-Test'}
+        for f in scores
+    ]
+    impact = [
+        {'feature': f, 'impact_score': (impacts or {}).get(f, 0.0), 'impact_level': 'Low'}
+        for f in scores
+    ]
+    return {
+        'executive_summary': {'severity': 'LOW'},
+        'drift_analysis': {'all_results': drift},
+        'impact_analysis': {'all_results': impact}
+    }
+
+
+@pytest.fixture(params=['sqlite', 'memory'])
+def store(request, tmp_path):
+    if request.param == 'sqlite':
+        return SQLiteReportStore(str(tmp_path / 'reports.sqlite'))
+    return MemoryReportStore()
+
+
+def test_save_roundtrip_and_list(store):
+    report = _report({'a': 0.1}, {'a': False}, {'a': 'None'})
+    report_id = store.save(report, name='churn')
+
+    assert store.get(report_id)['metadata']['report_id'] == report_id
+    assert [r['report_id'] for r in store.list(name='churn')] == [report_id]
+    store.delete(report_id)
+    with pytest.raises(KeyError):
+        store.get(report_id)
+
+
+def test_diff_classifies_changes(store):
+    base = store.save(_report(
+        {'a': 0.05, 'b': 0.4, 'c': 0.2, 'gone': 0.1},
+        {'a': False, 'b': True, 'c': True, 'gone': False},
+        {'a': 'None', 'b': 'High', 'c': 'Moderate', 'gone': 'None'}
+    ))
+    target = store.save(_report(
+        {'a': 0.35, 'b': 0.05, 'c': 0.21, 'new': 0.5},
+        {'a': True, 'b': False, 'c': True, 'new': True},
+        {'a': 'High', 'b': 'None', 'c': 'Moderate', 'new': 'High'},
+        impacts={'a': 0.3}
+    ))
+
+    diff = store.diff(base, target)
+
+    assert {d['feature'] for d in diff['newly_drifted']} == {'a', 'new'}
+    assert [r['feature'] for r in diff['resolved']] == ['b']
+    assert {(c['feature'], c['direction']) for c in diff['severity_changes']} == {('a', 'worse'), ('b', 'better')}
+    assert diff['added_features'] == ['new'] and diff['removed_features'] == ['gone']
+    assert diff['top_score_changes'][0]['feature'] == 'b'
+    assert diff['top_score_changes'][0]['drift_score_delta'] == pytest.approx(-0.35)
+    assert 'c' not in {m['feature'] for m in store.diff(base, target, min_score_change=0.05)['top_score_changes']}
+    assert diff['summary']['features_compared'] == 3
+
+
+def test_diff_of_10k_feature_reports_is_fast(store):
+    rng = np.random.default_rng(0)
+    features = [f'f{i}' for i in range(10000)]
+    reports = []
+    for _ in range(2):
+        scores = dict(zip(features, rng.random(len(features))))
+        reports.append(store.save(_report(
+            scores, {f: s > 0.9 for f, s in scores.items()}, {f: 'High' if s > 0.9 else 'None' for f, s in scores.items()}
+        )))
+
+    start = time.perf_counter()
+    diff = store.diff(*reports, top_k=10)
+    elapsed = time.perf_counter() - start
+
+    assert diff['summary']['features_compared'] == 10000
+    assert len(diff['top_score_changes']) == 10
+    assert elapsed < 1.0
+
+
+def test_report_endpoints(store, monkeypatch):
+    monkeypatch.setattr(report_store, '_report_store', store)
+    client = TestClient(app)
+    base = store.save(_report({'a': 0.05}, {'a': False}, {'a': 'None'}))
+    target = store.save(_report({'a': 0.4}, {'a': True}, {'a': 'High'}))
+
+    diff = client.get(f'/reports/{base}/diff/{target}', params={'top_k': 1}).json()
+    assert client.get('/reports/history/A').json()['history'][-1]['report_id'] == target
+    assert client.get('/reports/top-drifting', params={'runs': 1}).json()['features'][0]['feature'] == 'a'
+    assert diff['newly_drifted'][0]['feature'] == 'a'
+    assert client.get(f'/reports/{base}').json()['metadata']['report_id'] == base
+    assert len(client.get('/reports').json()['reports']) == 2
+    assert client.get(f'/reports/{base}/diff/missing').status_code == 404
+
+
+def _saved_runs(store, runs):
+    ids = []
+    for i, scores in enumerate(runs):
+        ids.append(store.save(_report(
+            scores, {f: s > 0.2 for f, s in scores.items()}, {f: 'High' if s > 0.2 else 'None' for f, s in scores.items()}
+        ), name='churn' if i % 2 == 0 else 'fraud'))
+        time.sleep(0.002)  # distinct created_at
+    return ids
+
+
+def test_feature_history_and_top_drifting(store):
+    ids = _saved_runs(store, [
+        {'income': 0.1, 'age': 0.3},
+        {'income': 0.2, 'age': 0.3},
+        {'income': 0.5, 'age': 0.05},
+        {'income': 0.6, 'age': 0.05},
+    ])
+
+    history = store.feature_history('income')
+    assert [h['report_id'] for h in history] == ids
+    assert [h['drift_score'] for h in history] == [0.1, 0.2, 0.5, 0.6]
+    assert [h['report_id'] for h in store.feature_history('income', limit=2)] == ids[2:]
+    assert [h['report_id'] for h in store.feature_history('income', name='churn')] == [ids[0], ids[2]]
+
+    top = store.top_drifting(runs=2)
+    assert top[0]['feature'] == 'income' and top[0]['drifted_runs'] == 2 and top[0]['avg_drift_score'] == 0.55
+    assert store.top_drifting(runs=4)[0]['feature'] == 'income'
+    assert store.top_drifting(runs=2, name='churn')[0] == {
+        'feature': 'income', 'runs': 2, 'drifted_runs': 1, 'avg_drift_score': 0.3,
+        'max_drift_score': 0.5, 'avg_impact_score': 0.0
+    }
+
+
+def test_retention_keeps_newest_reports(tmp_path):
+    store = SQLiteReportStore(str(tmp_path / 'reports.sqlite'), max_reports=2)
+    ids = _saved_runs(store, [{'a': 0.1}, {'a': 0.2}, {'a': 0.3}])
+
+    assert [r['report_id'] for r in store.list()] == ids[:0:-1]
+    assert [h['report_id'] for h in store.feature_history('a')] == ids[1:]
+
+
+def test_backend_factory():
+    assert isinstance(create_report_store('memory'), MemoryReportStore)
+    with pytest.raises(ValueError, match='Unknown report store backend'):
+        create_report_store('postgres')
+
+
+def test_sqlite_queries_use_indexes_and_migrate_old_stores(tmp_path):
+    import sqlite3
+    from app.services.report_store import HISTORY_QUERY
+
+    path = str(tmp_path / 'old.sqlite')
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE reports (report_id TEXT PRIMARY KEY, name TEXT NOT NULL, created_at REAL NOT NULL,
+                              severity TEXT, feature_count INTEGER NOT NULL, report BLOB NOT NULL);
+        CREATE TABLE feature_results (report_id TEXT NOT NULL, feature TEXT NOT NULL, drift INTEGER NOT NULL,
+                                      drift_score REAL, severity TEXT, method TEXT, impact_score REAL,
+                                      impact_level TEXT, PRIMARY KEY (report_id, feature)) WITHOUT ROWID;
+        INSERT INTO reports VALUES ('old', 'churn', 1.0, 'LOW', 1, x'');
+        INSERT INTO feature_results VALUES ('old', 'a', 1, 0.4, 'High', 'KS-Test', 0.1, 'Low');
+    """)
+    conn.commit()
+    conn.close()
+
+    store = SQLiteReportStore(path)
+    assert store.feature_history('a')[0]['created_at'] == 1.0
+
+    with sqlite3.connect(path) as conn:
+        plan = conn.execute('EXPLAIN QUERY PLAN ' + HISTORY_QUERY, {'feature': 'a', 'name': None, 'limit': 5}).fetchall()
+    assert any('feature_results_by_feature' in row[-1] for row in plan)
@@ -0,0 +1,111 @@
+"""Tests for columnar result views and response-schema validation"""
+import os
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.main import app
+from app.models.results import DriftColumns, ImpactColumns, rank_descending
+from app.models.schemas import AutopsyReport
+from app.reports.report_builder import build_report
+from app.services.timeline import build_timeline
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'samples')
+
+
+def _results(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    drift = [
+        {'feature': f'f{i}', 'method': 'KS-Test', 'drift': bool(rng.random() < 0.4),
+         'drift_score': float(np.round(rng.random(), 1)), 'severity': str(rng.choice(['None', 'Low', 'High']))}
+        for i in range(n)
+    ]
+    impact = [
+        {'feature': f'f{i}', 'impact_score': np.float64(np.round(rng.random(), 1)),
+         'impact_level': str(rng.choice(['Low', 'Moderate', 'High']))}
+        for i in rng.permutation(n)
+    ]
+    return drift, impact
+
+
+def test_rank_descending_is_stable_like_sorted():
+    scores = np.array([0.5, 0.1, 0.5, 0.9, 0.1])
+    assert rank_descending(scores).tolist() == sorted(range(5), key=lambda i: scores[i], reverse=True)
+    assert rank_descending(scores, np.array([1, 2, 4]), k=2).tolist() == [2, 1]
+
+
+def test_report_matches_dict_based_ranking():
+    drift, impact = _results()
+    report = build_report(drift, impact, build_timeline(drift, impact), {})
+
+    drifted = [d for d in drift if d['drift']]
+    expected = sorted(drifted, key=lambda d: d['drift_score'], reverse=True)[:10]
+    assert report['drift_analysis']['drift_leaderboard'] == expected
+    assert report['impact_analysis']['impact_leaderboard'] == sorted(
+        impact, key=lambda i: i['impact_score'], reverse=True
+    )[:10]
+    assert report['drift_analysis']['summary']['severe_drift_count'] == sum(d['severity'] == 'High' for d in drift)
+    assert report['visualizations']['drift_chart_data']['x_axis'] == [d['feature'] for d in drifted[:15]]
+    assert all(type(p['is_critical']) is bool for p in report['visualizations']['correlation_data']['points'])
+
+
+def test_timeline_critical_features_ranked_by_drift():
+    drift, impact = _results()
+    high = {i['feature'] for i in impact if i['impact_level'] == 'High'}
+    timeline = build_timeline(DriftColumns.from_results(drift), ImpactColumns.from_results(impact))
+
+    critical = timeline['critical_features']
+    assert set(critical) == {d['feature'] for d in drift if d['drift'] and d['feature'] in high}
+    scores = {d['feature']: d['drift_score'] for d in drift}
+    assert [scores[f] for f in critical] == sorted((scores[f] for f in critical), reverse=True)
+
+
+def test_columns_round_trip_records_without_mutating_input():
+    drift, impact = _results(50)
+    columns = DriftColumns.from_results(iter(drift))
+    assert columns.records() == drift and columns == drift
+    assert 'feature' in drift[0] and 'feature' not in columns.details[0]
+    assert columns.sorted().drift_score.tolist() == sorted((d['drift_score'] for d in drift), reverse=True)
+
+    weighted = ImpactColumns.from_results(impact).with_weighted_score(np.arange(50.0)).sorted()
+    assert weighted.features[0] == impact[-1]['feature']
+    assert weighted[0]['weighted_impact_score'] == 49.0
+    assert 'weighted_impact_score' not in ImpactColumns.from_results(impact)[0]
+
+
+def test_empty_results():
+    report = build_report([], [], build_timeline([], []), {})
+    assert report['drift_analysis']['drift_leaderboard'] == []
+    assert len(DriftColumns.from_results([])) == 0
+
+
+def test_run_autopsy_response_matches_schema():
+    client = TestClient(app)
+    files = {
+        name: open(os.path.join(SAMPLES_DIR, f'sample_{name}.csv'), 'rb')
+        for name in ('train', 'prod_old', 'prod_new')
+    }
+    try:
+        response = client.post(
+            '/run-autopsy', files=files,
+            data={'save_report': 'false', 'multivariate': 'false', 'correlation': 'false'}
+        )
+    finally:
+        for f in files.values():
+            f.close()
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    report = AutopsyReport.model_validate(body)
+    # Method-specific fields survive validation as extras
+    assert any('p_value' in d for d in body['drift_analysis']['all_results'])
+    assert report.drift_analysis.summary.total_features_analyzed == len(report.drift_analysis.all_results)
+    assert 'multivariate_drift' not in body and 'report_id' not in body['metadata']
+
+    # Undeclared report sections are rejected, not passed through
+    with pytest.raises(ValidationError):
+        AutopsyReport.model_validate(dict(body, unexpected={}))
+    with pytest.raises(ValidationError):
+        AutopsyReport.model_validate(dict(body, metadata=dict(body['metadata'], unexpected=1)))
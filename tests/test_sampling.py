@@ -0,0 +1,123 @@
+"""Tests for sampling mode and confidence-aware drift statistics"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.drift_detection import detect_drift
+from app.services.drift_policy import DriftPolicy
+from app.services.impact_analysis import analyze_impact
+from app.services.pipeline import run_pipeline
+from app.services.sampling import (
+    sample_csv_stream,
+    sample_frame,
+    attach_confidence_intervals,
+    bootstrap_numeric_impact,
+    ks_confidence_interval
+)
+from app.config import SAMPLING_MAX_ROWS
+
+
+def _csv(df):
+    return io.BytesIO(df.to_csv(index=False).encode())
+
+
+def test_reservoir_sample_is_uniform_across_chunks():
+    df = pd.DataFrame({'row': np.arange(20000), 'x': np.zeros(20000)})
+
+    sample, info = sample_csv_stream(_csv(df), 2000, chunksize=3000)
+
+    assert len(sample) == 2000
+    assert info['rows_seen'] == 20000
+    # Later chunks must not be over- or under-represented
+    assert 0.4 < (sample['row'] >= 10000).mean() < 0.6
+
+
+def test_stratified_sample_keeps_every_stratum_proportionally():
+    rng = np.random.default_rng(0)
+    segments = rng.choice(['a', 'b', 'rare'], 30000, p=[0.8, 0.19, 0.01])
+    df = pd.DataFrame({'segment': segments, 'x': rng.normal(size=30000)})
+
+    sample, info = sample_csv_stream(_csv(df), 1000, stratify_by='segment', chunksize=4000)
+
+    shares = sample['segment'].value_counts(normalize=True)
+    assert info['strata'] == 3
+    assert 'rare' in shares
+    assert abs(shares['a'] - 0.8) < 0.02
+
+
+def test_intervals_contain_point_estimates():
+    rng = np.random.default_rng(1)
+    train = pd.DataFrame({'x': rng.normal(0, 1, 3000), 'c': rng.choice(['u', 'v'], 3000)})
+    new = pd.DataFrame({'x': rng.normal(0.3, 1, 3000), 'c': rng.choice(['u', 'v', 'w'], 3000)})
+    drift = detect_drift(train, new)
+    impact = analyze_impact(train, train, new)
+
+    attach_confidence_intervals(drift, impact, train, new, rounds=100)
+
+    for result in drift:
+        score = result.get('ks_statistic', result.get('psi_value'))
+        low, high = result['confidence_interval']
+        assert low <= score <= high
+    assert all('borderline' in r for r in impact)
+
+
+def test_borderline_features_are_escalated():
+    # 0.15 shift on 200 rows: KS interval is wide enough to straddle a cutoff
+    rng = np.random.default_rng(2)
+    train = pd.DataFrame({'x': rng.normal(0, 1, 200)})
+    old = pd.DataFrame({'x': rng.normal(0, 1, 200)})
+    new = pd.DataFrame({'x': rng.normal(0.15, 1, 200)})
+    train_s, _ = sample_frame(train, 200)
+
+    report = run_pipeline(train_s, old, new, sampling_info={'sample_size': 200})
+
+    assert ks_confidence_interval(0.1, 200, 200)[1] > 0.2
+    assert report['metadata']['sampling']['escalate_features'] == ['x']
+
+
+def test_borderline_uses_feature_policy_cutoffs():
+    rng = np.random.default_rng(2)
+    train = pd.DataFrame({'x': rng.normal(0, 1, 200)})
+    new = pd.DataFrame({'x': rng.normal(0.15, 1, 200)})
+    drift, impact = detect_drift(train, new), analyze_impact(train, train, new)
+    # Cutoffs no interval can reach, so nothing straddles them
+    policy = DriftPolicy({'features': {'x': {'ks_severity': [5, 6, 7], 'impact': [1000, 2000]}}})
+
+    assert attach_confidence_intervals(drift, impact, train, new, rounds=50) == ['x']
+    assert attach_confidence_intervals(drift, impact, train, new, rounds=50, policy=policy) == []
+
+
+def test_blocked_bootstrap_matches_single_block():
+    rng = np.random.default_rng(0)
+    train, new = rng.normal(0, 1, 5000), rng.normal(0.3, 1.2, 4000)
+    whole = bootstrap_numeric_impact(train, new, 50, 0.95, np.random.default_rng(1), block_cells=10**9)
+    blocked = bootstrap_numeric_impact(train, new, 50, 0.95, np.random.default_rng(1), block_cells=12000)
+    assert blocked == pytest.approx(whole)
+
+
+def test_sample_size_above_maximum_is_rejected():
+    df = pd.DataFrame({'x': np.arange(10)})
+    with pytest.raises(ValueError, match='at most'):
+        sample_frame(df, SAMPLING_MAX_ROWS + 1)
+
+
+def test_high_cardinality_strata_keep_the_reservoir_bounded(monkeypatch):
+    from app.services import sampling
+
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({'user': [f'u{i}' for i in range(30000)], 'x': rng.normal(size=30000)})
+    sizes = []
+    keep_smallest = sampling._keep_smallest_keys
+    monkeypatch.setattr(
+        sampling, '_keep_smallest_keys',
+        lambda *args: (lambda kept: sizes.append(len(kept[0])) or kept)(keep_smallest(*args))
+    )
+
+    sample, info = sample_csv_stream(_csv(df), 500, stratify_by='user', chunksize=4000)
+
+    # Allocation never exceeds sample_size, even with one row per stratum
+    assert len(sample) == 500
+    assert info['strata'] == sampling.SAMPLING_MAX_STRATA + 1  # tracked strata plus "<other>"
+    assert max(sizes) <= 500 * sampling.SAMPLING_STRATIFIED_OVERSAMPLE + info['strata']
@@ -0,0 +1,97 @@
+"""Tests for segment-level drift drill-down"""
+import numpy as np
+import pandas as pd
+
+from app.services.drift_policy import DriftPolicy
+from app.services.segment_analysis import analyze_segments
+from app.utils.stats import calculate_psi
+
+
+def _frame(rng, n=6000, remote_income_shift=0.0):
+    df = pd.DataFrame({
+        'location': rng.choice(['urban', 'rural', 'remote'], n),
+        'plan': rng.choice(['basic', 'pro'], n),
+        'income': rng.normal(50000, 10000, n),
+        'education': rng.choice(['hs', 'ba', 'ms'], n)
+    })
+    df.loc[df['location'] == 'remote', 'income'] += remote_income_shift
+    return df
+
+
+def test_finds_drift_hidden_in_one_segment():
+    rng = np.random.default_rng(0)
+    train, new = _frame(rng), _frame(rng, remote_income_shift=15000)
+
+    result = analyze_segments(train, new, ['location'])
+
+    top = result['top_segments'][0]
+    assert top['segment'] == {'location': 'remote'}
+    assert top['features'][0]['feature'] == 'income'
+    assert top['features'][0]['psi'] > 3 * result['global_psi']['income']
+    assert result['top_segments'][-1]['max_psi'] < 0.1
+
+
+def test_segment_psi_matches_calculate_psi():
+    rng = np.random.default_rng(1)
+    train, new = _frame(rng), _frame(rng)
+    train_seg, new_seg = train[train['location'] == 'rural'], new[new['location'] == 'rural']
+
+    result = analyze_segments(train, new, ['location'], top_k=3)
+
+    rural = next(s for s in result['top_segments'] if s['segment'] == {'location': 'rural'})
+    by_feature = {f['feature']: f['psi'] for f in rural['features']}
+    assert np.isclose(by_feature['education'], calculate_psi(train_seg['education'], new_seg['education']), atol=1e-4)
+
+
+def test_small_segments_are_pruned_and_fall_back_to_global_baseline():
+    rng = np.random.default_rng(2)
+    train, new = _frame(rng), _frame(rng)
+    new.loc[:9, 'location'] = 'island'  # 10 prod rows, absent from training
+
+    result = analyze_segments(train, new, ['location', 'plan'], min_rows=5)
+    pruned = analyze_segments(train, new, ['location', 'plan'], min_rows=50)
+
+    island = [s for s in result['top_segments'] if s['segment']['location'] == 'island']
+    assert island and all(s['baseline'] == 'global' for s in island)
+    assert pruned['segments_pruned'] >= 1
+    assert all(s['segment']['location'] != 'island' for s in pruned['top_segments'])
+
+
+def test_segment_levels_follow_feature_policy():
+    rng = np.random.default_rng(3)
+    train, new = _frame(rng), _frame(rng, remote_income_shift=15000)
+    policy = DriftPolicy({'features': {
+        'income': {'psi': [50, 100], 'impact_weights': {'mean_shift': 0, 'variance_change': 0, 'overlap_loss': 0}}
+    }})
+
+    default = analyze_segments(train, new, ['location'])
+    strict = analyze_segments(train, new, ['location'], policy=policy)
+
+    remote = lambda result: next(s for s in result['top_segments'] if s['segment'] == {'location': 'remote'})
+    income = lambda segment: next(f for f in segment['features'] if f['feature'] == 'income')
+    assert income(remote(default))['drift'] and income(remote(default))['impact_score'] > 0
+    assert not income(remote(strict))['drift'] and income(remote(strict))['severity'] == 'None'
+    assert income(remote(strict))['impact_score'] == 0
+    assert income(remote(strict))['psi'] == income(remote(default))['psi']
+
+
+def test_high_cardinality_column_uses_heavy_hitter_bins(monkeypatch):
+    from app.services import segment_analysis
+
+    rng = np.random.default_rng(3)
+    n = 30000
+    user_ids = np.where(np.arange(n) % 2 == 0, 'guest', [f'u{i}' for i in range(n)])
+    train = pd.DataFrame({'location': rng.choice(['urban', 'rural'], n), 'user_id': user_ids})
+    new = pd.DataFrame({'location': rng.choice(['urban', 'rural'], n), 'user_id': [f'n{i}' for i in range(n)]})
+    widths = []
+    grouped_hist = segment_analysis._grouped_hist
+    monkeypatch.setattr(
+        segment_analysis, '_grouped_hist',
+        lambda seg, codes, n_segments, n_bins: widths.append(n_bins) or grouped_hist(seg, codes, n_segments, n_bins)
+    )
+
+    result = analyze_segments(train, new, ['location'], min_rows=10)
+
+    assert max(widths) <= 51  # training heavy hitters plus "<other>"
+    # The "guest" heavy hitter disappears and every prod ID pools into "<other>"
+    assert result['top_segments'][0]['features'][0]['severity'] == 'High'
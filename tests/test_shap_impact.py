@@ -0,0 +1,77 @@
+"""Tests for the scalable SHAP impact path"""
+import numpy as np
+import pandas as pd
+import shap
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+from app.services.shap_impact import get_explainer, shap_importance, summarize_background
+
+
+def _data(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'a': rng.normal(0, 1, n), 'b': rng.normal(0, 1, n), 'seg': rng.choice(['x', 'y'], n)})
+    target = 2 * df['a'] + 0.1 * df['b']
+    return df, target
+
+
+def test_background_is_summarized():
+    df, _ = _data()
+
+    assert len(summarize_background(df[['a', 'b']], size=20)) == 20
+    assert len(summarize_background(df, size=20)) == 20  # categorical column: sampled
+
+
+def test_tree_models_get_a_cached_tree_explainer():
+    df, target = _data()
+    model = RandomForestRegressor(n_estimators=10, max_depth=4, random_state=0).fit(df[['a', 'b']], target)
+    background = summarize_background(df[['a', 'b']], size=10)
+
+    explainer = get_explainer(model, background)
+
+    assert isinstance(explainer, shap.TreeExplainer)
+    assert get_explainer(model, background) is explainer
+
+
+def test_chunked_workers_match_inline_explanation():
+    df, target = _data()
+    model = LinearRegression().fit(df[['a', 'b']], target)
+
+    inline = shap_importance(model, df, df, ['a', 'b'], stratify_by='seg', explain_rows=300, max_workers=1)
+    pooled = shap_importance(model, df, df, ['a', 'b'], stratify_by='seg', explain_rows=300,
+                             chunk_rows=100, max_workers=2, process_min_rows=0)
+
+    assert inline['a'] > 10 * inline['b']
+    assert np.allclose([inline['a'], inline['b']], [pooled['a'], pooled['b']])
+
+
+def test_pool_workers_and_default_path_reuse_cached_explainers(monkeypatch):
+    import pickle
+    from app.services import shap_impact
+
+    df, target = _data()
+    model = LinearRegression().fit(df[['a', 'b']], target)
+    background = summarize_background(df[['a', 'b']])
+    first = shap_importance(model, df, df, ['a', 'b'], explain_rows=300, chunk_rows=100,
+                            max_workers=2, process_min_rows=0)
+    pool = shap_impact._get_pool(2)
+    again = shap_importance(model, df, df, ['a', 'b'], explain_rows=300, chunk_rows=100,
+                            max_workers=2, process_min_rows=0)
+    assert again == first and shap_impact._get_pool(2) is pool
+
+    # A worker task unpickles and builds the explainer only on a cache miss
+    monkeypatch.setattr(shap_impact, '_explainer_cache', type(shap_impact._explainer_cache)())
+    builds = []
+    build = shap_impact._build_explainer
+    monkeypatch.setattr(shap_impact, '_build_explainer', lambda *args: builds.append(1) or build(*args))
+    key = ('worker-test', shap_impact._background_hash(background))
+    for _ in range(3):
+        shap_impact._explain_chunk(key, pickle.dumps(model), background, df[['a', 'b']].head(50))
+    assert len(builds) == 1
+
+    # Small samples are explained inline with the cached explainer
+    inline = shap_importance(model, df, df, ['a', 'b'], explain_rows=300, model_key=shap_impact.model_hash(model))
+    assert len(builds) == 2
+    shap_importance(model, df, df, ['a', 'b'], explain_rows=300, model_key=shap_impact.model_hash(model))
+    assert len(builds) == 2
+    assert np.allclose(list(inline.values()), list(first.values()))
@@ -0,0 +1,104 @@
+"""Tests for frequency sketches on high-cardinality categoricals"""
+import numpy as np
+import pandas as pd
+
+from app.services.baseline import profile_column
+from app.services.drift_detection import detect_drift
+from app.services.impact_analysis import analyze_impact
+from app.config import SKETCH_WIDTH
+from app.utils.sketches import CategoricalSketch, CountMinSketch, HyperLogLog, compare_to_sketch, hash_values
+from app.utils.stats import calculate_psi
+
+
+def _ids(rng, n, prefix='id', universe=200_000, hot=('hot_a', 'hot_b'), hot_share=0.2):
+    values = pd.Series([f'{prefix}{i}' for i in rng.integers(0, universe, n)], dtype=object)
+    hot_rows = rng.random(n) < hot_share
+    values[hot_rows] = rng.choice(list(hot), hot_rows.sum())
+    return values
+
+
+def test_count_min_never_undercounts():
+    rng = np.random.default_rng(0)
+    values = pd.Series(rng.integers(0, 5000, 50_000)).astype(str)
+    cms = CountMinSketch(width=1024, depth=4)
+    cms.update(hash_values(values))
+
+    exact = values.value_counts()
+    estimates = cms.query(hash_values(pd.Series(exact.index)))
+
+    assert np.all(estimates >= exact.to_numpy())
+    assert cms.total == len(values)
+
+
+def test_hyperloglog_distinct_estimate():
+    rng = np.random.default_rng(1)
+    values = pd.Series(rng.integers(0, 10**9, 200_000)).astype(str)
+    hll = HyperLogLog()
+    hll.update(hash_values(values))
+
+    exact = values.nunique()
+    assert abs(hll.estimate() - exact) / exact < 0.05
+
+
+def test_heavy_hitters_are_found():
+    rng = np.random.default_rng(2)
+    sketch = CategoricalSketch.from_series(_ids(rng, 100_000), chunk_rows=10_000)
+
+    top = sketch.top()
+    assert list(top.index[:2]) == ['hot_a', 'hot_b'] or list(top.index[:2]) == ['hot_b', 'hot_a']
+    assert abs(top.iloc[0] - 0.1) < 0.02
+
+
+def test_id_column_uses_sketch_path_and_flags_new_values():
+    rng = np.random.default_rng(3)
+    train = pd.DataFrame({'user_id': _ids(rng, 60_000), 'x': rng.normal(size=60_000)})
+    new = pd.DataFrame({
+        'user_id': _ids(rng, 60_000, prefix='new', hot=('hot_a', 'fresh_hot')),
+        'x': rng.normal(size=60_000)
+    })
+
+    profile = profile_column(train['user_id'])
+    assert profile['high_cardinality']
+
+    drift = {r['feature']: r for r in detect_drift(train, new)}['user_id']
+    assert drift['high_cardinality']
+    assert drift['drift']
+    assert 'fresh_hot' in drift['statistics']['new_categories']
+    assert drift['statistics']['new_value_row_share'] > 0.85
+    assert drift['statistics']['new_categories_estimate'] > 30_000
+
+    impact = {r['feature']: r for r in analyze_impact(train, new, new)}['user_id']
+    assert impact['high_cardinality']
+    assert impact['impact_level'] == 'High'
+
+
+def test_new_values_found_far_above_sketch_width():
+    # ~330k distinct training values fill (almost) every count-min cell, so
+    # only the Bloom filter can tell that most production rows were never seen
+    rng = np.random.default_rng(5)
+    train = pd.Series(rng.integers(0, 2_000_000, 400_000)).astype(str).astype(object)
+    prod = pd.Series(rng.integers(0, 20_000_000, 100_000)).astype(str).astype(object)
+
+    sketch = CategoricalSketch.from_series(train)
+    assert sketch.distinct() > 4 * SKETCH_WIDTH
+    assert (sketch.cms.query(hash_values(prod)) == 0).mean() < 0.05
+
+    comparison = compare_to_sketch(sketch, prod)
+    exact = float((~prod.isin(set(train))).mean())
+    assert exact > 0.85
+    assert abs(comparison['new_row_share'] - exact) < 0.02
+
+    drift = {r['feature']: r for r in detect_drift(train.to_frame('id'), prod.to_frame('id'))}['id']
+    assert drift['high_cardinality'] and drift['drift']
+
+
+def test_low_cardinality_psi_unchanged():
+    rng = np.random.default_rng(4)
+    train = pd.Series(rng.choice(['a', 'b', 'c'], 5000, p=[0.5, 0.3, 0.2]))
+    new = pd.Series(rng.choice(['a', 'b', 'd'], 5000, p=[0.2, 0.3, 0.5]))
+
+    drift = {r['feature']: r for r in detect_drift(train.to_frame('c'), new.to_frame('c'))}['c']
+
+    assert 'high_cardinality' not in drift
+    assert drift['psi_value'] == round(calculate_psi(train, new), 5)
+    assert drift['statistics']['new_categories'] == ['d']
@@ -0,0 +1,142 @@
+"""Tests for per-feature distribution data and its lazy-loading endpoint"""
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import report_store
+from app.services.baseline import build_baseline_profile
+from app.services.pipeline import run_pipeline
+from app.services.report_store import MemoryReportStore, SQLiteReportStore
+from app.services.visualization import (
+    OTHER_CATEGORY,
+    build_visualization_data,
+    categorical_distribution,
+    numeric_distribution
+)
+from app.utils.stats import numeric_drift_metrics, quantile_bin_edges
+
+
+def _frames(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    train = pd.DataFrame({
+        'income': rng.normal(50000, 10000, n),
+        'age': rng.integers(18, 80, n).astype('int64'),
+        'city': rng.choice(['a', 'b', 'c'], n)
+    })
+    old = train.sample(frac=0.5, random_state=1).reset_index(drop=True)
+    new = pd.DataFrame({
+        'income': rng.normal(80000, 10000, n),
+        'age': rng.integers(18, 80, n).astype('int64'),
+        'city': rng.choice(['a', 'd'], n)
+    })
+    return train, old, new
+
+
+def test_numeric_histograms_reuse_drift_bins():
+    train, old, new = _frames()
+    train_sorted = np.sort(train['income'].to_numpy())
+    dist = numeric_distribution(train_sorted, old['income'].to_numpy(), new['income'].to_numpy(), bins=10)
+
+    assert dist['bin_edges'] == list(quantile_bin_edges(train_sorted, 10))
+    for name in ('train', 'prod_old', 'prod_new'):
+        assert len(dist['histograms'][name]['shares']) == 10
+        assert sum(dist['histograms'][name]['shares']) == pytest.approx(1.0, abs=1e-3)
+    # Training-quantile bins hold equal training mass; the shifted data piles into the last bin
+    assert dist['histograms']['train']['shares'][0] == pytest.approx(0.1, abs=0.01)
+    assert dist['histograms']['prod_new']['shares'][-1] > 0.5
+    assert dist['out_of_range']['prod_new']['above'] > 0
+    assert dist['summary']['prod_new']['quantiles']['p50'] > dist['summary']['train']['quantiles']['p50']
+
+
+def test_charts_use_the_edges_drift_metrics_scored_on():
+    train, old, new = _frames()
+    baseline = build_baseline_profile(train)
+    profile = baseline['income']
+    data = build_visualization_data(train, old, new, baseline=baseline, features=['income'])
+
+    assert data['income']['bin_edges'] == list(profile['bin_edges'])
+    prod_sorted = np.sort(new['income'].to_numpy())
+    assert numeric_drift_metrics(profile['values'], prod_sorted, ['psi'], edges=profile['bin_edges']) == \
+        numeric_drift_metrics(profile['values'], prod_sorted, ['psi'])
+
+
+def test_unsaved_report_builds_only_charted_distributions(monkeypatch):
+    from app.services import pipeline
+
+    requested = []
+    build = pipeline.build_visualization_data
+    monkeypatch.setattr(pipeline, 'build_visualization_data',
+                        lambda *args, features, **kwargs: requested.extend(features) or build(*args, features=features, **kwargs))
+    train, old, new = _frames()
+
+    report = run_pipeline(train, old, new, incremental=False, multivariate=False, correlation=False)
+
+    assert requested == report['visualizations']['drift_chart_data']['x_axis']
+    assert set(report['visualizations']['distributions']) == set(requested)
+
+
+def test_constant_numeric_column_has_no_density():
+    dist = numeric_distribution(np.ones(100), np.ones(10), np.array([1.0, 2.0]))
+    assert dist['histograms']['train']['density'] is None
+    assert dist['histograms']['prod_new']['shares'] == [1.0]
+
+
+def test_categorical_keeps_new_categories_and_folds_the_rest():
+    train_dist = pd.Series({'a': 0.5, 'b': 0.3, 'c': 0.2})
+    new = pd.Series(['a'] * 50 + ['d'] * 50)
+    dist = categorical_distribution(train_dist, pd.Series(['a', 'a', 'c']), new, max_categories=2)
+
+    assert dist['categories'] == ['a', 'd', OTHER_CATEGORY]
+    assert dist['shares']['train'] == [0.5, 0.0, 0.5]
+    assert dist['shares']['prod_new'] == [0.5, 0.5, 0.0]
+
+
+def test_baseline_profile_gives_same_data():
+    train, old, new = _frames()
+    assert build_visualization_data(train, old, new, baseline=build_baseline_profile(train)) == \
+        build_visualization_data(train, old, new)
+
+
+def test_pipeline_profiles_each_training_column_once(monkeypatch):
+    import importlib
+    from app.services import baseline
+
+    profiled = []
+    profile_column = baseline.profile_column
+    for name in ('baseline', 'drift_detection', 'impact_analysis', 'multivariate_drift',
+                 'error_attribution', 'visualization'):
+        module = importlib.import_module(f'app.services.{name}')
+        monkeypatch.setattr(module, 'profile_column',
+                            lambda series: profiled.append(series.name) or profile_column(series))
+    train, old, new = _frames()
+
+    run_pipeline(train, old, new, incremental=False)
+
+    assert sorted(profiled) == sorted(train.columns)
+
+
+@pytest.mark.parametrize('backend', ['sqlite', 'memory'])
+def test_saved_report_serves_distributions_lazily(backend, tmp_path, monkeypatch):
+    store = SQLiteReportStore(str(tmp_path / 'r.sqlite')) if backend == 'sqlite' else MemoryReportStore()
+    monkeypatch.setattr(report_store, '_report_store', store)
+    train, old, new = _frames()
+
+    report = run_pipeline(
+        train, old, new, incremental=False, multivariate=False, correlation=False, save_as='churn'
+    )
+    report_id = report['metadata']['report_id']
+    inline = report['visualizations']['distributions']
+    assert set(inline) == set(report['visualizations']['drift_chart_data']['x_axis'])
+
+    client = TestClient(app)
+    age = client.get(f'/reports/{report_id}/distributions/Age')
+    assert age.status_code == 200 and age.json()['kind'] == 'numeric'
+    assert client.get(f'/reports/{report_id}/distributions/city').json()['kind'] == 'categorical'
+    assert client.get(f'/reports/{report_id}/distributions/missing').status_code == 404
+    assert client.get('/reports/unknown/distributions/age').status_code == 404
+
+    store.delete(report_id)
+    with pytest.raises(KeyError):
+        store.get_distribution(report_id, 'age')
@@ -0,0 +1,80 @@
+"""Tests for startup warm-up and preloaded baselines"""
+import gc
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import dataset_store
+from app.services.baseline import build_baseline_profile
+from app.services.dataset_store import DatasetStore
+from app.services.warmup import (
+    get_preloaded_baseline, prefork_warmup, preload_baselines, reset_warmup, warmup_status
+)
+
+
+def _csv_bytes(seed=0, n=500, shift=0.0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'income': rng.normal(50000 + shift, 10000, n),
+        'location': rng.choice(['urban', 'rural'], n)
+    }).to_csv(index=False).encode()
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = DatasetStore(root=str(tmp_path), quota_mb=10)
+    monkeypatch.setattr(dataset_store, '_dataset_store', store)
+    yield store
+    reset_warmup()
+
+
+def test_preload_profiles_registered_datasets(store):
+    first = store.ingest(_csv_bytes(0), name='train')['dataset_id']
+    second = store.ingest(_csv_bytes(1), name='other')['dataset_id']
+
+    assert preload_baselines([first, 'missing']) == [first]
+    assert get_preloaded_baseline(second) is None
+    assert sorted(preload_baselines(['*'])) == sorted([first, second])
+
+    expected = build_baseline_profile(store.load(first))
+    assert np.array_equal(get_preloaded_baseline(first)['income']['values'], expected['income']['values'])
+
+
+def test_prefork_warmup_loads_modules_and_freezes_gc(store):
+    train_id = store.ingest(_csv_bytes(0), name='train')['dataset_id']
+
+    info = prefork_warmup([train_id])
+
+    assert 'scipy' in sys.modules and 'scipy.stats' in info['modules']
+    assert info['preloaded_baselines'] == [train_id]
+    assert gc.get_freeze_count() > 0
+    assert warmup_status()['warmed']
+
+    reset_warmup()
+    assert gc.get_freeze_count() == 0 and not warmup_status()['warmed']
+
+
+def test_routes_use_preloaded_baseline(store, monkeypatch):
+    train_id = store.ingest(_csv_bytes(0), name='train')['dataset_id']
+    prod_id = store.ingest(_csv_bytes(2, shift=3000), name='prod')['dataset_id']
+    client = TestClient(app)
+
+    def analyze():
+        response = client.post('/analyze-drift', data={'train_id': train_id, 'production_id': prod_id})
+        assert response.status_code == 200
+        return response.json()['results']
+
+    cold = analyze()
+    preload_baselines([train_id])
+
+    def no_profiling(series):
+        raise AssertionError('training column profiled on the request path')
+    monkeypatch.setattr('app.services.drift_detection.profile_column', no_profiling)
+    warm = analyze()
+
+    assert warm == cold
+    assert client.get('/health').json()['warmup'] == {'warmed': False}